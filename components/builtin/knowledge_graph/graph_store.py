@@ -8,13 +8,27 @@ Architecture:
     GraphStore(profile_id, user_uuid)
       ├── SQLite layer         ← CRUD, persistence, search
       └── NetworkX DiGraph     ← BFS, shortest path, centrality, cycle detection
-          Lazy-loaded, cached, invalidated on writes
+          Lazy-loaded once per kg_id, shared by all GraphStore instances,
+          kept in sync by applying each write incrementally
+
+Optionally (APP_CONFIG.KG_GRAPH_SNAPSHOT_ENABLED) a compressed adjacency
+snapshot is persisted in kg_graph_snapshots so a cold process can rebuild the
+graph without re-parsing every entity/relationship row.
+
+Entity search:
+    kg_entities_fts          ← FTS5 trigram index over name + properties_json,
+                               kept in sync by triggers (substring semantics)
+    kg_entities_<kg_id>      ← optional embedding index in the vector store
+                               (APP_CONFIG.KG_SEMANTIC_SEARCH_ENABLED), fused
+                               with FTS results by reciprocal rank fusion
 """
 
 import json
 import logging
 import sqlite3
-from collections import deque
+import threading
+import zlib
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Set, Tuple
 
@@ -47,6 +61,133 @@ _SEMANTIC_TYPES = frozenset({"business_concept", "taxonomy", "metric", "domain"}
 _MAX_JOIN_DISCOVERY_ROUNDS = 3
 
 
+# Recent subgraph extraction results kept per graph (cleared on every write)
+_SUBGRAPH_MEMO_SIZE = 64
+
+
+class _SharedGraph:
+    """
+    A loaded NetworkX graph plus a version counter bumped on every write.
+
+    Structures derived from the graph (undirected adjacency, column-name
+    index, memoized subgraphs) are rebuilt lazily whenever the version moved.
+    ``db_version`` is the kg_graph_versions counter the graph corresponds to
+    (None if the database does not track versions).
+    """
+
+    __slots__ = ("graph", "version", "db_version", "_derived_version", "_undirected", "_column_index", "_memo")
+
+    def __init__(self, graph: Any, db_version: Optional[int] = None):
+        self.graph = graph
+        self.version = 0
+        self.db_version = db_version
+        self._derived_version = -1
+        self._undirected: Optional[Dict[int, Set[int]]] = None
+        self._column_index: Optional[Tuple[Dict[int, Set[str]], Dict[str, Set[int]]]] = None
+        self._memo: "OrderedDict[tuple, Dict[str, List]]" = OrderedDict()
+
+    def _sync_derived(self) -> None:
+        if self._derived_version != self.version:
+            self._undirected = None
+            self._column_index = None
+            self._memo.clear()
+            self._derived_version = self.version
+
+    def undirected_adjacency(self) -> Dict[int, Set[int]]:
+        """node -> set of successors and predecessors."""
+        self._sync_derived()
+        if self._undirected is None:
+            G = self.graph
+            self._undirected = {n: set(G.successors(n)).union(G.predecessors(n)) for n in G}
+        return self._undirected
+
+    def column_index(self) -> Tuple[Dict[int, Set[str]], Dict[str, Set[int]]]:
+        """(table -> lower-cased column names, column name -> tables owning such a column)."""
+        self._sync_derived()
+        if self._column_index is None:
+            G = self.graph
+            columns_by_table: Dict[int, Set[str]] = {}
+            tables_by_column: Dict[str, Set[int]] = {}
+            for nid, ndata in G.nodes(data=True):
+                if ndata.get("entity_type") != "table":
+                    continue
+                names = columns_by_table.setdefault(nid, set())
+                for succ in G.successors(nid):
+                    if G.nodes[succ].get("entity_type") == "column":
+                        cname = G.nodes[succ].get("name", "").lower()
+                        if cname:
+                            names.add(cname)
+                            tables_by_column.setdefault(cname, set()).add(nid)
+            self._column_index = (columns_by_table, tables_by_column)
+        return self._column_index
+
+    def memo_get(self, key: tuple) -> Optional[Dict[str, List]]:
+        self._sync_derived()
+        result = self._memo.get(key)
+        if result is not None:
+            self._memo.move_to_end(key)
+        return result
+
+    def memo_put(self, key: tuple, result: Dict[str, List]) -> None:
+        self._sync_derived()
+        self._memo[key] = result
+        while len(self._memo) > _SUBGRAPH_MEMO_SIZE:
+            self._memo.popitem(last=False)
+
+
+# Loaded graphs shared across GraphStore instances. Key: (db_path, kg_id)
+_SHARED_GRAPHS: Dict[Tuple[str, str], _SharedGraph] = {}
+_SHARED_GRAPHS_LOCK = threading.RLock()
+
+
+# db_paths whose FTS index and sync triggers have been verified this process
+_FTS_READY: Dict[str, bool] = {}
+
+# db_paths whose graph version table and triggers have been verified this process
+_VERSIONS_READY: Dict[str, bool] = {}
+
+# Reciprocal rank fusion constant for hybrid (FTS + embedding) entity search
+_RRF_K = 60
+
+# Entity embedding index state. Key: (db_path, kg_id)
+_EMBEDDING_SYNCED_STAMPS: Dict[Tuple[str, str], str] = {}
+_EMBEDDING_SYNC_TASKS: Dict[Tuple[str, str], Any] = {}
+
+
+def _semantic_search_enabled() -> bool:
+    try:
+        from trusted_data_agent.core.config import APP_CONFIG
+        return bool(getattr(APP_CONFIG, "KG_SEMANTIC_SEARCH_ENABLED", False))
+    except Exception:
+        return False
+
+
+def _copy_json(value: Any) -> Any:
+    """Deep-copy JSON-shaped data (dicts/lists of scalars); much cheaper than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def _copy_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an entity/relationship dict; only its container values need a deep copy."""
+    copied = dict(record)
+    for key, value in record.items():
+        if isinstance(value, (dict, list)):
+            copied[key] = _copy_json(value)
+    return copied
+
+
+def _snapshots_enabled() -> bool:
+    try:
+        from trusted_data_agent.core.config import APP_CONFIG
+        return bool(getattr(APP_CONFIG, "KG_GRAPH_SNAPSHOT_ENABLED", False))
+    except Exception:
+        return False
+
+
 class GraphStore:
     """
     Dual-layer graph store scoped to a single knowledge graph (kg_id).
@@ -57,8 +198,9 @@ class GraphStore:
 
     SQLite handles durable CRUD. NetworkX provides graph algorithms
     (BFS, shortest path, centrality, cycle detection). The NetworkX graph
-    is lazily loaded from SQLite on first graph operation and cached.
-    Any write operation invalidates the cache.
+    is lazily loaded from SQLite on first graph operation and shared by every
+    GraphStore for the same kg_id.  Writes are applied to the loaded graph
+    incrementally instead of forcing a full reload.
     """
 
     def __init__(
@@ -81,9 +223,6 @@ class GraphStore:
             except Exception:
                 self._db_path = "tda_auth.db"
 
-        # NetworkX cache — lazy-loaded, invalidated on writes
-        self._graph: Optional[Any] = None
-
     # -----------------------------------------------------------------------
     # kg_id resolution
     # -----------------------------------------------------------------------
@@ -128,9 +267,190 @@ class GraphStore:
         conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
+    @staticmethod
+    def _ensure_fts_index(conn: sqlite3.Connection, db_path: str) -> bool:
+        """
+        Create the FTS5 entity index and its sync triggers if missing.
+
+        The index is an external-content FTS5 table over kg_entities using the
+        trigram tokenizer, so MATCH keeps the substring semantics of the old
+        LIKE search.  It is rebuilt whenever it or any trigger is missing
+        (e.g. after a migration recreated kg_entities).  Returns False if this
+        SQLite build lacks FTS5/trigram support.
+        """
+        ready = _FTS_READY.get(db_path)
+        if ready is not None:
+            return ready
+        try:
+            existing = {
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE name IN "
+                    "('kg_entities_fts', 'kg_entities_fts_ai', 'kg_entities_fts_ad', 'kg_entities_fts_au')"
+                )
+            }
+            if len(existing) < 4:
+                conn.executescript(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS kg_entities_fts USING fts5(
+                        name, properties_json,
+                        content='kg_entities', content_rowid='id', tokenize='trigram'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS kg_entities_fts_ai AFTER INSERT ON kg_entities BEGIN
+                        INSERT INTO kg_entities_fts(rowid, name, properties_json)
+                        VALUES (new.id, new.name, new.properties_json);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS kg_entities_fts_ad AFTER DELETE ON kg_entities BEGIN
+                        INSERT INTO kg_entities_fts(kg_entities_fts, rowid, name, properties_json)
+                        VALUES ('delete', old.id, old.name, old.properties_json);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS kg_entities_fts_au AFTER UPDATE ON kg_entities BEGIN
+                        INSERT INTO kg_entities_fts(kg_entities_fts, rowid, name, properties_json)
+                        VALUES ('delete', old.id, old.name, old.properties_json);
+                        INSERT INTO kg_entities_fts(rowid, name, properties_json)
+                        VALUES (new.id, new.name, new.properties_json);
+                    END;
+                    """
+                )
+                conn.execute("INSERT INTO kg_entities_fts(kg_entities_fts) VALUES ('rebuild')")
+                conn.commit()
+                logger.info("KG entity FTS index (re)built")
+            _FTS_READY[db_path] = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"KG entity FTS index unavailable, using LIKE search: {e}")
+            _FTS_READY[db_path] = False
+        return _FTS_READY[db_path]
+
+    @staticmethod
+    def _ensure_version_tracking(conn: sqlite3.Connection, db_path: str) -> bool:
+        """
+        Create the per-KG write counter (kg_graph_versions) and its triggers if missing.
+
+        The triggers bump a KG's version on every entity or relationship row
+        written, by any process and through any code path, so a cached graph
+        can tell cheaply whether it is still current.  Returns False if they
+        cannot be created (e.g. the KG tables do not exist yet).
+        """
+        if _VERSIONS_READY.get(db_path):
+            return True
+        statements = [
+            """
+            CREATE TABLE IF NOT EXISTS kg_graph_versions (
+                kg_id    TEXT PRIMARY KEY,
+                version  INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        ]
+        for table in ("kg_entities", "kg_relationships"):
+            for suffix, event, row in (("ai", "INSERT", "new"), ("ad", "DELETE", "old"), ("au", "UPDATE", "new")):
+                statements.append(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {event} ON {table} BEGIN
+                        INSERT INTO kg_graph_versions (kg_id, version) VALUES ({row}.kg_id, 1)
+                        ON CONFLICT(kg_id) DO UPDATE SET version = version + 1;
+                    END
+                    """
+                )
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.commit()
+            _VERSIONS_READY[db_path] = True
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            logger.warning(f"KG graph version tracking unavailable, writes from other processes go unnoticed: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _read_graph_version(conn: sqlite3.Connection, kg_id: str) -> Optional[int]:
+        """The KG's kg_graph_versions counter (0 if never written), or None if not tracked."""
+        try:
+            row = conn.execute("SELECT version FROM kg_graph_versions WHERE kg_id=?", (kg_id,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else 0
+
+    def _begin_graph_write(self, conn: sqlite3.Connection, kg_id: str) -> Optional[int]:
+        """
+        Start the transaction of a write to the KG and return its version before the write.
+
+        ``BEGIN IMMEDIATE`` takes the write lock first, so the versions read
+        before and after the write bracket exactly this transaction's changes.
+        """
+        self._ensure_version_tracking(conn, self._db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        return self._read_graph_version(conn, kg_id)
+
+    # -----------------------------------------------------------------------
+    # Shared NetworkX graph cache
+    # -----------------------------------------------------------------------
+
+    @property
+    def _graph_key(self) -> Tuple[str, str]:
+        return (self._db_path, self.kg_id)
+
+    @property
+    def graph_version(self) -> Optional[int]:
+        """Version of the loaded shared graph (bumped on every write), or None if not loaded."""
+        shared = _SHARED_GRAPHS.get(self._graph_key)
+        return shared.version if shared is not None else None
+
     def _invalidate_cache(self) -> None:
-        """Invalidate the in-memory NetworkX graph cache."""
-        self._graph = None
+        """Drop the shared NetworkX graph for this kg_id (next use reloads it)."""
+        GraphStore.invalidate_shared_graph(self.kg_id, self._db_path)
+
+    @staticmethod
+    def invalidate_shared_graph(kg_id: str, db_path: Optional[str] = None) -> None:
+        """
+        Drop the cached graph and persisted snapshot for ``kg_id``.
+
+        Call this after modifying kg_entities / kg_relationships without going
+        through GraphStore.  With ``db_path=None`` every cached copy of the
+        kg_id is dropped.
+        """
+        with _SHARED_GRAPHS_LOCK:
+            for key in [k for k in _SHARED_GRAPHS if k[1] == kg_id and (db_path is None or k[0] == db_path)]:
+                del _SHARED_GRAPHS[key]
+        if db_path:
+            conn = sqlite3.connect(db_path)
+            try:
+                GraphStore._drop_snapshot(conn, kg_id)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _apply_to_graph(self, mutate, db_before: Optional[int] = None, db_after: Optional[int] = None) -> None:
+        """
+        Apply ``mutate(G)`` to the shared graph if it is loaded and bump its version.
+
+        ``db_before``/``db_after`` are the KG's database versions around the
+        write.  If the graph was not at ``db_before``, another process wrote in
+        between and the graph is dropped (reloaded on next use) instead.
+        """
+        with _SHARED_GRAPHS_LOCK:
+            shared = _SHARED_GRAPHS.get(self._graph_key)
+            if shared is None:
+                return
+            if shared.db_version is not None and db_before != shared.db_version:
+                logger.debug(f"KG {self.kg_id} was changed by another writer, dropping cached graph")
+                _SHARED_GRAPHS.pop(self._graph_key, None)
+                return
+            try:
+                mutate(shared.graph)
+                shared.version += 1
+                shared.db_version = db_after
+            except Exception as e:
+                # Never serve a half-applied graph — fall back to a full reload
+                logger.warning(f"KG incremental graph update failed, dropping cached graph: {e}")
+                _SHARED_GRAPHS.pop(self._graph_key, None)
+
+    @staticmethod
+    def _drop_snapshot(conn: sqlite3.Connection, kg_id: str) -> None:
+        """Delete the persisted adjacency snapshot (caller commits)."""
+        try:
+            conn.execute("DELETE FROM kg_graph_snapshots WHERE kg_id=?", (kg_id,))
+        except sqlite3.OperationalError:
+            pass  # Snapshot table not created yet
 
     # -----------------------------------------------------------------------
     # Entity CRUD
@@ -159,6 +479,7 @@ class GraphStore:
 
         conn = self._get_conn()
         try:
+            db_before = self._begin_graph_write(conn, kg_id)
             cursor = conn.execute(
                 """
                 INSERT INTO kg_entities (kg_id, profile_id, user_uuid, name, entity_type, properties_json, source, source_detail, created_at, updated_at)
@@ -172,7 +493,6 @@ class GraphStore:
                 """,
                 (kg_id, self.profile_id, self.user_uuid, name, entity_type, props_json, source, source_detail, now, now),
             )
-            conn.commit()
             entity_id = cursor.lastrowid
 
             # If upsert updated an existing row, lastrowid may be 0 — fetch the real ID
@@ -183,7 +503,14 @@ class GraphStore:
                 ).fetchone()
                 entity_id = row["id"] if row else 0
 
-            self._invalidate_cache()
+            self._drop_snapshot(conn, kg_id)
+            db_after = self._read_graph_version(conn, kg_id)
+            conn.commit()
+            node_props = properties or {}
+            self._apply_to_graph(lambda G: G.add_node(
+                entity_id, name=name, entity_type=entity_type,
+                properties=node_props, source=source,
+            ), db_before, db_after)
             return entity_id
         finally:
             conn.close()
@@ -220,13 +547,41 @@ class GraphStore:
 
     def search_entities(self, query_text: str, limit: int = 10, entity_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Search entities by name/description substring matching.
-        V2: Replace with embedding-based semantic search.
+        Search entities by case-insensitive substring of name or properties.
+
+        Uses the FTS5 trigram index when available; results are ranked name
+        match first (exact, prefix, substring), then by BM25.  Queries shorter
+        than three characters (below trigram length) use the LIKE scan.
+        See search_entities_hybrid() for embedding-assisted ranking.
         """
         conn = self._get_conn()
         try:
-            pattern = f"%{query_text}%"
             kg_id = self.kg_id
+            if len(query_text.strip()) >= 3 and self._ensure_fts_index(conn, self._db_path):
+                phrase = '"' + query_text.replace('"', '""') + '"'
+                sql = """
+                    SELECT e.* FROM kg_entities_fts f
+                    JOIN kg_entities e ON e.id = f.rowid
+                    WHERE kg_entities_fts MATCH ? AND e.kg_id=?
+                """
+                params: list = [phrase, kg_id]
+                if entity_type:
+                    sql += " AND e.entity_type=?"
+                    params.append(entity_type)
+                sql += """
+                    ORDER BY CASE
+                        WHEN lower(e.name) = lower(?) THEN 0
+                        WHEN instr(lower(e.name), lower(?)) = 1 THEN 1
+                        WHEN instr(lower(e.name), lower(?)) > 1 THEN 2
+                        ELSE 3 END,
+                        bm25(kg_entities_fts, 10.0, 1.0), e.name
+                    LIMIT ?
+                """
+                params.extend([query_text, query_text, query_text, limit])
+                rows = conn.execute(sql, params).fetchall()
+                return [self._row_to_entity(r) for r in rows]
+
+            pattern = f"%{query_text}%"
             if entity_type:
                 rows = conn.execute(
                     """
@@ -251,6 +606,183 @@ class GraphStore:
         finally:
             conn.close()
 
+    async def search_entities_hybrid(
+        self,
+        query_text: str,
+        limit: int = 10,
+        entity_type: Optional[str] = None,
+        lexical_results: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank entities by fusing FTS and embedding search (reciprocal rank fusion).
+
+        ``lexical_results`` lets callers pass an already-computed lexical
+        ranking (e.g. the KG handler's word-expanded search).  Without
+        APP_CONFIG.KG_SEMANTIC_SEARCH_ENABLED, or while the embedding index is
+        still being built in the background, the lexical ranking is returned.
+        """
+        lexical = lexical_results if lexical_results is not None else self.search_entities(
+            query_text, limit=limit, entity_type=entity_type,
+        )
+        if not _semantic_search_enabled() or not query_text.strip():
+            return lexical[:limit]
+
+        try:
+            semantic_ids = await self._semantic_search_ids(query_text, limit * 2, entity_type)
+        except Exception as e:
+            logger.warning(f"KG semantic entity search failed, using FTS results only: {e}")
+            return lexical[:limit]
+        if not semantic_ids:
+            return lexical[:limit]
+
+        scores: Dict[int, float] = {}
+        for rank, ent in enumerate(lexical):
+            scores[ent["id"]] = scores.get(ent["id"], 0.0) + 1.0 / (_RRF_K + rank + 1)
+        for rank, eid in enumerate(semantic_ids):
+            scores[eid] = scores.get(eid, 0.0) + 1.0 / (_RRF_K + rank + 1)
+        ranked_ids = sorted(scores, key=lambda eid: -scores[eid])[:limit]
+
+        by_id = {ent["id"]: ent for ent in lexical}
+        missing = [eid for eid in ranked_ids if eid not in by_id]
+        if missing:
+            by_id.update({ent["id"]: ent for ent in self._get_entities_by_ids(missing)})
+        return [by_id[eid] for eid in ranked_ids if eid in by_id]
+
+    def _get_entities_by_ids(self, entity_ids: List[int]) -> List[Dict[str, Any]]:
+        conn = self._get_conn()
+        try:
+            placeholders = ",".join("?" * len(entity_ids))
+            rows = conn.execute(
+                f"SELECT * FROM kg_entities WHERE kg_id=? AND id IN ({placeholders})",
+                [self.kg_id, *entity_ids],
+            ).fetchall()
+            return [self._row_to_entity(r) for r in rows]
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------------------
+    # Entity embedding index (vector store)
+    # -----------------------------------------------------------------------
+
+    @property
+    def _embedding_collection_name(self) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.kg_id)
+        if len(safe) > 48:
+            import hashlib
+            safe = hashlib.md5(safe.encode()).hexdigest()
+        return f"kg_entities_{safe}"
+
+    @staticmethod
+    def _entity_embedding_text(name: str, entity_type: str, properties: Dict[str, Any]) -> str:
+        """Text embedded for an entity: name, type and its scalar property values."""
+        parts = [f"{name} ({entity_type})"]
+        for key, value in properties.items():
+            if isinstance(value, (str, int, float)) and str(value).strip():
+                parts.append(f"{key}: {value}")
+        return "\n".join(parts)
+
+    async def _get_embedding_backend(self):
+        from trusted_data_agent.core.config import APP_CONFIG
+        from trusted_data_agent.vectorstore import (
+            CollectionConfig, SentenceTransformerProvider, get_default_chromadb_backend,
+        )
+        model = getattr(APP_CONFIG, "KG_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        backend = await get_default_chromadb_backend()
+        await backend.get_or_create_collection(CollectionConfig(
+            name=self._embedding_collection_name,
+            embedding_model=model,
+            metadata={"kg_id": self.kg_id, "purpose": "kg_entity_search"},
+        ))
+        return backend, SentenceTransformerProvider.get_cached(model)
+
+    async def _semantic_search_ids(self, query_text: str, n_results: int, entity_type: Optional[str]) -> List[int]:
+        """
+        Query the entity embedding index.  Returns [] (and schedules a background
+        sync) if the index is not current, so callers never wait for embedding.
+        """
+        import asyncio
+
+        key = self._graph_key
+        conn = self._get_conn()
+        try:
+            stamp = self._entity_stamp(conn, self.kg_id)
+        finally:
+            conn.close()
+        if _EMBEDDING_SYNCED_STAMPS.get(key) != stamp:
+            task = _EMBEDDING_SYNC_TASKS.get(key)
+            if task is None or task.done():
+                _EMBEDDING_SYNC_TASKS[key] = asyncio.create_task(self.sync_embedding_index())
+            if key not in _EMBEDDING_SYNCED_STAMPS:
+                return []  # never indexed yet — nothing useful to query
+
+        from trusted_data_agent.vectorstore import eq
+        backend, provider = await self._get_embedding_backend()
+        result = await backend.query(
+            self._embedding_collection_name,
+            query_text,
+            n_results=n_results,
+            where=eq("entity_type", entity_type) if entity_type else None,
+            embedding_provider=provider,
+            include_documents=False,
+            include_metadata=False,
+        )
+        return [int(doc.id) for doc in result.documents]
+
+    async def sync_embedding_index(self, batch_size: int = 256) -> Dict[str, int]:
+        """
+        Bring the entity embedding index in line with kg_entities.
+
+        Only entities whose updated_at changed since they were embedded are
+        re-embedded; entities no longer in SQLite are deleted from the index.
+        """
+        from trusted_data_agent.vectorstore import VectorDocument
+
+        key = self._graph_key
+        kg_id = self.kg_id
+        conn = self._get_conn()
+        try:
+            stamp = self._entity_stamp(conn, kg_id)
+            rows = conn.execute(
+                "SELECT id, name, entity_type, properties_json, updated_at FROM kg_entities WHERE kg_id=?",
+                (kg_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        backend, provider = await self._get_embedding_backend()
+        collection = self._embedding_collection_name
+        indexed = await backend.get(collection, include_documents=False, include_metadata=True)
+        indexed_versions = {doc.id: (doc.metadata or {}).get("updated_at") for doc in indexed.documents}
+
+        current_ids = set()
+        to_upsert: List[Any] = []
+        for r in rows:
+            doc_id = str(r["id"])
+            current_ids.add(doc_id)
+            updated_at = r["updated_at"] or ""
+            if indexed_versions.get(doc_id) == updated_at:
+                continue
+            to_upsert.append(VectorDocument(
+                id=doc_id,
+                content=self._entity_embedding_text(
+                    r["name"], r["entity_type"], json.loads(r["properties_json"] or "{}"),
+                ),
+                metadata={"entity_type": r["entity_type"], "updated_at": updated_at},
+            ))
+
+        for start in range(0, len(to_upsert), batch_size):
+            await backend.upsert(collection, to_upsert[start:start + batch_size], embedding_provider=provider)
+        stale = [doc_id for doc_id in indexed_versions if doc_id not in current_ids]
+        if stale:
+            await backend.delete(collection, stale)
+
+        _EMBEDDING_SYNCED_STAMPS[key] = stamp
+        logger.info(
+            f"KG embedding index {collection}: {len(to_upsert)} embedded, "
+            f"{len(current_ids) - len(to_upsert)} unchanged, {len(stale)} deleted"
+        )
+        return {"embedded": len(to_upsert), "unchanged": len(current_ids) - len(to_upsert), "deleted": len(stale)}
+
     def list_entities(self, entity_type: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
         """List all entities, optionally filtered by type."""
         conn = self._get_conn()
@@ -272,8 +804,10 @@ class GraphStore:
 
     def update_entity(self, entity_id: int, properties: Dict[str, Any]) -> bool:
         """Merge new properties into an existing entity."""
+        kg_id = self.kg_id
         conn = self._get_conn()
         try:
+            db_before = self._begin_graph_write(conn, kg_id)
             row = conn.execute(
                 "SELECT properties_json FROM kg_entities WHERE id=? AND kg_id=?",
                 (entity_id, self.kg_id),
@@ -289,23 +823,43 @@ class GraphStore:
                 "UPDATE kg_entities SET properties_json=?, updated_at=? WHERE id=? AND kg_id=?",
                 (json.dumps(existing), now, entity_id, self.kg_id),
             )
+            self._drop_snapshot(conn, self.kg_id)
+            db_after = self._read_graph_version(conn, kg_id)
             conn.commit()
-            self._invalidate_cache()
+
+            def _update(G):
+                if entity_id in G:
+                    G.nodes[entity_id]["properties"] = existing
+
+            self._apply_to_graph(_update, db_before, db_after)
             return True
         finally:
             conn.close()
 
     def delete_entity(self, entity_id: int) -> bool:
         """Delete an entity and all its relationships (CASCADE)."""
+        kg_id = self.kg_id
         conn = self._get_conn()
         try:
+            db_before = self._begin_graph_write(conn, kg_id)
             cursor = conn.execute(
                 "DELETE FROM kg_entities WHERE id=? AND kg_id=?",
                 (entity_id, self.kg_id),
             )
+            deleted = cursor.rowcount > 0
+            if deleted:
+                self._drop_snapshot(conn, self.kg_id)
+            db_after = self._read_graph_version(conn, kg_id)
             conn.commit()
-            self._invalidate_cache()
-            return cursor.rowcount > 0
+
+            def _remove(G):
+                # Relationships are removed with the node, matching ON DELETE CASCADE
+                if entity_id in G:
+                    G.remove_node(entity_id)
+
+            if deleted:
+                self._apply_to_graph(_remove, db_before, db_after)
+            return deleted
         finally:
             conn.close()
 
@@ -332,6 +886,7 @@ class GraphStore:
 
         conn = self._get_conn()
         try:
+            db_before = self._begin_graph_write(conn, kg_id)
             cursor = conn.execute(
                 """
                 INSERT INTO kg_relationships (kg_id, profile_id, user_uuid, source_entity_id, target_entity_id,
@@ -346,7 +901,6 @@ class GraphStore:
                 (kg_id, self.profile_id, self.user_uuid, source_entity_id, target_entity_id,
                  relationship_type, cardinality, metadata_json, source, now),
             )
-            conn.commit()
             rel_id = cursor.lastrowid
 
             if not rel_id:
@@ -358,7 +912,27 @@ class GraphStore:
                 ).fetchone()
                 rel_id = row["id"] if row else 0
 
-            self._invalidate_cache()
+            self._drop_snapshot(conn, kg_id)
+            db_after = self._read_graph_version(conn, kg_id)
+            conn.commit()
+            edge_metadata = metadata or {}
+
+            def _add_edge(G):
+                # DiGraph keeps one edge per (source, target); like a full load
+                # (rows in id order), the highest rel_id wins.
+                if G.has_edge(source_entity_id, target_entity_id):
+                    if G.edges[source_entity_id, target_entity_id].get("rel_id", 0) > rel_id:
+                        return
+                G.add_edge(
+                    source_entity_id,
+                    target_entity_id,
+                    rel_id=rel_id,
+                    relationship_type=relationship_type,
+                    cardinality=cardinality,
+                    metadata=edge_metadata,
+                )
+
+            self._apply_to_graph(_add_edge, db_before, db_after)
             return rel_id
         finally:
             conn.close()
@@ -439,15 +1013,42 @@ class GraphStore:
 
     def delete_relationship(self, relationship_id: int) -> bool:
         """Delete a single relationship."""
+        kg_id = self.kg_id
         conn = self._get_conn()
         try:
+            db_before = self._begin_graph_write(conn, kg_id)
+            row = conn.execute(
+                "SELECT source_entity_id, target_entity_id FROM kg_relationships WHERE id=? AND kg_id=?",
+                (relationship_id, kg_id),
+            ).fetchone()
             cursor = conn.execute(
                 "DELETE FROM kg_relationships WHERE id=? AND kg_id=?",
-                (relationship_id, self.kg_id),
+                (relationship_id, kg_id),
             )
+            deleted = cursor.rowcount > 0
+            if not deleted or row is None:
+                conn.commit()
+                return deleted
+
+            src, tgt = row["source_entity_id"], row["target_entity_id"]
+            # Another relationship type between the same pair becomes the visible edge
+            replacement = conn.execute(
+                "SELECT * FROM kg_relationships WHERE kg_id=? AND source_entity_id=? AND target_entity_id=? "
+                "ORDER BY id DESC LIMIT 1",
+                (kg_id, src, tgt),
+            ).fetchone()
+            self._drop_snapshot(conn, kg_id)
+            db_after = self._read_graph_version(conn, kg_id)
             conn.commit()
-            self._invalidate_cache()
-            return cursor.rowcount > 0
+
+            def _remove_edge(G):
+                if G.has_edge(src, tgt) and G.edges[src, tgt].get("rel_id") == relationship_id:
+                    G.remove_edge(src, tgt)
+                    if replacement is not None:
+                        G.add_edge(src, tgt, **self._edge_attrs(replacement))
+
+            self._apply_to_graph(_remove_edge, db_before, db_after)
+            return True
         finally:
             conn.close()
 
@@ -510,9 +1111,10 @@ class GraphStore:
 
     def clear_graph(self) -> Dict[str, int]:
         """Delete all entities and relationships for this specific KG (scoped by kg_id)."""
+        kg_id = self.kg_id
         conn = self._get_conn()
         try:
-            kg_id = self.kg_id
+            db_before = self._begin_graph_write(conn, kg_id)
             rels_deleted = conn.execute(
                 "DELETE FROM kg_relationships WHERE kg_id=?",
                 (kg_id,),
@@ -521,8 +1123,10 @@ class GraphStore:
                 "DELETE FROM kg_entities WHERE kg_id=?",
                 (kg_id,),
             ).rowcount
+            self._drop_snapshot(conn, kg_id)
+            db_after = self._read_graph_version(conn, kg_id)
             conn.commit()
-            self._invalidate_cache()
+            self._apply_to_graph(lambda G: G.clear(), db_before, db_after)
             return {"entities_deleted": entities_deleted, "relationships_deleted": rels_deleted}
         finally:
             conn.close()
@@ -533,53 +1137,183 @@ class GraphStore:
 
     def _get_graph(self) -> Any:
         """
-        Lazy-load the full graph from SQLite into a NetworkX DiGraph.
-        Cached until invalidated by a write operation.
+        Return the NetworkX DiGraph for this kg_id, loading it on first use.
+
+        The graph is shared by all GraphStore instances for the same kg_id and
+        kept current by the write methods, so it is only rebuilt from SQLite
+        (or the persisted snapshot) when another process or code path has
+        written to the KG since it was loaded.
         """
-        if self._graph is not None:
-            return self._graph
+        shared = self._get_shared_graph()
+        return shared.graph if shared is not None else None
 
+    def _get_shared_graph(self) -> Optional[_SharedGraph]:
+        """Return the shared graph entry for this kg_id, (re)loading the graph if it is not current."""
         if not HAS_NETWORKX:
             logger.warning("NetworkX not installed — graph algorithms unavailable")
             return None
 
+        key = self._graph_key
+        kg_id = self.kg_id
+        shared = _SHARED_GRAPHS.get(key)
+        if shared is not None and self._is_current(shared, kg_id):
+            return shared
+
+        with _SHARED_GRAPHS_LOCK:
+            if _SHARED_GRAPHS.get(key) is not shared:
+                # Another thread replaced or dropped the entry meanwhile
+                shared = _SHARED_GRAPHS.get(key)
+                if shared is not None and self._is_current(shared, kg_id):
+                    return shared
+
+            conn = self._get_conn()
+            try:
+                self._ensure_version_tracking(conn, self._db_path)
+                # One read transaction, so the version matches the rows loaded
+                conn.execute("BEGIN")
+                db_version = self._read_graph_version(conn, kg_id)
+                use_snapshot = _snapshots_enabled()
+                G = self._load_snapshot(conn, kg_id) if use_snapshot else None
+                loaded_from_rows = G is None
+                if loaded_from_rows:
+                    G = self._load_graph_from_rows(conn, kg_id)
+                conn.commit()
+                if loaded_from_rows and use_snapshot:
+                    self._save_snapshot(conn, kg_id, G)
+            finally:
+                conn.close()
+
+            shared = _SharedGraph(G, db_version)
+            _SHARED_GRAPHS[key] = shared
+            return shared
+
+    def _is_current(self, shared: _SharedGraph, kg_id: str) -> bool:
+        """Whether nobody has written to the KG since ``shared`` was loaded or last updated."""
+        if shared.db_version is None:
+            return True
+        conn = sqlite3.connect(self._db_path)
+        try:
+            return self._read_graph_version(conn, kg_id) == shared.db_version
+        finally:
+            conn.close()
+
+    def _load_graph_from_rows(self, conn: sqlite3.Connection, kg_id: str) -> Any:
+        """Build the DiGraph from every entity and relationship row of the KG."""
         G = nx.DiGraph()
-        conn = self._get_conn()
+        entities = conn.execute(
+            "SELECT * FROM kg_entities WHERE kg_id=?",
+            (kg_id,),
+        ).fetchall()
+        for e in entities:
+            G.add_node(
+                e["id"],
+                name=e["name"],
+                entity_type=e["entity_type"],
+                properties=json.loads(e["properties_json"] or "{}"),
+                source=e["source"],
+            )
+
+        rels = conn.execute(
+            "SELECT * FROM kg_relationships WHERE kg_id=? ORDER BY id",
+            (kg_id,),
+        ).fetchall()
+        for r in rels:
+            G.add_edge(r["source_entity_id"], r["target_entity_id"], **self._edge_attrs(r))
+        return G
+
+    @staticmethod
+    def _edge_attrs(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "rel_id": row["id"],
+            "relationship_type": row["relationship_type"],
+            "cardinality": row["cardinality"],
+            "metadata": json.loads(row["metadata_json"] or "{}"),
+        }
+
+    # -----------------------------------------------------------------------
+    # Persisted adjacency snapshot (optional)
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _ensure_snapshot_table(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS kg_graph_snapshots (
+                kg_id       TEXT PRIMARY KEY,
+                stamp       TEXT NOT NULL,
+                payload     BLOB NOT NULL,
+                created_at  TEXT NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def _entity_stamp(conn: sqlite3.Connection, kg_id: str) -> str:
+        """Cheap row-count/max-id/max-updated_at stamp of the KG's entities."""
+        ent = conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(MAX(updated_at), '') FROM kg_entities WHERE kg_id=?",
+            (kg_id,),
+        ).fetchone()
+        return f"{ent[0]}:{ent[1]}:{ent[2]}"
+
+    @staticmethod
+    def _snapshot_stamp(conn: sqlite3.Connection, kg_id: str) -> str:
+        """Cheap row-count/max-id stamp that catches writes made outside GraphStore."""
+        rel = conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM kg_relationships WHERE kg_id=?",
+            (kg_id,),
+        ).fetchone()
+        return f"{GraphStore._entity_stamp(conn, kg_id)}|{rel[0]}:{rel[1]}"
+
+    def _load_snapshot(self, conn: sqlite3.Connection, kg_id: str) -> Optional[Any]:
+        """Rebuild the graph from a persisted snapshot, or return None if absent/stale."""
         try:
-            kg_id = self.kg_id
-            # Load nodes
-            entities = conn.execute(
-                "SELECT * FROM kg_entities WHERE kg_id=?",
+            GraphStore._ensure_snapshot_table(conn)
+            row = conn.execute(
+                "SELECT stamp, payload FROM kg_graph_snapshots WHERE kg_id=?",
                 (kg_id,),
-            ).fetchall()
-            for e in entities:
-                G.add_node(
-                    e["id"],
-                    name=e["name"],
-                    entity_type=e["entity_type"],
-                    properties=json.loads(e["properties_json"] or "{}"),
-                    source=e["source"],
-                )
+            ).fetchone()
+            if row is None or row["stamp"] != self._snapshot_stamp(conn, kg_id):
+                return None
+            data = json.loads(zlib.decompress(row["payload"]))
+        except Exception as e:
+            logger.warning(f"KG snapshot for {kg_id} unreadable, rebuilding from rows: {e}")
+            return None
 
-            # Load edges
-            rels = conn.execute(
-                "SELECT * FROM kg_relationships WHERE kg_id=?",
-                (kg_id,),
-            ).fetchall()
-            for r in rels:
-                G.add_edge(
-                    r["source_entity_id"],
-                    r["target_entity_id"],
-                    rel_id=r["id"],
-                    relationship_type=r["relationship_type"],
-                    cardinality=r["cardinality"],
-                    metadata=json.loads(r["metadata_json"] or "{}"),
-                )
+        G = nx.DiGraph()
+        G.add_nodes_from(
+            (nid, {"name": name, "entity_type": etype, "properties": props, "source": source})
+            for nid, name, etype, props, source in data["nodes"]
+        )
+        G.add_edges_from(
+            (src, tgt, {"rel_id": rid, "relationship_type": rtype, "cardinality": card, "metadata": meta})
+            for src, tgt, rid, rtype, card, meta in data["edges"]
+        )
+        logger.debug(f"KG graph {kg_id} loaded from snapshot ({G.number_of_nodes()} nodes)")
+        return G
 
-            self._graph = G
-            return G
-        finally:
-            conn.close()
+    def _save_snapshot(self, conn: sqlite3.Connection, kg_id: str, G: Any) -> None:
+        """Persist a compact adjacency snapshot of ``G`` (best effort)."""
+        try:
+            payload = {
+                "nodes": [
+                    [nid, d.get("name"), d.get("entity_type"), d.get("properties", {}), d.get("source")]
+                    for nid, d in G.nodes(data=True)
+                ],
+                "edges": [
+                    [src, tgt, d.get("rel_id"), d.get("relationship_type"), d.get("cardinality"), d.get("metadata", {})]
+                    for src, tgt, d in G.edges(data=True)
+                ],
+            }
+            blob = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            GraphStore._ensure_snapshot_table(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO kg_graph_snapshots (kg_id, stamp, payload, created_at) VALUES (?, ?, ?, ?)",
+                (kg_id, self._snapshot_stamp(conn, kg_id), blob, datetime.now(timezone.utc).isoformat()),
+            )
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Failed to persist KG snapshot for {kg_id}: {e}")
 
     def extract_subgraph(
         self,
@@ -590,13 +1324,24 @@ class GraphStore:
         """
         BFS traversal from seed entities up to given depth.
         Returns {entities: [...], relationships: [...]}.
+
+        Results are memoized per graph version, so repeated extractions for
+        the same seeds are free until the next write.
         """
-        G = self._get_graph()
-        if G is None:
+        shared = self._get_shared_graph()
+        if shared is None:
             return {"entities": [], "relationships": []}
+        G = shared.graph
 
+        memo_key = ("bfs", tuple(entity_ids), depth, max_nodes)
+        cached = shared.memo_get(memo_key)
+        if cached is not None:
+            return self._copy_subgraph(cached)
+
+        # Both directions (successors and predecessors)
+        adjacency = shared.undirected_adjacency()
         visited = set()
-        queue: List[Tuple[int, int]] = []  # (node_id, current_depth)
+        queue: deque = deque()  # (node_id, current_depth)
 
         for eid in entity_ids:
             if eid in G:
@@ -604,18 +1349,18 @@ class GraphStore:
                 visited.add(eid)
 
         while queue and len(visited) <= max_nodes:
-            node_id, d = queue.pop(0)
+            node_id, d = queue.popleft()
             if d >= depth:
                 continue
 
-            # Explore both directions (successors and predecessors)
-            neighbors = set(G.successors(node_id)) | set(G.predecessors(node_id))
-            for neighbor in neighbors:
+            for neighbor in adjacency.get(node_id, ()):
                 if neighbor not in visited and len(visited) < max_nodes:
                     visited.add(neighbor)
                     queue.append((neighbor, d + 1))
 
-        return self._subgraph_to_dict(G, visited)
+        result = self._subgraph_to_dict(G, visited)
+        shared.memo_put(memo_key, result)
+        return self._copy_subgraph(result)
 
     # -------------------------------------------------------------------
     # Adaptive subgraph extraction (entity-type-aware, scalable)
@@ -661,12 +1406,28 @@ class GraphStore:
 
         Returns:
             {"entities": [...], "relationships": [...]}
+
+        Results are memoized per graph version (see extract_subgraph).
         """
-        G = self._get_graph()
-        if G is None:
+        shared = self._get_shared_graph()
+        if shared is None:
             return {"entities": [], "relationships": []}
         if not seed_entity_ids:
             return {"entities": [], "relationships": []}
+        G = shared.graph
+
+        memo_key = (
+            "adaptive",
+            tuple(seed_entity_ids),
+            tuple(query_entity_ids) if query_entity_ids is not None else None,
+            max_nodes,
+        )
+        cached = shared.memo_get(memo_key)
+        if cached is not None:
+            logger.debug(f"KG adaptive extraction: memo hit ({len(cached['entities'])} nodes)")
+            return self._copy_subgraph(cached)
+
+        adjacency = shared.undirected_adjacency()
 
         if query_entity_ids is None:
             query_entity_ids = list(seed_entity_ids)
@@ -695,7 +1456,7 @@ class GraphStore:
             else:
                 # Non-expandable seed (column, business_concept, …).
                 # Promote to neighbouring structural nodes.
-                for nbr in set(G.predecessors(sid)) | set(G.successors(sid)):
+                for nbr in adjacency.get(sid, ()):
                     ntype = G.nodes[nbr].get("entity_type", "")
                     if ntype in _EXPANDABLE_STRUCTURAL_TYPES:
                         target = discovered_tables if ntype == "table" else discovered_fk_nodes
@@ -708,7 +1469,7 @@ class GraphStore:
 
         while bfs_queue:
             node_id, d = bfs_queue.popleft()
-            for nbr in set(G.successors(node_id)) | set(G.predecessors(node_id)):
+            for nbr in adjacency.get(node_id, ()):
                 if nbr in visited_expandable:
                     continue
                 ntype = G.nodes[nbr].get("entity_type", "")
@@ -732,39 +1493,21 @@ class GraphStore:
         # discovered tables.  Handles transitive joins (A→B→C→D) even
         # when no FK edges exist in the graph.
 
-        # Build full table-ID index once
-        all_table_ids: Dict[int, str] = {}
-        for nid, ndata in G.nodes(data=True):
-            if ndata.get("entity_type") == "table":
-                all_table_ids[nid] = ndata.get("name", "")
-
-        def _column_names_for_tables(table_ids: Set[int]) -> Set[str]:
-            """Collect column names owned by a set of table nodes."""
-            names: Set[str] = set()
-            for tid in table_ids:
-                for succ in G.successors(tid):
-                    if G.nodes[succ].get("entity_type") == "column":
-                        cname = G.nodes[succ].get("name", "").lower()
-                        if cname:
-                            names.add(cname)
-            return names
+        # Column-name index (table <-> column names), built once per graph version
+        columns_by_table, tables_by_column = shared.column_index()
 
         for round_num in range(_MAX_JOIN_DISCOVERY_ROUNDS):
-            seed_col_names = _column_names_for_tables(discovered_tables)
+            seed_col_names: Set[str] = set()
+            for tid in discovered_tables:
+                seed_col_names |= columns_by_table.get(tid, set())
             if not seed_col_names:
                 break
 
+            # Tables owning any column name from the seed set
             new_tables: Set[int] = set()
-            for tid in all_table_ids:
-                if tid in discovered_tables:
-                    continue
-                # Check if this table has any column name matching the seed set
-                for succ in G.successors(tid):
-                    if G.nodes[succ].get("entity_type") == "column":
-                        cname = G.nodes[succ].get("name", "").lower()
-                        if cname and cname in seed_col_names:
-                            new_tables.add(tid)
-                            break
+            for cname in seed_col_names:
+                new_tables |= tables_by_column.get(cname, set())
+            new_tables -= discovered_tables
 
             if not new_tables:
                 break
@@ -840,7 +1583,7 @@ class GraphStore:
             for nid in structural_visited:
                 if semantic_budget <= 0:
                     break
-                for nbr in set(G.successors(nid)) | set(G.predecessors(nid)):
+                for nbr in adjacency.get(nid, ()):
                     if nbr in visited:
                         continue
                     if G.nodes[nbr].get("entity_type") in _SEMANTIC_TYPES:
@@ -858,7 +1601,9 @@ class GraphStore:
             f"{semantic_added} semantic)"
         )
 
-        return self._subgraph_to_dict(G, visited)
+        result = self._subgraph_to_dict(G, visited)
+        shared.memo_put(memo_key, result)
+        return self._copy_subgraph(result)
 
     def get_full_graph(self, max_nodes: int = 100) -> Dict[str, List]:
         """Return entire graph (capped by max_nodes)."""
@@ -971,9 +1716,13 @@ class GraphStore:
     # -----------------------------------------------------------------------
 
     def _subgraph_to_dict(self, G: Any, node_ids: set) -> Dict[str, List]:
-        """Convert a set of node IDs from the NetworkX graph to an entity/relationship dict."""
+        """Convert a set of node IDs from the NetworkX graph to an entity/relationship dict.
+
+        Entities and relationships are sorted by ID, so the same subgraph always
+        serializes (and renders into prompts) identically.
+        """
         entities = []
-        for nid in node_ids:
+        for nid in sorted(node_ids):
             if nid in G:
                 data = G.nodes[nid]
                 entities.append({
@@ -984,10 +1733,15 @@ class GraphStore:
                     "source": data.get("source", ""),
                 })
 
+        # Walk only the out-edges of selected nodes instead of every edge in G
         relationships = []
-        for src, tgt, data in G.edges(data=True):
-            if src in node_ids and tgt in node_ids:
-                src_data = G.nodes[src]
+        for src in node_ids:
+            if src not in G:
+                continue
+            src_data = G.nodes[src]
+            for tgt, data in G.adj[src].items():
+                if tgt not in node_ids:
+                    continue
                 tgt_data = G.nodes[tgt]
                 relationships.append({
                     "id": data.get("rel_id", 0),
@@ -999,9 +1753,19 @@ class GraphStore:
                     "cardinality": data.get("cardinality"),
                     "metadata": data.get("metadata", {}),
                 })
+        relationships.sort(key=lambda r: (r["source_id"], r["target_id"], r["relationship_type"]))
 
         return {"entities": entities, "relationships": relationships}
 
+    @staticmethod
+    def _copy_subgraph(result: Dict[str, List]) -> Dict[str, List]:
+        """Deep-copy a memoized subgraph so callers can annotate it (including nested
+        ``properties``) without touching the memo."""
+        return {
+            "entities": [_copy_record(e) for e in result["entities"]],
+            "relationships": [_copy_record(r) for r in result["relationships"]],
+        }
+
     @staticmethod
     def _row_to_entity(row: sqlite3.Row) -> Dict[str, Any]:
         """Convert a sqlite3.Row to an entity dict."""
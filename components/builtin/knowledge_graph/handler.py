@@ -151,6 +151,8 @@ class KnowledgeGraphHandler(BaseComponentHandler):
 
         store = self._get_store_direct(kg_pid, user_uuid)
         entities = self._search_entities_for_query(store, query)
+        # Re-rank with the entity embedding index when semantic search is enabled
+        entities = await store.search_entities_hybrid(query, limit=15, lexical_results=entities)
 
         logger.debug(f"KG enrichment: found {len(entities)} matching entities for query")
 
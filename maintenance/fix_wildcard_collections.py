@@ -11,10 +11,28 @@ Usage:
     python maintenance/fix_wildcard_collections.py
 """
 
-import sqlite3
-import json
-import os
-from datetime import datetime
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from trusted_data_agent.auth.database import get_db_session
+from trusted_data_agent.auth.models import UserConfigSection, UserPreference
+from trusted_data_agent.core.config_manager import get_config_manager
+
+
+def _users_with_stored_config() -> list:
+    """User IDs with configuration sections or a not yet migrated preferences_json blob."""
+    with get_db_session() as session:
+        section_users = {row[0] for row in session.query(UserConfigSection.user_id).distinct()}
+        legacy_users = {
+            row[0] for row in session.query(UserPreference.user_id)
+            .filter(UserPreference.preferences_json.isnot(None))
+        }
+    return sorted(section_users | legacy_users)
+
 
 def update_profile_collections():
     """
@@ -24,21 +42,13 @@ def update_profile_collections():
     - ragCollections: ["*"] → []
     - autocompleteCollections: ["*"] → []
 
+    Profiles are read and saved through ConfigManager, so only the "profiles"
+    section is rewritten and running servers reload it (config_version).
+
     Returns:
         True if successful, False otherwise
     """
-    db_path = "tda_auth.db"
-
-    if not os.path.exists(db_path):
-        print(f"❌ Database not found: {db_path}")
-        print("   Make sure you're running this from the project root directory.")
-        return False
-
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
         print("="*70)
         print("FIX WILDCARD COLLECTION ASSIGNMENTS")
         print("="*70)
@@ -47,21 +57,19 @@ def update_profile_collections():
         print("automatically appearing as enabled.\n")
         print("="*70 + "\n")
 
-        # Get all users with preferences
-        cursor.execute("SELECT user_id, preferences_json FROM user_preferences")
-        users = cursor.fetchall()
+        users = _users_with_stored_config()
 
         if not users:
             print("ℹ️  No users found in database.")
             return True
 
+        config_manager = get_config_manager()
         total_profiles_updated = 0
         total_users_updated = 0
 
-        for user_id, preferences_json_str in users:
+        for user_id in users:
             try:
-                preferences = json.loads(preferences_json_str)
-                profiles = preferences.get("profiles", [])
+                profiles = config_manager.get_profiles(user_id)
 
                 if not profiles:
                     continue
@@ -91,17 +99,11 @@ def update_profile_collections():
                         profiles_updated_count += 1
                         updated_profiles.append(profile_tag)
 
-                # If any profiles were updated, save back to database
+                # If any profiles were updated, save them back
                 if profiles_updated_count > 0:
-                    preferences["last_modified"] = datetime.utcnow().isoformat() + "+00:00"
-                    updated_json = json.dumps(preferences, indent=2)
-
-                    cursor.execute("""
-                        UPDATE user_preferences
-                        SET preferences_json = ?,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE user_id = ?
-                    """, (updated_json, user_id))
+                    if not config_manager.save_profiles(profiles, user_id):
+                        print(f"⚠️  Warning: Could not save profiles for user {user_id}")
+                        continue
 
                     total_profiles_updated += profiles_updated_count
                     total_users_updated += 1
@@ -110,23 +112,16 @@ def update_profile_collections():
                     print(f"   Profiles: {', '.join('@' + tag for tag in updated_profiles)}")
                     print()
 
-            except json.JSONDecodeError as e:
-                print(f"⚠️  Warning: Could not parse preferences for user {user_id}: {e}")
-                continue
             except Exception as e:
                 print(f"⚠️  Warning: Error processing user {user_id}: {e}")
                 continue
 
-        # Commit all changes
-        conn.commit()
-
         print("="*70)
         if total_profiles_updated > 0:
             print(f"✅ SUCCESS: Updated {total_profiles_updated} profile(s) across {total_users_updated} user(s)")
             print("\nNext steps:")
-            print("  1. Restart the Uderia application")
-            print("  2. Open profile editor and verify collections are no longer auto-enabled")
-            print("  3. Manually select desired collections for each profile")
+            print("  1. Open profile editor and verify collections are no longer auto-enabled")
+            print("  2. Manually select desired collections for each profile")
             print("\nImported collections will no longer auto-appear in existing profiles!")
         else:
             print("ℹ️  No profiles with wildcard ['*'] collection assignments found.")
@@ -135,15 +130,9 @@ def update_profile_collections():
 
         return True
 
-    except sqlite3.Error as e:
-        print(f"\n❌ Database error: {e}")
-        return False
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 def main():
     print("\n" + "="*70)
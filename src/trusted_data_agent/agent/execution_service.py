@@ -317,6 +317,7 @@ async def _persist_extension_results(
 
 
 # --- MODIFICATION START: Add plan_to_execute and is_replay parameters ---
+@session_manager.batch_turn_usage
 async def run_agent_execution(
     user_uuid: str,
     session_id: str,
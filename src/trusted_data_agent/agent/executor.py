@@ -839,7 +839,7 @@ class PlanExecutor:
             data.setdefault("metadata", {})["execution_depth"] = self.execution_depth
         return self._format_sse(data, event)
 
-    async def _call_llm_and_update_tokens(self, prompt: str, reason: str, system_prompt_override: str = None, raise_on_error: bool = False, disabled_history: bool = False, active_prompt_name_for_filter: str = None, source: str = "text", multimodal_content: list = None, planning_phase: str = None, current_provider: str = None, current_model: str = None) -> tuple[str, int, int]:
+    async def _call_llm_and_update_tokens(self, prompt: str, reason: str, system_prompt_override: str = None, raise_on_error: bool = False, disabled_history: bool = False, active_prompt_name_for_filter: str = None, source: str = "text", multimodal_content: list = None, planning_phase: str = None, current_provider: str = None, current_model: str = None, cache_reason: str = None) -> tuple[str, int, int]:
         """
         A centralized wrapper for calling the LLM that handles token updates.
 
@@ -848,6 +848,7 @@ class PlanExecutor:
                            Valid values: "strategic" | "tactical" | "conversation"
             current_provider: Optional override for LLM provider (for dual-model support)
             current_model: Optional override for LLM model (for dual-model support)
+            cache_reason: Opt into the LLM response cache under this reason (see llm/response_cache.py)
         """
         final_disabled_history = disabled_history or self.disabled_history
 
@@ -885,7 +886,8 @@ class PlanExecutor:
             current_provider=effective_provider,
             current_model=effective_model,
             multimodal_content=multimodal_content,
-            thinking_budget=self.thinking_budget
+            thinking_budget=self.thinking_budget,
+            cache_reason=cache_reason
         )
         _timeout = APP_CONFIG.LLM_CALL_TIMEOUT_SECONDS
         try:
@@ -1947,7 +1949,8 @@ Response:"""
             response_text, _, _ = await self._call_llm_and_update_tokens(
                 prompt=rerank_prompt,
                 reason="Knowledge Reranking",
-                source="knowledge_retrieval"
+                source="knowledge_retrieval",
+                cache_reason="knowledge_rerank"
             )
 
             import json
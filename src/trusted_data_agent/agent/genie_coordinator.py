@@ -9,6 +9,8 @@ Architecture:
 - GenieCoordinator: Main class that builds and executes a LangChain agent
 - SlaveSessionTool: LangChain tool wrapper for child session REST calls
 - Session context is reused when the same child profile is called multiple times
+- Child queries of a coordinator running inside the server are dispatched in-process
+  (start_query_task + awaiting the task); remote base URLs use the REST API with polling
 
 Usage:
     from trusted_data_agent.agent.genie_coordinator import GenieCoordinator
@@ -28,8 +30,10 @@ Usage:
 import asyncio
 import json
 import logging
+import math
 import time
 from typing import Dict, List, Any, Optional, Callable
+from urllib.parse import urlparse
 
 import httpx
 from pydantic import Field
@@ -39,6 +43,8 @@ from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 from trusted_data_agent.agent.profile_prompt_resolver import ProfilePromptResolver
+from trusted_data_agent.core.config import APP_CONFIG, APP_STATE
+from trusted_data_agent.core.task_registry import TERMINAL_STATUSES
 
 logger = logging.getLogger(__name__)
 
@@ -71,6 +77,39 @@ def _get_slave_session_lock(session_id: str) -> asyncio.Lock:
     return _slave_session_locks.setdefault(session_id, asyncio.Lock())
 
 
+_LOOPBACK_HOSTS = frozenset({"localhost", "127.0.0.1", "::1", "0.0.0.0"})
+
+
+def _use_in_process_dispatch(base_url: str) -> bool:
+    """
+    True when child queries can bypass the HTTP loopback.
+
+    That is the case when the coordinator targets this machine and runs inside
+    the server process (create_app() registered the REST query routes and set
+    APP_STATE["in_process_query_dispatch"]); coordinators pointed at a remote
+    base URL keep using the REST API.
+    """
+    if not APP_CONFIG.GENIE_IN_PROCESS_DISPATCH:
+        return False
+    if urlparse(base_url).hostname not in _LOOPBACK_HOSTS:
+        return False
+    return bool(APP_STATE.get("in_process_query_dispatch"))
+
+
+def _poll_latency_saved_ms(elapsed: float) -> int:
+    """Idle time the HTTP path would have added: completion is only seen at the next poll."""
+    interval = APP_CONFIG.GENIE_HTTP_POLL_INTERVAL_SECONDS
+    return int((math.ceil(elapsed / interval) * interval - elapsed) * 1000)
+
+
+def _task_error(status_data: dict) -> str:
+    """Error message of a failed task (top-level 'error' or the error result payload)."""
+    result = status_data.get("result")
+    if isinstance(result, dict) and result.get("error"):
+        return status_data.get("error") or result["error"]
+    return status_data.get("error", "Unknown error")
+
+
 def _format_collected_data_as_text(collected_data: dict, max_rows: int = 50) -> str:
     """
     Formats structured data rows from a tool_enabled slave into plain text
@@ -125,7 +164,8 @@ class SlaveSessionTool(BaseTool):
 
     Each child profile becomes a separate tool instance. When invoked,
     it creates or reuses a child session and executes the query through
-    the existing Uderia REST API.
+    the existing Uderia REST API, or directly through the execution
+    service when the coordinator runs inside the server.
 
     Note: Class name 'SlaveSessionTool' preserved for API compatibility.
     """
@@ -233,7 +273,7 @@ class SlaveSessionTool(BaseTool):
             # assistant messages with the wrong turn_number.
             slave_lock = _get_slave_session_lock(session_id)
             async with slave_lock:
-                result = await self._execute_and_poll(session_id, query)
+                result, dispatch_info = await self._dispatch_query(session_id, query)
 
             # Emit completion event with full result for UI display
             duration_ms = int((time.time() - start_time) * 1000)
@@ -256,7 +296,8 @@ class SlaveSessionTool(BaseTool):
                 "result_preview": result[:200] if result else "",  # Short preview for compact view
                 "duration_ms": duration_ms,
                 "success": True,
-                "session_id": self.parent_session_id
+                "session_id": self.parent_session_id,
+                **dispatch_info
             })
 
             return result
@@ -355,7 +396,10 @@ class SlaveSessionTool(BaseTool):
 
                     for i, stmt in enumerate(primer_statements, 1):
                         try:
-                            await self._execute_primer(session_id, stmt)
+                            if _use_in_process_dispatch(self.base_url):
+                                await self._execute_primer_in_process(session_id, stmt)
+                            else:
+                                await self._execute_primer(session_id, stmt)
                             logger.info(f"Session primer {i}/{len(primer_statements)} completed for @{self.profile_tag}")
                         except Exception as e:
                             logger.warning(f"Session primer {i}/{len(primer_statements)} failed for @{self.profile_tag}: {e}")
@@ -389,7 +433,7 @@ class SlaveSessionTool(BaseTool):
             logger.info(f"Submitted session primer to @{self.profile_tag}, task_id: {task_id}")
 
             # Poll for completion (same pattern as _execute_and_poll)
-            poll_interval = 1.0
+            poll_interval = APP_CONFIG.GENIE_HTTP_POLL_INTERVAL_SECONDS
             max_polls = int(self.query_timeout / poll_interval)
 
             for _ in range(max_polls):
@@ -408,13 +452,94 @@ class SlaveSessionTool(BaseTool):
                 if status in ("completed", "complete"):
                     return "Primer executed successfully"
                 elif status in ("failed", "error"):
-                    error = status_data.get("error", "Unknown error")
+                    error = _task_error(status_data)
                     raise Exception(f"Primer execution failed: {error}")
 
                 await asyncio.sleep(poll_interval)
 
             raise Exception("Timeout waiting for primer execution")
 
+    async def _dispatch_query(self, session_id: str, query: str) -> tuple:
+        """Run a child query in-process when possible, else over REST. Returns (result, dispatch_info)."""
+        if not _use_in_process_dispatch(self.base_url):
+            return await self._execute_and_poll(session_id, query), {"dispatch": "http"}
+        return await self._execute_in_process(session_id, query)
+
+    async def _run_in_process(self, session_id: str, prompt: str, is_session_primer: bool = False):
+        """
+        Start a child query as a server background task and await its completion.
+
+        Returns (task_state, elapsed_seconds); task_state is None on timeout.
+        """
+        from trusted_data_agent.api.rest_routes import start_query_task, validate_query_session
+
+        # Same ownership check the REST query endpoint applies before starting a task
+        if not await validate_query_session(self.user_uuid, session_id):
+            raise Exception(f"Failed to submit query: session '{session_id}' not found for user")
+
+        started = time.monotonic()
+        task_id = await start_query_task(
+            self.user_uuid,
+            session_id,
+            prompt,
+            profile_id_to_use=self.profile_id,
+            profile_id_override=self.profile_id,
+            is_session_primer=is_session_primer,
+        )
+        logger.info(f"Dispatched {'primer' if is_session_primer else 'query'} to @{self.profile_tag} in-process, task_id: {task_id}")
+
+        # asyncio.wait neither raises nor cancels the child on timeout (same as abandoning a poll loop)
+        deadline = started + self.query_timeout
+        task_object = APP_STATE.get("active_tasks", {}).get(task_id)
+        if task_object is not None:
+            done, _ = await asyncio.wait({task_object}, timeout=self.query_timeout)
+            if not done:
+                return None, time.monotonic() - started
+
+        # Without (or beyond) the asyncio task, wait on the registry until the state is final
+        task_registry = APP_STATE["background_tasks"]
+        while True:
+            version = task_registry.version(task_id)
+            state = task_registry.get(task_id)
+            if version is None or state.get("status") in TERMINAL_STATUSES:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, time.monotonic() - started
+            await task_registry.wait_for_change(task_id, version, timeout=remaining)
+        return await task_registry.snapshot_async(task_id), time.monotonic() - started
+
+    async def _execute_in_process(self, session_id: str, query: str) -> tuple:
+        """In-process counterpart of _execute_and_poll."""
+        task_state, elapsed = await self._run_in_process(session_id, query)
+        if task_state is None:
+            return f"Timeout waiting for @{self.profile_tag} response", {"dispatch": "in_process"}
+
+        saved_ms = _poll_latency_saved_ms(elapsed)
+        dispatch_info = {"dispatch": "in_process", "poll_latency_saved_ms": saved_ms}
+        logger.info(
+            f"@{self.profile_tag} in-process dispatch finished in {int(elapsed * 1000)}ms "
+            f"(~{saved_ms}ms poll latency saved vs HTTP loopback)"
+        )
+
+        status = task_state.get("status")
+        if status in ("completed", "complete"):
+            return self._completed_task_response(task_state), dispatch_info
+        error = _task_error(task_state) if status in ("failed", "error") else f"Task {status}"
+        logger.error(f"@{self.profile_tag} task failed: {error}")
+        return f"Error from @{self.profile_tag}: {error}", dispatch_info
+
+    async def _execute_primer_in_process(self, session_id: str, primer: str) -> str:
+        """In-process counterpart of _execute_primer."""
+        task_state, _ = await self._run_in_process(session_id, primer, is_session_primer=True)
+        if task_state is None:
+            raise Exception("Timeout waiting for primer execution")
+        status = task_state.get("status")
+        if status in ("completed", "complete"):
+            return "Primer executed successfully"
+        error = _task_error(task_state) if status in ("failed", "error") else f"Task {status}"
+        raise Exception(f"Primer execution failed: {error}")
+
     async def _execute_and_poll(self, session_id: str, query: str) -> str:
         """Submit query and poll for completion."""
         async with httpx.AsyncClient(timeout=self.query_timeout) as client:
@@ -440,7 +565,7 @@ class SlaveSessionTool(BaseTool):
             logger.info(f"Submitted query to @{self.profile_tag}, task_id: {task_id}")
 
             # Poll for completion - derive max_polls from query_timeout
-            poll_interval = 1.0
+            poll_interval = APP_CONFIG.GENIE_HTTP_POLL_INTERVAL_SECONDS
             max_polls = int(self.query_timeout / poll_interval)
 
             for _ in range(max_polls):
@@ -458,50 +583,9 @@ class SlaveSessionTool(BaseTool):
                 status = status_data.get("status")
 
                 if status in ("completed", "complete"):
-                    result = status_data.get("result", {})
-
-                    # Forward child CCR events to parent Genie session
-                    child_events = status_data.get("events", [])
-                    for event in child_events:
-                        evt_type = event.get("event_type")
-                        if evt_type == "rag_retrieval":
-                            self._emit_event("rag_retrieval", event.get("event_data", {}))
-
-                    # Handle case where result might be a string directly (instead of dict)
-                    if isinstance(result, str):
-                        logger.info(f"@{self.profile_tag} completed successfully (text length: {len(result)})")
-                        return result
-                    elif result is None:
-                        logger.warning(f"@{self.profile_tag} completed but result is None")
-                        return "No response received"
-
-                    # Prefer clean text (final_answer_text) for LLM consumption
-                    # HTML formatting in final_answer adds noise for coordinator reasoning
-                    # Fall back to final_answer/final_response if clean text not available
-                    final_response = (
-                        result.get("final_answer_text") or  # Clean text - preferred for LLM
-                        result.get("final_response") or     # Legacy field
-                        result.get("final_answer", "")      # HTML formatted - fallback
-                    )
-                    # When full_result_passthrough is enabled on this slave profile, append
-                    # the structured data rows so the coordinator synthesis LLM has access
-                    # to the actual retrieved data, not just TDA_FinalReport's text summary.
-                    if self.full_result_passthrough:
-                        data_text = _format_collected_data_as_text(result.get("collected_data") or {})
-                        if data_text:
-                            final_response = final_response + "\n\n" + data_text
-                    # Cache the full HTML response for pass-through rendering.
-                    # When synthesis is skipped, the coordinator delivers the slave's answer
-                    # directly to the user — we want the rich HTML (table, charts, etc.),
-                    # not the plain-text summary stored in final_answer_text.
-                    html_response = result.get("final_answer") or final_response
-                    if html_response and html_response != final_response:
-                        _slave_html_responses[f"{self.parent_session_id}:{self.profile_tag}"] = html_response
-                    logger.info(f"@{self.profile_tag} completed successfully (text length: {len(final_response)})")
-                    return final_response
-
+                    return self._completed_task_response(status_data)
                 elif status in ("failed", "error"):
-                    error = status_data.get("error", "Unknown error")
+                    error = _task_error(status_data)
                     logger.error(f"@{self.profile_tag} task failed: {error}")
                     return f"Error from @{self.profile_tag}: {error}"
 
@@ -509,6 +593,50 @@ class SlaveSessionTool(BaseTool):
 
             return f"Timeout waiting for @{self.profile_tag} response"
 
+    def _completed_task_response(self, status_data: dict) -> str:
+        """Turn a completed child task (REST status payload or in-process task state) into the tool result."""
+        result = status_data.get("result", {})
+
+        # Forward child CCR events to parent Genie session
+        child_events = status_data.get("events", [])
+        for event in child_events:
+            evt_type = event.get("event_type")
+            if evt_type == "rag_retrieval":
+                self._emit_event("rag_retrieval", event.get("event_data", {}))
+
+        # Handle case where result might be a string directly (instead of dict)
+        if isinstance(result, str):
+            logger.info(f"@{self.profile_tag} completed successfully (text length: {len(result)})")
+            return result
+        elif result is None:
+            logger.warning(f"@{self.profile_tag} completed but result is None")
+            return "No response received"
+
+        # Prefer clean text (final_answer_text) for LLM consumption
+        # HTML formatting in final_answer adds noise for coordinator reasoning
+        # Fall back to final_answer/final_response if clean text not available
+        final_response = (
+            result.get("final_answer_text") or  # Clean text - preferred for LLM
+            result.get("final_response") or     # Legacy field
+            result.get("final_answer", "")      # HTML formatted - fallback
+        )
+        # When full_result_passthrough is enabled on this slave profile, append
+        # the structured data rows so the coordinator synthesis LLM has access
+        # to the actual retrieved data, not just TDA_FinalReport's text summary.
+        if self.full_result_passthrough:
+            data_text = _format_collected_data_as_text(result.get("collected_data") or {})
+            if data_text:
+                final_response = final_response + "\n\n" + data_text
+        # Cache the full HTML response for pass-through rendering.
+        # When synthesis is skipped, the coordinator delivers the slave's answer
+        # directly to the user — we want the rich HTML (table, charts, etc.),
+        # not the plain-text summary stored in final_answer_text.
+        html_response = result.get("final_answer") or final_response
+        if html_response and html_response != final_response:
+            _slave_html_responses[f"{self.parent_session_id}:{self.profile_tag}"] = html_response
+        logger.info(f"@{self.profile_tag} completed successfully (text length: {len(final_response)})")
+        return final_response
+
 
 class GenieCoordinator:
     """
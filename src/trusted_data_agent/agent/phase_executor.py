@@ -1,16 +1,18 @@
 # trusted_data_agent/agent/phase_executor.py
+import asyncio
 import re
 import json
 import logging
 import copy
 import uuid
+import weakref
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Tuple, Dict, Any, List
+from typing import TYPE_CHECKING, Tuple, Dict, Any, List, Optional
 from abc import ABC, abstractmethod
 
 from trusted_data_agent.core import session_manager
 from trusted_data_agent.mcp_adapter import adapter as mcp_adapter
-from trusted_data_agent.core.config import APP_CONFIG, AppConfig
+from trusted_data_agent.core.config import APP_CONFIG, AppConfig, get_user_mcp_server_id
 from trusted_data_agent.agent.prompts import (
     WORKFLOW_TACTICAL_PROMPT,
 )
@@ -304,6 +306,94 @@ class CorrectionHandler:
         return None, []
 
 
+# Concurrent FASTPATH tool calls per (user_uuid, MCP server), shared by all loops.
+# Only used without the MCP session pool: the pool already caps the calls of a
+# (user, server) pair at MCP_SESSION_POOL_MAX_PER_SERVER, whereas without it every
+# call opens its own session and nothing else bounds the fan-out.
+_SERVER_CALL_SEMAPHORES: "weakref.WeakValueDictionary[tuple, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+
+
+def _server_call_semaphore(user_uuid: str) -> Optional[asyncio.Semaphore]:
+    """The semaphore bounding prefetched calls of a user's MCP server (None when the session pool does)."""
+    if APP_CONFIG.MCP_SESSION_POOL_ENABLED:
+        return None
+    key = (user_uuid, get_user_mcp_server_id(user_uuid))
+    semaphore = _SERVER_CALL_SEMAPHORES.get(key)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, APP_CONFIG.FASTPATH_MAX_CONCURRENCY_PER_SERVER))
+        _SERVER_CALL_SEMAPHORES[key] = semaphore
+    return semaphore
+
+
+class _ToolCallPrefetcher:
+    """
+    Starts the first ``invoke_mcp_tool`` call of upcoming FASTPATH loop items
+    while earlier items are still being handled.
+
+    Items are still consumed strictly in order: ``take(i)`` returns the call
+    task for item ``i`` (None if it was not prefetched) and the caller handles
+    its result, events, retries and aborts exactly as in sequential mode.  At
+    most ``window`` calls of one loop run ahead, and all loops share the
+    per-server concurrency cap (the session pool's, or
+    ``_SERVER_CALL_SEMAPHORES``).  Commands that are None (client-side
+    ``TDA_*`` tools, orchestrated items) are never prefetched.
+
+    Calls that were already sent are not undone when an earlier item fails or
+    aborts the loop (``cancel`` only stops waiting for them), which is why
+    ``FASTPATH_LOOP_CONCURRENCY`` defaults to 1 (off).
+    """
+
+    def __init__(self, executor: 'PlanExecutor', commands: List[Optional[dict]], window: int):
+        self.executor = executor
+        self.commands = commands
+        self.window = window
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._next = 0
+        self._semaphore = _server_call_semaphore(executor.user_uuid) if window > 1 else None
+
+    def take(self, index: int) -> Optional[asyncio.Task]:
+        if self.window <= 1:
+            return None
+        while self._next < len(self.commands) and self._next < index + self.window:
+            command = self.commands[self._next]
+            if command is not None:
+                self._tasks[self._next] = asyncio.create_task(self._invoke(command))
+            self._next += 1
+        return self._tasks.pop(index, None)
+
+    async def _invoke(self, command: dict):
+        full_context_for_tool = {
+            "original_user_input": self.executor.original_user_input,
+            "workflow_goal_prompt": self.executor.workflow_goal_prompt,
+            **self.executor.workflow_state
+        }
+        if self._semaphore is None:
+            return await self._call(command, full_context_for_tool)
+        async with self._semaphore:
+            return await self._call(command, full_context_for_tool)
+
+    async def _call(self, command: dict, full_context_for_tool: dict):
+        return await mcp_adapter.invoke_mcp_tool(
+            self.executor.dependencies['STATE'],
+            command,
+            user_uuid=self.executor.user_uuid,
+            session_id=self.executor.session_id,
+            workflow_state=full_context_for_tool,
+            profile_id=self.executor.active_profile_id
+        )
+
+    async def cancel(self):
+        """Cancel calls that were started but will not be consumed (loop aborted)."""
+        cancelled = list(self._tasks.values())
+        for task in cancelled:
+            task.cancel()
+        self._tasks.clear()
+        self._next = len(self.commands)
+        if cancelled:
+            # Wait for the calls to unwind so none outlives the loop or logs an unretrieved exception
+            await asyncio.gather(*cancelled, return_exceptions=True)
+
+
 class PhaseExecutor:
     """
     Handles the tactical execution of a single phase of a plan. It is instantiated
@@ -516,58 +606,74 @@ class PhaseExecutor:
                 if not db_name:
                     raise RuntimeError(f"Cannot perform column-level FASTPATH for tool '{tool_name}' because 'database_name' is missing from the phase arguments.")
 
-                yield self.executor._format_sse_with_depth({"target": "db", "state": "busy"}, "status_indicator_update")
+                cols_commands = []
                 for table_item in tables_to_process:
                     table_name = get_argument_by_canonical_name(table_item, 'object_name')
-                    if not table_name: continue
-
+                    if not table_name:
+                        cols_commands.append(None)
+                        continue
                     args_for_col_tool = {'database_name': db_name}
                     for synonym in AppConfig.ARGUMENT_SYNONYM_MAP.get('object_name', {'object_name', 'table_name'}):
                         args_for_col_tool[synonym] = table_name
+                    cols_commands.append({"tool_name": "base_columnDescription", "arguments": args_for_col_tool})
 
+                # Column lookups for the next tables run concurrently; results are consumed in table order
+                cols_prefetcher = _ToolCallPrefetcher(self.executor, cols_commands, APP_CONFIG.FASTPATH_LOOP_CONCURRENCY)
 
-                    cols_command = {"tool_name": "base_columnDescription", "arguments": args_for_col_tool}
-                    # --- MODIFICATION START: Pass user_uuid ---
-                    cols_result, _, _ = await mcp_adapter.invoke_mcp_tool(
-                        self.executor.dependencies['STATE'],
-                        cols_command,
-                        user_uuid=self.executor.user_uuid,
-                        session_id=self.executor.session_id,
-                        profile_id=self.executor.active_profile_id
-                    )
-                    # --- MODIFICATION END ---
-
-                    if cols_result and isinstance(cols_result, dict) and cols_result.get('status') == 'success' and cols_result.get('results'):
-                        columns_metadata = cols_result.get('results', [])
-                        for col_info in columns_metadata:
-                            col_name = col_info.get("ColumnName")
-                            if not col_name: continue
-
-                            col_type = next((v for k, v in col_info.items() if "type" in k.lower()), "").upper()
-                            if required_type and col_type != "UNKNOWN":
-                                is_numeric = any(t in col_type for t in ["INT", "NUMERIC", "DECIMAL", "FLOAT", "BYTEINT", "SMALLINT", "BIGINT"])
-                                is_char = any(t in col_type for t in ["CHAR", "VARCHAR", "TEXT", "DATE", "TIMESTAMP"])
-                                if (required_type == "numeric" and not is_numeric) or (required_type == "character" and not is_char):
-                                    skip_details = f"Tool '{tool_name}' requires a {required_type} column, but '{col_name}' is '{col_type}'. Skipping."
-                                    event_data = {"step": "Skipping Incompatible Column", "type": "plan_optimization", "details": skip_details}
-                                    self.executor._log_system_event(event_data)
-                                    yield self.executor._format_sse_with_depth(event_data)
-                                    continue
-                            expanded_loop_items.append({**table_item, "column_name": col_name})
-                    else:
-                        error_msg = (cols_result or {}).get('error', '') if isinstance(cols_result, dict) else ''
-                        if 'timed out' in error_msg.lower():
-                            # MCP server is unresponsive — every remaining table will also time out.
-                            # Abort immediately instead of waiting N × 120 s.
-                            abort_event = {
-                                "step": "Column Expansion Aborted",
-                                "type": "plan_optimization",
-                                "details": f"MCP server timed out getting columns for '{table_name}'. Aborting column expansion for '{tool_name}' to avoid further delays."
-                            }
-                            self.executor._log_system_event(abort_event)
-                            yield self.executor._format_sse_with_depth(abort_event)
-                            break
-                        app_logger.warning(f"Data expansion: Failed to get columns for table '{table_name}'. Tool `base_columnDescription` may have failed. Result: {cols_result}")
+                yield self.executor._format_sse_with_depth({"target": "db", "state": "busy"}, "status_indicator_update")
+                try:
+                    for table_index, table_item in enumerate(tables_to_process):
+                        cols_command = cols_commands[table_index]
+                        if cols_command is None: continue
+                        table_name = get_argument_by_canonical_name(table_item, 'object_name')
+
+                        prefetched_cols = cols_prefetcher.take(table_index)
+                        if prefetched_cols is not None:
+                            cols_result, _, _ = await prefetched_cols
+                        else:
+                            # --- MODIFICATION START: Pass user_uuid ---
+                            cols_result, _, _ = await mcp_adapter.invoke_mcp_tool(
+                                self.executor.dependencies['STATE'],
+                                cols_command,
+                                user_uuid=self.executor.user_uuid,
+                                session_id=self.executor.session_id,
+                                profile_id=self.executor.active_profile_id
+                            )
+                            # --- MODIFICATION END ---
+
+                        if cols_result and isinstance(cols_result, dict) and cols_result.get('status') == 'success' and cols_result.get('results'):
+                            columns_metadata = cols_result.get('results', [])
+                            for col_info in columns_metadata:
+                                col_name = col_info.get("ColumnName")
+                                if not col_name: continue
+
+                                col_type = next((v for k, v in col_info.items() if "type" in k.lower()), "").upper()
+                                if required_type and col_type != "UNKNOWN":
+                                    is_numeric = any(t in col_type for t in ["INT", "NUMERIC", "DECIMAL", "FLOAT", "BYTEINT", "SMALLINT", "BIGINT"])
+                                    is_char = any(t in col_type for t in ["CHAR", "VARCHAR", "TEXT", "DATE", "TIMESTAMP"])
+                                    if (required_type == "numeric" and not is_numeric) or (required_type == "character" and not is_char):
+                                        skip_details = f"Tool '{tool_name}' requires a {required_type} column, but '{col_name}' is '{col_type}'. Skipping."
+                                        event_data = {"step": "Skipping Incompatible Column", "type": "plan_optimization", "details": skip_details}
+                                        self.executor._log_system_event(event_data)
+                                        yield self.executor._format_sse_with_depth(event_data)
+                                        continue
+                                expanded_loop_items.append({**table_item, "column_name": col_name})
+                        else:
+                            error_msg = (cols_result or {}).get('error', '') if isinstance(cols_result, dict) else ''
+                            if 'timed out' in error_msg.lower():
+                                # MCP server is unresponsive — every remaining table will also time out.
+                                # Abort immediately instead of waiting N × 120 s.
+                                abort_event = {
+                                    "step": "Column Expansion Aborted",
+                                    "type": "plan_optimization",
+                                    "details": f"MCP server timed out getting columns for '{table_name}'. Aborting column expansion for '{tool_name}' to avoid further delays."
+                                }
+                                self.executor._log_system_event(abort_event)
+                                yield self.executor._format_sse_with_depth(abort_event)
+                                break
+                            app_logger.warning(f"Data expansion: Failed to get columns for table '{table_name}'. Tool `base_columnDescription` may have failed. Result: {cols_result}")
+                finally:
+                    await cols_prefetcher.cancel()
 
                 yield self.executor._format_sse_with_depth({"target": "db", "state": "idle"}, "status_indicator_update")
                 self.executor.current_loop_items = expanded_loop_items
@@ -604,13 +710,13 @@ class PhaseExecutor:
                     if canonical_name:
                         allowed_arg_names.update(AppConfig.ARGUMENT_SYNONYM_MAP.get(canonical_name, set()))
 
-            all_loop_results = []
-            yield self.executor._format_sse_with_depth({"target": "db", "state": "busy"}, "status_indicator_update")
-            for i, item in enumerate(self.executor.current_loop_items):
-                event_data = {"step": f"Processing Loop Item {i+1}/{len(self.executor.current_loop_items)}", "type": "system_message", "details": item}
-                self.executor._log_system_event(event_data)
-                yield self.executor._format_sse_with_depth(event_data)
-
+            # Resolve every item's arguments up front so upcoming tool calls can be
+            # started while earlier items are processed (workflow_state does not
+            # change during a FASTPATH loop).
+            tool_scope = self.executor.dependencies['STATE'].get('tool_scopes', {}).get(tool_name)
+            item_args = []
+            item_commands = []
+            for item in self.executor.current_loop_items:
                 item_data = item if isinstance(item, dict) else {}
                 resolved_item_args = self.executor._resolve_arguments(static_phase_args, loop_item=item_data)
 
@@ -621,64 +727,89 @@ class PhaseExecutor:
                              pruned_item_data[key] = value
 
                 merged_args = {**resolved_item_args, **pruned_item_data}
+                item_args.append(merged_args)
+                item_commands.append({"tool_name": tool_name, "arguments": merged_args})
+
+            # Only MCP tool calls are prefetched; client-side TDA_* tools and items
+            # routed to the column iteration orchestrator run inline as before.
+            prefetch_commands = [
+                None if tool_name.startswith("TDA_") or (
+                    tool_scope == 'column' and get_argument_by_canonical_name(args, 'column_name') is None
+                ) else command
+                for args, command in zip(item_args, item_commands)
+            ]
+            prefetcher = _ToolCallPrefetcher(self.executor, prefetch_commands, APP_CONFIG.FASTPATH_LOOP_CONCURRENCY)
 
-                # === Column Iteration Orchestrator Check (FASTPATH Loop) ===
-                # Check if this is a column-scoped tool missing column_name argument
-                tool_scope = self.executor.dependencies['STATE'].get('tool_scopes', {}).get(tool_name)
-                has_column_arg = get_argument_by_canonical_name(merged_args, 'column_name') is not None
-
-                if tool_scope == 'column' and not has_column_arg:
-                    app_logger.info(f"FASTPATH Loop: Tool '{tool_name}' is column-scoped but missing column_name. Invoking column iteration orchestrator.")
-
-                    event_data = {
-                        "step": "Scope-Aware Dispatcher Action",
-                        "type": "plan_optimization",
-                        "details": f"FASTPATH loop invoking column iteration for '{tool_name}' because 'column_name' was missing."
-                    }
+            all_loop_results = []
+            yield self.executor._format_sse_with_depth({"target": "db", "state": "busy"}, "status_indicator_update")
+            try:
+                for i, item in enumerate(self.executor.current_loop_items):
+                    event_data = {"step": f"Processing Loop Item {i+1}/{len(self.executor.current_loop_items)}", "type": "system_message", "details": item}
                     self.executor._log_system_event(event_data)
                     yield self.executor._format_sse_with_depth(event_data)
 
-                    command_for_orchestrator = {"tool_name": tool_name, "arguments": merged_args}
-                    try:
-                        async for event in orchestrators.execute_column_iteration(self.executor, command_for_orchestrator):
-                            yield event
-                        enriched_tool_output = copy.deepcopy(self.executor.last_tool_output)
-                        if (isinstance(enriched_tool_output, dict) and
-                            enriched_tool_output.get("status") == "success" and
-                            isinstance(item, dict)):
-                            enriched_tool_output.setdefault("metadata", {}).update(item_data)
-                        all_loop_item_results.append(enriched_tool_output)
-                        continue  # Skip normal tool execution for this item
-                    except Exception as orch_e:
-                        app_logger.error(f"FASTPATH Loop: Column iteration orchestrator failed for '{tool_name}': {orch_e}", exc_info=True)
-                        # Fall through to normal tool execution for recovery
-                # === End Column Iteration Check ===
+                    item_data = item if isinstance(item, dict) else {}
+                    merged_args = item_args[i]
 
-                command = {"tool_name": tool_name, "arguments": merged_args}
-                async for event in self._execute_tool(command, phase, is_fast_path=True):
-                    yield event
+                    # === Column Iteration Orchestrator Check (FASTPATH Loop) ===
+                    # Check if this is a column-scoped tool missing column_name argument
+                    has_column_arg = get_argument_by_canonical_name(merged_args, 'column_name') is not None
+
+                    if tool_scope == 'column' and not has_column_arg:
+                        app_logger.info(f"FASTPATH Loop: Tool '{tool_name}' is column-scoped but missing column_name. Invoking column iteration orchestrator.")
+
+                        event_data = {
+                            "step": "Scope-Aware Dispatcher Action",
+                            "type": "plan_optimization",
+                            "details": f"FASTPATH loop invoking column iteration for '{tool_name}' because 'column_name' was missing."
+                        }
+                        self.executor._log_system_event(event_data)
+                        yield self.executor._format_sse_with_depth(event_data)
 
-                enriched_tool_output = copy.deepcopy(self.executor.last_tool_output)
-                if (isinstance(enriched_tool_output, dict) and
-                    enriched_tool_output.get("status") == "success" and
-                    isinstance(item, dict)):
-
-                    if 'results' in enriched_tool_output and isinstance(enriched_tool_output['results'], list):
-                        for result_row in enriched_tool_output['results']:
-                            if isinstance(result_row, dict):
-                                for key, value in item.items():
-                                    if key not in result_row:
-                                        result_row[key] = value
+                        command_for_orchestrator = {"tool_name": tool_name, "arguments": merged_args}
+                        try:
+                            async for event in orchestrators.execute_column_iteration(self.executor, command_for_orchestrator):
+                                yield event
+                            enriched_tool_output = copy.deepcopy(self.executor.last_tool_output)
+                            if (isinstance(enriched_tool_output, dict) and
+                                enriched_tool_output.get("status") == "success" and
+                                isinstance(item, dict)):
+                                enriched_tool_output.setdefault("metadata", {}).update(item_data)
+                            all_loop_item_results.append(enriched_tool_output)
+                            continue  # Skip normal tool execution for this item
+                        except Exception as orch_e:
+                            app_logger.error(f"FASTPATH Loop: Column iteration orchestrator failed for '{tool_name}': {orch_e}", exc_info=True)
+                            # Fall through to normal tool execution for recovery
+                    # === End Column Iteration Check ===
+
+                    command = item_commands[i]
+                    async for event in self._execute_tool(command, phase, is_fast_path=True,
+                                                          prefetched_call=prefetcher.take(i)):
+                        yield event
+
+                    enriched_tool_output = copy.deepcopy(self.executor.last_tool_output)
+                    if (isinstance(enriched_tool_output, dict) and
+                        enriched_tool_output.get("status") == "success" and
+                        isinstance(item, dict)):
+
+                        if 'results' in enriched_tool_output and isinstance(enriched_tool_output['results'], list):
+                            for result_row in enriched_tool_output['results']:
+                                if isinstance(result_row, dict):
+                                    for key, value in item.items():
+                                        if key not in result_row:
+                                            result_row[key] = value
                 
-                # --- MODIFICATION START: Log fast-path actions to history ---
-                # Ensure fast-path tool calls are logged just like slow-path
-                action_for_history = copy.deepcopy(command)
-                action_for_history.setdefault("metadata", {})["phase_number"] = phase_num
-                action_for_history.setdefault("metadata", {})["execution_depth"] = self.executor.execution_depth
-                action_for_history.setdefault("metadata", {})["timestamp"] = datetime.now(timezone.utc).isoformat()
-                self.executor.turn_action_history.append({"action": action_for_history, "result": enriched_tool_output})
-                # --- MODIFICATION END ---
-                all_loop_results.append(enriched_tool_output)
+                    # --- MODIFICATION START: Log fast-path actions to history ---
+                    # Ensure fast-path tool calls are logged just like slow-path
+                    action_for_history = copy.deepcopy(command)
+                    action_for_history.setdefault("metadata", {})["phase_number"] = phase_num
+                    action_for_history.setdefault("metadata", {})["execution_depth"] = self.executor.execution_depth
+                    action_for_history.setdefault("metadata", {})["timestamp"] = datetime.now(timezone.utc).isoformat()
+                    self.executor.turn_action_history.append({"action": action_for_history, "result": enriched_tool_output})
+                    # --- MODIFICATION END ---
+                    all_loop_results.append(enriched_tool_output)
+            finally:
+                await prefetcher.cancel()
 
             yield self.executor._format_sse_with_depth({"target": "db", "state": "idle"}, "status_indicator_update")
 
@@ -2076,8 +2207,14 @@ class PhaseExecutor:
                 app_logger.debug("Restored focused 'data' payload after failed refinement.")
 
 
-    async def _execute_tool(self, action: dict, phase: dict, is_fast_path: bool = False):
-        """Executes a single tool call with a built-in retry and recovery mechanism."""
+    async def _execute_tool(self, action: dict, phase: dict, is_fast_path: bool = False,
+                            prefetched_call: Optional[asyncio.Task] = None):
+        """
+        Executes a single tool call with a built-in retry and recovery mechanism.
+
+        ``prefetched_call`` is an already running ``invoke_mcp_tool`` task for
+        ``action`` (concurrent FASTPATH loops); it replaces the first attempt's call.
+        """
 
         is_multi_tool_phase = len(phase.get("relevant_tools", [])) > 1
 
@@ -2207,17 +2344,20 @@ class PhaseExecutor:
                 pass
             # --- EPC END ---
 
-            # --- MODIFICATION START: Pass user_uuid and remove incorrect comment ---
-            tool_result, input_tokens, output_tokens = await mcp_adapter.invoke_mcp_tool(
-                self.executor.dependencies['STATE'],
-                action,
-                user_uuid=self.executor.user_uuid,
-                session_id=self.executor.session_id,
-                call_id=call_id_for_tool,
-                workflow_state=full_context_for_tool,
-                profile_id=self.executor.active_profile_id
-            )
-            # --- MODIFICATION END ---
+            if prefetched_call is not None and attempt == 0:
+                tool_result, input_tokens, output_tokens = await prefetched_call
+            else:
+                # --- MODIFICATION START: Pass user_uuid and remove incorrect comment ---
+                tool_result, input_tokens, output_tokens = await mcp_adapter.invoke_mcp_tool(
+                    self.executor.dependencies['STATE'],
+                    action,
+                    user_uuid=self.executor.user_uuid,
+                    session_id=self.executor.session_id,
+                    call_id=call_id_for_tool,
+                    workflow_state=full_context_for_tool,
+                    profile_id=self.executor.active_profile_id
+                )
+                # --- MODIFICATION END ---
 
             # Check for report distillation metadata piggybacked by adapter
             if isinstance(tool_result, dict):
@@ -2809,7 +2949,8 @@ class PhaseExecutor:
         response_str, input_tokens, output_tokens = await self.executor._call_llm_and_update_tokens(
             prompt=classification_prompt, reason=reason,
             system_prompt_override="You are a JSON-only responding assistant.", raise_on_error=True,
-            source=self.executor.source
+            source=self.executor.source,
+            cache_reason="date_classification"
             # user_uuid implicitly passed
         )
         # Log date classification LLM call with tokens + cost for history
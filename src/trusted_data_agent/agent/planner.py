@@ -2255,7 +2255,8 @@ Ranking:"""
             # Call LLM for reranking
             response_text, _, _ = await self.executor._call_llm_and_update_tokens(
                 prompt=reranking_prompt,
-                reason="Reranking knowledge documents for relevance"
+                reason="Reranking knowledge documents for relevance",
+                cache_reason="knowledge_rerank"
             )
             
             # Parse ranking
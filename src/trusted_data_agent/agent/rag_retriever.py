@@ -2,8 +2,15 @@ import math
 import os
 import json
 import glob
+import heapq
 import logging
 import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 # --- MODIFICATION START: Import uuid, copy, and datetime ---
@@ -21,14 +28,34 @@ os.environ['TQDM_DISABLE'] = '1'
 
 from sentence_transformers import SentenceTransformer
 import chromadb
-from chromadb.utils import embedding_functions
 
 from trusted_data_agent.core.config import APP_CONFIG, APP_STATE
+from trusted_data_agent.vectorstore.embedding_providers import SentenceTransformerProvider
 from trusted_data_agent.core.config_manager import get_config_manager
 
 # Configure a dedicated logger for the RAG retriever
 logger = logging.getLogger("rag_retriever")
 
+# Per-caller sink for per-collection retrieval wall times (see record_retrieval_timings)
+_retrieval_timings: ContextVar[Optional[Dict[Any, float]]] = ContextVar("rag_retrieval_timings", default=None)
+
+
+@contextmanager
+def record_retrieval_timings():
+    """
+    Collect the per-collection wall times (ms) of retrievals run in this context.
+
+    Yields a dict that each fan-out in the context (including tasks started
+    from it) replaces with its ``{collection_id: ms}``.  Callers of the shared
+    retriever thus see their own timings, not those of a concurrent request.
+    """
+    timings: Dict[Any, float] = {}
+    token = _retrieval_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _retrieval_timings.reset(token)
+
 class RAGRetriever:
     def __init__(self, rag_cases_dir: str | Path, embedding_model_name: str = "all-MiniLM-L6-v2", persist_directory: Optional[str | Path] = None):
         self.rag_cases_dir = Path(rag_cases_dir).resolve()
@@ -47,10 +74,11 @@ class RAGRetriever:
         else:
             self.client = chromadb.Client()
 
-        # Initialize default embedding function (for backward compatibility)
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=self.embedding_model_name
-        )
+        # Initialize default embedding function (for backward compatibility).
+        # Shared with the vectorstore provider cache so the model loads once per process.
+        self.embedding_function = SentenceTransformerProvider.get_cached(
+            self.embedding_model_name
+        ).chromadb_embedding_function
 
         # --- MODIFICATION START: Support multiple collections ---
         # Store collections as a dict: {collection_id: chromadb_collection_object}
@@ -69,6 +97,14 @@ class RAGRetriever:
         # _register_knowledge_collection_with_backend().
         self._knowledge_backends: Dict[int, Any] = {}
 
+        # Bounded worker pool for concurrent per-collection ChromaDB queries
+        # (created lazily by _get_retrieval_executor).
+        # _stranded_retrievals counts workers still running a query whose
+        # deadline passed (see _run_retrieval_jobs).
+        self._retrieval_executor: Optional[ThreadPoolExecutor] = None
+        self._retrieval_lock = threading.Lock()
+        self._stranded_retrievals = 0
+
         # Pre-seed the shared ChromaDB backend singleton with this client so
         # get_default_chromadb_backend() never opens a second connection to the
         # same persist directory.
@@ -103,9 +139,9 @@ class RAGRetriever:
         """
         if embedding_model not in self.embedding_functions_cache:
             logger.debug(f"Creating new embedding function for model: {embedding_model}")
-            self.embedding_functions_cache[embedding_model] = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=embedding_model
-            )
+            self.embedding_functions_cache[embedding_model] = SentenceTransformerProvider.get_cached(
+                embedding_model
+            ).chromadb_embedding_function
         return self.embedding_functions_cache[embedding_model]
 
     # ── Vector store backend helpers ─────────────────────────────────────────
@@ -222,6 +258,49 @@ class RAGRetriever:
         self._knowledge_backends[collection_id] = backend
         return backend
 
+    def rebind_knowledge_collection(self, collection_id: int, old_name: str, new_name: str) -> None:
+        """Point a loaded knowledge collection at another backend collection.
+
+        Called by shadow-swap reindexing after the collection row was switched
+        to ``new_name`` (and by other workers when they notice the switch, see
+        ``_resolve_knowledge_collection``): ChromaDB collections are reloaded
+        into ``self.collections`` and the backend cache; non-ChromaDB backends
+        resolve the name from the database and need no refresh.
+        """
+        if collection_id not in self.collections:
+            return
+        try:
+            collection = self.client.get_collection(name=new_name)
+            self.collections[collection_id] = collection
+            self._register_knowledge_collection_with_backend(collection_id, new_name, collection)
+            backend = self._knowledge_backends.get(collection_id)
+            from trusted_data_agent.vectorstore.chromadb_backend import ChromaDBBackend
+            if isinstance(backend, ChromaDBBackend):
+                backend.evict_collection(old_name)
+        except Exception as e:
+            logger.error(f"Failed to rebind collection {collection_id} to '{new_name}': {e}", exc_info=True)
+
+    def _resolve_knowledge_collection(self, collection_id: int, collection: Any,
+                                      coll_meta: Dict[str, Any]) -> Optional[Any]:
+        """Return the loaded collection, rebound first if the database names another one.
+
+        A shadow-swap reindex in another worker process switches the
+        collection row to the shadow and drops the old collection; only that
+        worker rebinds its handle.  ``coll_meta`` is read from the database per
+        query, so a name mismatch here is how the other workers notice.
+        Returns None if the new collection cannot be loaded.
+        """
+        current_name = coll_meta.get("collection_name")
+        loaded_name = getattr(collection, "name", None)
+        if not current_name or not loaded_name or loaded_name == current_name:
+            return collection
+        logger.info(f"Collection {collection_id} was swapped to '{current_name}' by another worker, rebinding")
+        self.rebind_knowledge_collection(collection_id, loaded_name, current_name)
+        rebound = self.collections.get(collection_id)
+        if rebound is None or getattr(rebound, "name", None) != current_name:
+            return None
+        return rebound
+
     def _ensure_default_collection(self):
         """
         DEPRECATED: Default collections are now created per-user in the database.
@@ -1662,18 +1741,21 @@ class RAGRetriever:
             effective_allowed = allowed_collection_ids
         # --- MODIFICATION END ---
         
-        # --- MODIFICATION START: Query all active collections with optional filtering ---
-        all_candidate_cases = []
-        
+        # --- Query all eligible collections (concurrently when RAG_PARALLEL_RETRIEVAL) ---
         logger.debug(f"RAG retriever has {len(self.collections)} loaded collections: {list(self.collections.keys())}")
         logger.debug(f"Effective allowed collections: {effective_allowed}")
-        
-        for collection_id, collection in self.collections.items():
+
+        # Each job is (collection_id, callable, is_blocking). Blocking jobs are
+        # synchronous ChromaDB queries; non-blocking jobs return a coroutine.
+        retrieval_jobs = []
+        chroma_targets = []  # (collection_id, collection, coll_meta, embedding_model)
+
+        for collection_id, collection in list(self.collections.items()):
             # Skip collections not in the allowed set (if filtering is active)
             if effective_allowed is not None and collection_id not in effective_allowed:
                 logger.debug(f"Skipping collection '{collection_id}' - not accessible to user or not in profile filter")
                 continue
-            
+
             # --- MODIFICATION START: Filter by repository_type ---
             coll_meta = self.get_collection_metadata(collection_id)
             if coll_meta:
@@ -1682,134 +1764,41 @@ class RAGRetriever:
                     logger.debug(f"Skipping collection '{collection_id}' - repository_type '{coll_repo_type}' does not match requested '{repository_type}'")
                     continue
             # --- MODIFICATION END ---
-            
-            try:
-                # --- MODIFICATION: Use context-aware query builder ---
-                # Knowledge repositories have different metadata schema than planner repositories
-                if repository_type == "knowledge":
-                    # Knowledge documents don't have strategy_type, is_most_efficient, etc.
-                    # They should have document_id, collection_id, chunk metadata
-                    where_filter = None  # No filtering needed for knowledge documents
-                elif rag_context:
-                    # Allow cases that are EITHER efficient OR explicitly upvoted
-                    # This ensures "better suited" plans (which users liked) aren't hidden by "lazier" plans (fewer tokens)
-                    efficiency_filter = {
-                        "$or": [
-                            {"is_most_efficient": {"$eq": True}},
-                            {"user_feedback_score": {"$gt": 0}}
-                        ]
-                    }
 
-                    # Add MCP server ID filter for planner repositories (safety layer)
-                    # Collections are already segregated by MCP server, but this ensures double protection
-                    if coll_meta and coll_meta.get('mcp_server_id'):
-                        mcp_server_filter = {"mcp_server_id": {"$eq": coll_meta['mcp_server_id']}}
-                        # Combine efficiency filter and MCP server filter
-                        combined_extra_filter = {"$and": [efficiency_filter, mcp_server_filter]}
-                    else:
-                        combined_extra_filter = efficiency_filter
-
-                    where_filter = rag_context.build_query_filter(
-                        collection_id=collection_id,
-                        extra_filter=combined_extra_filter,
-                        strategy_type={"$eq": "successful"},
-                        user_feedback_score={"$gte": 0}
-                    )
-                else:
-                    # Fallback logic without context
-                    base_filters = [
-                        {"strategy_type": {"$eq": "successful"}},
-                        {"user_feedback_score": {"$gte": 0}},
-                        {"$or": [
-                            {"is_most_efficient": {"$eq": True}},
-                            {"user_feedback_score": {"$gt": 0}}
-                        ]}
-                    ]
+            if repository_type == "knowledge" and coll_meta:
+                collection = self._resolve_knowledge_collection(collection_id, collection, coll_meta)
+                if collection is None:
+                    continue
 
-                    # Add MCP server ID filter for planner repositories (safety layer)
-                    if coll_meta and coll_meta.get('mcp_server_id'):
-                        base_filters.append({"mcp_server_id": {"$eq": coll_meta['mcp_server_id']}})
+            # Keyword / hybrid search needs the backend's BM25 index, not the raw collection
+            if (repository_type == "knowledge" and coll_meta
+                    and coll_meta.get("search_mode", "semantic") in ("keyword", "hybrid")):
+                retrieval_jobs.append((
+                    collection_id,
+                    functools.partial(self._query_backend_collection, collection_id, coll_meta, query, k, min_score),
+                    False,
+                ))
+                continue
 
-                    where_filter = {"$and": base_filters}
-                
-                # Log collection state before query (debug level)
-                logger.debug(f"Querying collection '{collection_id}' with where_filter, n_results={k * 10}")
-
-                query_results = collection.query(
-                    query_texts=[query],
-                    n_results=k * 10,  # 10x buffer ensures enough candidates survive similarity threshold filtering
-                    where=where_filter,
-                    include=["metadatas", "distances", "documents"]
-                )
-                # --- MODIFICATION END ---
-                
-                logger.debug(f"Collection '{collection_id}' returned {len(query_results['ids'][0])} raw results")
-                
-                for i in range(len(query_results["ids"][0])):
-                    case_id = query_results["ids"][0][i]
-                    metadata = query_results["metadatas"][0][i]
-                    distance = query_results["distances"][0][i]
-                    
-                    similarity_score = 1 - distance 
+            coll_embedding_model = (coll_meta or {}).get("embedding_model", self.embedding_model_name)
+            chroma_targets.append((collection_id, collection, coll_meta, coll_embedding_model))
 
-                    if similarity_score < min_score:
-                        logger.debug(f"Skipping case {case_id} (similarity {similarity_score:.3f} < {min_score})")
-                        continue
-                    
-                    # Handle different metadata structures for knowledge vs planner repositories
-                    if repository_type == "knowledge":
-                        # Knowledge documents have chunk text directly, not full_case_data
-                        chunk_text = query_results["documents"][0][i] if "documents" in query_results else ""
-                        full_case_data = {
-                            "content": chunk_text,
-                            "metadata": metadata
-                        }
-                    else:
-                        # Planner repositories have full_case_data as JSON
-                        full_case_data = json.loads(metadata["full_case_data"])
-                    
-                    # --- MODIFICATION START: Add enhanced metadata for knowledge repositories ---
-                    if repository_type == "knowledge":
-                        # Knowledge documents have different structure
-                        candidate = {
-                            "case_id": case_id,
-                            "collection_id": collection_id,
-                            "user_query": query,  # The search query
-                            "content": full_case_data.get("content", ""),
-                            "full_case_data": full_case_data,
-                            "similarity_score": similarity_score,
-                            "document_id": metadata.get("document_id", case_id),
-                            "chunk_index": metadata.get("chunk_index", 0),
-                            "metadata": metadata,  # ChromaDB metadata (title, filename, etc.)
-                            "strategy_type": "knowledge",  # Mark as knowledge document
-                            "is_most_efficient": True,  # Not applicable for knowledge
-                            "had_plan_improvements": False,
-                            "had_tactical_improvements": False
-                        }
-                    else:
-                        # Planner repositories have standard structure
-                        candidate = {
-                            "case_id": case_id,
-                            "collection_id": collection_id,
-                            "user_query": metadata["user_query"],
-                            "strategy_type": metadata.get("strategy_type", "unknown"),
-                            "full_case_data": full_case_data,
-                            "similarity_score": similarity_score,
-                            "is_most_efficient": metadata.get("is_most_efficient"),
-                            "had_plan_improvements": full_case_data.get("metadata", {}).get("had_plan_improvements", False),
-                            "had_tactical_improvements": full_case_data.get("metadata", {}).get("had_tactical_improvements", False),
-                            "document_id": case_id
-                        }
-                    
-                    # Add collection metadata for knowledge repositories
-                    if coll_meta:
-                        candidate["collection_name"] = coll_meta.get("name")
-                        candidate["repository_type"] = coll_meta.get("repository_type", "planner")
-                    
-                    all_candidate_cases.append(candidate)
-                    # --- MODIFICATION END ---
-            except Exception as e:
-                logger.error(f"Error querying collection '{collection_id}': {e}", exc_info=True)
+        # Embed the query once per distinct model and reuse the vector for every
+        # collection sharing that model (instead of ChromaDB re-embedding the
+        # query text inside each collection.query call).
+        query_vectors = await self._embed_query_per_model(
+            query, {model for _, _, _, model in chroma_targets}
+        )
+        for collection_id, collection, coll_meta, coll_embedding_model in chroma_targets:
+            retrieval_jobs.append((
+                collection_id,
+                functools.partial(
+                    self._query_chroma_collection, collection_id, collection, coll_meta,
+                    query, k, min_score, repository_type, rag_context,
+                    query_embedding=query_vectors.get(coll_embedding_model),
+                ),
+                True,
+            ))
 
         # ── Non-ChromaDB knowledge repos: query via abstraction layer ──────────
         # These repos are NOT in self.collections (skipped in _load_collections),
@@ -1832,66 +1821,389 @@ class RAGRetriever:
                     continue
                 if coll_id in self.collections:
                     continue  # Safety: already queried above
-                try:
-                    backend = await self._get_knowledge_backend(coll_id)
-                    if not backend:
-                        continue
-                    coll_meta = self.get_collection_metadata(coll_id)
-                    coll_name = coll_meta["collection_name"] if coll_meta else db_coll["collection_name"]
-
-                    # Non-ChromaDB backends (Qdrant, Teradata) need an
-                    # explicit embedding provider for client-side embedding.
-                    from trusted_data_agent.vectorstore import get_embedding_provider
-                    emb_model = (coll_meta or db_coll).get("embedding_model", self.embedding_model_name)
-                    emb_provider = get_embedding_provider(emb_model)
-
-                    from trusted_data_agent.vectorstore.types import SearchMode
-                    _sm = SearchMode((coll_meta or db_coll).get("search_mode", "semantic"))
-                    _kw = float((coll_meta or db_coll).get("hybrid_keyword_weight", 0.3))
-
-                    query_result = await backend.query(
-                        coll_name, query_text=query, n_results=k * 10,
-                        embedding_provider=emb_provider,
-                        search_mode=_sm,
-                        keyword_weight=_kw,
-                    )
+                retrieval_jobs.append((
+                    coll_id,
+                    functools.partial(self._query_backend_collection, coll_id, db_coll, query, k, min_score),
+                    False,
+                ))
 
-                    for doc, distance in query_result:
-                        similarity_score = 1 - distance
-                        if similarity_score < min_score:
-                            continue
-                        candidate = {
-                            "case_id": doc.id,
-                            "collection_id": coll_id,
-                            "user_query": query,
-                            "content": doc.content,
-                            "full_case_data": {"content": doc.content, "metadata": doc.metadata},
-                            "similarity_score": similarity_score,
-                            "document_id": doc.metadata.get("document_id", doc.id),
-                            "chunk_index": doc.metadata.get("chunk_index", 0),
-                            "metadata": doc.metadata,
-                            "strategy_type": "knowledge",
-                            "is_most_efficient": True,
-                            "had_plan_improvements": False,
-                            "had_tactical_improvements": False,
-                        }
-                        if coll_meta:
-                            candidate["collection_name"] = coll_meta.get("name")
-                            candidate["repository_type"] = "knowledge"
-                        all_candidate_cases.append(candidate)
-                except Exception as e:
-                    logger.error(f"Error querying non-ChromaDB knowledge collection '{coll_id}': {e}", exc_info=True)
+        per_collection_candidates = await self._run_retrieval_jobs(retrieval_jobs)
 
-        if not all_candidate_cases:
+        if not any(per_collection_candidates):
             logger.info("No candidate cases found across all collections")
             return []
-        # --- MODIFICATION END ---
-        
-        # Calculate Adjusted Score
+
+        # Score and sort each collection's candidates locally, then k-way merge
+        # with a heap. heapq.merge is stable across inputs, so ties resolve in
+        # collection order exactly as a global stable sort would.
+        for candidates in per_collection_candidates:
+            self._apply_adjusted_scores(candidates, freshness_weight, freshness_decay_rate)
+            candidates.sort(key=lambda x: x["adjusted_score"], reverse=True)
+
+        merged = heapq.merge(*per_collection_candidates, key=lambda x: x["adjusted_score"], reverse=True)
+
+        # Take the top-k lazily, applying per-document deduplication (0 = disabled)
+        final_candidates = []
+        doc_chunk_count = {}
+        for case in merged:
+            if len(final_candidates) >= k:
+                break
+            if max_chunks_per_doc and max_chunks_per_doc > 0:
+                doc_id = case.get("document_id", case["case_id"])
+                current = doc_chunk_count.get(doc_id, 0)
+                if current >= max_chunks_per_doc:
+                    continue
+                doc_chunk_count[doc_id] = current + 1
+            final_candidates.append(case)
+        logger.debug(f"Returning top {k} candidates sorted by adjusted score.")
+
+        # Enrich with collection metadata
+        for case in final_candidates:
+            coll_id = case.get("collection_id")
+            if coll_id:
+                coll_meta = self.get_collection_metadata(coll_id)
+                if coll_meta:
+                    case["collection_name"] = coll_meta.get("name")
+                    case["collection_mcp_server_id"] = coll_meta.get("mcp_server_id")
+
+        return final_candidates
+
+    # ── Per-collection retrieval helpers ─────────────────────────────────────
+
+    def _get_retrieval_executor(self) -> ThreadPoolExecutor:
+        """Return the bounded thread pool used for concurrent ChromaDB queries.
+
+        A pool whose every worker is stranded on a query past its deadline is
+        retired and replaced; its threads exit once their queries return.
+        """
+        with self._retrieval_lock:
+            if (self._retrieval_executor is not None
+                    and self._stranded_retrievals >= APP_CONFIG.RAG_RETRIEVAL_MAX_WORKERS):
+                logger.warning(
+                    f"All {self._stranded_retrievals} RAG retrieval workers are blocked on queries past "
+                    f"their deadline - replacing the retrieval thread pool"
+                )
+                self._retrieval_executor.shutdown(wait=False)
+                self._retrieval_executor = None
+            if self._retrieval_executor is None:
+                self._retrieval_executor = ThreadPoolExecutor(
+                    max_workers=APP_CONFIG.RAG_RETRIEVAL_MAX_WORKERS,
+                    thread_name_prefix="rag-retrieval",
+                )
+                self._stranded_retrievals = 0
+            return self._retrieval_executor
+
+    async def _run_blocking_retrieval(self, fn, deadline: float):
+        """Run a blocking ChromaDB query on the retrieval pool under ``deadline``.
+
+        A running ChromaDB query cannot be interrupted: on timeout the caller
+        moves on while the worker thread stays busy until the query returns.
+        Such workers are counted in ``_stranded_retrievals`` so the pool can be
+        replaced before hung queries starve every later retrieval.  A job still
+        queued at its deadline is cancelled and never runs.
+        """
+        executor = self._get_retrieval_executor()
+        state = {"done": False, "abandoned": False}
+
+        def _job():
+            try:
+                return fn()
+            finally:
+                with self._retrieval_lock:
+                    state["done"] = True
+                    if state["abandoned"] and executor is self._retrieval_executor:
+                        self._stranded_retrievals -= 1
+
+        future = executor.submit(_job)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=deadline)
+        except asyncio.TimeoutError:
+            with self._retrieval_lock:
+                # A job that never started was cancelled by wait_for and holds no worker
+                if future.running() and not state["done"]:
+                    state["abandoned"] = True
+                    if executor is self._retrieval_executor:
+                        self._stranded_retrievals += 1
+            raise
+
+    async def _run_retrieval_jobs(self, jobs: list) -> List[List[Dict[str, Any]]]:
+        """Execute per-collection query jobs and return their candidates in job order.
+
+        With ``RAG_PARALLEL_RETRIEVAL`` enabled, blocking ChromaDB queries are
+        dispatched to a bounded thread pool and backend queries are awaited
+        concurrently, each under ``RAG_COLLECTION_QUERY_TIMEOUT_SECONDS``.  A
+        collection that misses its deadline contributes no candidates; see
+        ``_run_blocking_retrieval`` for what happens to its worker thread.
+        Otherwise jobs run one after another on the event loop.
+
+        Per-collection wall times (ms) go to the caller's ``record_retrieval_timings`` dict.
+        """
+        parallel = APP_CONFIG.RAG_PARALLEL_RETRIEVAL and len(jobs) > 1
+        deadline = APP_CONFIG.RAG_COLLECTION_QUERY_TIMEOUT_SECONDS
+        timings: Dict[Any, float] = {}
+
+        async def _run(collection_id, fn, is_blocking):
+            started = time.perf_counter()
+            try:
+                if not parallel:
+                    return fn() if is_blocking else await fn()
+                if is_blocking:
+                    return await self._run_blocking_retrieval(fn, deadline if deadline and deadline > 0 else None)
+                if deadline and deadline > 0:
+                    return await asyncio.wait_for(fn(), timeout=deadline)
+                return await fn()
+            except asyncio.TimeoutError:
+                logger.warning(f"Collection '{collection_id}' exceeded retrieval deadline of {deadline}s - skipping its results")
+                return []
+            finally:
+                timings[collection_id] = round((time.perf_counter() - started) * 1000, 1)
+
+        wall_start = time.perf_counter()
+        if parallel:
+            results = await asyncio.gather(*(_run(*job) for job in jobs))
+        else:
+            results = [await _run(*job) for job in jobs]
+        wall_ms = round((time.perf_counter() - wall_start) * 1000, 1)
+
+        sink = _retrieval_timings.get()
+        if sink is not None:
+            sink.clear()
+            sink.update(timings)
+        if jobs:
+            logger.debug(
+                f"Retrieved from {len(jobs)} collection(s) in {wall_ms}ms "
+                f"({'parallel' if parallel else 'sequential'}); per-collection ms: {timings}"
+            )
+        return list(results)
+
+    async def _embed_query_per_model(self, query: str, models: set) -> Dict[str, List[float]]:
+        """Embed ``query`` once for each embedding model, off the event loop.
+
+        Vectors come from the shared query-embedding LRU, so repeated queries
+        skip the model entirely.  Models that fail to embed are omitted and
+        their collections fall back to ChromaDB's own query-text embedding.
+        """
+        if not models:
+            return {}
+
+        def _sync():
+            vectors = {}
+            for model in models:
+                try:
+                    vectors[model] = SentenceTransformerProvider.get_cached(model).embed_query_cached(query)
+                except Exception as e:
+                    logger.warning(f"Query embedding with model '{model}' failed, collections will embed query text: {e}")
+            return vectors
+
+        return await asyncio.to_thread(_sync)
+
+    def _query_chroma_collection(self, collection_id: int, collection: Any, coll_meta: Optional[Dict[str, Any]],
+                                 query: str, k: int, min_score: float, repository_type: str,
+                                 rag_context: Optional['RAGAccessContext'],
+                                 query_embedding: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """Query one loaded ChromaDB collection and return its candidates above ``min_score``.
+
+        Uses ``query_embedding`` when supplied, otherwise lets ChromaDB embed
+        the query text.  Synchronous: safe to run on a worker thread.
+        """
+        candidates = []
+        try:
+            # --- MODIFICATION: Use context-aware query builder ---
+            # Knowledge repositories have different metadata schema than planner repositories
+            if repository_type == "knowledge":
+                # Knowledge documents don't have strategy_type, is_most_efficient, etc.
+                # They should have document_id, collection_id, chunk metadata
+                where_filter = None  # No filtering needed for knowledge documents
+            elif rag_context:
+                # Allow cases that are EITHER efficient OR explicitly upvoted
+                # This ensures "better suited" plans (which users liked) aren't hidden by "lazier" plans (fewer tokens)
+                efficiency_filter = {
+                    "$or": [
+                        {"is_most_efficient": {"$eq": True}},
+                        {"user_feedback_score": {"$gt": 0}}
+                    ]
+                }
+
+                # Add MCP server ID filter for planner repositories (safety layer)
+                # Collections are already segregated by MCP server, but this ensures double protection
+                if coll_meta and coll_meta.get('mcp_server_id'):
+                    mcp_server_filter = {"mcp_server_id": {"$eq": coll_meta['mcp_server_id']}}
+                    # Combine efficiency filter and MCP server filter
+                    combined_extra_filter = {"$and": [efficiency_filter, mcp_server_filter]}
+                else:
+                    combined_extra_filter = efficiency_filter
+
+                where_filter = rag_context.build_query_filter(
+                    collection_id=collection_id,
+                    extra_filter=combined_extra_filter,
+                    strategy_type={"$eq": "successful"},
+                    user_feedback_score={"$gte": 0}
+                )
+            else:
+                # Fallback logic without context
+                base_filters = [
+                    {"strategy_type": {"$eq": "successful"}},
+                    {"user_feedback_score": {"$gte": 0}},
+                    {"$or": [
+                        {"is_most_efficient": {"$eq": True}},
+                        {"user_feedback_score": {"$gt": 0}}
+                    ]}
+                ]
+
+                # Add MCP server ID filter for planner repositories (safety layer)
+                if coll_meta and coll_meta.get('mcp_server_id'):
+                    base_filters.append({"mcp_server_id": {"$eq": coll_meta['mcp_server_id']}})
+
+                where_filter = {"$and": base_filters}
+
+            # Log collection state before query (debug level)
+            logger.debug(f"Querying collection '{collection_id}' with where_filter, n_results={k * 10}")
+
+            if query_embedding is not None:
+                query_input = {"query_embeddings": [query_embedding]}
+            else:
+                query_input = {"query_texts": [query]}
+            query_results = collection.query(
+                **query_input,
+                n_results=k * 10,  # 10x buffer ensures enough candidates survive similarity threshold filtering
+                where=where_filter,
+                include=["metadatas", "distances", "documents"]
+            )
+
+            logger.debug(f"Collection '{collection_id}' returned {len(query_results['ids'][0])} raw results")
+
+            for i in range(len(query_results["ids"][0])):
+                case_id = query_results["ids"][0][i]
+                metadata = query_results["metadatas"][0][i]
+                distance = query_results["distances"][0][i]
+
+                similarity_score = 1 - distance
+
+                if similarity_score < min_score:
+                    logger.debug(f"Skipping case {case_id} (similarity {similarity_score:.3f} < {min_score})")
+                    continue
+
+                # Handle different metadata structures for knowledge vs planner repositories
+                if repository_type == "knowledge":
+                    # Knowledge documents have chunk text directly, not full_case_data
+                    chunk_text = query_results["documents"][0][i] if "documents" in query_results else ""
+                    full_case_data = {
+                        "content": chunk_text,
+                        "metadata": metadata
+                    }
+                else:
+                    # Planner repositories have full_case_data as JSON
+                    full_case_data = json.loads(metadata["full_case_data"])
+
+                if repository_type == "knowledge":
+                    # Knowledge documents have different structure
+                    candidate = {
+                        "case_id": case_id,
+                        "collection_id": collection_id,
+                        "user_query": query,  # The search query
+                        "content": full_case_data.get("content", ""),
+                        "full_case_data": full_case_data,
+                        "similarity_score": similarity_score,
+                        "document_id": metadata.get("document_id", case_id),
+                        "chunk_index": metadata.get("chunk_index", 0),
+                        "metadata": metadata,  # ChromaDB metadata (title, filename, etc.)
+                        "strategy_type": "knowledge",  # Mark as knowledge document
+                        "is_most_efficient": True,  # Not applicable for knowledge
+                        "had_plan_improvements": False,
+                        "had_tactical_improvements": False
+                    }
+                else:
+                    # Planner repositories have standard structure
+                    candidate = {
+                        "case_id": case_id,
+                        "collection_id": collection_id,
+                        "user_query": metadata["user_query"],
+                        "strategy_type": metadata.get("strategy_type", "unknown"),
+                        "full_case_data": full_case_data,
+                        "similarity_score": similarity_score,
+                        "is_most_efficient": metadata.get("is_most_efficient"),
+                        "had_plan_improvements": full_case_data.get("metadata", {}).get("had_plan_improvements", False),
+                        "had_tactical_improvements": full_case_data.get("metadata", {}).get("had_tactical_improvements", False),
+                        "document_id": case_id
+                    }
+
+                # Add collection metadata for knowledge repositories
+                if coll_meta:
+                    candidate["collection_name"] = coll_meta.get("name")
+                    candidate["repository_type"] = coll_meta.get("repository_type", "planner")
+
+                candidates.append(candidate)
+        except Exception as e:
+            logger.error(f"Error querying collection '{collection_id}': {e}", exc_info=True)
+        return candidates
+
+    async def _query_backend_collection(self, coll_id: int, db_coll: Dict[str, Any], query: str,
+                                        k: int, min_score: float) -> List[Dict[str, Any]]:
+        """Query one knowledge collection through its VectorStoreBackend.
+
+        Used for non-ChromaDB backends and for ChromaDB collections searched in
+        keyword / hybrid mode.
+        """
+        candidates = []
+        try:
+            backend = await self._get_knowledge_backend(coll_id)
+            if not backend:
+                return candidates
+            coll_meta = self.get_collection_metadata(coll_id)
+            coll_name = coll_meta["collection_name"] if coll_meta else db_coll["collection_name"]
+
+            # Non-ChromaDB backends (Qdrant, Teradata) need an
+            # explicit embedding provider for client-side embedding.
+            from trusted_data_agent.vectorstore import get_embedding_provider
+            emb_model = (coll_meta or db_coll).get("embedding_model", self.embedding_model_name)
+            emb_provider = get_embedding_provider(backend.backend_type, emb_model)
+
+            from trusted_data_agent.vectorstore.types import SearchMode
+            _sm = SearchMode((coll_meta or db_coll).get("search_mode", "semantic"))
+            _kw = float((coll_meta or db_coll).get("hybrid_keyword_weight", 0.3))
+
+            query_result = await backend.query(
+                coll_name, query_text=query, n_results=k * 10,
+                embedding_provider=emb_provider,
+                search_mode=_sm,
+                keyword_weight=_kw,
+            )
+
+            for doc, distance in query_result:
+                similarity_score = 1 - distance
+                if similarity_score < min_score:
+                    continue
+                candidate = {
+                    "case_id": doc.id,
+                    "collection_id": coll_id,
+                    "user_query": query,
+                    "content": doc.content,
+                    "full_case_data": {"content": doc.content, "metadata": doc.metadata},
+                    "similarity_score": similarity_score,
+                    "document_id": doc.metadata.get("document_id", doc.id),
+                    "chunk_index": doc.metadata.get("chunk_index", 0),
+                    "metadata": doc.metadata,
+                    "strategy_type": "knowledge",
+                    "is_most_efficient": True,
+                    "had_plan_improvements": False,
+                    "had_tactical_improvements": False,
+                }
+                if coll_meta:
+                    candidate["collection_name"] = coll_meta.get("name")
+                    candidate["repository_type"] = "knowledge"
+                candidates.append(candidate)
+        except Exception as e:
+            logger.error(f"Error querying knowledge collection '{coll_id}': {e}", exc_info=True)
+        return candidates
+
+    @staticmethod
+    def _apply_adjusted_scores(candidates: List[Dict[str, Any]], freshness_weight: float,
+                               freshness_decay_rate: float) -> None:
+        """Set ``adjusted_score`` on each candidate in place."""
         PENALTY_TACTICAL = 0.05  # 5% penalty for tactical corrections
         PENALTY_PLAN = 0.05      # 5% penalty for plan corrections
 
-        for case in all_candidate_cases:
+        for case in candidates:
             if case.get("strategy_type") == "knowledge" and freshness_weight > 0:
                 # Hybrid scoring: blend relevance with document freshness
                 freshness_score = 0.5  # default when no date available
@@ -1917,36 +2229,6 @@ class RAGRetriever:
                     penalty += PENALTY_PLAN
                 case["adjusted_score"] = case["similarity_score"] - penalty
 
-        # Sort by Adjusted Score descending
-        all_candidate_cases.sort(key=lambda x: x["adjusted_score"], reverse=True)
-
-        # Per-document deduplication (0 = disabled)
-        if max_chunks_per_doc and max_chunks_per_doc > 0:
-            doc_chunk_count = {}
-            deduped = []
-            for case in all_candidate_cases:
-                doc_id = case.get("document_id", case["case_id"])
-                current = doc_chunk_count.get(doc_id, 0)
-                if current < max_chunks_per_doc:
-                    deduped.append(case)
-                    doc_chunk_count[doc_id] = current + 1
-            logger.debug(f"Per-document dedup (max {max_chunks_per_doc}/doc): {len(all_candidate_cases)} -> {len(deduped)} candidates")
-            all_candidate_cases = deduped
-
-        final_candidates = all_candidate_cases
-        logger.debug(f"Returning top {k} candidates sorted by adjusted score.")
-
-        # Enrich with collection metadata
-        for case in final_candidates[:k]:
-            coll_id = case.get("collection_id")
-            if coll_id:
-                coll_meta = self.get_collection_metadata(coll_id)
-                if coll_meta:
-                    case["collection_name"] = coll_meta.get("name")
-                    case["collection_mcp_server_id"] = coll_meta.get("mcp_server_id")
-
-        return final_candidates[:k]
-
     def _format_few_shot_example(self, case: Dict[str, Any]) -> str:
         """
         Formats a retrieved RAG case into a string suitable for the prompt.
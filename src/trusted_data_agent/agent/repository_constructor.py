@@ -18,10 +18,13 @@ Key Abstractions:
 
 import json
 import logging
+import math
+import re
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from enum import Enum
 import hashlib
 import uuid
@@ -31,6 +34,10 @@ from trusted_data_agent.core.config import APP_CONFIG
 
 logger = logging.getLogger("repository_constructor")
 
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+_PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+_SEMANTIC_WARMUP_DISTANCES = 4  # Distances observed before topic shifts are detected
+
 
 class RepositoryType(Enum):
     """Types of repositories supported by the system."""
@@ -72,14 +79,53 @@ class DocumentChunk:
         }
 
 
+class _RunningStats:
+    """Welford running mean / variance of the adjacent-sentence distances."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def exceeds(self, value: float, stddevs: float) -> bool:
+        if self.count < _SEMANTIC_WARMUP_DISTANCES:
+            return False
+        stddev = math.sqrt(self._m2 / (self.count - 1))
+        return value > self.mean + stddevs * stddev
+
+
+def _cosine_distance(a: List[float], b: List[float]) -> float:
+    dot = norm_a = norm_b = 0.0
+    for x, y in zip(a, b):
+        dot += x * y
+        norm_a += x * x
+        norm_b += y * y
+    if not norm_a or not norm_b:
+        return 1.0
+    return 1.0 - dot / math.sqrt(norm_a * norm_b)
+
+
 class DocumentProcessor:
-    """Handles document processing with configurable chunking strategies."""
+    """Handles document processing with configurable chunking strategies.
+
+    SEMANTIC chunking needs an ``embedding_provider`` (client-side); without one
+    it falls back to paragraph chunking.
+    """
     
     def __init__(self, chunking_strategy: ChunkingStrategy = ChunkingStrategy.SEMANTIC,
-                 chunk_size: int = None, chunk_overlap: int = None):
+                 chunk_size: int = None, chunk_overlap: int = None, embedding_provider=None):
         self.chunking_strategy = chunking_strategy
         self.chunk_size = chunk_size if chunk_size is not None else APP_CONFIG.KNOWLEDGE_CHUNK_SIZE
         self.chunk_overlap = chunk_overlap if chunk_overlap is not None else APP_CONFIG.KNOWLEDGE_CHUNK_OVERLAP
+        self.embedding_provider = embedding_provider
     
     def process_document(self, content: str, metadata: Dict[str, Any]) -> List[DocumentChunk]:
         """
@@ -106,12 +152,110 @@ class DocumentProcessor:
             return self._chunk_by_sentence(content, metadata)
         
         elif self.chunking_strategy == ChunkingStrategy.SEMANTIC:
-            # For now, fall back to paragraph chunking
-            # TODO: Implement semantic boundary detection
-            return self._chunk_by_paragraph(content, metadata)
+            if not self._can_embed_sentences():
+                return self._chunk_by_paragraph(content, metadata)
+            return self._chunk_semantic(content, metadata)
         
         else:
             raise ValueError(f"Unsupported chunking strategy: {self.chunking_strategy}")
+
+    def _can_embed_sentences(self) -> bool:
+        if self.embedding_provider is None:
+            return False
+        from trusted_data_agent.vectorstore.embedding_providers import ServerSideEmbeddingProvider
+        # Server-side providers cannot embed on the client
+        return not isinstance(self.embedding_provider, ServerSideEmbeddingProvider)
+
+    def _chunk_semantic(self, content: str, metadata: Dict[str, Any]) -> List[DocumentChunk]:
+        """
+        Chunk document where adjacent sentences diverge in meaning.
+
+        Sentences are embedded KNOWLEDGE_SEMANTIC_EMBED_BATCH at a time; a chunk
+        boundary is placed where the cosine distance between two adjacent
+        sentences exceeds the running mean + KNOWLEDGE_SEMANTIC_BREAKPOINT_STDDEV
+        standard deviations of the distances seen so far in the document.
+        Chunks are closed regardless at chunk_size * 1.5 and are not closed on a
+        topic shift while shorter than chunk_size / 4.
+
+        Each chunk starts with the trailing whole sentences of the previous one
+        that fit in chunk_overlap. Only one batch of sentence vectors is held at
+        a time, and all chunks share one metadata dict.
+        """
+        max_chunk_size = int(self.chunk_size * 1.5)
+        min_chunk_size = self.chunk_size // 4
+        batch_size = max(1, APP_CONFIG.KNOWLEDGE_SEMANTIC_EMBED_BATCH)
+        stddevs = APP_CONFIG.KNOWLEDGE_SEMANTIC_BREAKPOINT_STDDEV
+        chunk_metadata = {**metadata, 'chunk_method': 'semantic'}
+
+        sentences = self._iter_sentences(content, max_chunk_size)
+        distances = _RunningStats()
+        chunks: List[DocumentChunk] = []
+        current: List[Tuple[str, str]] = []  # (separator, sentence) pairs of the open chunk
+        carried = 0        # Leading pairs of current repeated from the previous chunk
+        carried_size = 0
+        current_size = 0
+        previous_vector = None
+
+        while True:
+            batch = list(islice(sentences, batch_size))
+            if not batch:
+                break
+            vectors = self.embedding_provider.embed_texts([text for text, _ in batch])
+            for (text, separator), vector in zip(batch, vectors):
+                topic_shift = False
+                if previous_vector is not None:
+                    distance = _cosine_distance(previous_vector, vector)
+                    topic_shift = distances.exceeds(distance, stddevs)
+                    distances.add(distance)
+                overflow = current_size + len(separator) + len(text) > max_chunk_size
+                if len(current) > carried:
+                    if overflow or (topic_shift and current_size - carried_size >= min_chunk_size):
+                        chunks.append(DocumentChunk(self._join_sentences(current), chunk_metadata, len(chunks)))
+                        current, carried_size = self._overlap_tail(current)
+                        carried = len(current)
+                        current_size = carried_size
+                        overflow = current_size + len(separator) + len(text) > max_chunk_size
+                if overflow and len(current) == carried:
+                    # The carried overlap alone would not leave room for this sentence
+                    current, carried, carried_size, current_size = [], 0, 0, 0
+                current.append((separator, text))
+                current_size += len(text) + (len(separator) if len(current) > 1 else 0)
+                previous_vector = vector
+
+        if len(current) > carried:
+            chunks.append(DocumentChunk(self._join_sentences(current), chunk_metadata, len(chunks)))
+        return chunks
+
+    @staticmethod
+    def _join_sentences(pairs: List[Tuple[str, str]]) -> str:
+        return pairs[0][1] + ''.join(separator + text for separator, text in pairs[1:])
+
+    def _overlap_tail(self, pairs: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], int]:
+        """Trailing sentences of a closed chunk that fit in chunk_overlap, and their joined size."""
+        tail: List[Tuple[str, str]] = []
+        size = 0
+        # Never carry the whole chunk over
+        for separator, text in reversed(pairs[1:]):
+            added = len(text) + (len(tail[0][0]) if tail else 0)
+            if size + added > self.chunk_overlap:
+                break
+            tail.insert(0, (separator, text))
+            size += added
+        return tail, size
+
+    @staticmethod
+    def _iter_sentences(content: str, max_size: int) -> Iterator[Tuple[str, str]]:
+        """Yield (sentence, separator before it); sentences longer than max_size are split."""
+        separator = ''
+        for paragraph in _PARAGRAPH_BOUNDARY.split(content):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+                for start in range(0, len(sentence), max_size):
+                    yield sentence[start:start + max_size], separator if start == 0 else ''
+                separator = ' '
+            separator = '\n\n'
     
     def _chunk_fixed_size(self, content: str, metadata: Dict[str, Any]) -> List[DocumentChunk]:
         """Chunk document into fixed-size pieces with overlap."""
@@ -576,7 +720,13 @@ class KnowledgeRepositoryConstructor(RepositoryConstructor):
         self._backend = backend
 
         # Override document processor with Knowledge-specific configuration
-        self.document_processor = DocumentProcessor(chunking_strategy, chunk_size, chunk_overlap)
+        embedding_provider = None
+        if chunking_strategy == ChunkingStrategy.SEMANTIC:
+            from trusted_data_agent.vectorstore.embedding_providers import get_embedding_provider
+            backend_type = backend.backend_type if backend is not None else "chromadb"
+            embedding_provider = get_embedding_provider(backend_type, embedding_model)
+        self.document_processor = DocumentProcessor(chunking_strategy, chunk_size, chunk_overlap,
+                                                    embedding_provider=embedding_provider)
 
     async def construct_async(self, collection_id: int, content: str, **kwargs) -> Dict[str, Any]:
         """Async construction pipeline using the VectorStoreBackend abstraction.
@@ -590,6 +740,11 @@ class KnowledgeRepositoryConstructor(RepositoryConstructor):
                           so generation-based cleanup can delete stale chunks via
                           a metadata filter (client-side backends only).
                           Defaults to int(time.time()) when not provided.
+            reuse_existing_chunks: Re-embed only chunks whose content is not
+                          already stored for this document_id; unchanged chunks
+                          keep their vectors and removed ones are deleted (see
+                          ``_plan_chunk_delta``).  The result then carries
+                          ``delta_applied=True``.
         """
         if self._backend is None:
             raise RuntimeError(
@@ -629,7 +784,9 @@ class KnowledgeRepositoryConstructor(RepositoryConstructor):
             import asyncio
             asyncio.create_task(progress_callback("Chunking document...", 15))
 
-        chunks = self.document_processor.process_document(content, metadata)
+        # Off the event loop: semantic chunking embeds every sentence
+        import asyncio
+        chunks = await asyncio.to_thread(self.document_processor.process_document, content, metadata)
         logger.info(f"Processed document into {len(chunks)} chunk(s)")
 
         if progress_callback:
@@ -650,20 +807,22 @@ class KnowledgeRepositoryConstructor(RepositoryConstructor):
             ))
 
         embedding_provider = get_embedding_provider(self._backend.backend_type, embedding_model)
-        documents = [
-            VectorDocument(
-                id=chunk.chunk_id,
-                content=chunk.content,
-                metadata={
-                    **chunk.metadata,
-                    "chunk_index": chunk.chunk_index,
-                    "token_count": len(chunk.content) // 4,
-                    "ingest_epoch": ingest_epoch,
-                },
+        delta = None
+        if kwargs.get("reuse_existing_chunks"):
+            delta = await self._plan_chunk_delta(collection_name, metadata.get("document_id"), chunks)
+
+        if delta is None:
+            documents = [
+                VectorDocument(id=chunk.chunk_id, content=chunk.content,
+                               metadata=self._chunk_metadata(chunk, ingest_epoch))
+                for chunk in chunks
+            ]
+            await self._backend.upsert(collection_name, documents, embedding_provider)
+            chunk_counts = {"chunks_embedded": len(chunks), "chunks_reused": 0, "chunks_deleted": 0}
+        else:
+            chunk_counts = await self._apply_chunk_delta(
+                collection_name, chunks, delta, ingest_epoch, embedding_provider
             )
-            for chunk in chunks
-        ]
-        await self._backend.upsert(collection_name, documents, embedding_provider)
 
         if progress_callback:
             import asyncio
@@ -679,17 +838,113 @@ class KnowledgeRepositoryConstructor(RepositoryConstructor):
             asyncio.create_task(progress_callback("Document upload complete!", 100))
 
         logger.info(
-            f"Stored {len(chunks)} chunks in collection '{collection_name}' via backend '{self._backend.backend_type}'"
+            f"Stored {len(chunks)} chunks in collection '{collection_name}' via backend '{self._backend.backend_type}' "
+            f"(embedded={chunk_counts['chunks_embedded']} reused={chunk_counts['chunks_reused']} "
+            f"deleted={chunk_counts['chunks_deleted']})"
         )
         return {
             "status": "success",
             "chunks_stored": len(chunks),
+            **chunk_counts,
+            "delta_applied": delta is not None,
             "collection_name": collection_name,
             "repository_type": self.repository_type.value,
             "collection_id": collection_id,
             "metadata": metadata,
         }
 
+    @staticmethod
+    def _chunk_metadata(chunk: DocumentChunk, ingest_epoch: int) -> Dict[str, Any]:
+        return {
+            **chunk.metadata,
+            "chunk_index": chunk.chunk_index,
+            "token_count": len(chunk.content) // 4,
+            "ingest_epoch": ingest_epoch,
+        }
+
+    async def _plan_chunk_delta(self, collection_name: str, document_id: str,
+                                chunks: List[DocumentChunk]) -> Optional[Dict[str, Any]]:
+        """Match new chunks against the document's stored chunks by content hash.
+
+        Chunk IDs end with the first 16 hex digits of the chunk's SHA-256
+        (``{document_id}_chunk_{index}_{hash}``), so stored chunks are matched
+        from their IDs alone.  Exact ID matches are taken first, then same-content
+        chunks that moved; a reused chunk keeps its stored ID (and vector) and
+        only its metadata is rewritten.
+
+        Returns None when the backend cannot list or re-tag chunks without
+        re-embedding; the caller then re-embeds the whole document.
+        """
+        from trusted_data_agent.vectorstore.capabilities import VectorStoreCapability
+        from trusted_data_agent.vectorstore.filters import FieldFilter, FilterOp
+
+        backend = self._backend
+        if not document_id or not (
+            backend.has_capability(VectorStoreCapability.GET_BY_METADATA_FILTER)
+            and backend.has_capability(VectorStoreCapability.UPDATE_METADATA)
+        ):
+            return None
+
+        existing = await backend.get(
+            collection_name,
+            where=FieldFilter("document_id", FilterOp.EQ, document_id),
+            include_documents=False,
+            include_metadata=False,
+            limit=100_000,
+        )
+        existing_ids = {d.id for d in existing.documents} if existing and existing.documents else set()
+
+        reused: Dict[int, str] = {}   # position in chunks -> stored chunk ID
+        unmatched = []
+        for pos, chunk in enumerate(chunks):
+            if chunk.chunk_id in existing_ids:
+                existing_ids.discard(chunk.chunk_id)
+                reused[pos] = chunk.chunk_id
+            else:
+                unmatched.append(pos)
+
+        by_hash: Dict[str, List[str]] = {}
+        for chunk_id in sorted(existing_ids):
+            by_hash.setdefault(chunk_id.rsplit("_", 1)[-1], []).append(chunk_id)
+        to_embed = []
+        for pos in unmatched:
+            candidates = by_hash.get(chunks[pos].chunk_id.rsplit("_", 1)[-1])
+            if candidates:
+                chunk_id = candidates.pop(0)
+                existing_ids.discard(chunk_id)
+                reused[pos] = chunk_id
+            else:
+                to_embed.append(pos)
+
+        return {"reused": reused, "to_embed": to_embed, "to_delete": sorted(existing_ids)}
+
+    async def _apply_chunk_delta(self, collection_name: str, chunks: List[DocumentChunk],
+                                 delta: Dict[str, Any], ingest_epoch: int, embedding_provider) -> Dict[str, int]:
+        """Embed only new/changed chunks, re-tag reused ones, delete removed ones."""
+        from trusted_data_agent.vectorstore import VectorDocument
+
+        backend = self._backend
+        if delta["to_embed"]:
+            await backend.upsert(collection_name, [
+                VectorDocument(id=chunks[pos].chunk_id, content=chunks[pos].content,
+                               metadata=self._chunk_metadata(chunks[pos], ingest_epoch))
+                for pos in delta["to_embed"]
+            ], embedding_provider)
+        if delta["reused"]:
+            positions = sorted(delta["reused"])
+            await backend.update_metadata(
+                collection_name,
+                [delta["reused"][pos] for pos in positions],
+                [self._chunk_metadata(chunks[pos], ingest_epoch) for pos in positions],
+            )
+        if delta["to_delete"]:
+            await backend.delete(collection_name, ids=delta["to_delete"])
+        return {
+            "chunks_embedded": len(delta["to_embed"]),
+            "chunks_reused": len(delta["reused"]),
+            "chunks_deleted": len(delta["to_delete"]),
+        }
+
     def prepare_metadata(self, **kwargs) -> Dict[str, Any]:
         """Prepare metadata for knowledge document."""
         # Convert tags list to comma-separated string for ChromaDB
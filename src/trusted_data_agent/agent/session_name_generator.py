@@ -443,7 +443,8 @@ async def _generate_via_executor(
         source="system",
         active_profile_id=active_profile_id,
         current_provider=current_provider,
-        current_model=current_model
+        current_model=current_model,
+        cache_reason="session_name"
     )
 
     # Clean the name and extract only the final title
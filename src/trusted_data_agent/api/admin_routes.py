@@ -8,6 +8,7 @@ Includes:
 - System administration
 """
 
+import asyncio
 import logging
 from datetime import datetime, timezone
 
@@ -17,7 +18,7 @@ from trusted_data_agent.auth.admin import require_admin, get_current_user_from_r
 from trusted_data_agent.auth.database import get_db_session
 from trusted_data_agent.auth.models import User, AuditLog
 from trusted_data_agent.auth import audit, encryption
-from trusted_data_agent.auth.security import hash_password
+from trusted_data_agent.auth.security import hash_password, invalidate_access_token_cache
 from trusted_data_agent.core import configuration_service
 
 admin_api_bp = Blueprint('admin_api', __name__)
@@ -589,6 +590,7 @@ async def manage_user(user_id: str):
                 
                 user.updated_at = datetime.now(timezone.utc)
                 session.commit()
+                invalidate_access_token_cache(user_id=user.id)
                 
                 # Log admin action
                 audit.log_admin_action(
@@ -626,6 +628,7 @@ async def manage_user(user_id: str):
                 user.is_active = False
                 user.updated_at = datetime.now(timezone.utc)
                 session.commit()
+                invalidate_access_token_cache(user_id=user.id)
                 
                 # Log admin action
                 audit.log_admin_action(
@@ -759,6 +762,7 @@ async def change_user_tier(user_id: str):
             
             user.updated_at = datetime.now(timezone.utc)
             session.commit()
+            invalidate_access_token_cache(user_id=user.id)
             
             # Log admin action
             audit.log_admin_action(
@@ -801,13 +805,17 @@ async def get_admin_stats():
             "admin_users": 2,
             "locked_users": 1,
             "recent_logins_24h": 15,
-            "recent_registrations_7d": 5
+            "recent_registrations_7d": 5,
+            "audit_writer": {"written": 1200, "dropped": 0, "queued": 3, ...}
         }
     }
     """
     try:
         from datetime import timedelta
         
+        # Count events still waiting in the audit writer queue too
+        await asyncio.to_thread(audit.flush_audit_log)
+        
         with get_db_session() as session:
             now = datetime.now(timezone.utc)
             day_ago = now - timedelta(days=1)
@@ -843,7 +851,8 @@ async def get_admin_stats():
                     "recent_logins_24h": recent_logins,
                     "recent_registrations_7d": recent_registrations,
                     "recent_audit_events_24h": recent_audits,
-                    "tier_distribution": tier_distribution
+                    "tier_distribution": tier_distribution,
+                    "audit_writer": audit.get_audit_writer_stats()
                 }
             }), 200
             
@@ -509,8 +509,8 @@ async def check_pack_active_sessions(current_user, installation_id: int):
 
     try:
         from trusted_data_agent.core.agent_pack_db import AgentPackDB
+        from trusted_data_agent.core.session_manager import read_session_file
         from pathlib import Path
-        import json
 
         pack_db = AgentPackDB(DB_PATH)
 
@@ -532,8 +532,7 @@ async def check_pack_active_sessions(current_user, installation_id: int):
         active_sessions = []
         for session_file in sessions_dir.glob("*.json"):
             try:
-                with open(session_file, 'r') as f:
-                    session_data = json.load(f)
+                session_data = read_session_file(session_file)
 
                 # Skip archived sessions (treat null as not archived)
                 if session_data.get("is_archived") is True:
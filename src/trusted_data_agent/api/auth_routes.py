@@ -26,6 +26,7 @@ from trusted_data_agent.auth.security import (
     get_login_status,
     record_failed_login,
     reset_failed_login_attempts,
+    invalidate_access_token_cache,
     MAX_LOGIN_ATTEMPTS
 )
 from trusted_data_agent.auth.validators import (
@@ -41,6 +42,7 @@ from trusted_data_agent.auth.middleware import (
     get_current_user
 )
 from trusted_data_agent.auth.rate_limiter import check_ip_login_limit, check_ip_register_limit
+from trusted_data_agent.auth.usage_ledger import invalidate_consumption_profiles
 from trusted_data_agent.auth.audit import (
     log_audit_event as log_audit_event_detailed,
     log_login_success,
@@ -485,7 +487,7 @@ async def register():
     """
     try:
         # Check rate limit
-        allowed, retry_after = check_ip_register_limit()
+        allowed, retry_after = await check_ip_register_limit()
         if not allowed:
             log_rate_limit_exceeded('ip:' + request.remote_addr, '/api/v1/auth/register')
             return jsonify({
@@ -743,7 +745,7 @@ async def resend_verification_email():
     """
     try:
         # Rate limit resend attempts
-        allowed, retry_after = check_ip_register_limit()
+        allowed, retry_after = await check_ip_register_limit()
         if not allowed:
             log_rate_limit_exceeded('ip:' + request.remote_addr, '/api/v1/auth/resend-verification-email')
             return jsonify({
@@ -861,7 +863,7 @@ async def forgot_password():
 
     try:
         # Rate limit reset attempts (use register limit to prevent abuse)
-        allowed, retry_after = check_ip_register_limit()
+        allowed, retry_after = await check_ip_register_limit()
         if not allowed:
             log_rate_limit_exceeded('ip:' + request.remote_addr, '/api/v1/auth/forgot-password')
             return jsonify({
@@ -1044,7 +1046,7 @@ async def login():
     """
     try:
         # Check rate limit
-        allowed, retry_after = check_ip_login_limit()
+        allowed, retry_after = await check_ip_login_limit()
         if not allowed:
             log_rate_limit_exceeded('ip:' + request.remote_addr, '/api/v1/auth/login')
             return jsonify({
@@ -2056,6 +2058,9 @@ async def update_rate_limit_settings(current_user):
             
             session.commit()
             
+            # Global override changes every user's effective limits
+            invalidate_consumption_profiles()
+            
             # Log the configuration change
             log_audit_event_detailed(
                 user_id=current_user.id,
@@ -2197,6 +2202,7 @@ async def create_consumption_profile(current_user):
             
             session.add(profile)
             session.commit()
+            invalidate_consumption_profiles()
             session.refresh(profile)
             
             log_audit_event_detailed(
@@ -2299,6 +2305,7 @@ async def update_consumption_profile(current_user, profile_id: int):
                 profile.is_active = bool(data['is_active'])
             
             session.commit()
+            invalidate_consumption_profiles()
             session.refresh(profile)
             
             log_audit_event_detailed(
@@ -2366,6 +2373,7 @@ async def delete_consumption_profile(current_user, profile_id: int):
             profile_name = profile.name
             session.delete(profile)
             session.commit()
+            invalidate_consumption_profiles()
             
             log_audit_event_detailed(
                 user_id=current_user.id,
@@ -2454,6 +2462,7 @@ async def assign_user_consumption_profile(current_user, user_id: str):
                 action_desc = f'assigned to {profile.name}'
             
             session.commit()
+            invalidate_consumption_profiles(user_id)
             session.refresh(user)
             
             log_audit_event_detailed(
@@ -2537,7 +2546,7 @@ async def get_all_users_consumption_summary(current_user):
         from pathlib import Path
         from datetime import datetime, timezone
         from collections import defaultdict
-        import json
+        from trusted_data_agent.core.session_manager import read_session_file
         
         # Get period parameter or use current month
         period = request.args.get('period')
@@ -2576,8 +2585,7 @@ async def get_all_users_consumption_summary(current_user):
             # Scan session files for this user
             for session_file in user_dir.glob('*.json'):
                 try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
+                    session_data = read_session_file(session_file)
                     
                     # Filter by period using created_at timestamp
                     created_at = session_data.get('created_at')
@@ -3423,6 +3431,9 @@ async def _provision_sso_user(user_info: dict, cfg: dict, config_type: str = 'oi
             user.sso_groups = _json.dumps(groups) if groups else None
             user.last_login_at = datetime.now(timezone.utc)
             db_session.commit()
+            if not new_user_created:
+                # Cached access token verifications carry the old tier/is_admin
+                invalidate_access_token_cache(user_id=user.id)
 
             jwt_token, _ = generate_auth_token(
                 user_id=user.id,
@@ -3719,6 +3730,7 @@ async def manual_sso_sync(current_user, user_id):
                 u.profile_tier = new_tier
                 u.is_admin = (new_tier == 'admin')
                 db_session.commit()
+                invalidate_access_token_cache(user_id=u.id)
 
         log_sync_event(user_id, config_id, config_type, 'manual',
                        old_tier, new_tier, groups, groups)
@@ -25,6 +25,7 @@ import json
 
 from trusted_data_agent.core.config import APP_STATE
 from trusted_data_agent.core.collection_db import get_collection_db
+from trusted_data_agent.core.knowledge_sync import collection_write_lock
 from trusted_data_agent.auth.middleware import require_auth
 from trusted_data_agent.agent.rag_retriever import get_rag_retriever
 from trusted_data_agent.llm.document_upload import DocumentUploadHandler
@@ -90,6 +91,7 @@ async def preview_document_chunking(current_user: dict):
         - chunking_strategy: Chunking strategy (fixed_size, paragraph, sentence, semantic)
         - chunk_size: Size of chunks in characters (default: 1000)
         - chunk_overlap: Overlap between chunks (default: 200)
+        - embedding_model: Model used for semantic boundaries (default: all-MiniLM-L6-v2)
     
     Returns:
         JSON with chunks array containing text segments
@@ -164,15 +166,22 @@ async def preview_document_chunking(current_user: dict):
             
             # Create document processor to chunk the document
             from trusted_data_agent.agent.repository_constructor import DocumentProcessor
+            embedding_provider = None
+            if chunking_strategy == ChunkingStrategy.SEMANTIC:
+                from trusted_data_agent.vectorstore.embedding_providers import SentenceTransformerProvider
+                embedding_provider = SentenceTransformerProvider.get_cached(
+                    form.get('embedding_model') or 'all-MiniLM-L6-v2'
+                )
             doc_processor = DocumentProcessor(
                 chunking_strategy=chunking_strategy,
                 chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
+                chunk_overlap=chunk_overlap,
+                embedding_provider=embedding_provider
             )
             
-            # Chunk the preview text
+            # Chunk the preview text (off the event loop: semantic chunking embeds sentences)
             metadata = {"filename": file.filename, "source": "preview"}
-            chunk_objects = doc_processor.process_document(preview_text, metadata)
+            chunk_objects = await asyncio.to_thread(doc_processor.process_document, preview_text, metadata)
             
             # Format chunks for preview
             preview_chunks = [
@@ -773,7 +782,20 @@ async def upload_knowledge_document_stream(current_user: dict, collection_id: in
             app_logger.error(f"Error in streaming upload: {e}", exc_info=True)
             yield format_sse({"type": "error", "message": str(e)}, "error")
     
-    return Response(generate_upload_stream(), mimetype="text/event-stream")
+    async def generate_locked_upload_stream():
+        """Run the upload under the collection's write lock (a running reindex or sync finishes first)."""
+        write_lock = collection_write_lock(collection_id)
+        if write_lock.locked():
+            yield format_sse({
+                "type": "progress",
+                "message": "Waiting for a running re-index or sync of this repository to finish...",
+                "percentage": 0
+            }, "progress")
+        async with write_lock:
+            async for event in generate_upload_stream():
+                yield event
+
+    return Response(generate_locked_upload_stream(), mimetype="text/event-stream")
 
 
 @knowledge_api_bp.route("/v1/knowledge/repositories/<int:collection_id>/documents", methods=["POST"])
@@ -802,6 +824,12 @@ async def upload_knowledge_document(current_user: dict, collection_id: int):
         return await upload_knowledge_document_stream(current_user, collection_id)
     
     # Otherwise use original JSON response
+    async with collection_write_lock(collection_id):
+        return await _upload_knowledge_document(current_user, collection_id)
+
+
+async def _upload_knowledge_document(current_user: dict, collection_id: int):
+    """JSON-response upload; the caller holds the collection's write lock."""
     try:
         # Query collection directly from database
         from trusted_data_agent.core.collection_db import CollectionDatabase
@@ -1215,6 +1243,13 @@ async def list_knowledge_documents(current_user: dict, collection_id: int):
 @require_auth
 async def delete_knowledge_document(current_user: dict, collection_id: int, document_id: str):
     """Delete a document from Knowledge repository."""
+    # A reindex in progress finishes first, so its deferred rows cannot resurrect the document
+    async with collection_write_lock(collection_id):
+        return await _delete_knowledge_document(current_user, collection_id, document_id)
+
+
+async def _delete_knowledge_document(current_user: dict, collection_id: int, document_id: str):
+    """Delete a document; the caller holds the collection's write lock."""
     try:
         retriever = get_rag_retriever()
         if not retriever:
@@ -1357,7 +1392,7 @@ async def search_knowledge_repository(current_user: dict, collection_id: int):
 
         from trusted_data_agent.vectorstore import get_embedding_provider
         emb_model = coll_meta.get("embedding_model", "all-MiniLM-L6-v2") if coll_meta else "all-MiniLM-L6-v2"
-        emb_provider = get_embedding_provider(emb_model)
+        emb_provider = get_embedding_provider(backend.backend_type, emb_model)
 
         from trusted_data_agent.vectorstore.types import SearchMode
         _search_mode = SearchMode(coll_meta.get("search_mode", "semantic")) if coll_meta else SearchMode.SEMANTIC
@@ -1493,7 +1528,7 @@ async def get_knowledge_chunks(current_user: dict, collection_id: int):
             try:
                 from trusted_data_agent.vectorstore import get_embedding_provider
                 emb_model = coll_meta_full.get("embedding_model", "all-MiniLM-L6-v2") if coll_meta_full else "all-MiniLM-L6-v2"
-                emb_provider = get_embedding_provider(emb_model)
+                emb_provider = get_embedding_provider(backend.backend_type, emb_model)
 
                 from trusted_data_agent.vectorstore.types import SearchMode
                 _sm = SearchMode(coll_meta_full.get("search_mode", "semantic")) if coll_meta_full else SearchMode.SEMANTIC
@@ -1950,14 +1985,15 @@ async def reindex_knowledge_collection(current_user: dict, collection_id: int):
 
     Chooses strategy automatically:
         in_place   — collection has marketplace listing or active subscribers
-        shadow_swap — private unsubscribed collections (same ingest path,
-                      strategy name preserved for future isolation enhancement)
+        shadow_swap — private unsubscribed collections (re-embeds into a new
+                      collection and swaps it in on success; live retrieval
+                      is unaffected while it runs)
 
     Body (optional JSON):
         { "strategy": "in_place" | "shadow_swap" }   (overrides auto-select)
 
     Returns:
-        { strategy, reindexed, skipped, errors, duration_seconds }
+        { strategy, reindexed, carried_over, skipped, errors, swapped, duration_seconds }
     """
     try:
         db = get_collection_db()
@@ -22,7 +22,7 @@ from rag_templates.exceptions import (
 )
 
 # --- MODIFICATION START: Import generate_task_id ---
-from quart import Blueprint, current_app, jsonify, request, abort
+from quart import Blueprint, Response, current_app, jsonify, request, abort
 from trusted_data_agent.core.utils import generate_task_id, _get_prompt_info
 # --- MODIFICATION END ---
 
@@ -2334,86 +2334,70 @@ async def create_session():
         app_logger.error(f"Failed to create REST session for user {user_uuid}: {e}", exc_info=True)
         return jsonify({"error": "Failed to create session."}), 500
 
-@rest_api_bp.route("/v1/sessions/<session_id>/query", methods=["POST"])
-async def execute_query(session_id: str):
-    """Submits a query to a session and starts a background task *for the requesting user*."""
-    # --- MODIFICATION START: Get User UUID ---
-    user_uuid = _get_user_uuid_from_request()
-    # --- MODIFICATION END ---
-
-    data = await request.get_json()
-    prompt = data.get("prompt")
-    if not prompt:
-        return jsonify({"error": "The 'prompt' field is required."}), 400
-
-    # Optional MCP prompt execution (same as UI resource panel invoke_prompt_stream)
-    active_prompt_name = data.get("prompt_name")        # MCP prompt name (e.g., "base_tableBusinessDesc")
-    prompt_arguments = data.get("prompt_arguments")      # Dict of prompt arguments (e.g., {"database_name": "mydb"})
-
-    # Optional file attachments (uploaded via /api/v1/chat/upload)
-    attachments = data.get("attachments")  # [{file_id, filename, ...}]
-
-    # Post-processing extensions [{"name": "json", "param": null}]
-    extension_specs = data.get("extensions")
-
-    # Pre-processing skills [{"name": "sql-expert", "param": "strict"}]
-    skill_specs = data.get("skills")
-
-    # Canvas bidirectional context {title, language, content, modified}
-    canvas_context = data.get("canvas_context")
+async def validate_query_session(user_uuid: str, session_id: str) -> bool:
+    """
+    True if ``user_uuid`` may submit queries to ``session_id``.
 
-    # --- MODIFICATION START: Validate session for this user ---
+    Used by the REST query endpoint and by in-process callers (Genie child
+    dispatch) before ``start_query_task``.
+    """
     if not await session_manager.get_session(user_uuid, session_id):
         app_logger.warning(f"REST API: Session '{session_id}' not found for user '{user_uuid}'.")
-        return jsonify({"error": f"Session '{session_id}' not found."}), 404
-    # --- MODIFICATION END ---
-
-    # --- NEW: Switch to profile context for query execution (with optional override) ---
-    from trusted_data_agent.core.config_manager import get_config_manager
+        return False
+    return True
+
+
+async def start_query_task(
+    user_uuid: str,
+    session_id: str,
+    prompt: str,
+    profile_id_to_use: str = None,
+    profile_id_override: str = None,
+    is_session_primer: bool = False,
+    active_prompt_name: str = None,
+    prompt_arguments: dict = None,
+    attachments: list = None,
+    extension_specs: list = None,
+    skill_specs: list = None,
+    canvas_context: dict = None,
+) -> str:
+    """
+    Starts a query as a background task and returns its task_id.
+
+    Shared by the REST query endpoint and in-process callers (Genie child
+    dispatch). The task state lives in APP_STATE["background_tasks"] and the
+    running asyncio.Task in APP_STATE["active_tasks"]; in-process callers can
+    await the latter instead of polling /v1/tasks/<task_id>.
+    """
     from trusted_data_agent.core.configuration_service import switch_profile_context
-    
-    config_manager = get_config_manager()
-    
-    # Allow optional profile_id parameter; defaults to user's default profile
-    profile_id_override = data.get("profile_id")
-    profile_id_to_use = profile_id_override or config_manager.get_default_profile_id(user_uuid)
-    # Session primer flag - marks messages as initialization
-    is_session_primer = data.get("is_session_primer", False)
-    
+
     if profile_id_to_use:
         # Activate profile context to ensure correct LLM and profile badges are associated
         profile_context = await switch_profile_context(profile_id_to_use, user_uuid, validate_llm=False)
         if "error" in profile_context:
             app_logger.warning(f"REST API: Could not activate profile {profile_id_to_use} for query execution: {profile_context.get('error')}")
-    # --- END NEW ---
 
     task_id = generate_task_id()
 
-    # Initialize the task state
-    APP_STATE.setdefault("background_tasks", {})[task_id] = {
+    # Initialize the task state (events are kept by the registry)
+    task_registry = APP_STATE["background_tasks"]
+    task_registry.create(task_id, {
         "task_id": task_id,
         "user_uuid": user_uuid, # Store the user UUID with the task
         "session_id": session_id, # Store session ID for reference
         "profile_id_override": profile_id_override, # Track which profile was used for this query
         "status": "pending",
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-        "events": [],
         "intermediate_data": [],
         "result": None
-    }
+    })
 
     async def event_handler(event_data, event_type):
         """This handler is called by the execution service for each event."""
-        task_status_dict = APP_STATE["background_tasks"].get(task_id)
+        task_status_dict = task_registry.get(task_id)
         sanitized_event_data = _sanitize_for_json(event_data)
 
-        # 1. Update the persistent task state (for polling clients)
+        # 1. Update the persistent task state (for polling and waiting clients)
         if task_status_dict:
-            task_status_dict["events"].append({
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "event_data": sanitized_event_data,
-                "event_type": event_type
-            })
             if event_type == "tool_result" and isinstance(sanitized_event_data, dict):
                 details = sanitized_event_data.get("details", {})
                 if isinstance(details, dict) and details.get("status") == "success" and "results" in details:
@@ -2421,7 +2405,11 @@ async def execute_query(session_id: str):
                         "tool_name": details.get("metadata", {}).get("tool_name", "unknown_tool"),
                         "data": details["results"]
                     })
-            task_status_dict["last_updated"] = datetime.now(timezone.utc).isoformat()
+            task_registry.append_event(task_id, {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "event_data": sanitized_event_data,
+                "event_type": event_type
+            })
 
         # 2. Create and send a canonical event to the UI notification stream
         notification_queues = APP_STATE.get("notification_queues", {}).get(user_uuid, set())
@@ -2469,10 +2457,10 @@ async def execute_query(session_id: str):
 
     async def background_wrapper():
         """Wraps the execution to handle context, final state updates, and notifications."""
-        task_status_dict = APP_STATE["background_tasks"].get(task_id)
+        task_status_dict = task_registry.get(task_id)
         final_result_payload = None
         try:
-            if task_status_dict: task_status_dict["status"] = "processing"
+            task_registry.update(task_id, status="processing")
 
             final_result_payload = await execution_service.run_agent_execution(
                 user_uuid=user_uuid,
@@ -2492,27 +2480,19 @@ async def execute_query(session_id: str):
             )
 
             if task_status_dict:
-                task_status_dict["status"] = "complete"
-                task_status_dict["result"] = _sanitize_for_json(final_result_payload)
-                task_status_dict["last_updated"] = datetime.now(timezone.utc).isoformat()
                 # Promote extension_results to top-level for easy n8n/Flowise access
                 if final_result_payload and isinstance(final_result_payload, dict):
                     ext_results = final_result_payload.get("extension_results")
                     if ext_results:
                         task_status_dict["extension_results"] = ext_results
+                task_registry.update(task_id, status="complete", result=_sanitize_for_json(final_result_payload))
 
         except asyncio.CancelledError:
             app_logger.info(f"REST background task {task_id} (user {user_uuid}) was cancelled.")
-            if task_status_dict:
-                task_status_dict["status"] = "cancelled"
-                task_status_dict["result"] = {"message": "Task cancelled by user."}
-                task_status_dict["last_updated"] = datetime.now(timezone.utc).isoformat()
+            task_registry.update(task_id, status="cancelled", result={"message": "Task cancelled by user."})
         except Exception as e:
             app_logger.error(f"Background task {task_id} (user {user_uuid}) failed: {e}", exc_info=True)
-            if task_status_dict:
-                task_status_dict["status"] = "error"
-                task_status_dict["result"] = {"error": str(e)}
-                task_status_dict["last_updated"] = datetime.now(timezone.utc).isoformat()
+            task_registry.update(task_id, status="error", result={"error": str(e)})
         finally:
             # Remove from ACTIVE tasks registry
             if task_id in APP_STATE.get("active_tasks", {}):
@@ -2553,6 +2533,69 @@ async def execute_query(session_id: str):
     # Store the actual task object for potential cancellation (uses task_id)
     APP_STATE.setdefault("active_tasks", {})[task_id] = task_object
 
+    return task_id
+
+
+@rest_api_bp.route("/v1/sessions/<session_id>/query", methods=["POST"])
+async def execute_query(session_id: str):
+    """Submits a query to a session and starts a background task *for the requesting user*."""
+    # --- MODIFICATION START: Get User UUID ---
+    user_uuid = _get_user_uuid_from_request()
+    # --- MODIFICATION END ---
+
+    data = await request.get_json()
+    prompt = data.get("prompt")
+    if not prompt:
+        return jsonify({"error": "The 'prompt' field is required."}), 400
+
+    # Optional MCP prompt execution (same as UI resource panel invoke_prompt_stream)
+    active_prompt_name = data.get("prompt_name")        # MCP prompt name (e.g., "base_tableBusinessDesc")
+    prompt_arguments = data.get("prompt_arguments")      # Dict of prompt arguments (e.g., {"database_name": "mydb"})
+
+    # Optional file attachments (uploaded via /api/v1/chat/upload)
+    attachments = data.get("attachments")  # [{file_id, filename, ...}]
+
+    # Post-processing extensions [{"name": "json", "param": null}]
+    extension_specs = data.get("extensions")
+
+    # Pre-processing skills [{"name": "sql-expert", "param": "strict"}]
+    skill_specs = data.get("skills")
+
+    # Canvas bidirectional context {title, language, content, modified}
+    canvas_context = data.get("canvas_context")
+
+    # --- MODIFICATION START: Validate session for this user ---
+    if not await validate_query_session(user_uuid, session_id):
+        return jsonify({"error": f"Session '{session_id}' not found."}), 404
+    # --- MODIFICATION END ---
+
+    # --- NEW: Switch to profile context for query execution (with optional override) ---
+    from trusted_data_agent.core.config_manager import get_config_manager
+    
+    config_manager = get_config_manager()
+    
+    # Allow optional profile_id parameter; defaults to user's default profile
+    profile_id_override = data.get("profile_id")
+    profile_id_to_use = profile_id_override or config_manager.get_default_profile_id(user_uuid)
+    # Session primer flag - marks messages as initialization
+    is_session_primer = data.get("is_session_primer", False)
+    # --- END NEW ---
+
+    task_id = await start_query_task(
+        user_uuid,
+        session_id,
+        prompt,
+        profile_id_to_use=profile_id_to_use,
+        profile_id_override=profile_id_override,
+        is_session_primer=is_session_primer,
+        active_prompt_name=active_prompt_name,
+        prompt_arguments=prompt_arguments,
+        attachments=attachments,
+        extension_specs=extension_specs,
+        skill_specs=skill_specs,
+        canvas_context=canvas_context,
+    )
+
     status_url = f"/api/v1/tasks/{task_id}"
 
     return jsonify({"task_id": task_id, "status_url": status_url}), 202
@@ -2582,11 +2625,95 @@ async def get_task_status(task_id: str):
         return jsonify({"error": "Access denied to this task."}), 403
     # --- MODIFICATION END ---
 
-    # Exclude user_uuid from the response payload if desired
-    # response_task = task.copy()
-    # response_task.pop("user_uuid", None)
-    # return jsonify(response_task)
-    return jsonify(task)
+    # Events are stored pre-serialized; ?since_event=N returns only events N and later
+    since_event = request.args.get("since_event", 0, type=int)
+    return Response(await APP_STATE["background_tasks"].snapshot_json_async(task_id, since_event), mimetype="application/json")
+
+
+def _get_owned_task(task_id: str, user_uuid: str):
+    """Returns (task, error_response) for a task the requesting user owns."""
+    task = APP_STATE["background_tasks"].get(task_id)
+    if not task:
+        return None, (jsonify({"error": f"Task '{task_id}' not found."}), 404)
+    if task.get("user_uuid") != user_uuid:
+        app_logger.error(f"REST API: User '{user_uuid}' attempted to access task '{task_id}' owned by user '{task.get('user_uuid')}'.")
+        return None, (jsonify({"error": "Access denied to this task."}), 403)
+    return task, None
+
+
+@rest_api_bp.route("/v1/tasks/<task_id>/wait", methods=["GET"])
+async def wait_for_task(task_id: str):
+    """
+    Long-poll variant of GET /v1/tasks/<task_id>.
+
+    Returns as soon as the task's version is greater than ?version (default:
+    the version at request time, i.e. wait for the next change) or after
+    ?timeout seconds, whichever comes first. The response has the same shape
+    as the status endpoint; pass ?since_event=<event_count> to receive only
+    new events.
+    """
+    user_uuid = _get_user_uuid_from_request()
+    task, error_response = _get_owned_task(task_id, user_uuid)
+    if error_response:
+        return error_response
+
+    task_registry = APP_STATE["background_tasks"]
+    since_version = request.args.get("version", type=int)
+    if since_version is None:
+        since_version = task_registry.version(task_id)
+    timeout = min(max(request.args.get("timeout", 30.0, type=float), 0.0), APP_CONFIG.TASK_WAIT_MAX_SECONDS)
+    since_event = request.args.get("since_event", 0, type=int)
+
+    await task_registry.wait_for_change(task_id, since_version, timeout)
+
+    snapshot = await task_registry.snapshot_json_async(task_id, since_event)
+    if snapshot is None:
+        return jsonify({"error": f"Task '{task_id}' not found."}), 404
+    return Response(snapshot, mimetype="application/json")
+
+
+@rest_api_bp.route("/v1/tasks/<task_id>/stream", methods=["GET"])
+async def stream_task(task_id: str):
+    """
+    SSE stream of a task's events.
+
+    Sends the events from ?since_event on (default: all), then each new event
+    as it is recorded, and closes with a 'task_complete' event carrying the
+    final state once the task has finished.
+    """
+    user_uuid = _get_user_uuid_from_request()
+    task, error_response = _get_owned_task(task_id, user_uuid)
+    if error_response:
+        return error_response
+
+    from trusted_data_agent.core.task_registry import TERMINAL_STATUSES
+    task_registry = APP_STATE["background_tasks"]
+    since_event = request.args.get("since_event", 0, type=int)
+
+    async def task_event_generator():
+        next_event = since_event
+        while True:
+            version = task_registry.version(task_id)
+            if version is None:
+                yield f"event: task_evicted\ndata: {json.dumps({'task_id': task_id})}\n\n"
+                return
+            events = await task_registry.event_strings_async(task_id, next_event)
+            for event_json in events:
+                yield f"event: task_event\ndata: {event_json}\n\n"
+            next_event += len(events)
+
+            state = task_registry.get(task_id)
+            if state is not None and state.get("status") in TERMINAL_STATUSES:
+                snapshot = await task_registry.snapshot_json_async(task_id, next_event)
+                if snapshot is not None:
+                    yield f"event: task_complete\ndata: {snapshot}\n\n"
+                return
+
+            if not await task_registry.wait_for_change(task_id, version, timeout=20.0):
+                # Heartbeat comment keeps the connection alive
+                yield ": ping\n\n"
+
+    return Response(task_event_generator(), mimetype="text/event-stream")
 
 
 @rest_api_bp.route("/v1/tasks/<task_id>/cancel", methods=["POST"])
@@ -2614,9 +2741,8 @@ async def cancel_task(task_id: str):
         # Remove immediately from active tasks dict
         if task_id in active_tasks:
              del active_tasks[task_id]
-        # Update the status in the background_tasks dict as well
-        task_status_dict["status"] = "cancelling" # Or "cancelled" immediately
-        task_status_dict["last_updated"] = datetime.now(timezone.utc).isoformat()
+        # Update the status in the background_tasks registry as well
+        APP_STATE["background_tasks"].update(task_id, status="cancelling") # Or "cancelled" immediately
 
         return jsonify({"status": "success", "message": "Cancellation request sent."}), 200
     elif task_object and task_object.done():
@@ -2625,7 +2751,7 @@ async def cancel_task(task_id: str):
              del active_tasks[task_id]
         # Ensure final status reflects completion if missed
         if task_status_dict.get("status") not in ["complete", "error", "cancelled"]:
-             task_status_dict["status"] = "complete" # Or infer from result if possible
+             APP_STATE["background_tasks"].update(task_id, status="complete") # Or infer from result if possible
         return jsonify({"status": "success", "message": "Task already completed."}), 200
     else:
         # Task might exist in background_tasks but not in active_tasks if already finished/cancelled
@@ -3285,8 +3411,7 @@ async def check_collection_active_sessions(collection_id: int):
 
         for session_file in sessions_dir.glob("*.json"):
             try:
-                with open(session_file, 'r') as f:
-                    session_data = json.load(f)
+                session_data = session_manager.read_session_file(session_file)
 
                 # Skip archived sessions (treat null as not archived)
                 if session_data.get("is_archived") is True:
@@ -3625,12 +3750,20 @@ async def archive_session_manual(current_user: dict, session_id: str):
 
         session_file = Path(SESSIONS_DIR) / user_uuid / f"{session_id}.json"
 
+        # Write out and drop any cached copy before touching the file directly
+        from trusted_data_agent.core import session_manager
+        await session_manager.flush_session_cache(user_uuid, session_id, evict=True)
+
         if not session_file.exists():
             return jsonify({
                 "status": "error",
                 "message": "Session not found"
             }), 404
 
+        # Fold any pending journal so the snapshot read below is current
+        from trusted_data_agent.core import session_journal
+        await session_journal.fold_journal(session_file)
+
         # Load session
         async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
             content = await f.read()
@@ -3656,6 +3789,8 @@ async def archive_session_manual(current_user: dict, session_id: str):
         # Save session
         async with aiofiles.open(session_file, 'w', encoding='utf-8') as f:
             await f.write(json.dumps(session_data, indent=2))
+        # Direct write bypasses the journal baseline — force a fresh one on next save
+        session_journal.discard_journal(session_file)
 
         app_logger.info(f"Manually archived session {session_id} for user {user_uuid}: {archived_reason}")
 
@@ -5903,7 +6038,7 @@ async def get_vectorstore_capabilities():
                 "CREATE_COLLECTION", "DELETE_COLLECTION", "ADD_DOCUMENTS",
                 "DELETE_DOCUMENTS", "SIMILARITY_SEARCH", "GET_BY_ID", "COUNT",
                 "UPSERT", "GET_BY_METADATA_FILTER", "UPDATE_METADATA",
-                "EMBEDDING_PASSTHROUGH", "GET_ALL",
+                "EMBEDDING_PASSTHROUGH", "GET_ALL", "HYBRID_SEARCH",
             ],
             "qdrant": [
                 "CREATE_COLLECTION", "DELETE_COLLECTION", "ADD_DOCUMENTS",
@@ -8138,8 +8273,7 @@ async def check_profile_active_sessions(profile_id: str):
         active_sessions = []
         for session_file in sessions_dir.glob("*.json"):
             try:
-                with open(session_file, 'r') as f:
-                    session_data = json.load(f)
+                session_data = session_manager.read_session_file(session_file)
 
                 # Skip archived sessions (treat null as not archived)
                 if session_data.get("is_archived") is True:
@@ -8830,8 +8964,7 @@ async def get_sessions_analytics():
         for session_dir in scan_dirs:
             for session_file in session_dir.glob('*.json'):
                 try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
+                    session_data = session_manager.read_session_file(session_file)
                     
                     total_sessions += 1
                     total_input_tokens += session_data.get('input_tokens', 0)
@@ -8916,8 +9049,7 @@ async def get_sessions_analytics():
         for session_dir in scan_dirs:
             for session_file in session_dir.glob('*.json'):
                 try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
+                    session_data = session_manager.read_session_file(session_file)
 
                     workflow_history = session_data.get('last_turn_data', {}).get('workflow_history', [])
                     for turn in workflow_history:
@@ -9585,8 +9717,7 @@ async def get_sessions_list():
         for session_dir in scan_dirs:
             for session_file in session_dir.glob('**/*.json'):
                 try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
+                    session_data = session_manager.read_session_file(session_file)
                     
                     session_id = session_data.get('id')
                     name = session_data.get('name', 'Unnamed Session')
@@ -9598,7 +9729,8 @@ async def get_sessions_list():
                     output_tokens = session_data.get('output_tokens', 0)
                     
                     # Enrich genie_metadata with nesting_level and slave_profile_tag from database
-                    genie_metadata = session_data.get("genie_metadata", {})
+                    # (a copy: read_session_file may return the session cache's own dict)
+                    genie_metadata = dict(session_data.get("genie_metadata", {}))
                     if genie_metadata.get("is_genie_slave"):
                         from trusted_data_agent.core.session_manager import get_genie_parent_session
                         parent_link = await get_genie_parent_session(session_id, user_uuid)
@@ -9861,8 +9993,7 @@ async def get_session_details(session_id: str):
         if not session_file or not session_file.exists():
             return jsonify({"error": "Session not found"}), 404
         
-        with open(session_file, 'r', encoding='utf-8') as f:
-            session_data = json.load(f)
+        session_data = session_manager.read_session_file(session_file)
         
         # Find associated RAG cases
         rag_cases = []
@@ -9889,7 +10020,8 @@ async def get_session_details(session_id: str):
                     except:
                         continue
         
-        session_data['rag_cases'] = rag_cases
+        # read_session_file may return the session cache's own dict
+        session_data = dict(session_data, rag_cases=rag_cases)
         
         return jsonify(session_data), 200
         
@@ -11252,6 +11384,28 @@ async def update_fallback_cost():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _llm_response_cache_savings() -> dict:
+    """
+    Tokens and cost avoided by LLM response cache hits.
+
+    Hits return zero tokens, so they never appear in the session files the
+    cost analytics are computed from; the savings are reported next to them.
+    Counters are per process and reset on restart.
+    """
+    from trusted_data_agent.llm.response_cache import get_llm_response_cache
+    stats = get_llm_response_cache().get_stats()
+    by_reason = stats["by_reason"]
+    return {
+        "enabled": stats["enabled"],
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "saved_input_tokens": sum(s["saved_input_tokens"] for s in by_reason.values()),
+        "saved_output_tokens": sum(s["saved_output_tokens"] for s in by_reason.values()),
+        "saved_cost_usd": stats["saved_cost_usd"],
+        "by_reason": by_reason,
+    }
+
+
 @rest_api_bp.route('/v1/costs/analytics', methods=['GET'])
 @require_admin
 async def get_cost_analytics():
@@ -11265,6 +11419,7 @@ async def get_cost_analytics():
         - Cost trends over time
         - Most expensive sessions/queries
         - Average costs per turn/session
+        - Tokens and cost avoided by LLM response cache hits (this process)
     """
     try:
         from trusted_data_agent.core.cost_manager import get_cost_manager
@@ -11288,7 +11443,8 @@ async def get_cost_analytics():
                     "avg_cost_per_turn": 0.0,
                     "most_expensive_sessions": [],
                     "most_expensive_queries": [],
-                    "cost_trend": []
+                    "cost_trend": [],
+                    "response_cache_savings": _llm_response_cache_savings()
                 }), 200
             scan_dirs = [sessions_root]
         else:
@@ -11301,7 +11457,8 @@ async def get_cost_analytics():
                     "avg_cost_per_turn": 0.0,
                     "most_expensive_sessions": [],
                     "most_expensive_queries": [],
-                    "cost_trend": []
+                    "cost_trend": [],
+                    "response_cache_savings": _llm_response_cache_savings()
                 }), 200
             scan_dirs = [d for d in sessions_base.iterdir() if d.is_dir()]
         
@@ -11319,8 +11476,7 @@ async def get_cost_analytics():
         for session_dir in scan_dirs:
             for session_file in session_dir.glob('*.json'):
                 try:
-                    with open(session_file, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
+                    session_data = session_manager.read_session_file(session_file)
                     
                     total_sessions += 1
                     session_cost = 0.0
@@ -11403,7 +11559,8 @@ async def get_cost_analytics():
             "most_expensive_queries": query_costs[:20],
             "cost_trend": cost_trend[-30:],  # Last 30 days
             "total_sessions": total_sessions,
-            "total_turns": total_turns
+            "total_turns": total_turns,
+            "response_cache_savings": _llm_response_cache_savings()
         }), 200
         
     except Exception as e:
@@ -11607,26 +11764,23 @@ async def execute_genie_query(session_id: str):
         # Create task for background execution
         task_id = generate_task_id()
 
-        # Initialize task state
-        APP_STATE.setdefault("background_tasks", {})[task_id] = {
+        # Initialize task state (events are kept by the registry)
+        task_registry = APP_STATE["background_tasks"]
+        task_registry.create(task_id, {
             "task_id": task_id,
             "user_uuid": user_uuid,
             "session_id": session_id,
             "profile_id": profile_id,
             "query_type": "genie_coordination",
             "status": "pending",
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "events": [],
             "intermediate_data": [],
             "result": None
-        }
+        })
 
         async def genie_background_task():
             """Execute genie coordination in background."""
-            task_status = APP_STATE["background_tasks"].get(task_id)
             try:
-                task_status["status"] = "processing"
-                task_status["last_updated"] = datetime.now(timezone.utc).isoformat()
+                task_registry.update(task_id, status="processing")
 
                 # Create LangChain LLM from Uderia config
                 from trusted_data_agent.llm.langchain_adapter import create_langchain_llm
@@ -11651,12 +11805,11 @@ async def execute_genie_query(session_id: str):
                         asyncio.create_task(queue.put(notification))
 
                     # Also store event in task status for polling clients
-                    task_status["events"].append({
+                    task_registry.append_event(task_id, {
                         "event_type": event_type,
                         "payload": payload,
                         "timestamp": datetime.now(timezone.utc).isoformat()
                     })
-                    task_status["last_updated"] = datetime.now(timezone.utc).isoformat()
 
                 # Build and execute coordinator with event callback
                 from trusted_data_agent.agent.genie_coordinator import GenieCoordinator
@@ -11754,9 +11907,11 @@ async def execute_genie_query(session_id: str):
                     app_logger.warning(f"Failed to log Genie session data: {log_error}")
                 # --- END SESSION LOGGING ---
 
-                task_status["status"] = "completed" if result.get("success", False) else "failed"
-                task_status["result"] = _sanitize_for_json(result)
-                task_status["last_updated"] = datetime.now(timezone.utc).isoformat()
+                task_registry.update(
+                    task_id,
+                    status="completed" if result.get("success", False) else "failed",
+                    result=_sanitize_for_json(result),
+                )
 
                 # Note: Final completion notification is now emitted by GenieCoordinator
                 # but we still send rest_task_complete for backwards compatibility
@@ -11782,9 +11937,7 @@ async def execute_genie_query(session_id: str):
 
             except Exception as e:
                 app_logger.error(f"Genie coordination task {task_id} failed: {e}", exc_info=True)
-                task_status["status"] = "failed"
-                task_status["result"] = {"error": str(e), "success": False}
-                task_status["last_updated"] = datetime.now(timezone.utc).isoformat()
+                task_registry.update(task_id, status="failed", result={"error": str(e), "success": False})
             finally:
                 # Remove from active tasks
                 if task_id in APP_STATE.get("active_tasks", {}):
@@ -16174,3 +16327,55 @@ async def get_scheduler_status(current_user):
     except Exception as e:
         app_logger.error(f"Failed to get scheduler status: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
+
+
+@rest_api_bp.route("/v1/admin/mcp/session-pool", methods=["GET"])
+@require_admin
+async def get_mcp_session_pool_stats():
+    """Return MCP session pool counters (hits, creates, waits, evictions). Admin only."""
+    try:
+        from trusted_data_agent.mcp_adapter.session_pool import get_mcp_session_pool
+        return jsonify({
+            "enabled": APP_CONFIG.MCP_SESSION_POOL_ENABLED,
+            "stats": get_mcp_session_pool().get_stats(),
+        }), 200
+    except Exception as e:
+        app_logger.error(f"Failed to get MCP session pool stats: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@rest_api_bp.route("/v1/admin/sessions/cache", methods=["GET"])
+@require_admin
+async def get_session_cache_stats():
+    """Return write-back session cache counters (hits, misses, flush latency). Admin only."""
+    try:
+        from trusted_data_agent.core import session_manager
+        return jsonify(session_manager.get_session_cache_stats()), 200
+    except Exception as e:
+        app_logger.error(f"Failed to get session cache stats: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@rest_api_bp.route("/v1/admin/llm/response-cache", methods=["GET"])
+@require_admin
+async def get_llm_response_cache_stats():
+    """Return LLM response cache counters per cache reason (hits, misses, saved tokens/cost). Admin only."""
+    try:
+        from trusted_data_agent.llm.response_cache import get_llm_response_cache
+        return jsonify(get_llm_response_cache().get_stats()), 200
+    except Exception as e:
+        app_logger.error(f"Failed to get LLM response cache stats: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@rest_api_bp.route("/v1/admin/llm/response-cache", methods=["DELETE"])
+@require_admin
+async def clear_llm_response_cache():
+    """Drop all cached LLM responses (memory and SQLite tiers). Admin only."""
+    try:
+        from trusted_data_agent.llm.response_cache import get_llm_response_cache
+        await get_llm_response_cache().clear()
+        return jsonify({"status": "success"}), 200
+    except Exception as e:
+        app_logger.error(f"Failed to clear LLM response cache: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
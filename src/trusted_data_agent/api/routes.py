@@ -1462,8 +1462,7 @@ async def get_rag_case_details(case_id: str):
                     if not session_file.exists():
                         continue
                     try:
-                        with open(session_file, 'r', encoding='utf-8') as sf:
-                            session_json = json.load(sf)
+                        session_json = session_manager.read_session_file(session_file)
                         workflow_history = session_json.get('last_turn_data', {}).get('workflow_history', [])
                         # 1. Try by turn_id
                         if turn_id is not None:
@@ -1502,12 +1501,14 @@ async def get_sessions(current_user):
         limit (int): Maximum number of sessions to return (default: 50, use 0 for all)
         offset (int): Number of sessions to skip for pagination (default: 0)
         include_archived (bool): If true, includes archived sessions in results (default: false)
+        cursor (str): next_cursor of the previous page; continues after it (replaces offset)
     """
     user_uuid = current_user.id
 
     # Parse pagination parameters
     limit_param = request.args.get('limit', '50')
     offset = request.args.get('offset', 0, type=int)
+    cursor = request.args.get('cursor') or None
 
     # Handle limit: 0 means no limit (return all sessions)
     if limit_param == '0' or limit_param == 'all':
@@ -1540,11 +1541,16 @@ async def get_sessions(current_user):
         original_filter = APP_CONFIG.SESSIONS_FILTER_BY_USER
         try:
             APP_CONFIG.SESSIONS_FILTER_BY_USER = False
-            result = await session_manager.get_all_sessions(user_uuid=user_uuid, limit=limit, offset=offset, include_archived=include_archived)
+            result = await session_manager.get_all_sessions(user_uuid=user_uuid, limit=limit, offset=offset, include_archived=include_archived, cursor=cursor)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         finally:
             APP_CONFIG.SESSIONS_FILTER_BY_USER = original_filter
     else:
-        result = await session_manager.get_all_sessions(user_uuid=user_uuid, limit=limit, offset=offset, include_archived=include_archived)
+        try:
+            result = await session_manager.get_all_sessions(user_uuid=user_uuid, limit=limit, offset=offset, include_archived=include_archived, cursor=cursor)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
 
     # Extract sessions from result (new format returns dict with sessions, total_count, has_more)
     sessions = result.get("sessions", [])
@@ -1559,7 +1565,8 @@ async def get_sessions(current_user):
     return jsonify({
         "sessions": sessions,
         "total_count": total_count,
-        "has_more": has_more
+        "has_more": has_more,
+        "next_cursor": result.get("next_cursor")
     })
 
 @api_bp.route("/session/<session_id>", methods=["GET"])
@@ -2840,7 +2847,7 @@ async def _cancel_genie_slaves_recursive(user_uuid: str, parent_session_id: str,
         return
 
     active_tasks = APP_STATE.get("active_tasks", {})
-    background_tasks = APP_STATE.get("background_tasks", {})
+    background_tasks = APP_STATE["background_tasks"]
     cancellation_flags = APP_STATE.setdefault("cancellation_flags", {})
 
     for slave in slaves:
@@ -2863,7 +2870,7 @@ async def _cancel_genie_slaves_recursive(user_uuid: str, parent_session_id: str,
                 rest_task = active_tasks.get(task_id)
                 if rest_task and not rest_task.done():
                     rest_task.cancel()
-                    meta["status"] = "cancelling"
+                    background_tasks.update(task_id, status="cancelling")
                     app_logger.info(f"[cancel_stream] Cancelled REST slave task {task_id} for session {slave_session_id}")
                 break
 
@@ -3,13 +3,24 @@ Audit logging for security and compliance.
 
 Records all security-relevant events including authentication, authorization,
 configuration changes, and API access.
+
+Events are queued in memory and written by a background thread in batches
+(one executemany INSERT per transaction), so request paths never wait on a
+database commit. When the queue is full, high-volume events (API access,
+prompt execution, session access) are dropped and counted; all other events
+are written synchronously by the caller so none are lost. The writer is
+flushed on shutdown.
 """
 
 import os
 import logging
 import json
+import queue
+import threading
+import uuid
+from collections import Counter
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 from quart import request
 
@@ -20,6 +31,162 @@ logger = logging.getLogger("quart.app")
 
 # Configuration
 AUDIT_LOGGING_ENABLED = os.environ.get('TDA_AUDIT_LOGGING_ENABLED', 'true').lower() == 'true'
+AUDIT_ASYNC_ENABLED = os.environ.get('TDA_AUDIT_ASYNC_ENABLED', 'true').lower() == 'true'  # False = one commit per event
+AUDIT_QUEUE_MAX_SIZE = int(os.environ.get('TDA_AUDIT_QUEUE_MAX_SIZE', '10000'))
+AUDIT_BATCH_SIZE = int(os.environ.get('TDA_AUDIT_BATCH_SIZE', '500'))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get('TDA_AUDIT_FLUSH_INTERVAL_SECONDS', '1.0'))
+
+# Actions that may be dropped (and counted) when the audit queue is full
+_DROPPABLE_ACTIONS = ('api_access', 'prompt_execution')
+_DROPPABLE_PREFIXES = ('session_',)
+
+
+class _AuditWriter:
+    """Bounded in-memory queue of audit rows drained by a background thread."""
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_size))
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # One batch transaction at a time
+        self._thread: Optional[threading.Thread] = None
+        self._dropped: Counter = Counter()  # action -> dropped since last report
+        self._stats = {'written': 0, 'batches': 0, 'dropped': 0, 'sync_writes': 0, 'failed': 0}
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue a row. Returns False if it was dropped because the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            pass
+        action = row['action']
+        if action in _DROPPABLE_ACTIONS or action.startswith(_DROPPABLE_PREFIXES):
+            with self._start_lock:
+                self._dropped[action] += 1
+                self._stats['dropped'] += 1
+            return False
+        # Backpressure: the caller pays for its own write rather than losing the event
+        self._write([row])
+        self._stats['sync_writes'] += 1
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self._flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain([first]))
+
+    def _drain(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        with self._write_lock:
+            with self._start_lock:
+                dropped, self._dropped = self._dropped, Counter()
+            if dropped:
+                batch = batch + [_dropped_events_row(dropped)]
+            try:
+                with get_db_session() as session:
+                    session.execute(AuditLog.__table__.insert(), batch)
+                self._stats['written'] += len(batch)
+                self._stats['batches'] += 1
+            except Exception as e:
+                self._stats['failed'] += len(batch)
+                logger.error(f"Failed to write {len(batch)} audit event(s): {e}", exc_info=True)
+
+    def flush(self):
+        """Write everything queued so far (from the caller's thread)."""
+        while True:
+            try:
+                first = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._write(self._drain([first]))
+
+    def shutdown(self, timeout: float = 10.0):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats, queued=self._queue.qsize(), max_size=self._queue.maxsize)
+
+
+_audit_writer: Optional[_AuditWriter] = None
+_audit_writer_lock = threading.Lock()
+
+
+def _get_audit_writer() -> _AuditWriter:
+    global _audit_writer
+    if _audit_writer is None:
+        with _audit_writer_lock:
+            if _audit_writer is None:
+                _audit_writer = _AuditWriter(AUDIT_QUEUE_MAX_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS)
+    return _audit_writer
+
+
+def _dropped_events_row(dropped: Counter) -> Dict[str, Any]:
+    """Audit row recording events dropped under load, so the gap is visible in the trail."""
+    total = sum(dropped.values())
+    summary = ', '.join(f"{action}={count}" for action, count in dropped.most_common())
+    logger.warning(f"AUDIT: queue full, dropped {total} event(s): {summary}")
+    return _audit_row(None, 'audit_events_dropped', f"Dropped {total} audit event(s) under load: {summary}",
+                      False, None, None, None)
+
+
+def _audit_row(user_id, action, details, success, resource, ip_address, user_agent) -> Dict[str, Any]:
+    return {
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'action': action,
+        'resource': resource,
+        'status': 'success' if success else 'failure',
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'details': details,
+        'timestamp': datetime.now(timezone.utc),
+    }
+
+
+def flush_audit_log():
+    """Write all queued audit events now."""
+    if _audit_writer is not None:
+        _audit_writer.flush()
+
+
+def shutdown_audit_writer():
+    """Stop the background writer and write any remaining events (call on shutdown)."""
+    if _audit_writer is not None:
+        _audit_writer.shutdown()
+
+
+def get_audit_writer_stats() -> Dict[str, Any]:
+    """Return written / dropped / queued counters of the audit writer."""
+    stats = _audit_writer.get_stats() if _audit_writer is not None else {}
+    stats['async_enabled'] = AUDIT_ASYNC_ENABLED
+    return stats
 
 
 def _get_client_info() -> tuple[str, str]:
@@ -59,6 +226,9 @@ def log_audit_event(
 ) -> bool:
     """
     Log an audit event to the database.
+
+    The event is queued for the background batch writer (see module
+    docstring); with TDA_AUDIT_ASYNC_ENABLED=false it is committed inline.
     
     Args:
         user_id: User ID (None for anonymous events)
@@ -87,21 +257,13 @@ def log_audit_event(
                 ip_address = ip_address or 'unknown'
                 user_agent = user_agent or 'unknown'
         
-        # Create audit log entry
-        audit_log = AuditLog(
-            user_id=user_id,
-            action=action,
-            resource=resource,
-            status='success' if success else 'failure',
-            ip_address=ip_address,
-            user_agent=user_agent,
-            details=details,
-            metadata=json.dumps(metadata) if metadata else None
-        )
+        row = _audit_row(user_id, action, details, success, resource, ip_address, user_agent)
         
-        # Store in database
-        with get_db_session() as session:
-            session.add(audit_log)
+        if AUDIT_ASYNC_ENABLED:
+            _get_audit_writer().submit(row)
+        else:
+            with get_db_session() as session:
+                session.execute(AuditLog.__table__.insert(), [row])
         
         # Log to application logger as well (for immediate visibility)
         log_level = logging.INFO if success else logging.WARNING
@@ -319,6 +481,9 @@ def get_user_audit_logs(
     Returns:
         List of audit log dictionaries
     """
+    # Include events still waiting in the writer queue
+    flush_audit_log()
+    
     try:
         with get_db_session() as session:
             query = session.query(AuditLog).filter_by(user_id=user_id)
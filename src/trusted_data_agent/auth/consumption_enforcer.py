@@ -20,11 +20,12 @@ Usage:
 
 import logging
 from typing import Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import func
 
 from trusted_data_agent.auth.database import get_db_session
-from trusted_data_agent.auth.models import User, ConsumptionProfile, UserTokenUsage
+from trusted_data_agent.auth.models import User, ConsumptionProfile
+from trusted_data_agent.auth.usage_ledger import get_usage_ledger
 
 logger = logging.getLogger(__name__)
 
@@ -64,82 +65,91 @@ class ConsumptionEnforcer:
         self._load_user_and_profile()
     
     def _load_user_and_profile(self):
-        """Load user and their consumption profile from database."""
+        """Load the user's effective limits (cached by the usage ledger)."""
         try:
-            with get_db_session() as session:
-                from trusted_data_agent.auth.models import SystemSettings
-                
-                user = session.query(User).filter_by(id=self.user_id).first()
-                
-                if not user:
-                    raise ValueError(f"User {self.user_id} not found")
-                
-                # Check if global override is enabled
-                global_override_setting = session.query(SystemSettings).filter_by(
-                    setting_key='rate_limit_global_override'
-                ).first()
-                
-                use_global_override = (
-                    global_override_setting and 
-                    global_override_setting.setting_value.lower() == 'true'
-                )
-                
-                if use_global_override:
-                    # Use global rate limit settings instead of consumption profile
-                    # Load global settings from SystemSettings
-                    def get_setting_value(key, default):
-                        setting = session.query(SystemSettings).filter_by(setting_key=key).first()
-                        if setting:
-                            try:
-                                return int(setting.setting_value)
-                            except ValueError:
-                                return default
-                        return default
-                    
-                    self.profile_name = 'Global Override'
-                    self.is_active = True
-                    self.prompts_per_hour = get_setting_value('rate_limit_user_prompts_per_hour', 100)
-                    self.prompts_per_day = get_setting_value('rate_limit_user_prompts_per_day', 1000)
-                    self.config_changes_per_hour = get_setting_value('rate_limit_user_configs_per_hour', 10)
-                    # Global override doesn't have token limits
-                    self.input_tokens_per_month = None
-                    self.output_tokens_per_month = None
-                else:
-                    # Load consumption profile (normal mode)
-                    profile = None
-                    if user.consumption_profile_id:
-                        profile = session.query(ConsumptionProfile).filter_by(
-                            id=user.consumption_profile_id
-                        ).first()
-                    else:
-                        # Get default profile
-                        profile = session.query(ConsumptionProfile).filter_by(
-                            is_default=True
-                        ).first()
-                    
-                    if profile:
-                        # Copy attributes from ORM object to avoid detached instance errors
-                        self.profile_name = profile.name
-                        self.is_active = profile.is_active
-                        self.prompts_per_hour = profile.prompts_per_hour
-                        self.prompts_per_day = profile.prompts_per_day
-                        self.config_changes_per_hour = profile.config_changes_per_hour
-                        self.input_tokens_per_month = profile.input_tokens_per_month
-                        self.output_tokens_per_month = profile.output_tokens_per_month
-                    else:
-                        logger.warning(f"No consumption profile found for user {self.user_id}, using unlimited")
-                        # Set unlimited profile attributes
-                        self.profile_name = 'Unlimited'
-                        self.is_active = True
-                        self.prompts_per_hour = None
-                        self.prompts_per_day = None
-                        self.config_changes_per_hour = None
-                        self.input_tokens_per_month = None
-                        self.output_tokens_per_month = None
-        
+            limits = get_usage_ledger().get_profile('enforcer', self.user_id, self._query_user_and_profile)
         except Exception as e:
             logger.error(f"Failed to load user/profile for {self.user_id}: {e}")
             raise
+        for name, value in limits.items():
+            setattr(self, name, value)
+    
+    @staticmethod
+    def _query_user_and_profile(user_id: str) -> dict:
+        """Resolve a user's limits from their consumption profile or the global override."""
+        limits = {}
+        with get_db_session() as session:
+            from trusted_data_agent.auth.models import SystemSettings
+            
+            user = session.query(User).filter_by(id=user_id).first()
+            
+            if not user:
+                raise ValueError(f"User {user_id} not found")
+            
+            # Check if global override is enabled
+            global_override_setting = session.query(SystemSettings).filter_by(
+                setting_key='rate_limit_global_override'
+            ).first()
+            
+            use_global_override = (
+                global_override_setting and 
+                global_override_setting.setting_value.lower() == 'true'
+            )
+            
+            if use_global_override:
+                # Use global rate limit settings instead of consumption profile
+                # Load global settings from SystemSettings
+                def get_setting_value(key, default):
+                    setting = session.query(SystemSettings).filter_by(setting_key=key).first()
+                    if setting:
+                        try:
+                            return int(setting.setting_value)
+                        except ValueError:
+                            return default
+                    return default
+                
+                limits['profile_name'] = 'Global Override'
+                limits['is_active'] = True
+                limits['prompts_per_hour'] = get_setting_value('rate_limit_user_prompts_per_hour', 100)
+                limits['prompts_per_day'] = get_setting_value('rate_limit_user_prompts_per_day', 1000)
+                limits['config_changes_per_hour'] = get_setting_value('rate_limit_user_configs_per_hour', 10)
+                # Global override doesn't have token limits
+                limits['input_tokens_per_month'] = None
+                limits['output_tokens_per_month'] = None
+            else:
+                # Load consumption profile (normal mode)
+                profile = None
+                if user.consumption_profile_id:
+                    profile = session.query(ConsumptionProfile).filter_by(
+                        id=user.consumption_profile_id
+                    ).first()
+                else:
+                    # Get default profile
+                    profile = session.query(ConsumptionProfile).filter_by(
+                        is_default=True
+                    ).first()
+                
+                if profile:
+                    # Copy attributes from ORM object to avoid detached instance errors
+                    limits['profile_name'] = profile.name
+                    limits['is_active'] = profile.is_active
+                    limits['prompts_per_hour'] = profile.prompts_per_hour
+                    limits['prompts_per_day'] = profile.prompts_per_day
+                    limits['config_changes_per_hour'] = profile.config_changes_per_hour
+                    limits['input_tokens_per_month'] = profile.input_tokens_per_month
+                    limits['output_tokens_per_month'] = profile.output_tokens_per_month
+                else:
+                    logger.warning(f"No consumption profile found for user {user_id}, using unlimited")
+                    # Set unlimited profile attributes
+                    limits['profile_name'] = 'Unlimited'
+                    limits['is_active'] = True
+                    limits['prompts_per_hour'] = None
+                    limits['prompts_per_day'] = None
+                    limits['config_changes_per_hour'] = None
+                    limits['input_tokens_per_month'] = None
+                    limits['output_tokens_per_month'] = None
+
+        return limits
     
     def is_unlimited(self) -> bool:
         """Check if user has unlimited access."""
@@ -168,48 +178,36 @@ class ConsumptionEnforcer:
             return True, None
         
         try:
-            with get_db_session() as session:
-                now = datetime.utcnow()
-                
-                # Check hourly limit
-                if self.prompts_per_hour is not None:
-                    hour_ago = now - timedelta(hours=1)
-                    hourly_count = session.query(func.count()).filter(
-                        UserTokenUsage.user_id == self.user_id,
-                        UserTokenUsage.last_usage_at >= hour_ago
-                    ).scalar() or 0
-                    
-                    if hourly_count >= self.prompts_per_hour:
-                        return False, f"Hourly prompt limit exceeded ({self.prompts_per_hour} prompts/hour)"
-                
-                # Check daily limit
-                if self.prompts_per_day is not None:
-                    day_ago = now - timedelta(days=1)
-                    daily_count = session.query(func.count()).filter(
-                        UserTokenUsage.user_id == self.user_id,
-                        UserTokenUsage.last_usage_at >= day_ago
-                    ).scalar() or 0
-                    
-                    if daily_count >= self.prompts_per_day:
-                        return False, f"Daily prompt limit exceeded ({self.prompts_per_day} prompts/day)"
-                
-                # Check monthly token limits
-                current_period = now.strftime('%Y-%m')
-                usage = session.query(UserTokenUsage).filter_by(
-                    user_id=self.user_id,
-                    period=current_period
-                ).first()
+            # Answered from the in-memory usage ledger (no DB round trip once loaded)
+            ledger = get_usage_ledger()
+            now = datetime.now(timezone.utc)
+            
+            # Check hourly limit
+            if self.prompts_per_hour is not None:
+                hourly_count = ledger.periods_used_since(self.user_id, now - timedelta(hours=1))
                 
-                if usage:
-                    if self.input_tokens_per_month is not None:
-                        if usage.input_tokens_used >= self.input_tokens_per_month:
-                            return False, f"Monthly input token limit exceeded ({self.input_tokens_per_month:,} tokens)"
-                    
-                    if self.output_tokens_per_month is not None:
-                        if usage.output_tokens_used >= self.output_tokens_per_month:
-                            return False, f"Monthly output token limit exceeded ({self.output_tokens_per_month:,} tokens)"
+                if hourly_count >= self.prompts_per_hour:
+                    return False, f"Hourly prompt limit exceeded ({self.prompts_per_hour} prompts/hour)"
+            
+            # Check daily limit
+            if self.prompts_per_day is not None:
+                daily_count = ledger.periods_used_since(self.user_id, now - timedelta(days=1))
                 
-                return True, None
+                if daily_count >= self.prompts_per_day:
+                    return False, f"Daily prompt limit exceeded ({self.prompts_per_day} prompts/day)"
+            
+            # Check monthly token limits
+            usage = ledger.get_usage(self.user_id)
+            
+            if self.input_tokens_per_month is not None:
+                if usage['input_tokens_used'] >= self.input_tokens_per_month:
+                    return False, f"Monthly input token limit exceeded ({self.input_tokens_per_month:,} tokens)"
+            
+            if self.output_tokens_per_month is not None:
+                if usage['output_tokens_used'] >= self.output_tokens_per_month:
+                    return False, f"Monthly output token limit exceeded ({self.output_tokens_per_month:,} tokens)"
+            
+            return True, None
         
         except Exception as e:
             logger.error(f"Error checking prompt limits for user {self.user_id}: {e}")
@@ -225,11 +223,8 @@ class ConsumptionEnforcer:
             output_tokens: Number of output tokens used
         """
         try:
-            from trusted_data_agent.auth.consumption_manager import ConsumptionManager
-            
-            manager = ConsumptionManager()
-            # The consumption manager already handles recording
-            # This is just a pass-through for consistency
+            # Token usage is already recorded per turn via token_quota.record_token_usage
+            # (usage ledger); this is just a pass-through for consistency
             logger.debug(f"Recorded prompt execution for user {self.user_id}: {input_tokens} in, {output_tokens} out")
         
         except Exception as e:
@@ -312,59 +307,48 @@ class ConsumptionEnforcer:
             Dictionary with usage stats including limits and current usage
         """
         try:
-            with get_db_session() as session:
-                now = datetime.utcnow()
-                current_period = now.strftime('%Y-%m')
-                
-                # Get monthly usage
-                usage = session.query(UserTokenUsage).filter_by(
-                    user_id=self.user_id,
-                    period=current_period
-                ).first()
-                
-                # Count hourly prompts
-                hour_ago = now - timedelta(hours=1)
-                hourly_prompts = session.query(func.count()).filter(
-                    UserTokenUsage.user_id == self.user_id,
-                    UserTokenUsage.last_usage_at >= hour_ago
-                ).scalar() or 0
-                
-                # Count daily prompts
-                day_ago = now - timedelta(days=1)
-                daily_prompts = session.query(func.count()).filter(
-                    UserTokenUsage.user_id == self.user_id,
-                    UserTokenUsage.last_usage_at >= day_ago
-                ).scalar() or 0
-                
-                return {
-                    'profile_name': self.profile_name,
-                    'is_unlimited': self.is_unlimited(),
-                    'prompts': {
-                        'hourly': {
-                            'used': hourly_prompts,
-                            'limit': self.prompts_per_hour,
-                            'remaining': self.prompts_per_hour - hourly_prompts if self.prompts_per_hour else None
-                        },
-                        'daily': {
-                            'used': daily_prompts,
-                            'limit': self.prompts_per_day,
-                            'remaining': self.prompts_per_day - daily_prompts if self.prompts_per_day else None
-                        }
+            ledger = get_usage_ledger()
+            now = datetime.now(timezone.utc)
+            current_period = now.strftime('%Y-%m')
+            
+            # Get monthly usage
+            usage = ledger.get_usage(self.user_id, current_period)
+            input_used = usage['input_tokens_used']
+            output_used = usage['output_tokens_used']
+            
+            # Count hourly / daily prompts
+            hourly_prompts = ledger.periods_used_since(self.user_id, now - timedelta(hours=1))
+            daily_prompts = ledger.periods_used_since(self.user_id, now - timedelta(days=1))
+            
+            return {
+                'profile_name': self.profile_name,
+                'is_unlimited': self.is_unlimited(),
+                'prompts': {
+                    'hourly': {
+                        'used': hourly_prompts,
+                        'limit': self.prompts_per_hour,
+                        'remaining': self.prompts_per_hour - hourly_prompts if self.prompts_per_hour else None
                     },
-                    'tokens': {
-                        'input': {
-                            'used': usage.input_tokens_used if usage else 0,
-                            'limit': self.input_tokens_per_month,
-                            'remaining': self.input_tokens_per_month - (usage.input_tokens_used if usage else 0) if self.input_tokens_per_month else None
-                        },
-                        'output': {
-                            'used': usage.output_tokens_used if usage else 0,
-                            'limit': self.output_tokens_per_month,
-                            'remaining': self.output_tokens_per_month - (usage.output_tokens_used if usage else 0) if self.output_tokens_per_month else None
-                        }
+                    'daily': {
+                        'used': daily_prompts,
+                        'limit': self.prompts_per_day,
+                        'remaining': self.prompts_per_day - daily_prompts if self.prompts_per_day else None
+                    }
+                },
+                'tokens': {
+                    'input': {
+                        'used': input_used,
+                        'limit': self.input_tokens_per_month,
+                        'remaining': self.input_tokens_per_month - input_used if self.input_tokens_per_month else None
                     },
-                    'period': current_period
-                }
+                    'output': {
+                        'used': output_used,
+                        'limit': self.output_tokens_per_month,
+                        'remaining': self.output_tokens_per_month - output_used if self.output_tokens_per_month else None
+                    }
+                },
+                'period': current_period
+            }
         
         except Exception as e:
             logger.error(f"Error getting usage stats for user {self.user_id}: {e}")
@@ -169,20 +169,21 @@ class ConsumptionManager:
         
         return True, None
     
-    def increment_request_counter(self, user_id: str) -> None:
+    def increment_request_counter(self, user_id: str, count: int = 1) -> None:
         """
         Increment request counters (hourly, daily, velocity).
         Call this at the START of each request.
         
         Args:
             user_id: User ID
+            count: Number of requests to add (batched callers record a whole turn at once)
         """
         consumption = self.get_or_create_consumption(user_id)
         now = datetime.now(timezone.utc)
         
         # Increment counters
-        consumption.requests_this_hour += 1
-        consumption.requests_today += 1
+        consumption.requests_this_hour += count
+        consumption.requests_today += count
         
         # Update peak tracking
         if consumption.requests_this_hour > consumption.peak_requests_per_hour:
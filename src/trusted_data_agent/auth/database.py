@@ -1950,7 +1950,7 @@ def _create_saml_tables():
 
 def _run_user_table_migrations():
     """
-    Run schema migrations for the users table.
+    Run schema migrations for the users and user_preferences tables.
     Adds new columns that were added after initial release.
     Safe to call multiple times (checks if columns exist).
     """
@@ -1981,6 +1981,14 @@ def _run_user_table_migrations():
             cursor.execute("ALTER TABLE users ADD COLUMN marketplace_visible BOOLEAN NOT NULL DEFAULT 1")
             conn.commit()
 
+        # Migration: Add config_version column for cross-process config cache invalidation
+        try:
+            cursor.execute("SELECT config_version FROM user_preferences LIMIT 1")
+        except sqlite3.OperationalError:
+            logger.info("Adding config_version column to user_preferences table")
+            cursor.execute("ALTER TABLE user_preferences ADD COLUMN config_version INTEGER NOT NULL DEFAULT 0")
+            conn.commit()
+
         conn.close()
 
     except Exception as e:
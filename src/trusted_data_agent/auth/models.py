@@ -180,7 +180,10 @@ class UserPreference(Base):
     notification_enabled = Column(Boolean, default=True)
     
     # Extended preferences (JSON)
-    preferences_json = Column(Text, nullable=True)  # Store as JSON string
+    preferences_json = Column(Text, nullable=True)  # Store as JSON string (legacy, see UserConfigSection)
+
+    # Bumped on every configuration write; other processes drop cached configs when it changes
+    config_version = Column(Integer, nullable=False, default=0)
     
     updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
@@ -191,6 +194,20 @@ class UserPreference(Base):
         return f"<UserPreference(user_id='{self.user_id}', theme='{self.theme}')>"
 
 
+class UserConfigSection(Base):
+    """One top-level section of a user's configuration (profiles, mcp_servers, ...) as JSON."""
+
+    __tablename__ = 'user_config_sections'
+
+    user_id = Column(String(36), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    section = Column(String(100), primary_key=True)
+    data_json = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self):
+        return f"<UserConfigSection(user_id='{self.user_id}', section='{self.section}')>"
+
+
 class OAuthAccount(Base):
     """OAuth account linking for users."""
     
@@ -9,6 +9,7 @@ import json
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
+from trusted_data_agent.auth.audit import flush_audit_log
 from trusted_data_agent.auth.database import get_db_session
 from trusted_data_agent.auth.models import AuditLog
 
@@ -365,6 +366,9 @@ class OAuthAnalytics:
         try:
             from datetime import timedelta
             
+            # Include events still waiting in the audit writer queue
+            flush_audit_log()
+            
             with get_db_session() as session:
                 cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
                 
@@ -431,6 +435,9 @@ class OAuthAnalytics:
         try:
             from datetime import timedelta
             
+            # Include events still waiting in the audit writer queue
+            flush_audit_log()
+            
             with get_db_session() as session:
                 # Count OAuth logins by provider in last 30 days
                 cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
@@ -0,0 +1,270 @@
+"""
+Token bucket storage backends for the rate limiter.
+
+``check_rate_limit`` delegates its read-refill-consume step to a storage
+backend so buckets can be shared by several worker processes:
+
+  - **memory** — per-process dict (the default). Limits are enforced per
+                 worker, so N workers allow up to N times the configured rate.
+  - **sqlite** — one WAL-mode SQLite file shared by all local workers. Each
+                 check is a single ``INSERT ... ON CONFLICT DO UPDATE ...
+                 RETURNING`` statement, so refill and consume are atomic across
+                 processes without an explicit transaction.
+
+Buckets expire once they would have refilled completely (``last_update +
+window``); an expired bucket is indistinguishable from a new one. Expiry works
+on an ordered structure (insertion-ordered dicts per window in memory, an
+index on ``expires_at`` in SQLite) and removes a bounded number of buckets per
+check instead of scanning all of them periodically.
+
+Select the backend with ``TDA_RATE_LIMIT_STORAGE`` (``memory`` | ``sqlite``)
+and the shared file with ``TDA_RATE_LIMIT_DB``. The sqlite backend needs
+SQLite 3.35+ (``RETURNING``); older libraries fall back to memory. A check that
+cannot get the SQLite write lock within a short busy timeout is decided by a
+per-process memory bucket instead, so limits still hold (per worker) while the
+file is busy. Event loop code calls ``consume_async``, which runs the SQLite
+statement in a worker thread.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("quart.app")
+
+_EXPIRE_BATCH = 64  # Buckets removed per expiry pass (bounds the work added to one check)
+_BUSY_TIMEOUT_SECONDS = 0.075  # Wait for another worker's write at most this long, then use the memory bucket
+_MIN_SQLITE_VERSION = (3, 35, 0)  # INSERT ... RETURNING
+
+
+def _retry_after(tokens: float, refill_rate: float) -> int:
+    return int((1.0 - tokens) / refill_rate) + 1 if refill_rate > 0 else 1
+
+
+class RateLimitStorage:
+    """Interface of a token bucket store."""
+
+    def consume(self, identifier: str, bucket_key: str, limit: int, window: int,
+                now: Optional[float] = None) -> Tuple[bool, int]:
+        """Refill the bucket and take one token if available.
+
+        Returns:
+            Tuple of (is_allowed, retry_after_seconds)
+        """
+        raise NotImplementedError
+
+    async def consume_async(self, identifier: str, bucket_key: str, limit: int, window: int,
+                            now: Optional[float] = None) -> Tuple[bool, int]:
+        """``consume`` for event loop code; backends that do I/O run it off the loop."""
+        return self.consume(identifier, bucket_key, limit, window, now)
+
+    def reset(self, identifier: str) -> None:
+        """Forget all buckets of an identifier."""
+        raise NotImplementedError
+
+    def status(self, identifier: str) -> Dict[str, Tuple[float, float]]:
+        """Return ``{bucket_key: (tokens, last_update)}`` for an identifier."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRateLimitStorage(RateLimitStorage):
+    """Per-process buckets. Not shared between workers."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[str, Tuple[float, float]]] = defaultdict(dict)
+        # window -> OrderedDict[(identifier, bucket_key)] in last-update order; within one
+        # window that is also expiry order, so expired buckets are always at the front.
+        self._expiry: Dict[int, OrderedDict] = defaultdict(OrderedDict)
+        self._lock = threading.Lock()
+
+    def consume(self, identifier, bucket_key, limit, window, now=None):
+        now = time.time() if now is None else now
+        refill_rate = limit / window
+        with self._lock:
+            self._expire(now)
+            buckets = self._buckets[identifier]
+            tokens, last_update = buckets.get(bucket_key, (float(limit), now))
+            tokens = min(limit, tokens + (now - last_update) * refill_rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            buckets[bucket_key] = (tokens, now)
+            order = self._expiry[window]
+            order[(identifier, bucket_key)] = now
+            order.move_to_end((identifier, bucket_key))
+        return (True, 0) if allowed else (False, _retry_after(tokens, refill_rate))
+
+    def _expire(self, now: float) -> None:
+        for window, order in self._expiry.items():
+            removed = 0
+            while order and removed < _EXPIRE_BATCH:
+                (identifier, bucket_key), last_update = next(iter(order.items()))
+                if last_update + window > now:
+                    break
+                order.popitem(last=False)
+                buckets = self._buckets.get(identifier)
+                if buckets is not None:
+                    buckets.pop(bucket_key, None)
+                    if not buckets:
+                        del self._buckets[identifier]
+                removed += 1
+
+    def reset(self, identifier):
+        with self._lock:
+            buckets = self._buckets.pop(identifier, None) or {}
+            for order in self._expiry.values():
+                for bucket_key in buckets:
+                    order.pop((identifier, bucket_key), None)
+
+    def status(self, identifier):
+        with self._lock:
+            return dict(self._buckets.get(identifier, {}))
+
+
+class SQLiteRateLimitStorage(RateLimitStorage):
+    """Buckets in a WAL-mode SQLite file shared by all local worker processes."""
+
+    _CONSUME_SQL = """
+        INSERT INTO rate_limit_buckets (identifier, bucket_key, tokens, last_update, expires_at, allowed)
+        VALUES (:identifier, :bucket_key,
+                CASE WHEN :limit >= 1 THEN :limit - 1.0 ELSE :limit END,
+                :now, :now + :window, :limit >= 1)
+        ON CONFLICT (identifier, bucket_key) DO UPDATE SET
+            tokens = CASE
+                WHEN min(:limit, tokens + max(:now - last_update, 0) * :rate) >= 1.0
+                THEN min(:limit, tokens + max(:now - last_update, 0) * :rate) - 1.0
+                ELSE min(:limit, tokens + max(:now - last_update, 0) * :rate)
+            END,
+            allowed = min(:limit, tokens + max(:now - last_update, 0) * :rate) >= 1.0,
+            last_update = max(:now, last_update),
+            expires_at = max(:now, last_update) + :window
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self, db_path: str, expire_every: int = 100):
+        self.db_path = db_path
+        self._expire_every = max(1, expire_every)
+        self._local = threading.local()
+        self._checks = 0
+        # Decides checks while the shared file is busy (limits then hold per worker)
+        self._fallback = MemoryRateLimitStorage()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own (atomic) transaction
+            conn = sqlite3.connect(self.db_path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None,
+                                   check_same_thread=False)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(
+                    "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                    "  identifier TEXT NOT NULL, bucket_key TEXT NOT NULL,"
+                    "  tokens REAL NOT NULL, last_update REAL NOT NULL, expires_at REAL NOT NULL,"
+                    "  allowed INTEGER NOT NULL DEFAULT 1,"
+                    "  PRIMARY KEY (identifier, bucket_key)) WITHOUT ROWID;"
+                    "CREATE INDEX IF NOT EXISTS idx_rate_limit_expires ON rate_limit_buckets(expires_at);"
+                )
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._local.conn = conn
+        return conn
+
+    def consume(self, identifier, bucket_key, limit, window, now=None):
+        now = time.time() if now is None else now
+        refill_rate = limit / window
+        try:
+            conn = self._get_conn()
+            tokens, allowed = conn.execute(self._CONSUME_SQL, {
+                "identifier": identifier, "bucket_key": bucket_key, "limit": float(limit),
+                "window": float(window), "rate": refill_rate, "now": now,
+            }).fetchone()
+        except sqlite3.OperationalError as e:
+            # Busy past the timeout (or unwritable file): neither stall the request nor wave it through
+            logger.warning(f"Rate limit check for {identifier} (bucket: {bucket_key}) using the "
+                           f"per-process bucket: {e}")
+            return self._fallback.consume(identifier, bucket_key, limit, window, now)
+        self._checks += 1
+        if self._checks % self._expire_every == 0:
+            self._expire(conn, now)
+        return (True, 0) if allowed else (False, _retry_after(tokens, refill_rate))
+
+    async def consume_async(self, identifier, bucket_key, limit, window, now=None):
+        return await asyncio.to_thread(self.consume, identifier, bucket_key, limit, window, now)
+
+    @staticmethod
+    def _expire(conn: sqlite3.Connection, now: float) -> None:
+        try:
+            conn.execute(
+                "DELETE FROM rate_limit_buckets WHERE (identifier, bucket_key) IN ("
+                "  SELECT identifier, bucket_key FROM rate_limit_buckets WHERE expires_at <= ? LIMIT ?)",
+                (now, _EXPIRE_BATCH),
+            )
+        except sqlite3.Error as e:
+            logger.debug(f"Rate limit bucket expiry skipped: {e}")
+
+    def reset(self, identifier):
+        self._fallback.reset(identifier)
+        try:
+            self._get_conn().execute("DELETE FROM rate_limit_buckets WHERE identifier = ?", (identifier,))
+        except sqlite3.OperationalError as e:
+            # The buckets expire on their own; a busy file must not fail the caller (e.g. a login)
+            logger.warning(f"Rate limit reset for {identifier} skipped: {e}")
+
+    def status(self, identifier):
+        try:
+            rows = self._get_conn().execute(
+                "SELECT bucket_key, tokens, last_update FROM rate_limit_buckets WHERE identifier = ?", (identifier,)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Rate limit status for {identifier} unavailable: {e}")
+            return {}
+        return {bucket_key: (tokens, last_update) for bucket_key, tokens, last_update in rows}
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_storage: Optional[RateLimitStorage] = None
+_storage_lock = threading.Lock()
+
+
+def get_rate_limit_storage() -> RateLimitStorage:
+    """Return the process-wide rate limit storage selected by APP_CONFIG.RATE_LIMIT_STORAGE."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                from trusted_data_agent.core.config import APP_CONFIG
+                backend = APP_CONFIG.RATE_LIMIT_STORAGE
+                if backend == "sqlite" and sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+                    logger.warning(
+                        f"TDA_RATE_LIMIT_STORAGE=sqlite needs SQLite "
+                        f"{'.'.join(map(str, _MIN_SQLITE_VERSION))}+ (found {sqlite3.sqlite_version}), "
+                        f"using in-memory storage"
+                    )
+                    backend = "memory"
+                if backend == "sqlite":
+                    db_path = APP_CONFIG.RATE_LIMIT_DB
+                    if not db_path:
+                        from trusted_data_agent.core.utils import get_project_root
+                        db_path = str(get_project_root() / "tda_rate_limits.db")
+                    _storage = SQLiteRateLimitStorage(db_path)
+                    logger.info(f"Rate limiter using shared SQLite storage: {db_path}")
+                else:
+                    if backend != "memory":
+                        logger.warning(f"Unknown TDA_RATE_LIMIT_STORAGE '{backend}', using in-memory storage")
+                    _storage = MemoryRateLimitStorage()
+    return _storage
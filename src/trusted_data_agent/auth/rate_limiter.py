@@ -2,19 +2,21 @@
 Rate limiting implementation using token bucket algorithm.
 
 Provides per-user and per-IP rate limiting to prevent abuse.
-Uses in-memory storage with periodic cleanup (can be extended to use Redis in production).
+Bucket state lives in a pluggable storage backend (see rate_limit_storage.py):
+in-memory per process by default, or a SQLite file shared by all local workers.
 """
 
 import os
 import time
 import logging
 from typing import Optional, Dict, Tuple
-from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 
 from quart import request, jsonify
 
+from trusted_data_agent.auth.rate_limit_storage import get_rate_limit_storage
+
 logger = logging.getLogger("quart.app")
 
 # Cache for rate limit configuration (refreshed periodically)
@@ -93,13 +95,6 @@ def _is_rate_limit_enabled():
     config = _get_rate_limit_config()
     return config.get('enabled', False)
 
-# In-memory storage for rate limits
-# Structure: {identifier: {bucket_key: (tokens, last_update_time)}}
-_rate_limits: Dict[str, Dict[str, Tuple[float, float]]] = defaultdict(dict)
-_last_cleanup = time.time()
-CLEANUP_INTERVAL = 3600  # Clean up every hour
-
-
 class RateLimitExceeded(Exception):
     """Exception raised when rate limit is exceeded."""
     
@@ -128,40 +123,6 @@ def _get_client_ip() -> str:
     return request.remote_addr or 'unknown'
 
 
-def _cleanup_old_entries():
-    """Remove stale entries from rate limit storage."""
-    global _last_cleanup, _rate_limits
-    
-    current_time = time.time()
-    
-    # Only cleanup every CLEANUP_INTERVAL seconds
-    if current_time - _last_cleanup < CLEANUP_INTERVAL:
-        return
-    
-    # Remove entries older than 24 hours
-    cutoff = current_time - 86400
-    
-    identifiers_to_remove = []
-    for identifier, buckets in _rate_limits.items():
-        # Remove old buckets
-        old_buckets = [key for key, (tokens, last_update) in buckets.items() if last_update < cutoff]
-        for key in old_buckets:
-            del buckets[key]
-        
-        # If no buckets left, mark identifier for removal
-        if not buckets:
-            identifiers_to_remove.append(identifier)
-    
-    # Remove empty identifiers
-    for identifier in identifiers_to_remove:
-        del _rate_limits[identifier]
-    
-    _last_cleanup = current_time
-    
-    if identifiers_to_remove:
-        logger.debug(f"Rate limiter cleanup: removed {len(identifiers_to_remove)} stale entries")
-
-
 def check_rate_limit(
     identifier: str,
     limit: int,
@@ -183,38 +144,46 @@ def check_rate_limit(
     if not _is_rate_limit_enabled():
         return True, 0
     
-    # Periodic cleanup
-    _cleanup_old_entries()
-    
-    current_time = time.time()
     bucket_key = bucket_key or f"{limit}_{window}"
     
-    # Get current bucket state
-    buckets = _rate_limits[identifier]
-    tokens, last_update = buckets.get(bucket_key, (float(limit), current_time))
-    
-    # Calculate token refill based on time passed
-    time_passed = current_time - last_update
-    refill_rate = limit / window  # tokens per second
-    tokens = min(limit, tokens + time_passed * refill_rate)
+    # Refill and consume atomically in the configured storage (stale buckets expire there)
+    try:
+        allowed, retry_after = get_rate_limit_storage().consume(identifier, bucket_key, limit, window)
+    except Exception as e:
+        # Fail open: a storage outage must not lock every user out
+        logger.error(f"Rate limit storage error for {identifier} (bucket: {bucket_key}): {e}")
+        return True, 0
     
-    # Check if request can be allowed
-    if tokens >= 1.0:
-        # Allow request and consume token
-        tokens -= 1.0
-        buckets[bucket_key] = (tokens, current_time)
+    if not allowed:
+        logger.warning(f"Rate limit exceeded for {identifier} (bucket: {bucket_key})")
+    return allowed, retry_after
+
+
+async def check_rate_limit_async(
+    identifier: str,
+    limit: int,
+    window: int,
+    bucket_key: Optional[str] = None
+) -> Tuple[bool, int]:
+    """
+    ``check_rate_limit`` for request handlers: a shared (SQLite) bucket store
+    is queried in a worker thread instead of blocking the event loop.
+    """
+    if not _is_rate_limit_enabled():
         return True, 0
-    else:
-        # Rate limit exceeded
-        # Calculate retry after time
-        tokens_needed = 1.0 - tokens
-        retry_after = int(tokens_needed / refill_rate) + 1
-        
-        # Update last_update time even on rejection
-        buckets[bucket_key] = (tokens, current_time)
-        
+
+    bucket_key = bucket_key or f"{limit}_{window}"
+
+    try:
+        allowed, retry_after = await get_rate_limit_storage().consume_async(identifier, bucket_key, limit, window)
+    except Exception as e:
+        # Fail open: a storage outage must not lock every user out
+        logger.error(f"Rate limit storage error for {identifier} (bucket: {bucket_key}): {e}")
+        return True, 0
+
+    if not allowed:
         logger.warning(f"Rate limit exceeded for {identifier} (bucket: {bucket_key})")
-        return False, retry_after
+    return allowed, retry_after
 
 
 def rate_limit(limit: int, window: int, bucket_key: Optional[str] = None):
@@ -252,7 +221,7 @@ def rate_limit(limit: int, window: int, bucket_key: Optional[str] = None):
                 identifier = f"ip:{_get_client_ip()}"
             
             # Check rate limit
-            allowed, retry_after = check_rate_limit(identifier, limit, window, bucket_key)
+            allowed, retry_after = await check_rate_limit_async(identifier, limit, window, bucket_key)
             
             if not allowed:
                 return jsonify({
@@ -378,7 +347,7 @@ def check_user_config_quota(user_id: str) -> Tuple[bool, str]:
     return True, ""
 
 
-def check_ip_login_limit(ip_address: Optional[str] = None) -> Tuple[bool, int]:
+async def check_ip_login_limit(ip_address: Optional[str] = None) -> Tuple[bool, int]:
     """
     Check if IP has exceeded login attempt limits.
     
@@ -396,7 +365,7 @@ def check_ip_login_limit(ip_address: Optional[str] = None) -> Tuple[bool, int]:
     
     ip = ip_address or _get_client_ip()
     
-    return check_rate_limit(
+    return await check_rate_limit_async(
         f"ip:{ip}",
         ip_login_per_minute,
         60,
@@ -404,7 +373,7 @@ def check_ip_login_limit(ip_address: Optional[str] = None) -> Tuple[bool, int]:
     )
 
 
-def check_ip_register_limit(ip_address: Optional[str] = None) -> Tuple[bool, int]:
+async def check_ip_register_limit(ip_address: Optional[str] = None) -> Tuple[bool, int]:
     """
     Check if IP has exceeded registration limits.
     
@@ -422,7 +391,7 @@ def check_ip_register_limit(ip_address: Optional[str] = None) -> Tuple[bool, int
     
     ip = ip_address or _get_client_ip()
     
-    return check_rate_limit(
+    return await check_rate_limit_async(
         f"ip:{ip}",
         ip_register_per_hour,
         3600,
@@ -437,9 +406,8 @@ def reset_rate_limits(identifier: str):
     Args:
         identifier: User ID or IP address
     """
-    if identifier in _rate_limits:
-        del _rate_limits[identifier]
-        logger.debug(f"Reset rate limits for {identifier}")
+    get_rate_limit_storage().reset(identifier)
+    logger.debug(f"Reset rate limits for {identifier}")
 
 
 def get_rate_limit_status(identifier: str) -> Dict[str, Dict[str, any]]:
@@ -452,11 +420,8 @@ def get_rate_limit_status(identifier: str) -> Dict[str, Dict[str, any]]:
     Returns:
         Dictionary of bucket statuses
     """
-    if identifier not in _rate_limits:
-        return {}
-    
     status = {}
-    buckets = _rate_limits[identifier]
+    buckets = get_rate_limit_storage().status(identifier)
     
     for bucket_key, (tokens, last_update) in buckets.items():
         status[bucket_key] = {
@@ -8,6 +8,8 @@ import os
 import logging
 import hashlib
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from pathlib import Path
@@ -17,6 +19,7 @@ import jwt
 
 from trusted_data_agent.auth.database import get_db_session
 from trusted_data_agent.auth.models import AuthToken, User
+from trusted_data_agent.core.config import APP_CONFIG
 
 logger = logging.getLogger("quart.app")
 
@@ -620,9 +623,159 @@ def get_token_prefix(token: str) -> str:
     return token[:12] if len(token) >= 12 else token
 
 
+# ---------------------------------------------------------------------------
+# Access token cache + write-behind usage tracking
+# ---------------------------------------------------------------------------
+# Automation clients reuse one access token for hundreds of requests per second.
+# Verified tokens are cached like JWTs in middleware._auth_cache, and their
+# last_used_at / use_count updates are aggregated in memory and written by a
+# background thread in one batched UPDATE instead of one commit per request.
+_access_token_cache: dict = {}  # token_hash -> (User, token_id, expires_at, cached_at)
+_pending_token_usage: dict = {}  # token_id -> [use_count delta, last_used_at]
+_access_token_lock = threading.Lock()
+_usage_flush_lock = threading.Lock()  # Serialises flushes (background thread vs. shutdown/listing)
+_usage_flusher: Optional[threading.Thread] = None
+_usage_flusher_stop = threading.Event()
+
+
+def invalidate_access_token_cache(token_hash: str = None, user_id: str = None):
+    """
+    Drop cached access token verifications.
+
+    Removes the entry for ``token_hash``, every entry of ``user_id`` (after the
+    user is edited or deactivated), or the whole cache when neither is given.
+    """
+    with _access_token_lock:
+        if token_hash:
+            _access_token_cache.pop(token_hash, None)
+        elif user_id:
+            for key in [k for k, v in _access_token_cache.items() if v[0].id == user_id]:
+                del _access_token_cache[key]
+        else:
+            _access_token_cache.clear()
+
+
+def _get_cached_access_token(token_hash: str) -> Optional[tuple]:
+    """Return ``(User, token_id)`` for a fresh, unexpired cache entry."""
+    ttl = APP_CONFIG.ACCESS_TOKEN_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return None
+    with _access_token_lock:
+        cached = _access_token_cache.get(token_hash)
+        if cached is None:
+            return None
+        user, token_id, expires_at, cached_at = cached
+        now = time.time()
+        if now - cached_at >= ttl or (expires_at is not None and expires_at.timestamp() <= now):
+            del _access_token_cache[token_hash]
+            return None
+        return user, token_id
+
+
+def _cache_access_token(token_hash: str, user: User, token_id: str, expires_at: Optional[datetime]):
+    if APP_CONFIG.ACCESS_TOKEN_CACHE_TTL_SECONDS <= 0:
+        return
+    if expires_at is not None and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    with _access_token_lock:
+        if token_hash not in _access_token_cache and len(_access_token_cache) >= APP_CONFIG.ACCESS_TOKEN_CACHE_MAX_SIZE:
+            oldest_key = min(_access_token_cache, key=lambda k: _access_token_cache[k][3])
+            del _access_token_cache[oldest_key]
+        _access_token_cache[token_hash] = (user, token_id, expires_at, time.time())
+
+
+def _record_token_usage(token_id: str, used_at: datetime):
+    """Count one use of an access token (buffered unless write-behind is disabled)."""
+    if APP_CONFIG.ACCESS_TOKEN_USAGE_FLUSH_SECONDS <= 0:
+        _write_token_usage({token_id: [1, used_at]})
+        return
+    global _usage_flusher
+    with _access_token_lock:
+        pending = _pending_token_usage.get(token_id)
+        if pending is None:
+            _pending_token_usage[token_id] = [1, used_at]
+        else:
+            pending[0] += 1
+            pending[1] = used_at
+        if _usage_flusher is None or not _usage_flusher.is_alive():
+            _usage_flusher_stop.clear()
+            _usage_flusher = threading.Thread(
+                target=_usage_flush_loop, name="access-token-usage-flusher", daemon=True
+            )
+            _usage_flusher.start()
+
+
+def _write_token_usage(pending: dict):
+    """Apply aggregated ``{token_id: [delta, last_used_at]}`` in one executemany UPDATE."""
+    from sqlalchemy import bindparam
+    from trusted_data_agent.auth.models import AccessToken
+
+    table = AccessToken.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == bindparam('b_id'))
+        .values(use_count=table.c.use_count + bindparam('b_delta'), last_used_at=bindparam('b_last_used'))
+    )
+    rows = [
+        {'b_id': token_id, 'b_delta': delta, 'b_last_used': last_used}
+        for token_id, (delta, last_used) in pending.items()
+    ]
+    with get_db_session() as session:
+        session.execute(stmt, rows)
+
+
+def flush_access_token_usage() -> int:
+    """
+    Write buffered access token usage to the database.
+
+    Returns:
+        Number of tokens whose counters were written
+    """
+    with _usage_flush_lock:
+        with _access_token_lock:
+            if not _pending_token_usage:
+                return 0
+            pending = dict(_pending_token_usage)
+            _pending_token_usage.clear()
+        try:
+            _write_token_usage(pending)
+        except Exception as e:
+            logger.warning(f"Failed to flush access token usage for {len(pending)} token(s), will retry: {e}")
+            # Merge back so no uses are lost; the next flush retries
+            with _access_token_lock:
+                for token_id, (delta, last_used) in pending.items():
+                    current = _pending_token_usage.get(token_id)
+                    if current is None:
+                        _pending_token_usage[token_id] = [delta, last_used]
+                    else:
+                        current[0] += delta
+                        current[1] = max(current[1], last_used)
+            return 0
+    return len(pending)
+
+
+def _usage_flush_loop():
+    while not _usage_flusher_stop.wait(APP_CONFIG.ACCESS_TOKEN_USAGE_FLUSH_SECONDS):
+        flush_access_token_usage()
+
+
+def stop_access_token_usage_flusher():
+    """Stop the background flusher and write any remaining usage (call on shutdown)."""
+    global _usage_flusher
+    _usage_flusher_stop.set()
+    flusher, _usage_flusher = _usage_flusher, None
+    if flusher is not None:
+        flusher.join(timeout=10)
+    flush_access_token_usage()
+
+
 def verify_access_token(token: str) -> Optional[User]:
     """
     Verify an access token and return the associated user.
+
+    Valid tokens are served from a short-lived in-process cache; usage
+    counters are buffered and written in batches (see APP_CONFIG
+    ACCESS_TOKEN_CACHE_TTL_SECONDS / ACCESS_TOKEN_USAGE_FLUSH_SECONDS).
     
     Args:
         token: Full access token string
@@ -636,6 +789,15 @@ def verify_access_token(token: str) -> Optional[User]:
         return None
     
     token_hash = hash_access_token(token)
+
+    cached = _get_cached_access_token(token_hash)
+    if cached is not None:
+        user, token_id = cached
+        try:
+            _record_token_usage(token_id, datetime.now(timezone.utc))
+        except Exception as e:
+            logger.warning(f"Failed to record access token usage: {e}")
+        return user
     
     try:
         with get_db_session() as session:
@@ -660,27 +822,17 @@ def verify_access_token(token: str) -> Optional[User]:
             
             if not user:
                 return None
+
+            token_id = access_token.id
+            expires_at = access_token.expires_at
             
-            # Update last used timestamp BEFORE loading user attributes
-            access_token.last_used_at = datetime.now(timezone.utc)
-            access_token.use_count += 1
-            session.commit()
-            
-            # Now load all user attributes AFTER commit (so they don't get expired)
-            # Access each attribute to force SQLAlchemy to load it into the instance
-            _ = user.id
-            _ = user.username
-            _ = user.id
-            _ = user.email
-            _ = user.display_name
-            _ = user.is_admin
-            _ = user.is_active
-            _ = user.created_at
-            _ = user.last_login_at
-            
-            # Detach from session
+            # Detach from session (attributes were loaded by the query and
+            # nothing is committed here, so they stay populated)
             session.expunge(user)
-            return user
+
+        _cache_access_token(token_hash, user, token_id, expires_at)
+        _record_token_usage(token_id, datetime.now(timezone.utc))
+        return user
             
     except Exception as e:
         logger.error(f"Error verifying access token: {e}", exc_info=True)
@@ -758,10 +910,13 @@ def revoke_access_token(token_id: str, user_id: str) -> bool:
             if not access_token:
                 return False
             
+            token_hash = access_token.token_hash
             access_token.revoked = True
             access_token.revoked_at = datetime.now(timezone.utc)
             session.commit()
-            
+        
+        # Revoked tokens must not be served from the verification cache
+        invalidate_access_token_cache(token_hash=token_hash)
         logger.info(f"Revoked access token {token_id} for user {user_id}")
         return True
         
@@ -783,6 +938,9 @@ def list_access_tokens(user_id: str, include_revoked: bool = False) -> list:
     """
     from trusted_data_agent.auth.models import AccessToken
     
+    # Write buffered usage first so last_used_at / use_count are current
+    flush_access_token_usage()
+    
     try:
         with get_db_session() as session:
             query = session.query(AccessToken).filter_by(user_id=user_id)
@@ -2,6 +2,8 @@
 Token quota management and enforcement.
 
 Tracks and enforces token consumption limits based on user consumption profiles.
+Profiles and usage counters are served by the in-memory usage ledger
+(usage_ledger.py), which checkpoints usage to ``user_token_usage``.
 """
 
 import logging
@@ -11,6 +13,7 @@ from sqlalchemy import func
 
 from trusted_data_agent.auth.database import get_db_session
 from trusted_data_agent.auth.models import User, ConsumptionProfile, UserTokenUsage
+from trusted_data_agent.auth.usage_ledger import get_usage_ledger
 
 logger = logging.getLogger("quart.app")
 
@@ -31,49 +34,55 @@ def get_user_consumption_profile(user_id: str) -> Optional[Dict]:
         Profile dictionary or None
     """
     try:
-        with get_db_session() as session:
-            user = session.query(User).filter_by(id=user_id).first()
-            if not user:
-                return None
-            
-            # If user has a profile assigned, use it
-            if user.consumption_profile_id:
-                profile = session.query(ConsumptionProfile).filter_by(
-                    id=user.consumption_profile_id,
-                    is_active=True
-                ).first()
-                if profile:
-                    # Return as dict to avoid detached instance issues
-                    return {
-                        'id': profile.id,
-                        'name': profile.name,
-                        'prompts_per_hour': profile.prompts_per_hour,
-                        'prompts_per_day': profile.prompts_per_day,
-                        'config_changes_per_hour': profile.config_changes_per_hour,
-                        'input_tokens_per_month': profile.input_tokens_per_month,
-                        'output_tokens_per_month': profile.output_tokens_per_month
-                    }
-            
-            # Otherwise, get the default profile
-            default_profile = session.query(ConsumptionProfile).filter_by(
-                is_default=True,
+        profile = get_usage_ledger().get_profile('quota', user_id, _query_consumption_profile)
+        # Copy so callers cannot modify the cached entry
+        return dict(profile) if profile else None
+    except Exception as e:
+        logger.error(f"Error fetching consumption profile for user {user_id}: {e}", exc_info=True)
+        return None
+
+
+def _query_consumption_profile(user_id: str) -> Optional[Dict]:
+    with get_db_session() as session:
+        user = session.query(User).filter_by(id=user_id).first()
+        if not user:
+            return None
+        
+        # If user has a profile assigned, use it
+        if user.consumption_profile_id:
+            profile = session.query(ConsumptionProfile).filter_by(
+                id=user.consumption_profile_id,
                 is_active=True
             ).first()
-            
-            if default_profile:
+            if profile:
+                # Return as dict to avoid detached instance issues
                 return {
-                    'id': default_profile.id,
-                    'name': default_profile.name,
-                    'prompts_per_hour': default_profile.prompts_per_hour,
-                    'prompts_per_day': default_profile.prompts_per_day,
-                    'config_changes_per_hour': default_profile.config_changes_per_hour,
-                    'input_tokens_per_month': default_profile.input_tokens_per_month,
-                    'output_tokens_per_month': default_profile.output_tokens_per_month
+                    'id': profile.id,
+                    'name': profile.name,
+                    'prompts_per_hour': profile.prompts_per_hour,
+                    'prompts_per_day': profile.prompts_per_day,
+                    'config_changes_per_hour': profile.config_changes_per_hour,
+                    'input_tokens_per_month': profile.input_tokens_per_month,
+                    'output_tokens_per_month': profile.output_tokens_per_month
                 }
-            
-            return None
-    except Exception as e:
-        logger.error(f"Error fetching consumption profile for user {user_id}: {e}", exc_info=True)
+        
+        # Otherwise, get the default profile
+        default_profile = session.query(ConsumptionProfile).filter_by(
+            is_default=True,
+            is_active=True
+        ).first()
+        
+        if default_profile:
+            return {
+                'id': default_profile.id,
+                'name': default_profile.name,
+                'prompts_per_hour': default_profile.prompts_per_hour,
+                'prompts_per_day': default_profile.prompts_per_day,
+                'config_changes_per_hour': default_profile.config_changes_per_hour,
+                'input_tokens_per_month': default_profile.input_tokens_per_month,
+                'output_tokens_per_month': default_profile.output_tokens_per_month
+            }
+        
         return None
 
 
@@ -165,42 +174,44 @@ def check_token_quota(
                 'output_remaining': None
             }
         
-        # Get current usage
+        # Get current usage (in-memory ledger, no DB round trip once loaded)
         period = get_current_period()
-        usage = get_user_token_usage(user_id, period)
+        usage = get_usage_ledger().get_usage(user_id, period)
+        input_used = usage['input_tokens_used']
+        output_used = usage['output_tokens_used']
         
         quota_info = {
             'input_limit': profile['input_tokens_per_month'],
             'output_limit': profile['output_tokens_per_month'],
-            'input_used': usage.input_tokens_used,
-            'output_used': usage.output_tokens_used,
+            'input_used': input_used,
+            'output_used': output_used,
             'input_remaining': None,
             'output_remaining': None
         }
         
         # Check input token quota
         if profile['input_tokens_per_month'] is not None:
-            input_remaining = profile['input_tokens_per_month'] - usage.input_tokens_used
+            input_remaining = profile['input_tokens_per_month'] - input_used
             quota_info['input_remaining'] = input_remaining
             
-            if usage.input_tokens_used + input_tokens > profile['input_tokens_per_month']:
+            if input_used + input_tokens > profile['input_tokens_per_month']:
                 return False, (
                     f"Input token quota exceeded. "
                     f"Limit: {profile['input_tokens_per_month']:,}/month, "
-                    f"Used: {usage.input_tokens_used:,}, "
+                    f"Used: {input_used:,}, "
                     f"Remaining: {input_remaining:,}"
                 ), quota_info
         
         # Check output token quota
         if profile['output_tokens_per_month'] is not None:
-            output_remaining = profile['output_tokens_per_month'] - usage.output_tokens_used
+            output_remaining = profile['output_tokens_per_month'] - output_used
             quota_info['output_remaining'] = output_remaining
             
-            if usage.output_tokens_used + output_tokens > profile['output_tokens_per_month']:
+            if output_used + output_tokens > profile['output_tokens_per_month']:
                 return False, (
                     f"Output token quota exceeded. "
                     f"Limit: {profile['output_tokens_per_month']:,}/month, "
-                    f"Used: {usage.output_tokens_used:,}, "
+                    f"Used: {output_used:,}, "
                     f"Remaining: {output_remaining:,}"
                 ), quota_info
         
@@ -220,6 +231,9 @@ def record_token_usage(
     """
     Record token usage for a user.
     
+    Usage is added to the in-memory ledger and written to ``user_token_usage``
+    at the next checkpoint.
+    
     Args:
         user_id: User's unique identifier
         input_tokens: Number of input tokens used
@@ -229,36 +243,13 @@ def record_token_usage(
         True if recorded successfully, False otherwise
     """
     try:
-        period = get_current_period()
+        get_usage_ledger().record_usage(user_id, input_tokens, output_tokens)
         
-        with get_db_session() as session:
-            usage = session.query(UserTokenUsage).filter_by(
-                user_id=user_id,
-                period=period
-            ).first()
-            
-            if not usage:
-                usage = UserTokenUsage(
-                    user_id=user_id,
-                    period=period,
-                    input_tokens_used=input_tokens,
-                    output_tokens_used=output_tokens,
-                    total_tokens_used=input_tokens + output_tokens
-                )
-                session.add(usage)
-            else:
-                usage.input_tokens_used += input_tokens
-                usage.output_tokens_used += output_tokens
-                usage.total_tokens_used += (input_tokens + output_tokens)
-                usage.last_usage_at = datetime.now(timezone.utc)
-            
-            session.commit()
-            
-            logger.debug(
-                f"Recorded token usage for user {user_id[:8]}: "
-                f"input={input_tokens}, output={output_tokens}"
-            )
-            return True
+        logger.debug(
+            f"Recorded token usage for user {user_id[:8]}: "
+            f"input={input_tokens}, output={output_tokens}"
+        )
+        return True
             
     except Exception as e:
         logger.error(f"Error recording token usage for user {user_id}: {e}", exc_info=True)
@@ -279,25 +270,7 @@ def get_user_quota_status(user_id: str) -> Dict:
         profile = get_user_consumption_profile(user_id)
         period = get_current_period()
         
-        # Get usage and convert to dict within session context
-        with get_db_session() as session:
-            usage_obj = session.query(UserTokenUsage).filter_by(
-                user_id=user_id,
-                period=period
-            ).first()
-            
-            if usage_obj:
-                usage = {
-                    'input_tokens_used': usage_obj.input_tokens_used,
-                    'output_tokens_used': usage_obj.output_tokens_used,
-                    'total_tokens_used': usage_obj.total_tokens_used
-                }
-            else:
-                usage = {
-                    'input_tokens_used': 0,
-                    'output_tokens_used': 0,
-                    'total_tokens_used': 0
-                }
+        usage = get_usage_ledger().get_usage(user_id, period)
         
         if not profile:
             return {
@@ -0,0 +1,334 @@
+"""
+In-memory usage ledger for consumption-profile enforcement.
+
+Quota checks (``ConsumptionEnforcer``, ``token_quota``) read from this ledger
+instead of querying ``user_token_usage`` and the user's profile per prompt:
+
+  - **Profiles**    — resolved limits are cached per user for
+                      CONSUMPTION_PROFILE_CACHE_TTL_SECONDS. Admin edits to
+                      profiles, assignments and the global override call
+                      ``invalidate_consumption_profiles()``, which only
+                      clears the cache of the worker that served the edit:
+                      other workers keep enforcing the old limits for up to
+                      the TTL.
+  - **Counters**    — monthly token usage per (user, period) is loaded once from
+                      ``user_token_usage`` and then kept in memory;
+                      ``record_usage()`` only adds to it.
+  - **Checkpoints** — a background thread writes the accumulated deltas every
+                      CONSUMPTION_LEDGER_CHECKPOINT_SECONDS as additive upserts
+                      (workers never overwrite each other) and re-reads the
+                      stored totals, which folds in usage recorded by other
+                      workers. Shutdown writes whatever is left, and a
+                      restarted process starts from the stored totals, so at
+                      most one checkpoint interval is lost on a crash.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+from trusted_data_agent.auth.database import get_db_session
+from trusted_data_agent.auth.models import UserTokenUsage
+from trusted_data_agent.core.config import APP_CONFIG
+
+logger = logging.getLogger("quart.app")
+
+_READ_BATCH = 500  # (user, period) pairs re-read per query after a checkpoint
+_IDLE_EVICT_SECONDS = 3600  # Counters untouched this long (and fully written) are dropped
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m")
+
+
+def _previous_period(now: datetime) -> str:
+    return current_period(now.replace(day=1) - timedelta(days=1))
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _PeriodUsage:
+    """Token usage of one user in one period: stored totals plus unwritten deltas."""
+
+    __slots__ = ("base_input", "base_output", "pending_input", "pending_output",
+                 "last_usage_at", "dirty", "touched")
+
+    def __init__(self, input_used: int = 0, output_used: int = 0, last_usage_at: Optional[datetime] = None):
+        self.base_input = input_used
+        self.base_output = output_used
+        self.pending_input = 0
+        self.pending_output = 0
+        self.last_usage_at = last_usage_at
+        self.dirty = False  # Usage recorded since the last checkpoint
+        self.touched = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        input_used = self.base_input + self.pending_input
+        output_used = self.base_output + self.pending_output
+        return {
+            "input_tokens_used": input_used,
+            "output_tokens_used": output_used,
+            "total_tokens_used": input_used + output_used,
+            "last_usage_at": self.last_usage_at,
+        }
+
+
+class UsageLedger:
+    """Process-wide cache of consumption profiles and per-user token counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._usage: Dict[Tuple[str, str], _PeriodUsage] = {}
+        self._profiles: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ── Profiles ──────────────────────────────────────────────────────────────
+
+    def get_profile(self, kind: str, user_id: str, loader: Callable[[str], Any]) -> Any:
+        """Return ``loader(user_id)``, cached per (kind, user). Exceptions are not cached."""
+        ttl = APP_CONFIG.CONSUMPTION_PROFILE_CACHE_TTL_SECONDS
+        key = (kind, user_id)
+        if ttl > 0:
+            with self._lock:
+                cached = self._profiles.get(key)
+            if cached is not None and time.time() - cached[1] < ttl:
+                return cached[0]
+        value = loader(user_id)
+        if ttl > 0:
+            with self._lock:
+                self._profiles[key] = (value, time.time())
+        return value
+
+    def invalidate_profiles(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._profiles.clear()
+            else:
+                for key in [k for k in self._profiles if k[1] == user_id]:
+                    del self._profiles[key]
+
+    # ── Counters ──────────────────────────────────────────────────────────────
+
+    def _entries(self, user_id: str, periods: Tuple[str, ...]) -> Dict[str, _PeriodUsage]:
+        """Return the counters of ``periods``, loading missing ones from the database."""
+        with self._lock:
+            found = {p: self._usage[(user_id, p)] for p in periods if (user_id, p) in self._usage}
+        missing = [p for p in periods if p not in found]
+        if missing:
+            with get_db_session() as session:
+                rows = session.query(UserTokenUsage).filter(
+                    UserTokenUsage.user_id == user_id,
+                    UserTokenUsage.period.in_(missing),
+                ).all()
+                loaded = {
+                    row.period: _PeriodUsage(row.input_tokens_used, row.output_tokens_used, _as_utc(row.last_usage_at))
+                    for row in rows
+                }
+            with self._lock:
+                for period in missing:
+                    # Another thread may have loaded (and recorded into) it meanwhile
+                    found[period] = self._usage.setdefault(
+                        (user_id, period), loaded.get(period) or _PeriodUsage()
+                    )
+        now = time.time()
+        for entry in found.values():
+            entry.touched = now
+        return found
+
+    def get_usage(self, user_id: str, period: Optional[str] = None) -> Dict[str, Any]:
+        """Token usage of a user in ``period`` (default: current month)."""
+        period = period or current_period()
+        entry = self._entries(user_id, (period,))[period]
+        with self._lock:
+            return entry.snapshot()
+
+    def periods_used_since(self, user_id: str, since: datetime) -> int:
+        """Number of the user's usage periods (current and previous month) last used at or after ``since``."""
+        now = datetime.now(timezone.utc)
+        entries = self._entries(user_id, (current_period(now), _previous_period(now)))
+        since = _as_utc(since)
+        with self._lock:
+            return sum(1 for e in entries.values() if e.last_usage_at is not None and e.last_usage_at >= since)
+
+    def record_usage(self, user_id: str, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        """Add token usage to the current period; written at the next checkpoint."""
+        now = datetime.now(timezone.utc)
+        period = current_period(now)
+        entry = self._entries(user_id, (period,))[period]
+        with self._lock:
+            entry.pending_input += input_tokens
+            entry.pending_output += output_tokens
+            entry.last_usage_at = now
+            entry.dirty = True
+        if APP_CONFIG.CONSUMPTION_LEDGER_CHECKPOINT_SECONDS <= 0:
+            self.checkpoint()
+        else:
+            self._ensure_started()
+
+    # ── Checkpointing ─────────────────────────────────────────────────────────
+
+    def checkpoint(self) -> int:
+        """Write accumulated usage and refresh totals from the database.
+
+        Returns:
+            Number of (user, period) counters written
+        """
+        with self._checkpoint_lock:
+            writes = {}
+            with self._lock:
+                for key, entry in self._usage.items():
+                    if not entry.dirty:
+                        continue
+                    writes[key] = (entry.pending_input, entry.pending_output, entry.last_usage_at)
+                    # Move deltas into the base: the value seen by checks does not change
+                    entry.base_input += entry.pending_input
+                    entry.base_output += entry.pending_output
+                    entry.pending_input = entry.pending_output = 0
+                    entry.dirty = False
+            if writes:
+                try:
+                    self._write(writes)
+                except Exception as e:
+                    logger.error(f"Usage ledger checkpoint failed for {len(writes)} counter(s), will retry: {e}")
+                    self._restore(writes)
+                    return 0
+            try:
+                self._refresh()
+            except Exception as e:
+                logger.warning(f"Usage ledger refresh failed: {e}")
+            self._evict_idle()
+            return len(writes)
+
+    @staticmethod
+    def _write(writes: Dict[Tuple[str, str], Tuple[int, int, datetime]]) -> None:
+        """Add the deltas in one upsert on the unique (user_id, period) index.
+
+        An UPDATE-then-INSERT would race with another worker inserting the same
+        new period and fail the whole checkpoint on the unique index.
+        """
+        table = UserTokenUsage.__table__
+        rows = [
+            {
+                "user_id": user_id, "period": period,
+                "input_tokens_used": d_in, "output_tokens_used": d_out, "total_tokens_used": d_in + d_out,
+                "first_usage_at": last_usage_at, "last_usage_at": last_usage_at,
+            }
+            for (user_id, period), (d_in, d_out, last_usage_at) in writes.items()
+        ]
+        with get_db_session() as session:
+            dialect = session.get_bind().dialect.name
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            elif dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                raise NotImplementedError(f"Usage ledger checkpoints need ON CONFLICT support (dialect: {dialect})")
+            stmt = insert(table)
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.period],
+                set_={
+                    "input_tokens_used": table.c.input_tokens_used + stmt.excluded.input_tokens_used,
+                    "output_tokens_used": table.c.output_tokens_used + stmt.excluded.output_tokens_used,
+                    "total_tokens_used": table.c.total_tokens_used + stmt.excluded.total_tokens_used,
+                    "last_usage_at": stmt.excluded.last_usage_at,
+                },
+            ), rows)
+
+    def _restore(self, writes: Dict[Tuple[str, str], Tuple[int, int, datetime]]) -> None:
+        # Entries are only evicted under the checkpoint lock, so all of them still exist
+        with self._lock:
+            for key, (d_in, d_out, _) in writes.items():
+                entry = self._usage[key]
+                entry.base_input -= d_in
+                entry.base_output -= d_out
+                entry.pending_input += d_in
+                entry.pending_output += d_out
+                entry.dirty = True
+
+    def _refresh(self) -> None:
+        """Re-read stored totals so usage written by other workers is counted."""
+        with self._lock:
+            keys = list(self._usage)
+        for i in range(0, len(keys), _READ_BATCH):
+            batch = keys[i:i + _READ_BATCH]
+            with get_db_session() as session:
+                rows = session.query(
+                    UserTokenUsage.user_id, UserTokenUsage.period, UserTokenUsage.input_tokens_used,
+                    UserTokenUsage.output_tokens_used, UserTokenUsage.last_usage_at,
+                ).filter(or_(*[
+                    and_(UserTokenUsage.user_id == user_id, UserTokenUsage.period == period)
+                    for user_id, period in batch
+                ])).all()
+            with self._lock:
+                for user_id, period, input_used, output_used, last_usage_at in rows:
+                    entry = self._usage.get((user_id, period))
+                    if entry is None:
+                        continue
+                    entry.base_input = input_used
+                    entry.base_output = output_used
+                    last_usage_at = _as_utc(last_usage_at)
+                    if last_usage_at and (entry.last_usage_at is None or last_usage_at > entry.last_usage_at):
+                        entry.last_usage_at = last_usage_at
+
+    def _evict_idle(self) -> None:
+        cutoff = time.time() - _IDLE_EVICT_SECONDS
+        with self._lock:
+            for key in [k for k, e in self._usage.items() if e.touched < cutoff and not e.dirty]:
+                del self._usage[key]
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="usage-ledger-checkpoint", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(APP_CONFIG.CONSUMPTION_LEDGER_CHECKPOINT_SECONDS):
+            self.checkpoint()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop the checkpoint thread and write the remaining usage."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self.checkpoint()
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide usage ledger."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = UsageLedger()
+    return _ledger
+
+
+def invalidate_consumption_profiles(user_id: Optional[str] = None) -> None:
+    """Drop cached profile limits of one user, or of everyone (profile or settings edits)."""
+    if _ledger is not None:
+        _ledger.invalidate_profiles(user_id)
+
+
+def shutdown_usage_ledger() -> None:
+    """Write pending usage on shutdown."""
+    if _ledger is not None:
+        _ledger.shutdown()
@@ -1876,6 +1876,9 @@ class AgentPackManager:
                     conn_kg.commit()
                 finally:
                     conn_kg.close()
+                # Rows were deleted directly — drop any cached graph/snapshot for this KG
+                from components.builtin.knowledge_graph.graph_store import GraphStore as _GS_delete
+                _GS_delete.invalidate_shared_graph(kg_id, self.db_path)
                 kgs_deleted += 1
                 app_logger.info(f"  Deleted KG id={kg_id} ('{res['resource_tag']}')")
             except Exception as e:
@@ -118,8 +118,7 @@ class CollectionDetector(BaseDetector):
         Returns separate lists for active and archived sessions.
         """
         from trusted_data_agent.core.config_manager import get_config_manager
-        from trusted_data_agent.core.session_manager import SESSIONS_DIR
-        import aiofiles
+        from trusted_data_agent.core.session_manager import SESSIONS_DIR, load_session_file
 
         active_sessions = []
         archived_sessions = []
@@ -135,9 +134,7 @@ class CollectionDetector(BaseDetector):
 
         for session_file in user_session_dir.glob("*.json"):
             try:
-                async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    session_data = json.loads(content)
+                session_data = await load_session_file(session_file)
 
                 session_id = session_data.get("id")
                 session_name = session_data.get("name", "Unnamed Session")
@@ -364,9 +361,8 @@ class ProfileDetector(BaseDetector):
         1. Direct: session.profile_id == artifact_id (current profile)
         2. Historical: artifact_id in session.profile_tags_used (historical usage)
         """
-        from trusted_data_agent.core.session_manager import SESSIONS_DIR
+        from trusted_data_agent.core.session_manager import SESSIONS_DIR, load_session_file
         from trusted_data_agent.core.config_manager import get_config_manager
-        import aiofiles
 
         active_sessions = []
         archived_sessions = []
@@ -385,9 +381,7 @@ class ProfileDetector(BaseDetector):
 
         for session_file in user_session_dir.glob("*.json"):
             try:
-                async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    session_data = json.loads(content)
+                session_data = await load_session_file(session_file)
 
                 session_id = session_data.get("id")
                 session_name = session_data.get("name", "Unnamed Session")
@@ -515,8 +509,7 @@ class McpServerDetector(BaseDetector):
         Sessions don't directly reference MCP servers - the relationship is:
         Session → Profile → MCP Server
         """
-        from trusted_data_agent.core.session_manager import SESSIONS_DIR
-        import aiofiles
+        from trusted_data_agent.core.session_manager import SESSIONS_DIR, load_session_file
 
         # First find profiles using this MCP server
         profiles_with_server = await self.find_profiles(artifact_id, user_uuid)
@@ -533,9 +526,7 @@ class McpServerDetector(BaseDetector):
 
         for session_file in user_session_dir.glob("*.json"):
             try:
-                async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    session_data = json.loads(content)
+                session_data = await load_session_file(session_file)
 
                 session_profile_id = session_data.get("profile_id")
 
@@ -627,8 +618,7 @@ class LlmConfigDetector(BaseDetector):
         Sessions don't directly reference LLM configs - the relationship is:
         Session → Profile → LLM Config
         """
-        from trusted_data_agent.core.session_manager import SESSIONS_DIR
-        import aiofiles
+        from trusted_data_agent.core.session_manager import SESSIONS_DIR, load_session_file
 
         # First find profiles using this LLM config
         profiles_with_config = await self.find_profiles(artifact_id, user_uuid)
@@ -645,9 +635,7 @@ class LlmConfigDetector(BaseDetector):
 
         for session_file in user_session_dir.glob("*.json"):
             try:
-                async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    session_data = json.loads(content)
+                session_data = await load_session_file(session_file)
 
                 session_profile_id = session_data.get("profile_id")
 
@@ -738,8 +726,7 @@ class AgentPackDetector(BaseDetector):
         Agent packs manage profiles and collections. Sessions use those resources.
         """
         from trusted_data_agent.core.agent_pack_db import AgentPackDB
-        from trusted_data_agent.core.session_manager import SESSIONS_DIR
-        import aiofiles
+        from trusted_data_agent.core.session_manager import SESSIONS_DIR, load_session_file
 
         # Get all resources managed by this pack
         pack_db = AgentPackDB()
@@ -768,9 +755,7 @@ class AgentPackDetector(BaseDetector):
 
         for session_file in user_session_dir.glob("*.json"):
             try:
-                async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    session_data = json.loads(content)
+                session_data = await load_session_file(session_file)
 
                 session_id = session_data.get("id")
                 session_name = session_data.get("name", "Unnamed Session")
@@ -3,6 +3,8 @@ import os
 import asyncio
 from dotenv import load_dotenv
 
+from trusted_data_agent.core.task_registry import TaskRegistry
+
 load_dotenv()
 
 class AppConfig:
@@ -28,6 +30,29 @@ class AppConfig:
 
     # --- Database ---
     AUTH_DB_PATH = None  # Absolute path to tda_auth.db; set by init_database() at startup
+    # Per-user configurations (ConfigManager) are cached per process, least recently used evicted first.
+    # A cached config is re-checked against user_preferences.config_version at most once per interval,
+    # so writes from other workers become visible within it. 0 checks on every load.
+    CONFIG_CACHE_MAX_USERS = int(os.environ.get('TDA_CONFIG_CACHE_MAX_USERS', '500'))
+    CONFIG_CACHE_VERSION_CHECK_SECONDS = float(os.environ.get('TDA_CONFIG_CACHE_VERSION_CHECK_SECONDS', '2.0'))
+
+    # --- Authentication ---
+    # Validated access tokens (tda_...) are cached per process; revoking a token or editing/deactivating
+    # its user invalidates the entry immediately, the TTL bounds staleness for anything else. 0 disables the cache.
+    ACCESS_TOKEN_CACHE_TTL_SECONDS = int(os.environ.get('TDA_ACCESS_TOKEN_CACHE_TTL_SECONDS', '60'))
+    ACCESS_TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TDA_ACCESS_TOKEN_CACHE_MAX_SIZE', '10000'))
+    # last_used_at / use_count are aggregated in memory and written in one batch per interval. 0 writes on every request.
+    ACCESS_TOKEN_USAGE_FLUSH_SECONDS = float(os.environ.get('TDA_ACCESS_TOKEN_USAGE_FLUSH_SECONDS', '5.0'))
+    # Rate limiter token buckets: "memory" is per process (each worker enforces its own limits),
+    # "sqlite" shares them between all local workers through one WAL-mode file (needs SQLite 3.35+,
+    # otherwise memory is used; a check that finds the file busy for ~75 ms is allowed).
+    RATE_LIMIT_STORAGE = os.environ.get('TDA_RATE_LIMIT_STORAGE', 'memory').lower()
+    RATE_LIMIT_DB = os.environ.get('TDA_RATE_LIMIT_DB', '')  # Empty = tda_rate_limits.db in the project root
+    # Consumption enforcement reads profiles and monthly token usage from an in-memory ledger
+    # (auth/usage_ledger.py). Admin edits invalidate cached profiles only in the worker that served the edit;
+    # other workers keep enforcing the previous limits for up to this TTL.
+    CONSUMPTION_PROFILE_CACHE_TTL_SECONDS = int(os.environ.get('TDA_CONSUMPTION_PROFILE_CACHE_TTL_SECONDS', '60'))
+    CONSUMPTION_LEDGER_CHECKPOINT_SECONDS = float(os.environ.get('TDA_CONSUMPTION_LEDGER_CHECKPOINT_SECONDS', '5.0'))  # 0 writes on every record
 
     # --- Connection & Model State ---
     SERVICES_CONFIGURED = False # Master flag indicating if the core services (LLM, MCP) have been successfully configured.
@@ -73,6 +98,8 @@ class AppConfig:
     # Knowledge chunking defaults
     KNOWLEDGE_CHUNK_SIZE = 1_000  # Default chunk size in characters for document segmentation
     KNOWLEDGE_CHUNK_OVERLAP = 200  # Overlap between consecutive document chunks
+    KNOWLEDGE_SEMANTIC_EMBED_BATCH = 64  # Sentences embedded per batch by semantic chunking
+    KNOWLEDGE_SEMANTIC_BREAKPOINT_STDDEV = 1.0  # Topic shift: adjacent-sentence distance above running mean + N * stddev
 
     # LLM output limits
     LLM_MAX_OUTPUT_TOKENS = 16_384  # Max output tokens for LLM generation calls
@@ -81,6 +108,53 @@ class AppConfig:
     # Set to 0 to disable. Applies to every _call_llm_and_update_tokens() invocation.
     LLM_CALL_TIMEOUT_SECONDS = 120
 
+    # Opt-in response cache for deterministic utility LLM calls (session naming, date/profile
+    # classification, knowledge reranking). See llm/response_cache.py.
+    LLM_RESPONSE_CACHE_ENABLED = os.environ.get('TDA_LLM_RESPONSE_CACHE_ENABLED', 'false').lower() == 'true'
+    LLM_RESPONSE_CACHE_REASONS = os.environ.get('TDA_LLM_RESPONSE_CACHE_REASONS', 'session_name,date_classification,profile_classification,knowledge_rerank')  # Comma-separated cache reasons to serve from the cache
+    LLM_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('TDA_LLM_RESPONSE_CACHE_MAX_ENTRIES', '1024'))  # Memory-tier LRU bound
+    LLM_RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('TDA_LLM_RESPONSE_CACHE_TTL_SECONDS', '86400'))
+    LLM_RESPONSE_CACHE_PERSIST = os.environ.get('TDA_LLM_RESPONSE_CACHE_PERSIST', 'true').lower() == 'true'  # Keep a SQLite tier next to the memory tier
+    LLM_RESPONSE_CACHE_DB = os.environ.get('TDA_LLM_RESPONSE_CACHE_DB', '')  # Empty = tda_llm_cache.db in the project root
+
+    # MCP session pooling — reuse warm MCP client sessions across tool calls instead of
+    # performing a full transport handshake per call. See mcp_adapter/session_pool.py.
+    MCP_SESSION_POOL_ENABLED = os.environ.get('TDA_MCP_SESSION_POOL_ENABLED', 'true').lower() == 'true'
+    MCP_SESSION_POOL_MAX_PER_SERVER = int(os.environ.get('TDA_MCP_SESSION_POOL_MAX_PER_SERVER', '4'))  # Concurrency cap per (user, server)
+    MCP_SESSION_POOL_IDLE_TTL_SECONDS = 300  # Idle sessions older than this are closed
+    MCP_SESSION_POOL_HEALTH_CHECK_SECONDS = 60  # Sessions idle longer than this are pinged before reuse
+
+    # Concurrent FASTPATH loops — a single-tool loop starts the MCP calls for upcoming items
+    # while earlier items are processed; results and events stay in item order.
+    # Opt-in: calls already sent for later items still run when an earlier item fails or
+    # aborts the loop, so only enable it for MCP servers whose loop tools are read-only.
+    FASTPATH_LOOP_CONCURRENCY = int(os.environ.get('TDA_FASTPATH_LOOP_CONCURRENCY', '1'))  # Calls in flight per loop (1 = sequential)
+    FASTPATH_MAX_CONCURRENCY_PER_SERVER = int(os.environ.get('TDA_FASTPATH_MAX_CONCURRENCY_PER_SERVER', '4'))  # Shared by all loops of a user; only without the MCP session pool
+
+    # Genie child dispatch — a coordinator running inside the server submits child queries
+    # straight to the execution service and awaits the task instead of HTTP loopback + polling.
+    GENIE_IN_PROCESS_DISPATCH = os.environ.get('TDA_GENIE_IN_PROCESS_DISPATCH', 'true').lower() == 'true'  # Remote base URLs always use HTTP
+    GENIE_HTTP_POLL_INTERVAL_SECONDS = 1.0  # Task status poll interval of the HTTP path
+
+    # REST background task registry — finished tasks are evicted after a TTL or when over the
+    # size cap; long task event logs spill to SQLite. See core/task_registry.py.
+    TASK_REGISTRY_MAX_TASKS = int(os.environ.get('TDA_TASK_REGISTRY_MAX_TASKS', '1000'))  # Finished tasks kept at most
+    TASK_REGISTRY_TTL_SECONDS = int(os.environ.get('TDA_TASK_REGISTRY_TTL_SECONDS', '3600'))  # Lifetime of a finished task
+    TASK_EVENTS_MAX_IN_MEMORY = int(os.environ.get('TDA_TASK_EVENTS_MAX_IN_MEMORY', '2000'))  # Per task
+    # Relative paths resolve against the project root. Empty = drop events beyond the cap (the
+    # task snapshot reports them as events_dropped).
+    TASK_EVENT_SPILL_DB = os.environ.get('TDA_TASK_EVENT_SPILL_DB', 'tda_task_events.db')
+    TASK_WAIT_MAX_SECONDS = 60  # Upper bound for the long-poll timeout of GET /v1/tasks/<id>/wait
+
+    # MCP tool result ingestion — with the row cap set, large results are parsed row by row and
+    # rows beyond the cap are spilled to a JSONL file. See mcp_adapter/result_ingest.py.
+    MCP_RESULT_STREAMING_THRESHOLD_BYTES = 1_000_000  # With a row cap, results this large are parsed incrementally
+    # Opt-in row cap (0 = off). When set, `results` holds only the first N rows and the result's
+    # metadata carries results_truncated=True; the full dataset is available via iter_result_rows.
+    MCP_RESULT_MAX_ROWS_IN_MEMORY = int(os.environ.get('TDA_MCP_RESULT_MAX_ROWS_IN_MEMORY', '0'))
+    MCP_RESULT_SPILL_DIR = os.environ.get('TDA_MCP_RESULT_SPILL_DIR', '')  # Empty = <system temp>/uderia_tool_results
+    MCP_RESULT_SPILL_TTL_SECONDS = 6 * 3600  # Spill files older than this are removed
+
     SQL_OPTIMIZATION_PROMPTS = []
     SQL_OPTIMIZATION_TOOLS = ["base_readQuery"]
 
@@ -93,6 +167,12 @@ class AppConfig:
     RAG_NUM_EXAMPLES = 3 # Total number of few-shot examples to retrieve across all active collections
     RAG_DEFAULT_COLLECTION_NAME = "default_collection" # ChromaDB collection name for default collection (ID 0)
     AUTOCOMPLETE_MIN_RELEVANCE = 0.40  # Minimum cosine similarity for autocomplete suggestions (0.0-1.0)
+    RAG_PARALLEL_RETRIEVAL = True # If True, per-collection queries in retrieve_examples() run concurrently instead of one after another.
+    RAG_RETRIEVAL_MAX_WORKERS = 8 # Thread pool size for concurrent ChromaDB collection queries.
+    RAG_COLLECTION_QUERY_TIMEOUT_SECONDS = 10 # Per-collection deadline in parallel mode; slower collections are skipped (their query keeps its worker thread until it returns). 0 = no deadline.
+    KG_SEMANTIC_SEARCH_ENABLED = os.environ.get('TDA_KG_SEMANTIC_SEARCH_ENABLED', 'false').lower() == 'true' # Fuse knowledge graph FTS entity search with an embedding index in the default vector store.
+    KG_EMBEDDING_MODEL = os.environ.get('TDA_KG_EMBEDDING_MODEL', 'all-MiniLM-L6-v2') # Embedding model for the knowledge graph entity index.
+    KG_GRAPH_SNAPSHOT_ENABLED = os.environ.get('TDA_KG_GRAPH_SNAPSHOT_ENABLED', 'false').lower() == 'true' # Persist a compressed adjacency snapshot per knowledge graph so cold starts skip the full row scan.
     
     # Knowledge Repository Configuration (Knowledge Repositories = Domain Knowledge RAG)
     KNOWLEDGE_RAG_ENABLED = True # Master switch for knowledge repository retrieval during planning
@@ -103,8 +183,26 @@ class AppConfig:
     KNOWLEDGE_MAX_CHUNKS_PER_DOC = 0 # 0 = disabled (no per-document dedup). Limits chunks from same source document.
     KNOWLEDGE_FRESHNESS_WEIGHT = 0.0 # 0.0 = disabled (pure relevance). Blend: (1-w)*similarity + w*freshness
     KNOWLEDGE_FRESHNESS_DECAY_RATE = 0.005 # Exponential decay rate for freshness scoring. Higher = faster decay.
-    
+    # Knowledge CDC sync / reindex pipeline (see core/knowledge_sync.py): source fetches per resolver
+    # scheme run concurrently with chunk/embed/upsert of already-fetched documents.
+    KNOWLEDGE_SYNC_FETCH_CONCURRENCY = {"file": 8, "http": 4, "https": 4, "gdrive": 2}  # Concurrent fetches per scheme (unlisted schemes: 2)
+    KNOWLEDGE_SYNC_EMBED_CONCURRENCY = int(os.environ.get('TDA_KNOWLEDGE_SYNC_EMBED_CONCURRENCY', '2'))  # Documents chunked/embedded/upserted at once
+    KNOWLEDGE_SYNC_MAX_IN_FLIGHT = int(os.environ.get('TDA_KNOWLEDGE_SYNC_MAX_IN_FLIGHT', '16'))  # Documents fetched but not yet ingested (bounds memory)
+
     # Session & Analytics Configuration
+    # Session storage: "snapshot" rewrites the full session JSON on every save; "journal" appends
+    # per-save deltas to <session_id>.journal.jsonl and compacts them into the snapshot periodically.
+    # Code that scans session files directly must use session_manager.read_session_file/load_session_file to see pending deltas.
+    SESSION_STORAGE_MODE = os.environ.get('TDA_SESSION_STORAGE_MODE', 'snapshot').lower()
+    SESSION_JOURNAL_COMPACT_ENTRIES = 200 # Compact the journal into a snapshot after this many appended saves.
+    SESSION_JOURNAL_COMPACT_BYTES = 1_048_576 # ...or once the journal exceeds this size (or the snapshot's size, whichever is larger).
+    # Write-back session cache: keeps hot sessions parsed in memory and coalesces saves into one
+    # disk write per flush window. Opt-in: only safe with a single worker process per session directory.
+    # Ignored when SESSIONS_FILTER_BY_USER is off.
+    SESSION_CACHE_ENABLED = os.environ.get('TDA_SESSION_CACHE_ENABLED', 'false').lower() == 'true'
+    SESSION_CACHE_MAX_ENTRIES = int(os.environ.get('TDA_SESSION_CACHE_MAX_ENTRIES', '128')) # LRU bound on cached sessions.
+    SESSION_CACHE_FLUSH_DELAY_SECONDS = float(os.environ.get('TDA_SESSION_CACHE_FLUSH_DELAY_SECONDS', '1.0')) # Saves within this window are coalesced.
+    SESSION_USAGE_BATCHING_ENABLED = os.environ.get('TDA_SESSION_USAGE_BATCHING_ENABLED', 'true').lower() == 'true' # Queue per-LLM-call token/model bookkeeping and persist it once per phase/turn.
     SESSIONS_FILTER_BY_USER = os.environ.get('TDA_SESSIONS_FILTER_BY_USER', 'true').lower() == 'true' # If True, execution dashboard shows only current user's sessions. If False, shows all sessions. Note: User tier always filtered, Developer+ can override.
 
 
@@ -169,8 +267,17 @@ APP_STATE = {
     # Validated license information
     "license_info": None,
 
-    # Asynchronous task tracking for the REST API
-    "background_tasks": {},
+    # Set by create_app() once the REST query routes are registered; Genie coordinators
+    # only dispatch child queries in-process when this server can run them
+    "in_process_query_dispatch": False,
+
+    # Asynchronous task tracking for the REST API (bounded; see core/task_registry.py)
+    "background_tasks": TaskRegistry(
+        max_tasks=APP_CONFIG.TASK_REGISTRY_MAX_TASKS,
+        ttl_seconds=APP_CONFIG.TASK_REGISTRY_TTL_SECONDS,
+        max_events_in_memory=APP_CONFIG.TASK_EVENTS_MAX_IN_MEMORY,
+        spill_db_path=APP_CONFIG.TASK_EVENT_SPILL_DB,
+    ),
     
     # --- MODIFICATION START: Add RAG queue and instance placeholder ---
     # Asynchronous RAG processing queue and singleton instance
@@ -674,4 +781,11 @@ def clear_mcp_server_cache(server_id: str):
     client_pool = APP_STATE.get('mcp_client_pool', {})
     if server_id in client_pool:
         del client_pool[server_id]
-        logger.info(f"Cleared pooled MCP client for server {server_id}")
\ No newline at end of file
+        logger.info(f"Cleared pooled MCP client for server {server_id}")
+
+    # Retire warm MCP sessions opened against the old configuration
+    try:
+        from trusted_data_agent.mcp_adapter.session_pool import get_mcp_session_pool
+        get_mcp_session_pool().invalidate(server_id=server_id)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate MCP session pool for server {server_id}: {e}")
@@ -7,6 +7,11 @@ Handles saving and loading application configuration to/from tda_config.json.
 import json
 import logging
 import copy
+import hashlib
+import operator
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
@@ -14,6 +19,94 @@ from sqlalchemy import text
 
 app_logger = logging.getLogger("quart.app")
 
+_ANY_SERVER = object()  # first_tool_profile_id() key for "any MCP server"
+
+
+def _digest(data: str) -> bytes:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+
+class _SectionIndex:
+    """Dict-by-id view of one list section (profiles, llm_configurations, ...)."""
+
+    __slots__ = ("items", "members", "by_id", "tool_profiles")
+
+    def __init__(self, items: list):
+        self.items = items
+        self.members = tuple(items)
+        self.by_id: Dict[Any, Dict[str, Any]] = {}
+        for item in items:
+            if isinstance(item, dict):
+                self.by_id.setdefault(item.get("id"), item)  # First match wins, like a linear scan
+        self.tool_profiles: Optional[Dict[Any, str]] = None
+
+    def is_current(self, items: list) -> bool:
+        # Callers append to, remove from, replace elements of or replace the cached
+        # lists before saving; the index is current only if every element is the same object
+        return (self.items is items and len(self.members) == len(items)
+                and all(map(operator.is_, self.members, items)))
+
+
+class _CachedConfig:
+    """A user's configuration as cached by ConfigManager.
+
+    ``digests`` holds a hash per stored section (None when the stored state is
+    unknown, e.g. loaded from the legacy preferences_json blob) so save_config
+    can write only the sections that changed. ``version`` is the
+    user_preferences.config_version the cached config corresponds to.
+    ``stale`` marks an entry that must be reloaded on its next access,
+    regardless of when its version was last checked.
+    """
+
+    __slots__ = ("config", "digests", "version", "checked_at", "stale", "_indexes")
+
+    def __init__(self, config: Dict[str, Any], digests: Optional[Dict[str, bytes]], version: Optional[int]):
+        self.config = config
+        self.digests = digests
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.stale = False
+        self._indexes: Dict[str, _SectionIndex] = {}
+
+    def index(self, section: str) -> _SectionIndex:
+        items = self.config.get(section)
+        if not isinstance(items, list):
+            items = []
+        index = self._indexes.get(section)
+        if index is None or not index.is_current(items):
+            index = self._indexes[section] = _SectionIndex(items)
+        return index
+
+    def find(self, section: str, item_id: Any) -> Optional[Dict[str, Any]]:
+        item = self.index(section).by_id.get(item_id)
+        if item is not None and item.get("id") != item_id:
+            # The id was edited in place - rebuild once
+            self._indexes.pop(section, None)
+            item = self.index(section).by_id.get(item_id)
+        return item
+
+    def first_tool_profile_id(self, mcp_server_id: Optional[str]) -> Optional[str]:
+        """ID of the first tool_enabled profile (of ``mcp_server_id``, or of any server if None)."""
+        key = mcp_server_id if mcp_server_id else _ANY_SERVER
+        for _ in range(2):
+            index = self.index("profiles")
+            if index.tool_profiles is None:
+                first: Dict[Any, str] = {}
+                for profile in index.items:
+                    if isinstance(profile, dict) and profile.get("profile_type") != "llm_only":
+                        first.setdefault(profile.get("mcpServerId"), profile["id"])
+                        first.setdefault(_ANY_SERVER, profile["id"])
+                index.tool_profiles = first
+            profile_id = index.tool_profiles.get(key)
+            profile = index.by_id.get(profile_id) if profile_id is not None else None
+            if profile_id is None or (
+                profile is not None and profile.get("profile_type") != "llm_only"
+                and (key is _ANY_SERVER or profile.get("mcpServerId") == mcp_server_id)
+            ):
+                return profile_id
+            self._indexes.pop("profiles", None)  # Edited in place since the index was built
+        return None
+
 
 class ConfigManager:
     """
@@ -45,8 +138,178 @@ class ConfigManager:
             config_path = project_root / self.DEFAULT_CONFIG_FILENAME
         
         self.config_path = Path(config_path)
-        self._user_configs = {}  # Memory cache for loaded user configs from database
+        # LRU memory cache for loaded user configs from database: user_uuid -> _CachedConfig
+        self._user_configs: "OrderedDict[str, _CachedConfig]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         pass  # ConfigManager initialized
+
+    # ========================================================================
+    # PER-USER CONFIG CACHE
+    # ========================================================================
+
+    def _get_cached(self, user_uuid: str) -> Optional[_CachedConfig]:
+        """Return the cached config of a user, dropping it if another process has changed it since."""
+        from trusted_data_agent.core.config import APP_CONFIG
+
+        with self._cache_lock:
+            entry = self._user_configs.get(user_uuid)
+            if entry is None:
+                return None
+            self._user_configs.move_to_end(user_uuid)
+
+        if not entry.stale:
+            now = time.monotonic()
+            if now - entry.checked_at < APP_CONFIG.CONFIG_CACHE_VERSION_CHECK_SECONDS:
+                return entry
+            entry.checked_at = now
+            version = self._read_config_version(user_uuid)
+            if version is None or version == entry.version:
+                return entry
+
+        app_logger.info(f"Configuration of user {user_uuid} was changed by another process - reloading")
+        with self._cache_lock:
+            if self._user_configs.get(user_uuid) is entry:
+                del self._user_configs[user_uuid]
+        return None
+
+    def _cache_config(self, user_uuid: str, config: Dict[str, Any],
+                      digests: Optional[Dict[str, bytes]], version: Optional[int]) -> _CachedConfig:
+        """Cache a user's config (with fresh indexes), evicting the least recently used users."""
+        from trusted_data_agent.core.config import APP_CONFIG
+
+        entry = _CachedConfig(config, digests, version)
+        with self._cache_lock:
+            self._user_configs[user_uuid] = entry
+            self._user_configs.move_to_end(user_uuid)
+            while len(self._user_configs) > max(1, APP_CONFIG.CONFIG_CACHE_MAX_USERS):
+                self._user_configs.popitem(last=False)
+        return entry
+
+    def _find_by_id(self, items: list, section: str, item_id: Any,
+                    user_uuid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Find the item with ``item_id`` in ``items``, the user's ``section`` list.
+
+        Uses the cached dict-by-id index when ``items`` is the cached list,
+        otherwise (bootstrap template, detached copies) scans it.
+        """
+        entry = self._user_configs.get(user_uuid) if user_uuid else None
+        if entry is not None and entry.config.get(section) is items:
+            return entry.find(section, item_id)
+        return next((item for item in items if item.get("id") == item_id), None)
+
+    @staticmethod
+    def _read_config_version(user_uuid: str) -> Optional[int]:
+        try:
+            from trusted_data_agent.auth.database import get_db_session
+            from trusted_data_agent.auth.models import UserPreference
+
+            with get_db_session() as session:
+                version = session.query(UserPreference.config_version).filter_by(user_id=user_uuid).scalar()
+            return version or 0
+        except Exception as e:
+            app_logger.debug(f"Could not check configuration version for user {user_uuid}: {e}")
+            return None
+
+    @staticmethod
+    def _read_stored_config(user_uuid: str) -> Optional[tuple]:
+        """
+        Read a user's configuration from user_config_sections, falling back
+        to the legacy user_preferences.preferences_json blob.
+
+        Returns:
+            Tuple of (config, section digests or None, config_version), or None if nothing is stored
+        """
+        from trusted_data_agent.auth.database import get_db_session
+        from trusted_data_agent.auth.models import UserConfigSection, UserPreference
+
+        with get_db_session() as session:
+            prefs = session.query(
+                UserPreference.preferences_json, UserPreference.config_version
+            ).filter_by(user_id=user_uuid).first()
+            rows = session.query(
+                UserConfigSection.section, UserConfigSection.data_json
+            ).filter_by(user_id=user_uuid).all()
+
+        version = (prefs.config_version or 0) if prefs else 0
+        if rows:
+            config = {section: json.loads(data) for section, data in rows}
+            return config, {section: _digest(data) for section, data in rows}, version
+        if prefs and prefs.preferences_json:
+            return json.loads(prefs.preferences_json), None, version
+        return None
+
+    @staticmethod
+    def _read_stored_digests(user_uuid: str) -> tuple:
+        """
+        Digests of the user's stored sections and the config_version, for a save without a cached config.
+
+        Returns:
+            Tuple of (section digests, or None if no sections are stored yet, config_version)
+        """
+        from trusted_data_agent.auth.database import get_db_session
+        from trusted_data_agent.auth.models import UserConfigSection, UserPreference
+
+        with get_db_session() as session:
+            version = session.query(UserPreference.config_version).filter_by(user_id=user_uuid).scalar()
+            rows = session.query(
+                UserConfigSection.section, UserConfigSection.data_json
+            ).filter_by(user_id=user_uuid).all()
+        digests = {section: _digest(data) for section, data in rows} if rows else None
+        return digests, version or 0
+
+    @staticmethod
+    def _write_sections(user_uuid: str, sections: Dict[str, str], digests: Dict[str, bytes],
+                        stored_digests: Optional[Dict[str, bytes]]) -> tuple:
+        """
+        Write the sections whose digest differs from ``stored_digests`` and bump config_version.
+
+        Without ``stored_digests`` all of the user's sections are replaced (and
+        the legacy preferences_json blob is cleared).
+
+        Returns:
+            Tuple of (config_version after the write, number of sections written or removed)
+        """
+        from sqlalchemy import and_
+        from trusted_data_agent.auth.database import get_db_session
+        from trusted_data_agent.auth.models import UserConfigSection, UserPreference
+
+        if stored_digests is None:
+            changed = sections
+            removed = []
+        else:
+            changed = {name: data for name, data in sections.items() if stored_digests.get(name) != digests[name]}
+            removed = [name for name in stored_digests if name not in sections]
+
+        table = UserConfigSection.__table__
+        now = datetime.now(timezone.utc)
+        with get_db_session() as session:
+            prefs = session.query(UserPreference).filter_by(user_id=user_uuid).first()
+            if not prefs:
+                prefs = UserPreference(user_id=user_uuid, config_version=0)
+                session.add(prefs)
+                session.flush()
+            elif not changed and not removed:
+                return prefs.config_version or 0, 0
+
+            if stored_digests is None:
+                session.execute(table.delete().where(table.c.user_id == user_uuid))
+                prefs.preferences_json = None
+            elif changed or removed:
+                session.execute(table.delete().where(and_(
+                    table.c.user_id == user_uuid, table.c.section.in_(list(changed) + removed)
+                )))
+            if changed:
+                session.execute(table.insert(), [
+                    {"user_id": user_uuid, "section": name, "data_json": data, "updated_at": now}
+                    for name, data in changed.items()
+                ])
+            # Increment in SQL so concurrent writers never end up on the same version
+            prefs.config_version = UserPreference.config_version + 1
+            prefs.updated_at = now
+            session.flush()
+            version = session.query(UserPreference.config_version).filter_by(user_id=user_uuid).scalar()
+        return version, len(changed) + len(removed)
     
     def _get_default_config(self) -> Dict[str, Any]:
         """
@@ -112,38 +375,35 @@ class ConfigManager:
             return self._load_bootstrap_template()
         
         # Check memory cache first
-        if user_uuid in self._user_configs:
-            return self._user_configs[user_uuid]
+        cached = self._get_cached(user_uuid)
+        if cached is not None:
+            return cached.config
         
         # Load from database
         try:
-            from trusted_data_agent.auth.database import get_db_session
-            from trusted_data_agent.auth.models import UserPreference
-            
-            with get_db_session() as session:
-                prefs = session.query(UserPreference).filter_by(user_id=user_uuid).first()
-                
-                if prefs and prefs.preferences_json:
-                    # Load existing per-user configuration from database
-                    user_config = json.loads(prefs.preferences_json)
+            stored = self._read_stored_config(user_uuid)
+
+            if stored is not None:
+                # Load existing per-user configuration from database
+                user_config, digests, version = stored
 
-                    # Sync any new default profiles from bootstrap template
-                    original_profile_count = len(user_config.get("profiles", []))
-                    user_config = self._sync_new_default_profiles(user_config)
-                    new_profile_count = len(user_config.get("profiles", []))
+                # Sync any new default profiles from bootstrap template
+                original_profile_count = len(user_config.get("profiles", []))
+                user_config = self._sync_new_default_profiles(user_config)
+                new_profile_count = len(user_config.get("profiles", []))
 
-                    self._user_configs[user_uuid] = user_config
+                self._cache_config(user_uuid, user_config, digests, version)
 
-                    # If new profiles were added, save the updated config
-                    if new_profile_count > original_profile_count:
-                        self.save_config(user_config, user_uuid)
+                # If new profiles were added, save the updated config
+                if new_profile_count > original_profile_count:
+                    self.save_config(user_config, user_uuid)
 
-                    # Ensure default vector store config exists and migrate inline configs
-                    self.ensure_default_vector_store_config(user_uuid)
-                    self.migrate_inline_vector_store_configs(user_uuid)
+                # Ensure default vector store config exists and migrate inline configs
+                self.ensure_default_vector_store_config(user_uuid)
+                self.migrate_inline_vector_store_configs(user_uuid)
 
-                    app_logger.info(f"Loaded configuration from database for user {user_uuid}")
-                    return user_config
+                app_logger.info(f"Loaded configuration from database for user {user_uuid}")
+                return user_config
         except Exception as e:
             app_logger.error(f"Error loading config from database for user {user_uuid}: {e}", exc_info=True)
         
@@ -173,7 +433,7 @@ class ConfigManager:
 
         app_logger.info(f"Bootstrap complete for user {user_uuid} - no default/master/active profiles auto-set (user must activate a profile first)")
 
-        self._user_configs[user_uuid] = user_config
+        self._cache_config(user_uuid, user_config, None, None)
 
         # Save to database for future loads
         self.save_config(user_config, user_uuid)
@@ -265,8 +525,14 @@ class ConfigManager:
 
     def save_config(self, config: Dict[str, Any], user_uuid: Optional[str] = None) -> bool:
         """
-        Save per-user configuration to database (user_preferences).
+        Save per-user configuration to database (user_config_sections).
         tda_config.json is never modified - it serves only as bootstrap template.
+
+        Each top-level key is stored as its own row and only the sections that
+        changed since the last load/save are written, so e.g. switching the
+        active MCP server does not rewrite all profiles. Every write bumps
+        user_preferences.config_version, which invalidates the cached config
+        in other processes.
         
         Args:
             config: Configuration dictionary to save
@@ -283,26 +549,32 @@ class ConfigManager:
             # Update last_modified timestamp
             config["last_modified"] = datetime.now(timezone.utc).isoformat()
             
-            # Store in per-user memory cache
-            self._user_configs[user_uuid] = config
-            
-            # Persist to database (user_preferences.preferences_json)
-            from trusted_data_agent.auth.database import get_db_session
-            from trusted_data_agent.auth.models import UserPreference
+            # Store in per-user memory cache (indexes are rebuilt from the saved config)
+            with self._cache_lock:
+                previous = self._user_configs.get(user_uuid)
+            if previous is not None:
+                stored_digests, stored_version = previous.digests, previous.version
+            else:
+                # Not cached (evicted, or saved without a load): diff against what is stored
+                # instead of replacing every section
+                stored_digests, stored_version = self._read_stored_digests(user_uuid)
+            entry = self._cache_config(user_uuid, config, stored_digests, stored_version)
             
-            with get_db_session() as session:
-                prefs = session.query(UserPreference).filter_by(user_id=user_uuid).first()
-                if not prefs:
-                    prefs = UserPreference(user_id=user_uuid)
-                    session.add(prefs)
-                
-                # Store config in preferences_json (excluding credentials for security)
-                safe_config = self._strip_credentials(config)
-                prefs.preferences_json = json.dumps(safe_config)
-                prefs.updated_at = datetime.utcnow()
-                session.commit()
+            # Persist changed sections to database (excluding credentials for security)
+            safe_config = self._strip_credentials(config)
+            sections = {name: json.dumps(value) for name, value in safe_config.items()}
+            digests = {name: _digest(data) for name, data in sections.items()}
+            version, written = self._write_sections(user_uuid, sections, digests, entry.digests)
+
+            if entry.digests is None or version == (entry.version or 0) + (1 if written else 0):
+                entry.version = version
+            else:
+                # Another process wrote in between: sections we did not change may be
+                # newer in the database, so reload on the next access
+                entry.stale = True
+            entry.digests = digests
             
-            app_logger.info(f"Configuration saved to database for user {user_uuid}")
+            app_logger.info(f"Configuration saved to database for user {user_uuid} ({written} section(s) written)")
             return True
             
         except Exception as e:
@@ -528,7 +800,7 @@ class ConfigManager:
         app_logger.info(f"Looking for MCP server {server_id} in {len(servers)} servers for user {user_uuid}")
         app_logger.debug(f"Available server IDs: {[s.get('id') for s in servers]}")
         
-        server = next((s for s in servers if s.get("id") == server_id), None)
+        server = self._find_by_id(servers, "mcp_servers", server_id, user_uuid)
         
         if not server:
             app_logger.warning(f"MCP server with ID {server_id} not found for update")
@@ -705,14 +977,8 @@ class ConfigManager:
         if not mcp_server_id:
             return []
         
-        config = self.load_config(user_uuid)
-        mcp_servers = config.get("mcp_servers", [])
-        
-        for server in mcp_servers:
-            if server.get("id") == mcp_server_id:
-                return server.get("all_tools", [])
-        
-        return []
+        server = self._find_by_id(self.get_mcp_servers(user_uuid), "mcp_servers", mcp_server_id, user_uuid)
+        return server.get("all_tools", []) if server else []
     
     def get_all_mcp_prompts(self, mcp_server_id: Optional[str] = None, user_uuid: Optional[str] = None) -> list:
         """
@@ -732,14 +998,8 @@ class ConfigManager:
         if not mcp_server_id:
             return []
         
-        config = self.load_config(user_uuid)
-        mcp_servers = config.get("mcp_servers", [])
-        
-        for server in mcp_servers:
-            if server.get("id") == mcp_server_id:
-                return server.get("all_prompts", [])
-        
-        return []
+        server = self._find_by_id(self.get_mcp_servers(user_uuid), "mcp_servers", mcp_server_id, user_uuid)
+        return server.get("all_prompts", []) if server else []
     
     def get_profile_enabled_tools(self, profile_id: str, user_uuid: Optional[str] = None) -> list:
         """
@@ -754,13 +1014,7 @@ class ConfigManager:
         Returns:
             List of enabled tool names for this profile (or master classification profile if inheriting)
         """
-        profiles = self.get_profiles(user_uuid)
-        target_profile = None
-
-        for profile in profiles:
-            if profile.get("id") == profile_id:
-                target_profile = profile
-                break
+        target_profile = self.get_profile(profile_id, user_uuid)
 
         if not target_profile:
             return []
@@ -793,11 +1047,7 @@ class ConfigManager:
                 return target_profile.get("tools", target_profile.get("enabled_tools", []))
 
             # Find master profile
-            master_profile = None
-            for profile in profiles:
-                if profile.get("id") == master_profile_id:
-                    master_profile = profile
-                    break
+            master_profile = self.get_profile(master_profile_id, user_uuid)
 
             if not master_profile:
                 app_logger.warning(
@@ -838,13 +1088,7 @@ class ConfigManager:
         Returns:
             List of enabled prompt names for this profile (or master classification profile if inheriting)
         """
-        profiles = self.get_profiles(user_uuid)
-        target_profile = None
-
-        for profile in profiles:
-            if profile.get("id") == profile_id:
-                target_profile = profile
-                break
+        target_profile = self.get_profile(profile_id, user_uuid)
 
         if not target_profile:
             return []
@@ -877,11 +1121,7 @@ class ConfigManager:
                 return target_profile.get("prompts", target_profile.get("enabled_prompts", []))
 
             # Find master profile
-            master_profile = None
-            for profile in profiles:
-                if profile.get("id") == master_profile_id:
-                    master_profile = profile
-                    break
+            master_profile = self.get_profile(master_profile_id, user_uuid)
 
             if not master_profile:
                 app_logger.warning(
@@ -922,7 +1162,7 @@ class ConfigManager:
         Returns:
             List of disabled tool names for this profile (excluding TDA_ tools)
         """
-        profile = next((p for p in self.get_profiles(user_uuid) if p.get("id") == profile_id), None)
+        profile = self.get_profile(profile_id, user_uuid)
         if not profile:
             return []
 
@@ -977,7 +1217,7 @@ class ConfigManager:
         Returns:
             List of disabled prompt names for this profile (excluding TDA_ prompts)
         """
-        profile = next((p for p in self.get_profiles(user_uuid) if p.get("id") == profile_id), None)
+        profile = self.get_profile(profile_id, user_uuid)
         if not profile:
             return []
 
@@ -1033,8 +1273,20 @@ class ConfigManager:
         Returns:
             Profile configuration dictionary or None if not found
         """
+        return self._find_by_id(self.get_profiles(user_uuid), "profiles", profile_id, user_uuid)
+
+    def _first_tool_profile_id(self, mcp_server_id: Optional[str], user_uuid: Optional[str]) -> Optional[str]:
+        """ID of the first tool_enabled profile of an MCP server (any server if None)."""
         profiles = self.get_profiles(user_uuid)
-        return next((p for p in profiles if p.get("id") == profile_id), None)
+        entry = self._user_configs.get(user_uuid) if user_uuid else None
+        if entry is not None and entry.config.get("profiles") is profiles:
+            return entry.first_tool_profile_id(mcp_server_id)
+        for profile in profiles:
+            if profile.get('profile_type') != 'llm_only' and (
+                not mcp_server_id or profile.get('mcpServerId') == mcp_server_id
+            ):
+                return profile['id']
+        return None
 
     def get_dual_model_configs(self, profile_id: str, user_uuid: str) -> Optional[Dict[str, Any]]:
         """
@@ -1066,7 +1318,7 @@ class ConfigManager:
         def get_config(config_id):
             if not config_id:
                 return None
-            return next((cfg for cfg in llm_configs if cfg['id'] == config_id), None)
+            return self._find_by_id(llm_configs, "llm_configurations", config_id, user_uuid)
 
         # Resolve strategic and tactical model IDs
         if dual_config:
@@ -1128,7 +1380,7 @@ class ConfigManager:
             True if successful, False otherwise
         """
         profiles = self.get_profiles(user_uuid)
-        profile = next((p for p in profiles if p.get("id") == profile_id), None)
+        profile = self._find_by_id(profiles, "profiles", profile_id, user_uuid)
         
         if not profile:
             app_logger.warning(f"Profile with ID {profile_id} not found for update")
@@ -1457,22 +1709,19 @@ class ConfigManager:
 
         # === FALLBACK: Find first tool_enabled profile for this server ===
         if mcp_server_id:
-            profiles = self.get_profiles(user_uuid)
-            for profile in profiles:
-                if (profile.get('profile_type') != 'llm_only' and
-                    profile.get('mcpServerId') == mcp_server_id):
-                    app_logger.debug(
-                        f"No master classification profile set for MCP server {mcp_server_id}, "
-                        f"using first tool_enabled profile: {profile['id']}"
-                    )
-                    return profile['id']
+            profile_id = self._first_tool_profile_id(mcp_server_id, user_uuid)
+            if profile_id:
+                app_logger.debug(
+                    f"No master classification profile set for MCP server {mcp_server_id}, "
+                    f"using first tool_enabled profile: {profile_id}"
+                )
+                return profile_id
 
         # === LEGACY FALLBACK: Any tool_enabled profile ===
-        profiles = self.get_profiles(user_uuid)
-        for profile in profiles:
-            if profile.get('profile_type') != 'llm_only':
-                app_logger.debug(f"No master classification profile set, using first tool_enabled profile: {profile['id']}")
-                return profile['id']
+        profile_id = self._first_tool_profile_id(None, user_uuid)
+        if profile_id:
+            app_logger.debug(f"No master classification profile set, using first tool_enabled profile: {profile_id}")
+            return profile_id
 
         app_logger.warning(f"No tool_enabled profiles found for user {user_uuid} - cannot determine master classification profile")
         return None
@@ -1585,8 +1834,7 @@ class ConfigManager:
         Returns:
             Classification results dictionary or empty dict if not found
         """
-        profiles = self.get_profiles(user_uuid)
-        profile = next((p for p in profiles if p.get("id") == profile_id), None)
+        profile = self.get_profile(profile_id, user_uuid)
         if profile:
             return profile.get("classification_results", {})
         return {}
@@ -1607,7 +1855,7 @@ class ConfigManager:
         from datetime import datetime, timezone
         
         profiles = self.get_profiles(user_uuid)
-        profile = next((p for p in profiles if p.get("id") == profile_id), None)
+        profile = self._find_by_id(profiles, "profiles", profile_id, user_uuid)
         
         if not profile:
             app_logger.warning(f"Profile {profile_id} not found for classification save")
@@ -1700,7 +1948,7 @@ class ConfigManager:
             True if successful, False otherwise
         """
         configurations = self.get_llm_configurations(user_uuid)
-        configuration = next((c for c in configurations if c.get("id") == config_id), None)
+        configuration = self._find_by_id(configurations, "llm_configurations", config_id, user_uuid)
         
         if not configuration:
             app_logger.warning(f"LLM configuration with ID {config_id} not found for update")
@@ -1837,7 +2085,7 @@ class ConfigManager:
             True if successful, False otherwise
         """
         configurations = self.get_vector_store_configurations(user_uuid)
-        configuration = next((c for c in configurations if c.get("id") == config_id), None)
+        configuration = self._find_by_id(configurations, "vector_store_configurations", config_id, user_uuid)
 
         if not configuration:
             app_logger.warning(f"Vector store configuration with ID {config_id} not found for update")
@@ -20,17 +20,51 @@ scheme-specific resolver. Currently supported schemes:
   gdrive:// — Google Drive via existing platform connector
 
 New schemes are added by registering a coroutine in SOURCE_RESOLVERS.
+
+Sync and reindex run documents through a two-stage pipeline: source fetches
+(bounded per scheme by KNOWLEDGE_SYNC_FETCH_CONCURRENCY) overlap with the
+chunk → embed → upsert of documents already fetched (bounded by
+KNOWLEDGE_SYNC_EMBED_CONCURRENCY).
+
+Every write to a collection's vectors and document rows (sync, reindex,
+document upload and delete) holds collection_write_lock(collection_id), so a
+shadow-swap reindex never misses writes made while the shadow is built.  The
+lock is per process: with several workers, writes routed to another worker
+during a reindex can land in the retired collection.  Readers in other
+workers pick up the swap on their next query, because retrieval compares the
+loaded collection's name with the database row and rebinds on a mismatch.
 """
 
+import asyncio
+import hashlib
 import logging
 import time
+import uuid
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Optional
 
 logger = logging.getLogger("quart.app")
 
 
+# ---------------------------------------------------------------------------
+# Per-collection write lock
+# ---------------------------------------------------------------------------
+
+_collection_write_locks: Dict[int, asyncio.Lock] = {}
+
+
+def collection_write_lock(collection_id: int) -> asyncio.Lock:
+    """
+    Lock serialising writes to one knowledge collection.
+
+    A reindex holds it from start to swap, so uploads, deletes and syncs
+    started meanwhile wait and then resolve the (possibly swapped) collection
+    name afresh.  Not re-entrant, and only effective within one process.
+    """
+    return _collection_write_locks.setdefault(collection_id, asyncio.Lock())
+
+
 # ---------------------------------------------------------------------------
 # Source resolvers
 # ---------------------------------------------------------------------------
@@ -141,7 +175,7 @@ async def fetch_source(source_uri: str, user_uuid: str, source_root: str = None)
     if not source_uri:
         raise ValueError("source_uri is empty")
 
-    scheme = source_uri.split("://")[0].lower()
+    scheme = _uri_scheme(source_uri)
     if not SOURCE_RESOLVERS.get(scheme):
         raise ValueError(
             f"Unsupported source URI scheme '{scheme}'. "
@@ -153,6 +187,90 @@ async def fetch_source(source_uri: str, user_uuid: str, source_root: str = None)
     return await SOURCE_RESOLVERS[scheme](source_uri, user_uuid)
 
 
+def _uri_scheme(source_uri: str) -> str:
+    return source_uri.split("://")[0].lower()
+
+
+# ---------------------------------------------------------------------------
+# Fetch → ingest pipeline
+# ---------------------------------------------------------------------------
+
+_DEFAULT_FETCH_CONCURRENCY = 2  # Schemes missing from KNOWLEDGE_SYNC_FETCH_CONCURRENCY
+
+
+async def _run_fetch_pipeline(documents: list, user_uuid: str, source_root: Optional[str], ingest) -> int:
+    """
+    Fetch the source of every document and ingest each one as soon as it arrives.
+
+    Fetches run concurrently, at most KNOWLEDGE_SYNC_FETCH_CONCURRENCY[scheme]
+    per resolver scheme, while fetched documents are ingested alongside them,
+    at most KNOWLEDGE_SYNC_EMBED_CONCURRENCY at a time.  No more than
+    KNOWLEDGE_SYNC_MAX_IN_FLIGHT documents are between fetch start and ingest
+    end, which bounds the source bytes held in memory.
+
+    ``ingest(doc, content_bytes, fetch_error)`` is awaited once per document
+    (in completion order) with either the fetched bytes or the fetch exception.
+    An exception escaping ``ingest`` is logged and does not stop the other
+    documents; returns how many documents failed that way.
+    """
+    from trusted_data_agent.core.config import APP_CONFIG
+
+    in_flight = asyncio.Semaphore(max(1, APP_CONFIG.KNOWLEDGE_SYNC_MAX_IN_FLIGHT))
+    ingest_slots = asyncio.Semaphore(max(1, APP_CONFIG.KNOWLEDGE_SYNC_EMBED_CONCURRENCY))
+    fetch_slots: dict = {}
+
+    def _fetch_slot(scheme: str) -> asyncio.Semaphore:
+        slot = fetch_slots.get(scheme)
+        if slot is None:
+            limit = APP_CONFIG.KNOWLEDGE_SYNC_FETCH_CONCURRENCY.get(scheme, _DEFAULT_FETCH_CONCURRENCY)
+            slot = fetch_slots[scheme] = asyncio.Semaphore(max(1, int(limit)))
+        return slot
+
+    async def _process(doc: dict) -> bool:
+        source_uri = doc["source_uri"]
+        async with in_flight:
+            content_bytes, fetch_error = None, None
+            try:
+                async with _fetch_slot(_uri_scheme(source_uri)):
+                    content_bytes = await fetch_source(source_uri, user_uuid, source_root=source_root)
+            except Exception as e:
+                fetch_error = e
+            try:
+                async with ingest_slots:
+                    await ingest(doc, content_bytes, fetch_error)
+            except Exception as ingest_err:
+                logger.error(
+                    f"[KNOWLEDGE PIPELINE] Ingest failed for '{doc.get('filename')}' "
+                    f"(doc={doc.get('document_id')}): {ingest_err}",
+                    exc_info=True,
+                )
+                return False
+            return True
+
+    outcomes = await asyncio.gather(*(_process(doc) for doc in documents))
+    return outcomes.count(False)
+
+
+_CHUNK_COUNT_KEYS = ("chunks_embedded", "chunks_reused", "chunks_deleted")
+
+
+def _add_chunk_counts(results: dict, chunk_counts, keys: tuple = _CHUNK_COUNT_KEYS) -> dict:
+    """
+    Add a document's chunk counts (as returned by _sync_upsert_document) to the
+    run totals.  Missing keys or a non-dict result count as zero.  Returns the
+    normalised per-document counts.
+    """
+    counts = {key: 0 for key in _CHUNK_COUNT_KEYS}
+    if isinstance(chunk_counts, dict):
+        for key in _CHUNK_COUNT_KEYS:
+            value = chunk_counts.get(key)
+            if isinstance(value, int):
+                counts[key] = value
+    for key in keys:
+        results[key] += counts[key]
+    return counts
+
+
 # ---------------------------------------------------------------------------
 # Sync orchestration
 # ---------------------------------------------------------------------------
@@ -167,9 +285,10 @@ async def sync_knowledge_collection(
     potentially changed (last_checked_at older than older_than_seconds).
 
     For each candidate document:
-      1. Fetch content from source_uri
+      1. Fetch content from source_uri (concurrently, see _run_fetch_pipeline)
       2. Hash-check — skip if content unchanged
-      3. Call _upsert_document() (via knowledge_routes) to re-embed
+      3. Call _sync_upsert_document() to re-chunk; only chunks whose content
+         is not already stored are embedded (chunk-level delta)
 
     Returns:
         {
@@ -177,9 +296,18 @@ async def sync_knowledge_collection(
             "updated":          int,
             "unchanged":        int,
             "errors":           int,
+            "chunks_embedded":  int,   # new or changed chunks sent to the embedder
+            "chunks_reused":    int,   # unchanged chunks whose vectors were kept
+            "chunks_deleted":   int,   # chunks no longer present in the source
             "duration_seconds": float,
         }
     """
+    async with collection_write_lock(collection_id):
+        return await _sync_collection(collection_id, user_uuid, older_than_seconds)
+
+
+async def _sync_collection(collection_id: int, user_uuid: str, older_than_seconds: int) -> dict:
+    """Body of sync_knowledge_collection; the caller holds the collection's write lock."""
     from trusted_data_agent.core.collection_db import get_collection_db
 
     db = get_collection_db()
@@ -190,6 +318,8 @@ async def sync_knowledge_collection(
     candidates = db.get_sync_candidates(collection_id, older_than_seconds=older_than_seconds)
     results: dict = defaultdict(int)
     results["updated_files"] = []
+    for key in _CHUNK_COUNT_KEYS:
+        results[key] = 0
     start = time.monotonic()
     source_root = collection.get("source_root") or None
 
@@ -199,39 +329,38 @@ async def sync_knowledge_collection(
         f"source_root={source_root or '(auto)'}"
     )
 
+    pending = []
     for doc in candidates:
         results["checked"] += 1
+        if doc.get("source_uri"):
+            pending.append(doc)
+        else:
+            db.mark_document_checked(doc["document_id"])
+            results["unchanged"] += 1
+
+    async def _ingest(doc: dict, content_bytes: Optional[bytes], fetch_err: Optional[Exception]):
         doc_id = doc["document_id"]
         filename = doc["filename"]
-        source_uri = doc.get("source_uri")
-
-        if not source_uri:
-            db.mark_document_checked(doc_id)
-            results["unchanged"] += 1
-            continue
 
-        try:
-            content_bytes = await fetch_source(source_uri, user_uuid, source_root=source_root)
-        except Exception as fetch_err:
+        if fetch_err is not None:
             logger.warning(
                 f"[CDC SYNC] Fetch failed for '{filename}' "
                 f"(doc={doc_id}): {fetch_err}"
             )
             results["errors"] += 1
-            continue
+            return
 
         # Hash check — mark checked and skip if content identical
-        import hashlib
         new_hash = hashlib.sha256(content_bytes).hexdigest()
         if doc.get("content_hash") == new_hash:
             db.mark_document_checked(doc_id)
             results["unchanged"] += 1
             logger.debug(f"[CDC SYNC] '{filename}' unchanged (doc={doc_id})")
-            continue
+            return
 
         # Content changed — re-ingest via the same pipeline as manual upload
         try:
-            await _sync_upsert_document(
+            chunk_counts = await _sync_upsert_document(
                 collection_id=collection_id,
                 collection=collection,
                 content_bytes=content_bytes,
@@ -239,9 +368,14 @@ async def sync_knowledge_collection(
                 existing_doc=doc,
                 user_uuid=user_uuid,
             )
+            chunk_counts = _add_chunk_counts(results, chunk_counts)
             results["updated"] += 1
             results["updated_files"].append(filename)
-            logger.info(f"[CDC SYNC] '{filename}' updated (doc={doc_id})")
+            logger.info(
+                f"[CDC SYNC] '{filename}' updated (doc={doc_id}) — "
+                f"embedded={chunk_counts['chunks_embedded']} reused={chunk_counts['chunks_reused']} "
+                f"deleted={chunk_counts['chunks_deleted']}"
+            )
         except Exception as upsert_err:
             logger.error(
                 f"[CDC SYNC] Re-ingest failed for '{filename}' "
@@ -250,6 +384,9 @@ async def sync_knowledge_collection(
             )
             results["errors"] += 1
 
+    failed = await _run_fetch_pipeline(pending, user_uuid, source_root, _ingest)
+    results["errors"] += failed
+
     duration = round(time.monotonic() - start, 2)
     results["duration_seconds"] = duration
 
@@ -273,7 +410,8 @@ async def sync_knowledge_collection(
         f"[CDC SYNC] collection={collection_id} done — "
         f"checked={results['checked']} updated={results['updated']} "
         f"unchanged={results['unchanged']} errors={results['errors']} "
-        f"duration={duration}s"
+        f"chunks embedded={results['chunks_embedded']} reused={results['chunks_reused']} "
+        f"deleted={results['chunks_deleted']} duration={duration}s"
     )
     return dict(results)
 
@@ -285,14 +423,25 @@ async def _sync_upsert_document(
     content_hash: str,
     existing_doc: dict,
     user_uuid: str,
-) -> None:
+    reuse_existing_chunks: bool = True,
+    metadata_updates: Optional[list] = None,
+) -> dict:
     """
     Re-embed a document that has changed at its source.
     Mirrors the client-side chunking path in knowledge_routes.py but runs
     without an HTTP request context (called from scheduler or sync endpoint).
 
     Server-side chunking (Teradata EVS) is handled by delete → re-submit.
-    Client-side chunking uses ingest_epoch generation cleanup.
+    Client-side chunking embeds only new or changed chunks when
+    reuse_existing_chunks is set and the backend can list and re-tag stored
+    chunks; otherwise every chunk is re-embedded and stale ones are removed
+    by ingest_epoch generation cleanup.
+
+    Chunks are written to collection["collection_name"].  When
+    metadata_updates is a list, the document's metadata row is appended to it
+    instead of written, so a shadow-swap reindex can defer it until the swap.
+
+    Returns {"chunks_embedded", "chunks_reused", "chunks_deleted"}.
     """
     import os, tempfile
     from trusted_data_agent.core.collection_db import get_collection_db
@@ -348,6 +497,7 @@ async def _sync_upsert_document(
                 ),
             )
             chunk_count = 0  # deferred
+            chunk_counts = {"chunks_embedded": 0, "chunks_reused": 0, "chunks_deleted": 0}
         else:
             # ── Client-side path: chunk → embed → upsert → cleanup ────────
             from trusted_data_agent.llm.document_upload import DocumentUploadHandler
@@ -386,35 +536,42 @@ async def _sync_upsert_document(
                 document_id=doc_id,
                 ingest_epoch=ingest_epoch,
                 save_original=False,
+                reuse_existing_chunks=reuse_existing_chunks,
             )
             chunk_count = result.get("chunks_stored", 0)
-
-            # Stale chunk cleanup
-            try:
-                from trusted_data_agent.vectorstore.filters import FieldFilter, AndFilter, FilterOp
-                stale_filter = AndFilter([
-                    FieldFilter("document_id", FilterOp.EQ, doc_id),
-                    FieldFilter("ingest_epoch", FilterOp.LT, ingest_epoch),
-                ])
-                stale_result = await backend.get(
-                    collection_name,
-                    where=stale_filter,
-                    include_documents=False,
-                    include_metadata=False,
-                    limit=10_000,
-                )
-                stale_ids = [d.id for d in stale_result.documents] if stale_result and stale_result.documents else []
-                if stale_ids:
-                    await backend.delete(collection_name, ids=stale_ids)
-                    logger.info(
-                        f"[CDC SYNC] Removed {len(stale_ids)} stale chunks "
-                        f"for '{filename}' (doc={doc_id})"
+            chunk_counts = {
+                key: result.get(key, 0)
+                for key in _CHUNK_COUNT_KEYS
+            }
+
+            # Stale chunk cleanup (the delta path already deleted removed chunks)
+            if not result.get("delta_applied"):
+                try:
+                    from trusted_data_agent.vectorstore.filters import FieldFilter, AndFilter, FilterOp
+                    stale_filter = AndFilter([
+                        FieldFilter("document_id", FilterOp.EQ, doc_id),
+                        FieldFilter("ingest_epoch", FilterOp.LT, ingest_epoch),
+                    ])
+                    stale_result = await backend.get(
+                        collection_name,
+                        where=stale_filter,
+                        include_documents=False,
+                        include_metadata=False,
+                        limit=10_000,
                     )
-            except Exception as ce:
-                logger.warning(f"[CDC SYNC] Stale chunk cleanup failed: {ce}")
+                    stale_ids = [d.id for d in stale_result.documents] if stale_result and stale_result.documents else []
+                    if stale_ids:
+                        await backend.delete(collection_name, ids=stale_ids)
+                        chunk_counts["chunks_deleted"] = len(stale_ids)
+                        logger.info(
+                            f"[CDC SYNC] Removed {len(stale_ids)} stale chunks "
+                            f"for '{filename}' (doc={doc_id})"
+                        )
+                except Exception as ce:
+                    logger.warning(f"[CDC SYNC] Stale chunk cleanup failed: {ce}")
 
         # Persist updated metadata
-        db.upsert_document_metadata(
+        metadata_row = dict(
             document_id=doc_id,
             collection_id=collection_id,
             filename=filename,
@@ -431,7 +588,12 @@ async def _sync_upsert_document(
             tags=existing_doc.get("tags", ""),
             file_size=len(content_bytes),
         )
+        if metadata_updates is not None:
+            metadata_updates.append(metadata_row)
+            return chunk_counts
+        db.upsert_document_metadata(**metadata_row)
         db.sync_collection_counts(collection_id)
+        return chunk_counts
 
     finally:
         try:
@@ -455,15 +617,24 @@ async def reindex_knowledge_collection(
     Two strategies:
         in_place   — re-ingest each document over the same collection_name.
                      Used when subscribers or marketplace listing exist.
-        shadow_swap — (reserved) create a shadow collection, swap on success.
-                     Currently falls back to in_place (both strategies share
-                     the same ingest path; shadow_swap isolation is a future
-                     enhancement).
+                     Retrieval sees a mix of old and new vectors while it runs.
+        shadow_swap — build a new (shadow) collection while the live one keeps
+                     serving queries, then switch the collection row to it in
+                     one update and drop the old collection.  Documents without
+                     a source_uri (or whose fetch fails) are carried over by
+                     re-embedding their stored chunks.  If anything cannot be
+                     carried over, the shadow is dropped and the live
+                     collection is left untouched.  Server-side chunking
+                     collections fall back to in_place.
+
+    Both hold collection_write_lock(collection_id) for the whole run, so
+    uploads, deletes and syncs started meanwhile wait and then write to the
+    collection that is live after the swap.
 
     For each document:
-      1. Locate original bytes from source_uri (or skip if no source_uri)
+      1. Locate original bytes from source_uri (fetched concurrently)
       2. Force-ingest (hash ignored — always re-embeds)
-      3. Cleanup stale chunks with old ingest_epoch
+      3. in_place: cleanup stale chunks with old ingest_epoch
 
     After all documents: lock the embedding model by setting
     embedding_model_locked=1 on the collection.
@@ -472,11 +643,19 @@ async def reindex_knowledge_collection(
         {
             "strategy":         str,
             "reindexed":        int,
+            "carried_over":     int,   # shadow_swap: stored chunks re-embedded
             "skipped":          int,
             "errors":           int,
+            "swapped":          bool,  # shadow_swap only
             "duration_seconds": float,
         }
     """
+    async with collection_write_lock(collection_id):
+        return await _reindex_collection(collection_id, user_uuid, strategy)
+
+
+async def _reindex_collection(collection_id: int, user_uuid: str, strategy: str) -> dict:
+    """Body of reindex_knowledge_collection; the caller holds the collection's write lock."""
     from trusted_data_agent.core.collection_db import get_collection_db
 
     db = get_collection_db()
@@ -484,49 +663,73 @@ async def reindex_knowledge_collection(
     if not collection:
         raise ValueError(f"Collection {collection_id} not found")
 
+    if strategy == "shadow_swap" and collection.get("chunking_strategy") == "server_side":
+        logger.info(
+            f"[REINDEX] collection={collection_id} uses server-side chunking — "
+            f"shadow_swap not supported, using in_place"
+        )
+        strategy = "in_place"
+    shadow = strategy == "shadow_swap"
+
     documents = db.get_all_documents_in_collection(collection_id)
     start = time.monotonic()
     results: dict = defaultdict(int)
     results["strategy"] = strategy
     source_root = collection.get("source_root") or None
+    live_name = collection["collection_name"]
+
+    # Shadow builds go to a fresh collection; document rows are written after the swap
+    target = collection
+    metadata_updates = None
+    carry_over: list = []
+    if shadow:
+        target = dict(collection, collection_name=f"tda_rag_coll_{collection_id}_{uuid.uuid4().hex[:6]}")
+        metadata_updates = []
 
     logger.info(
         f"[REINDEX] collection={collection_id} strategy={strategy} "
         f"documents={len(documents)} source_root={source_root or '(auto)'}"
+        + (f" shadow={target['collection_name']}" if shadow else "")
     )
 
+    with_source = []
     for doc in documents:
+        if doc.get("source_uri"):
+            with_source.append(doc)
+        elif shadow:
+            carry_over.append(doc)
+        else:
+            logger.debug(f"[REINDEX] '{doc['filename']}' has no source_uri — skipping")
+            results["skipped"] += 1
+
+    async def _ingest(doc: dict, content_bytes: Optional[bytes], fetch_err: Optional[Exception]):
         doc_id = doc["document_id"]
         filename = doc["filename"]
-        source_uri = doc.get("source_uri")
-
-        if not source_uri:
-            logger.debug(f"[REINDEX] '{filename}' has no source_uri — skipping")
-            results["skipped"] += 1
-            continue
 
-        try:
-            content_bytes = await fetch_source(source_uri, user_uuid, source_root=source_root)
-        except Exception as fetch_err:
+        if fetch_err is not None:
             logger.warning(
                 f"[REINDEX] Fetch failed for '{filename}' "
                 f"(doc={doc_id}): {fetch_err}"
             )
-            results["errors"] += 1
-            continue
-
-        import hashlib
-        new_hash = hashlib.sha256(content_bytes).hexdigest()
+            if shadow:
+                carry_over.append(doc)
+            else:
+                results["errors"] += 1
+            return
 
         try:
-            await _sync_upsert_document(
+            # A re-index exists to refresh vectors (e.g. new embedding model): never reuse them
+            chunk_counts = await _sync_upsert_document(
                 collection_id=collection_id,
-                collection=collection,
+                collection=target,
                 content_bytes=content_bytes,
-                content_hash=new_hash,
+                content_hash=hashlib.sha256(content_bytes).hexdigest(),
                 existing_doc=doc,
                 user_uuid=user_uuid,
+                reuse_existing_chunks=False,
+                metadata_updates=metadata_updates,
             )
+            _add_chunk_counts(results, chunk_counts, keys=("chunks_embedded",))
             results["reindexed"] += 1
             logger.info(f"[REINDEX] '{filename}' re-indexed (doc={doc_id})")
         except Exception as upsert_err:
@@ -537,19 +740,135 @@ async def reindex_knowledge_collection(
             )
             results["errors"] += 1
 
+    lock_model = True
+    if shadow:
+        try:
+            failed = await _run_fetch_pipeline(with_source, user_uuid, source_root, _ingest)
+            results["errors"] += failed
+            if not results["errors"]:
+                await _carry_over_documents(collection_id, collection, live_name, target, carry_over, results)
+        except Exception as build_err:
+            logger.error(f"[REINDEX] Shadow build failed: {build_err}", exc_info=True)
+            results["errors"] += 1
+        results["swapped"] = False
+        if results["errors"]:
+            lock_model = False
+            await _drop_collection(collection_id, target["collection_name"])
+            logger.warning(
+                f"[REINDEX] collection={collection_id} shadow build had {results['errors']} "
+                f"error(s) — shadow dropped, live collection '{live_name}' unchanged"
+            )
+        else:
+            await _swap_in_shadow(collection_id, live_name, target["collection_name"], metadata_updates)
+            results["swapped"] = True
+    else:
+        failed = await _run_fetch_pipeline(with_source, user_uuid, source_root, _ingest)
+        results["errors"] += failed
+
     # Lock the embedding model so mismatch warnings stop appearing
-    try:
-        db.update_collection(collection_id, {"embedding_model_locked": 1})
-        logger.info(f"[REINDEX] collection={collection_id} embedding_model_locked=1")
-    except Exception as lock_err:
-        logger.warning(f"[REINDEX] Failed to lock embedding model: {lock_err}")
+    if lock_model:
+        try:
+            db.update_collection(collection_id, {"embedding_model_locked": 1})
+            logger.info(f"[REINDEX] collection={collection_id} embedding_model_locked=1")
+        except Exception as lock_err:
+            logger.warning(f"[REINDEX] Failed to lock embedding model: {lock_err}")
 
     duration = round(time.monotonic() - start, 2)
     results["duration_seconds"] = duration
 
     logger.info(
         f"[REINDEX] collection={collection_id} done — "
-        f"reindexed={results['reindexed']} skipped={results['skipped']} "
-        f"errors={results['errors']} duration={duration}s"
+        f"reindexed={results['reindexed']} carried_over={results['carried_over']} "
+        f"skipped={results['skipped']} errors={results['errors']} duration={duration}s"
     )
     return dict(results)
+
+
+async def _carry_over_documents(
+    collection_id: int,
+    collection: dict,
+    live_name: str,
+    target: dict,
+    documents: list,
+    results: dict,
+) -> None:
+    """
+    Copy the stored chunks of documents that could not be re-fetched from the
+    live collection into the shadow, re-embedding their text with the
+    collection's (possibly new) embedding model.  Chunk ids and metadata are
+    kept.  Failures are counted in results["errors"].
+    """
+    from trusted_data_agent.agent.rag_retriever import get_rag_retriever
+    from trusted_data_agent.vectorstore import CollectionConfig, VectorDocument
+    from trusted_data_agent.vectorstore.embedding_providers import get_embedding_provider
+    from trusted_data_agent.vectorstore.filters import FieldFilter, FilterOp
+
+    retriever = get_rag_retriever()
+    if not retriever:
+        raise RuntimeError("RAG retriever not initialized")
+    backend = await retriever._get_knowledge_backend(collection_id)
+    if not backend:
+        raise RuntimeError(f"No backend available for collection {collection_id}")
+
+    embedding_model = collection.get("embedding_model", "all-MiniLM-L6-v2")
+    shadow_name = target["collection_name"]
+    await backend.get_or_create_collection(CollectionConfig(name=shadow_name, embedding_model=embedding_model))
+    embedding_provider = get_embedding_provider(backend.backend_type, embedding_model)
+
+    for doc in documents:
+        doc_id = doc["document_id"]
+        try:
+            stored = await backend.get(
+                live_name,
+                where=FieldFilter("document_id", FilterOp.EQ, doc_id),
+                include_documents=True,
+                include_metadata=True,
+                limit=100_000,
+            )
+            chunks = [
+                VectorDocument(id=d.id, content=d.content, metadata=d.metadata)
+                for d in (stored.documents if stored else [])
+            ]
+            for i in range(0, len(chunks), 500):
+                await backend.upsert(shadow_name, chunks[i:i + 500], embedding_provider)
+            results["carried_over"] += 1
+            logger.info(f"[REINDEX] '{doc['filename']}' carried over ({len(chunks)} chunks, doc={doc_id})")
+        except Exception as copy_err:
+            logger.error(
+                f"[REINDEX] Could not carry over '{doc['filename']}' (doc={doc_id}): {copy_err}",
+                exc_info=True,
+            )
+            results["errors"] += 1
+
+
+async def _swap_in_shadow(collection_id: int, live_name: str, shadow_name: str, metadata_updates: list) -> None:
+    """Point the collection at its shadow, persist the deferred document rows, drop the old collection."""
+    from trusted_data_agent.core.collection_db import get_collection_db
+    from trusted_data_agent.agent.rag_retriever import get_rag_retriever
+
+    db = get_collection_db()
+    # Single UPDATE — readers resolve either the old or the new name, never a half-built one
+    db.update_collection(collection_id, {"collection_name": shadow_name})
+    retriever = get_rag_retriever()
+    if retriever:
+        retriever.rebind_knowledge_collection(collection_id, live_name, shadow_name)
+    logger.info(f"[REINDEX] collection={collection_id} swapped '{live_name}' → '{shadow_name}'")
+
+    for row in metadata_updates:
+        db.upsert_document_metadata(**row)
+    db.sync_collection_counts(collection_id)
+
+    await _drop_collection(collection_id, live_name)
+
+
+async def _drop_collection(collection_id: int, collection_name: str) -> None:
+    """Delete a backend collection by name (shadow cleanup / retired live collection)."""
+    from trusted_data_agent.agent.rag_retriever import get_rag_retriever
+
+    try:
+        retriever = get_rag_retriever()
+        backend = await retriever._get_knowledge_backend(collection_id) if retriever else None
+        if backend and await backend.delete_collection(collection_name):
+            logger.info(f"[REINDEX] Dropped collection '{collection_name}'")
+    except Exception as drop_err:
+        logger.warning(f"[REINDEX] Could not drop collection '{collection_name}': {drop_err}")
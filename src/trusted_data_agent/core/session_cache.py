@@ -0,0 +1,307 @@
+# src/trusted_data_agent/core/session_cache.py
+"""
+In-memory write-back cache for hot sessions.
+
+Every public ``session_manager`` function goes through ``_load_session`` (file
+read + ``json.loads``) and ``_save_session`` (full serialization + write), and a
+single executor turn touches the same session many times.  This cache keeps
+recently used sessions parsed in memory, keyed by ``(user_uuid, session_id)``:
+
+  - **Reads**        — a hit returns the cached dict without touching disk.
+  - **Write-back**   — ``mark_dirty`` records a mutation; all saves that land
+                       within ``flush_delay`` are coalesced into one disk write.
+  - **Bounded**      — at most ``max_entries`` sessions are kept (LRU).  Dirty
+                       entries are flushed before they become evictable.
+  - **Consistency**  — flushes run under the same per-session lock as
+                       ``session_manager._session_transaction``, so a flush
+                       never persists a half-applied transaction.
+
+Ownership: the cache owns every dict it holds and never mutates it, except
+through ``checkout``.
+
+  - ``get``        — returns a private deep copy; the caller may mutate it and
+                     persists its changes via ``_save_session`` as before.
+  - ``checkout``   — for a caller holding the session's lock, which mutates
+                     the result in place and gives it back with
+                     ``mark_dirty(handoff=True)``, or with ``release`` if it
+                     gives up.  A clean entry is handed out itself (``release``
+                     drops it, the file still holds its state); a dirty one as
+                     a copy, since its pending changes exist only here.
+  - ``peek``       — returns the cached dict itself, strictly read-only.  It
+                     may show the changes of a checkout still in progress.
+  - ``put``        — takes ownership of a freshly parsed dict (no copy).
+  - ``mark_dirty`` — copies the saved dict, unless ``handoff=True``: the
+                     caller then gives the dict up and must not touch it, or
+                     anything reachable from it, again.  The ``sections``
+                     (changed top-level keys) of the saves a flush coalesces
+                     are merged and passed to the writer.
+
+A load-modify-save transaction therefore costs no copy when the session was
+flushed (or read from disk) since the previous one, and one copy otherwise.
+"""
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+app_logger = logging.getLogger("quart.app")
+
+
+def _merge_sections(a: Optional[frozenset], b: Optional[frozenset]) -> Optional[frozenset]:
+    """Union of two ``sections`` sets, where None stands for "every key"."""
+    if a is None or b is None:
+        return None
+    return a | b
+
+
+class _CacheEntry:
+    __slots__ = ("data", "path", "dirty", "sections", "flush_handle", "flush_task")
+
+    def __init__(self, data: dict, path: Path):
+        self.data = data
+        self.path = path
+        self.dirty = False
+        # Top-level keys changed since the last flush (None: unknown, any)
+        self.sections: Optional[frozenset] = frozenset()
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.flush_task: Optional[asyncio.Task] = None
+
+
+class SessionCache:
+    """
+    LRU write-back cache of parsed session dicts.
+
+    Args:
+        writer: ``async writer(key, path, data, sections)`` that persists one
+            session; ``sections`` are the top-level keys changed since its
+            last flush, or None if unknown.
+        lock_for: returns the ``asyncio.Lock`` guarding a session id.
+        max_entries: maximum number of cached sessions.
+        flush_delay: seconds to coalesce saves before writing to disk.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[tuple, Path, dict, Optional[frozenset]], Awaitable[None]],
+        lock_for: Callable[[str], asyncio.Lock],
+        max_entries: int = 128,
+        flush_delay: float = 1.0,
+    ):
+        self._writer = writer
+        self._lock_for = lock_for
+        self.max_entries = max(1, int(max_entries))
+        self.flush_delay = max(0.0, float(flush_delay))
+        self._entries: "OrderedDict[tuple, _CacheEntry]" = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "checkout_copies": 0,
+            "saves": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "evictions": 0,
+            "flush_ms_total": 0.0,
+            "flush_ms_max": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lookup / population
+    # ------------------------------------------------------------------
+
+    def get(self, key: tuple) -> Optional[dict]:
+        """Return a private, mutable copy of a cached session."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return copy.deepcopy(entry.data)
+
+    def checkout(self, key: tuple) -> Optional[dict]:
+        """
+        Return the cached session itself for an in-place load-modify-save.
+
+        The caller must hold the session's lock until it hands the dict back
+        via ``mark_dirty(handoff=True)`` or ``release``.  Unsaved changes never
+        reach a flush: a dirty entry is checked out as a copy.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        if entry.dirty or entry.flush_task is not None:
+            self._stats["checkout_copies"] += 1
+            return copy.deepcopy(entry.data)
+        return entry.data
+
+    def release(self, key: tuple, data: dict):
+        """
+        Give back a checked-out session that was not saved.
+
+        It may be half-modified: if it is the (clean) cached dict itself, the
+        entry is dropped so the next load reads the file again.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.data is data:
+            self._discard(key)
+
+    def peek(self, key: tuple) -> Optional[dict]:
+        """Return the cached session itself (read-only) without touching LRU order or stats."""
+        entry = self._entries.get(key)
+        return entry.data if entry is not None else None
+
+    def put(self, key: tuple, path: Path, data: dict):
+        """Cache a freshly loaded (clean) session; the cache takes ownership of ``data``."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.dirty:
+                # Never let a disk read clobber unflushed changes
+                return
+            entry.data = data
+            entry.path = path
+            self._entries.move_to_end(key)
+        else:
+            self._entries[key] = _CacheEntry(data, path)
+        self._evict()
+
+    def mark_dirty(self, key: tuple, path: Path, data: dict, handoff: bool = False, sections=None):
+        """
+        Record a save; the entry is written out after ``flush_delay``.
+
+        With ``handoff=True`` the cache keeps ``data`` itself instead of a copy.
+        ``sections`` are the top-level keys the save changed (None: unknown).
+        """
+        self._stats["saves"] += 1
+        if not handoff:
+            data = copy.deepcopy(data)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _CacheEntry(data, path)
+            self._entries[key] = entry
+        else:
+            entry.data = data
+            entry.path = path
+            self._entries.move_to_end(key)
+        sections = frozenset(sections) if sections is not None else None
+        entry.sections = _merge_sections(entry.sections, sections) if entry.dirty else sections
+        entry.dirty = True
+        if entry.flush_handle is None and entry.flush_task is None:
+            loop = asyncio.get_running_loop()
+            entry.flush_handle = loop.call_later(self.flush_delay, self._start_flush, key)
+        self._evict()
+
+    def session_keys(self, session_id: str) -> list:
+        return [k for k in self._entries if k[1] == session_id]
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _start_flush(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.flush_handle = None
+        if entry.flush_task is None:
+            entry.flush_task = asyncio.create_task(self._flush_entry(key, entry))
+
+    async def _flush_entry(self, key: tuple, entry: _CacheEntry):
+        try:
+            async with self._lock_for(key[1]):
+                if not entry.dirty:
+                    return
+                entry.dirty = False
+                sections, entry.sections = entry.sections, frozenset()
+                started = time.perf_counter()
+                try:
+                    await self._writer(key, entry.path, entry.data, sections)
+                except Exception as e:
+                    # Saves made during the write add to the sections still unwritten
+                    entry.sections = _merge_sections(sections, entry.sections) if entry.dirty else sections
+                    entry.dirty = True
+                    self._stats["flush_errors"] += 1
+                    app_logger.error(f"Failed to flush cached session {key[1]}: {e}", exc_info=True)
+                    return
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._stats["flushes"] += 1
+                self._stats["flush_ms_total"] += elapsed_ms
+                self._stats["flush_ms_max"] = max(self._stats["flush_ms_max"], elapsed_ms)
+        finally:
+            entry.flush_task = None
+            # Saves that arrived while writing (or a failed write) need another pass
+            if entry.dirty and entry.flush_handle is None and self._entries.get(key) is entry:
+                entry.flush_handle = asyncio.get_running_loop().call_later(
+                    self.flush_delay, self._start_flush, key)
+            self._evict()
+
+    async def flush(self, key: tuple, evict: bool = False):
+        """
+        Write a session to disk now if it has pending changes.
+
+        Must not be called while holding the session's lock.  With
+        ``evict=True`` the entry is also dropped, for callers about to read
+        or rewrite the session file directly.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if entry.flush_handle is not None:
+            entry.flush_handle.cancel()
+            entry.flush_handle = None
+        if entry.flush_task is not None:
+            await entry.flush_task
+        if entry.dirty:
+            await self._flush_entry(key, entry)
+        if evict and self._entries.get(key) is entry and not entry.dirty:
+            self._discard(key)
+
+    async def flush_all(self):
+        """Flush every dirty entry (used on shutdown)."""
+        for key in [k for k, e in self._entries.items() if e.dirty or e.flush_task]:
+            await self.flush(key)
+
+    def invalidate(self, key: tuple):
+        """Drop an entry without writing it (the file was rewritten elsewhere)."""
+        if key in self._entries:
+            self._discard(key)
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key)
+        if entry.flush_handle is not None:
+            entry.flush_handle.cancel()
+            entry.flush_handle = None
+
+    def _evict(self):
+        if len(self._entries) <= self.max_entries:
+            return
+        # Oldest first; dirty entries stay until their flush has landed
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            entry = self._entries[key]
+            if entry.dirty or entry.flush_task is not None:
+                continue
+            self._discard(key)
+            self._stats["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["flush_ms_avg"] = round(stats["flush_ms_total"] / stats["flushes"], 2) if stats["flushes"] else 0.0
+        stats["flush_ms_total"] = round(stats["flush_ms_total"], 2)
+        stats["flush_ms_max"] = round(stats["flush_ms_max"], 2)
+        stats["entries"] = len(self._entries)
+        stats["dirty_entries"] = sum(1 for e in self._entries.values() if e.dirty)
+        stats["saves_coalesced"] = max(0, stats["saves"] - stats["flushes"])
+        return stats
@@ -0,0 +1,393 @@
+# src/trusted_data_agent/core/session_journal.py
+"""
+Append-only journal storage for session files.
+
+In the default ``snapshot`` storage mode every ``_save_session`` call
+re-serializes the whole session with ``indent=2`` and rewrites the file.  Long
+sessions grow to megabytes and are saved several times per turn, so each turn
+costs O(session size) in serialization and disk writes.
+
+In ``journal`` mode (``APP_CONFIG.SESSION_STORAGE_MODE``) a save appends only
+the *delta* against the last persisted state to ``<session_id>.journal.jsonl``
+next to the snapshot ``<session_id>.json``.  Loads replay the journal over the
+snapshot, and the journal is periodically compacted into a fresh snapshot.
+
+Deltas are computed by comparing per-node fingerprints (hashes of the compact
+JSON encoding) against the fingerprints of the last persisted state.  Dicts
+are diffed key by key down to ``_MAX_DEPTH``.  Lists that grew are written as
+an ``extend`` of the new tail (chat history, workflow history), plus
+``setitem`` ops for the few existing entries that changed in place (e.g. a
+turn toggled invalid).
+
+Encoding every leaf is still O(session size), so callers that know which
+top-level keys a save may have changed pass them as ``sections``: the other
+keys keep their persisted fingerprints without being re-encoded.
+
+Journal ops are absolute assignments, so replaying is idempotent:
+
+    {"op": "set",     "path": [...], "value": ...}
+    {"op": "del",     "path": [...]}
+    {"op": "extend",  "path": [...], "at": n, "items": [...]}   # list[n:] = items
+    {"op": "setitem", "path": [...], "index": i, "value": ...}  # list[i] = value
+
+If the process dies between writing a compacted snapshot and removing the
+journal, replaying the old journal over the new snapshot yields the same state.
+A torn final journal line (crash mid-append) is ignored.  A journal whose ops
+do not fit the snapshot (e.g. an ``extend`` past the end of the list) is
+replayed only up to the last entry that fits, and the next save rewrites the
+snapshot and drops the journal.
+"""
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import aiofiles
+
+app_logger = logging.getLogger("quart.app")
+
+# Containers at depth < _MAX_DEPTH are diffed structurally (0 = session root,
+# 1 = top-level fields such as last_turn_data, 2 = their children such as
+# last_turn_data.workflow_history).  Deeper values are compared as opaque leaves.
+_MAX_DEPTH = 3
+
+_MISSING = object()
+
+
+class JournalMismatchError(ValueError):
+    """A journal op does not fit the state it is replayed over."""
+
+
+def journal_path_for(session_path: Path) -> Path:
+    """Return the journal file path that belongs to a session snapshot path."""
+    return session_path.with_name(f"{session_path.stem}.journal.jsonl")
+
+
+class _JournalState:
+    """Fingerprint of the last persisted state of one session file."""
+
+    __slots__ = ("fingerprint", "entries", "journal_bytes", "snapshot_bytes", "generation")
+
+    def __init__(self, fingerprint, entries: int, journal_bytes: int, snapshot_bytes: int, generation: int):
+        self.fingerprint = fingerprint
+        self.entries = entries
+        self.journal_bytes = journal_bytes
+        self.snapshot_bytes = snapshot_bytes
+        self.generation = generation
+
+
+# Key: str(session_path)
+_states: dict[str, _JournalState] = {}
+# Monotonic write counter per session path; guards against a slow load
+# installing fingerprints of data that a concurrent save already superseded.
+_generations: dict[str, int] = {}
+
+
+# ---------------------------------------------------------------------------
+# Fingerprinting and diffing
+# ---------------------------------------------------------------------------
+
+def _leaf_fingerprint(value) -> int:
+    return hash(json.dumps(value, separators=(",", ":")))
+
+
+def _fingerprint(value, depth: int = 0):
+    """Fingerprint tree: dict for diffed dicts, list for diffed lists, int for leaves."""
+    if depth < _MAX_DEPTH:
+        if isinstance(value, dict):
+            return {k: _fingerprint(v, depth + 1) for k, v in value.items()}
+        if isinstance(value, list):
+            return [_leaf_fingerprint(item) for item in value]
+    return _leaf_fingerprint(value)
+
+
+def _diff(old_fp, value, path: list, ops: list, depth: int):
+    """Append the ops that turn the state fingerprinted by ``old_fp`` into ``value``.
+
+    Returns the fingerprint of ``value``.
+    """
+    if depth < _MAX_DEPTH and isinstance(value, dict):
+        if not isinstance(old_fp, dict):
+            ops.append({"op": "set", "path": path, "value": value})
+            return _fingerprint(value, depth)
+        new_fp = {}
+        for key, child in value.items():
+            new_fp[key] = _diff(old_fp.get(key, _MISSING), child, path + [key], ops, depth + 1)
+        for key in old_fp:
+            if key not in value:
+                ops.append({"op": "del", "path": path + [key]})
+        return new_fp
+
+    if depth < _MAX_DEPTH and isinstance(value, list):
+        new_fp = [_leaf_fingerprint(item) for item in value]
+        if isinstance(old_fp, list) and len(new_fp) >= len(old_fp):
+            changed = [i for i in range(len(old_fp)) if new_fp[i] != old_fp[i]]
+            # Patch a few in-place edits; rewrite the list if most of it changed
+            if len(changed) * 2 <= len(old_fp):
+                for i in changed:
+                    ops.append({"op": "setitem", "path": path, "index": i, "value": value[i]})
+                if len(new_fp) > len(old_fp):
+                    ops.append({"op": "extend", "path": path, "at": len(old_fp), "items": value[len(old_fp):]})
+                return new_fp
+        ops.append({"op": "set", "path": path, "value": value})
+        return new_fp
+
+    new_fp = _leaf_fingerprint(value)
+    if old_fp != new_fp:
+        ops.append({"op": "set", "path": path, "value": value})
+    return new_fp
+
+
+def _diff_sections(old_fp, value: dict, sections, ops: list):
+    """``_diff`` of a session root that only re-encodes the top-level keys in ``sections``.
+
+    With ``sections=None`` every key is diffed.  Keys added or removed since
+    the last persisted state are always picked up.
+    """
+    if sections is None or not isinstance(old_fp, dict):
+        return _diff(old_fp, value, [], ops, 0)
+    new_fp = {}
+    for key, child in value.items():
+        if key in sections or key not in old_fp:
+            new_fp[key] = _diff(old_fp.get(key, _MISSING), child, [key], ops, 1)
+        else:
+            new_fp[key] = old_fp[key]
+    for key in old_fp:
+        if key not in value:
+            ops.append({"op": "del", "path": [key]})
+    return new_fp
+
+
+def _apply_op(data: dict, op: dict):
+    path = op.get("path") or []
+    if not path:
+        return
+    target = data
+    for key in path[:-1]:
+        child = target.get(key) if isinstance(target, dict) else None
+        if not isinstance(child, dict):
+            if not isinstance(target, dict):
+                return
+            child = {}
+            target[key] = child
+        target = child
+    if not isinstance(target, dict):
+        return
+
+    last = path[-1]
+    kind = op.get("op")
+    if kind == "set":
+        target[last] = op.get("value")
+    elif kind == "del":
+        target.pop(last, None)
+    elif kind == "extend":
+        at = op.get("at", 0)
+        current = target.get(last)
+        if not isinstance(current, list) or len(current) < at:
+            raise JournalMismatchError(f"cannot extend {path} at {at}")
+        current[at:] = op.get("items", [])
+    elif kind == "setitem":
+        current = target.get(last)
+        index = op.get("index", -1)
+        if not isinstance(current, list) or not 0 <= index < len(current):
+            raise JournalMismatchError(f"cannot set {path}[{index}]")
+        current[index] = op.get("value")
+
+
+# ---------------------------------------------------------------------------
+# File I/O
+# ---------------------------------------------------------------------------
+
+async def _write_snapshot(session_path: Path, session_data: dict) -> int:
+    """Atomically write a full snapshot (temp file + os.replace). Returns bytes written."""
+    session_path.parent.mkdir(parents=True, exist_ok=True)
+    json_content = json.dumps(session_data, indent=2)
+    temp_fd, temp_path = tempfile.mkstemp(dir=str(session_path.parent), suffix='.tmp', prefix='.session_')
+    try:
+        os.close(temp_fd)
+        async with aiofiles.open(temp_path, 'w', encoding='utf-8') as f:
+            await f.write(json_content)
+        os.replace(temp_path, str(session_path))
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return len(json_content)
+
+
+def _bump_generation(key: str) -> int:
+    generation = _generations.get(key, 0) + 1
+    _generations[key] = generation
+    return generation
+
+
+def _replay_journal(data: dict, journal: str, journal_name: str, limit: int = None) -> int:
+    """
+    Apply the journal records in ``journal`` (at most ``limit``) to ``data``.
+
+    Returns the number of entries applied. Raises ``JournalMismatchError``,
+    with ``entries`` set to the number of entries applied before it, if an
+    entry does not fit ``data``.
+    """
+    entries = 0
+    lines = journal.splitlines()
+    for index, line in enumerate(lines):
+        if limit is not None and entries >= limit:
+            break
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            if index == len(lines) - 1:
+                app_logger.warning(f"Ignoring torn final journal entry in {journal_name}")
+                break
+            raise
+        try:
+            for op in record.get("ops", []):
+                _apply_op(data, op)
+        except JournalMismatchError as e:
+            e.entries = entries
+            raise
+        entries += 1
+    return entries
+
+
+def _load_with_journal(content: str, journal: str, journal_name: str) -> tuple:
+    """
+    Parse a snapshot and replay its journal. Returns (data, entries, consistent).
+
+    If the journal does not fit the snapshot, the result is the snapshot with
+    only the entries before the first misfit replayed, and ``consistent`` is False.
+    """
+    data = json.loads(content)
+    try:
+        return data, _replay_journal(data, journal, journal_name), True
+    except JournalMismatchError as e:
+        app_logger.error(
+            f"Journal {journal_name} does not match its snapshot ({e}); "
+            f"keeping the first {e.entries} entries")
+        data = json.loads(content)
+        return data, _replay_journal(data, journal, journal_name, limit=e.entries), False
+
+
+async def _read(session_path: Path) -> tuple:
+    """
+    Read a snapshot and replay its journal.
+
+    Returns (data, entries, journal_bytes, snapshot_bytes, consistent).
+    """
+    async with aiofiles.open(session_path, 'r', encoding='utf-8') as f:
+        content = await f.read()
+    snapshot_bytes = len(content)
+
+    journal_path = journal_path_for(session_path)
+    if not journal_path.is_file():
+        return json.loads(content), 0, 0, snapshot_bytes, True
+    async with aiofiles.open(journal_path, 'r', encoding='utf-8') as f:
+        journal = await f.read()
+    data, entries, consistent = _load_with_journal(content, journal, journal_path.name)
+    return data, entries, len(journal), snapshot_bytes, consistent
+
+
+async def load_journaled(session_path: Path) -> dict:
+    """Load a snapshot and replay its journal (if any). Raises like json/OS reads do."""
+    key = str(session_path)
+    generation = _generations.get(key, 0)
+
+    data, entries, journal_bytes, snapshot_bytes, consistent = await _read(session_path)
+
+    # Without a baseline the next save rewrites the snapshot, dropping a mismatched journal
+    if consistent and _generations.get(key, 0) == generation:
+        _states[key] = _JournalState(_fingerprint(data), entries, journal_bytes, snapshot_bytes, generation)
+    return data
+
+
+async def read_session(session_path: Path) -> dict:
+    """
+    Read-only load of a session file: the snapshot with its journal replayed.
+
+    For code that scans session files directly. Unlike ``load_journaled`` it
+    does not record a save baseline. Raises like json/OS reads do.
+    """
+    return (await _read(session_path))[0]
+
+
+def read_session_sync(session_path: Path) -> dict:
+    """Blocking variant of ``read_session`` for synchronous callers."""
+    with open(session_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    journal_path = journal_path_for(session_path)
+    if not journal_path.is_file():
+        return json.loads(content)
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        journal = f.read()
+    return _load_with_journal(content, journal, journal_path.name)[0]
+
+
+async def save_journaled(session_path: Path, session_data: dict, compact_entries: int, compact_bytes: int,
+                         sections=None):
+    """
+    Persist ``session_data`` as a journal delta, compacting when thresholds are exceeded.
+
+    ``sections`` are the top-level keys that may have changed since the last
+    save of this file (None: any of them).
+    """
+    key = str(session_path)
+    state = _states.get(key)
+
+    if state is None or not session_path.is_file():
+        # No known baseline for this file — write a full snapshot to establish one
+        await compact(session_path, session_data)
+        return
+
+    ops: list = []
+    new_fp = _diff_sections(state.fingerprint, session_data, sections, ops)
+    if not ops:
+        return
+
+    line = json.dumps({"ops": ops}, separators=(",", ":")) + "\n"
+    async with aiofiles.open(journal_path_for(session_path), 'a', encoding='utf-8') as f:
+        await f.write(line)
+
+    state.fingerprint = new_fp
+    state.entries += 1
+    state.journal_bytes += len(line)
+    state.generation = _bump_generation(key)
+
+    if state.entries >= compact_entries or state.journal_bytes >= max(compact_bytes, state.snapshot_bytes):
+        await compact(session_path, session_data)
+
+
+async def compact(session_path: Path, session_data: dict):
+    """Fold the current state into a fresh snapshot and drop the journal."""
+    key = str(session_path)
+    snapshot_bytes = await _write_snapshot(session_path, session_data)
+    discard_journal(session_path)
+    generation = _bump_generation(key)
+    _states[key] = _JournalState(_fingerprint(session_data), 0, 0, snapshot_bytes, generation)
+    app_logger.debug(f"Compacted session journal into snapshot: {session_path.name} ({snapshot_bytes} bytes)")
+
+
+async def fold_journal(session_path: Path) -> bool:
+    """Compact a pending journal into the snapshot so the file can be read/written directly.
+
+    Returns True if a journal was folded.
+    """
+    if not journal_path_for(session_path).is_file():
+        return False
+    data = await load_journaled(session_path)
+    await compact(session_path, data)
+    return True
+
+
+def discard_journal(session_path: Path):
+    """Remove a session's journal file and forget its persisted-state fingerprint."""
+    try:
+        journal_path_for(session_path).unlink()
+    except FileNotFoundError:
+        pass
+    _states.pop(str(session_path), None)
@@ -2,6 +2,9 @@
 import uuid
 import os
 import json
+import base64
+import copy
+import functools
 import logging
 from datetime import datetime, timezone
 from pathlib import Path # Use pathlib for better path handling
@@ -15,6 +18,8 @@ import google.generativeai as genai
 from trusted_data_agent.agent.prompts import PROVIDER_SYSTEM_PROMPTS
 # --- MODIFICATION START: Import APP_CONFIG ---
 from trusted_data_agent.core.config import APP_STATE, APP_CONFIG
+from trusted_data_agent.core import session_journal
+from trusted_data_agent.core.session_cache import SessionCache
 from trusted_data_agent.core.utils import generate_session_id, get_project_root # Import generate_session_id and get_project_root
 from trusted_data_agent.agent.rag_template_generator import RAGTemplateGenerator
 # --- MODIFICATION END ---
@@ -61,6 +66,55 @@ def _get_session_lock(session_id: str) -> asyncio.Lock:
     return _session_locks[session_id]
 
 
+# --- Write-Back Session Cache ---
+# Keeps hot sessions parsed in memory and coalesces saves into debounced disk
+# writes. Created lazily; None when APP_CONFIG.SESSION_CACHE_ENABLED is off.
+_session_cache: SessionCache | None = None
+
+def _get_session_cache() -> SessionCache | None:
+    global _session_cache
+    # With SESSIONS_FILTER_BY_USER off a session is found in any user's directory,
+    # so (user_uuid, session_id) would cache one file under several keys.
+    if not APP_CONFIG.SESSION_CACHE_ENABLED or not APP_CONFIG.SESSIONS_FILTER_BY_USER:
+        return None
+    if _session_cache is None:
+        _session_cache = SessionCache(
+            writer=_flush_cached_session,
+            lock_for=_get_session_lock,
+            max_entries=APP_CONFIG.SESSION_CACHE_MAX_ENTRIES,
+            flush_delay=APP_CONFIG.SESSION_CACHE_FLUSH_DELAY_SECONDS,
+        )
+    return _session_cache
+
+
+async def flush_session_cache(user_uuid: str = None, session_id: str = None, evict: bool = False):
+    """
+    Write pending cached session changes to disk.
+
+    With ``session_id`` only that session is flushed (all users if ``user_uuid``
+    is None); otherwise every dirty session is flushed. Use ``evict=True`` before
+    reading or rewriting a session file directly. Must not be called while
+    holding the session's lock.
+    """
+    cache = _session_cache
+    if cache is None:
+        return
+    if session_id is None:
+        await cache.flush_all()
+        return
+    for key in cache.session_keys(session_id):
+        if user_uuid is None or key[0] == user_uuid:
+            await cache.flush(key, evict=evict)
+
+
+def get_session_cache_stats() -> dict:
+    """Return hit/miss and flush-latency counters of the session cache."""
+    cache = _session_cache
+    stats = cache.get_stats() if cache is not None else {}
+    stats["enabled"] = APP_CONFIG.SESSION_CACHE_ENABLED
+    return stats
+
+
 # ---------------------------------------------------------------------------
 # Session Metadata Index — SQLite cache for fast session listing
 # ---------------------------------------------------------------------------
@@ -100,7 +154,11 @@ async def _init_session_index():
                     status TEXT DEFAULT 'unknown',
                     provider TEXT,
                     model TEXT,
-                    profile_type TEXT
+                    profile_type TEXT,
+                    genie_parent_id TEXT,
+                    genie_root_id TEXT,
+                    genie_path TEXT DEFAULT '',
+                    genie_sequence INTEGER DEFAULT 0
                 )
             """)
             # Migrate existing index databases that lack the new columns
@@ -111,6 +169,10 @@ async def _init_session_index():
                 ("provider", "TEXT"),
                 ("model", "TEXT"),
                 ("profile_type", "TEXT"),
+                ("genie_parent_id", "TEXT"),
+                ("genie_root_id", "TEXT"),
+                ("genie_path", "TEXT DEFAULT ''"),
+                ("genie_sequence", "INTEGER DEFAULT 0"),
             ]:
                 try:
                     await db.execute(f"ALTER TABLE session_index ADD COLUMN {col} {typedef}")
@@ -124,6 +186,17 @@ async def _init_session_index():
                 CREATE INDEX IF NOT EXISTS idx_si_user_updated
                 ON session_index(user_uuid, last_updated DESC)
             """)
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_si_genie_parent
+                ON session_index(genie_parent_id)
+            """)
+            # Matches the is_last_child window of _query_session_page, so
+            # computing it needs no sort
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_si_user_family
+                ON session_index(user_uuid, genie_parent_id, genie_sequence DESC, session_id DESC)
+            """)
+            await _refresh_genie_hierarchy(db)
             await db.commit()
         _session_index_ready = True
         app_logger.info("Session index database initialized")
@@ -132,6 +205,65 @@ async def _init_session_index():
         app_logger.error(f"Failed to initialize session index: {e}", exc_info=True)
 
 
+# Genie hierarchy columns: genie_parent_id / genie_sequence come from genie_metadata;
+# genie_root_id is the top-level session of the family and genie_path orders a family
+# depth-first (parent before children, children by sequence number). Listing queries
+# sort by the root's last_updated and then genie_path, which reproduces the nested
+# sidebar order in SQL.
+def _genie_path_segment(sequence: int, session_id: str) -> str:
+    return f"/{sequence:06d}:{session_id}"
+
+
+async def _refresh_genie_hierarchy(db, session_id: str = None):
+    """
+    Recompute genie_root_id and genie_path for every indexed session, or only for
+    the descendants of ``session_id`` (whose own row must already be current).
+
+    The family tree is materialised in a temp table and applied with correlated
+    subqueries rather than UPDATE ... FROM, which needs SQLite 3.33+.
+    """
+    if session_id is None:
+        await db.execute("""
+            UPDATE session_index SET
+                genie_parent_id = CASE WHEN json_extract(genie_metadata, '$.is_genie_slave')
+                                       THEN json_extract(genie_metadata, '$.parent_session_id') END,
+                genie_sequence = COALESCE(json_extract(genie_metadata, '$.slave_sequence_number'), 0)
+            WHERE json_valid(genie_metadata)
+        """)
+        seed, params = """
+            SELECT session_id, session_id, '' FROM session_index
+            WHERE genie_parent_id IS NULL
+               OR genie_parent_id NOT IN (SELECT session_id FROM session_index)
+        """, ()
+    else:
+        seed, params = """
+            SELECT session_id, COALESCE(genie_root_id, session_id), COALESCE(genie_path, '')
+            FROM session_index WHERE session_id = ?
+        """, (session_id,)
+    await db.execute("DROP TABLE IF EXISTS temp.genie_tree")
+    await db.execute("CREATE TEMP TABLE genie_tree (session_id TEXT PRIMARY KEY, root_id TEXT, path TEXT)")
+    try:
+        await db.execute(f"""
+            INSERT OR IGNORE INTO genie_tree
+            WITH RECURSIVE tree(session_id, root_id, path) AS (
+                {seed}
+                UNION ALL
+                SELECT c.session_id, t.root_id,
+                       t.path || '/' || printf('%06d', c.genie_sequence) || ':' || c.session_id
+                FROM session_index c JOIN tree t ON c.genie_parent_id = t.session_id
+            )
+            SELECT session_id, root_id, path FROM tree
+        """, params)
+        await db.execute("""
+            UPDATE session_index SET
+                genie_root_id = (SELECT root_id FROM genie_tree WHERE genie_tree.session_id = session_index.session_id),
+                genie_path = (SELECT path FROM genie_tree WHERE genie_tree.session_id = session_index.session_id)
+            WHERE session_id IN (SELECT session_id FROM genie_tree)
+        """)
+    finally:
+        await db.execute("DROP TABLE IF EXISTS temp.genie_tree")
+
+
 def _compute_session_status(wf: list) -> str:
     """Derive session status from workflow history turns.
 
@@ -148,29 +280,91 @@ def _compute_session_status(wf: list) -> str:
     return "success"
 
 
+def _session_index_fields(session_data: dict) -> dict:
+    """Extract the values of a session's index row (everything but the Genie root/path)."""
+    genie_metadata = session_data.get("genie_metadata", {})
+    # Compute total_tokens and turn_count from session data
+    input_tokens = session_data.get("input_tokens", 0) or 0
+    output_tokens = session_data.get("output_tokens", 0) or 0
+    # Turn count and status from last_turn_data workflow_history or top-level
+    wf = session_data.get("last_turn_data", {}).get("workflow_history", [])
+    return {
+        "user_uuid": session_data.get("user_uuid", ""),
+        "name": session_data.get("name", "New Chat"),
+        "created_at": session_data.get("created_at"),
+        "last_updated": session_data.get("last_updated"),
+        "profile_tag": session_data.get("profile_tag"),
+        "profile_id": session_data.get("profile_id"),
+        "archived": 1 if session_data.get("archived") else 0,
+        "archived_at": session_data.get("archived_at"),
+        "is_temporary": 1 if session_data.get("is_temporary") else 0,
+        "temporary_purpose": session_data.get("temporary_purpose"),
+        "models_used": json.dumps(session_data.get("models_used", [])),
+        "profile_tags_used": json.dumps(session_data.get("profile_tags_used", [])),
+        "genie_metadata": json.dumps(genie_metadata),
+        "total_tokens": input_tokens + output_tokens,
+        "turn_count": len([t for t in wf if t.get("isValid", True)]) if wf else session_data.get("turn_count", 0),
+        "status": _compute_session_status(wf),
+        "provider": session_data.get("provider"),
+        "model": session_data.get("model"),
+        "profile_type": session_data.get("profile_type"),
+        # Genie hierarchy: children inherit the root and path of their parent's row
+        "genie_parent_id": genie_metadata.get("parent_session_id") if genie_metadata.get("is_genie_slave") else None,
+        "genie_sequence": int(genie_metadata.get("slave_sequence_number") or 0),
+    }
+
+
+def _schedule_session_index_upsert(session_id: str, session_data: dict):
+    """
+    Update a session's index row in the background (the index is a cache).
+
+    The row values are taken now: ``session_data`` may be the session cache's
+    own dict, which a later transaction mutates in place.
+    """
+    if not _session_index_ready:
+        return
+    try:
+        fields = _session_index_fields(session_data)
+    except Exception as e:
+        app_logger.warning(f"Failed to upsert session index for {session_id}: {e}")
+        return
+    asyncio.create_task(_write_session_index_row(session_id, fields))
+
+
 async def _upsert_session_index(session_id: str, session_data: dict):
     """Insert or update a session's metadata in the index. Fire-and-forget safe."""
     if not _session_index_ready:
         return
     try:
-        genie_metadata = session_data.get("genie_metadata", {})
-        # Compute total_tokens and turn_count from session data
-        input_tokens = session_data.get("input_tokens", 0) or 0
-        output_tokens = session_data.get("output_tokens", 0) or 0
-        total_tokens = input_tokens + output_tokens
-        # Turn count and status from last_turn_data workflow_history or top-level
-        wf = session_data.get("last_turn_data", {}).get("workflow_history", [])
-        turn_count = len([t for t in wf if t.get("isValid", True)]) if wf else session_data.get("turn_count", 0)
-        status = _compute_session_status(wf)
+        fields = _session_index_fields(session_data)
+    except Exception as e:
+        app_logger.warning(f"Failed to upsert session index for {session_id}: {e}")
+        return
+    await _write_session_index_row(session_id, fields)
+
+
+async def _write_session_index_row(session_id: str, fields: dict):
+    try:
+        genie_parent_id = fields["genie_parent_id"]
+        genie_root_id, genie_path = session_id, ""
         async with aiosqlite.connect(str(SESSION_INDEX_DB)) as db:
+            if genie_parent_id:
+                cursor = await db.execute(
+                    "SELECT genie_root_id, genie_path FROM session_index WHERE session_id=?",
+                    (genie_parent_id,))
+                parent_row = await cursor.fetchone()
+                if parent_row is not None:
+                    genie_root_id = parent_row[0] or genie_parent_id
+                    genie_path = (parent_row[1] or "") + _genie_path_segment(fields["genie_sequence"], session_id)
             await db.execute("""
                 INSERT INTO session_index
                     (session_id, user_uuid, name, created_at, last_updated,
                      profile_tag, profile_id, archived, archived_at,
                      is_temporary, temporary_purpose, models_used,
                      profile_tags_used, genie_metadata,
-                     total_tokens, turn_count, status, provider, model, profile_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     total_tokens, turn_count, status, provider, model, profile_type,
+                     genie_parent_id, genie_root_id, genie_path, genie_sequence)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(session_id) DO UPDATE SET
                     name=excluded.name,
                     last_updated=excluded.last_updated,
@@ -188,29 +382,44 @@ async def _upsert_session_index(session_id: str, session_data: dict):
                     status=excluded.status,
                     provider=excluded.provider,
                     model=excluded.model,
-                    profile_type=excluded.profile_type
+                    profile_type=excluded.profile_type,
+                    genie_parent_id=excluded.genie_parent_id,
+                    genie_root_id=excluded.genie_root_id,
+                    genie_path=excluded.genie_path,
+                    genie_sequence=excluded.genie_sequence
             """, (
                 session_id,
-                session_data.get("user_uuid", ""),
-                session_data.get("name", "New Chat"),
-                session_data.get("created_at"),
-                session_data.get("last_updated"),
-                session_data.get("profile_tag"),
-                session_data.get("profile_id"),
-                1 if session_data.get("archived") else 0,
-                session_data.get("archived_at"),
-                1 if session_data.get("is_temporary") else 0,
-                session_data.get("temporary_purpose"),
-                json.dumps(session_data.get("models_used", [])),
-                json.dumps(session_data.get("profile_tags_used", [])),
-                json.dumps(genie_metadata),
-                total_tokens,
-                turn_count,
-                status,
-                session_data.get("provider"),
-                session_data.get("model"),
-                session_data.get("profile_type"),
+                fields["user_uuid"],
+                fields["name"],
+                fields["created_at"],
+                fields["last_updated"],
+                fields["profile_tag"],
+                fields["profile_id"],
+                fields["archived"],
+                fields["archived_at"],
+                fields["is_temporary"],
+                fields["temporary_purpose"],
+                fields["models_used"],
+                fields["profile_tags_used"],
+                fields["genie_metadata"],
+                fields["total_tokens"],
+                fields["turn_count"],
+                fields["status"],
+                fields["provider"],
+                fields["model"],
+                fields["profile_type"],
+                genie_parent_id,
+                genie_root_id,
+                genie_path,
+                fields["genie_sequence"],
             ))
+            # Children indexed before this session were stored as their own roots; relink them
+            cursor = await db.execute(
+                "SELECT 1 FROM session_index WHERE genie_parent_id=? AND "
+                "(genie_root_id IS NOT ? OR substr(genie_path, 1, length(?)) != ?) LIMIT 1",
+                (session_id, genie_root_id, genie_path + "/", genie_path + "/"))
+            if await cursor.fetchone() is not None:
+                await _refresh_genie_hierarchy(db, session_id)
             await db.commit()
     except Exception as e:
         app_logger.warning(f"Failed to upsert session index for {session_id}: {e}")
@@ -228,6 +437,32 @@ async def _delete_from_session_index(session_id: str):
         app_logger.warning(f"Failed to delete session index entry for {session_id}: {e}")
 
 
+def _index_row_to_summary(row) -> dict:
+    """Build a session summary from a session_index row (JSON columns are decoded here)."""
+    return {
+        "id": row["session_id"],
+        "user_uuid": row["user_uuid"],
+        "name": row["name"] or "Unnamed Session",
+        "created_at": row["created_at"] or "Unknown",
+        "last_updated": row["last_updated"] or row["created_at"] or "Unknown",
+        "profile_tag": row["profile_tag"],
+        "profile_id": row["profile_id"],
+        "archived": bool(row["archived"]),
+        "archived_at": row["archived_at"],
+        "is_temporary": bool(row["is_temporary"]),
+        "temporary_purpose": row["temporary_purpose"],
+        "models_used": json.loads(row["models_used"] or "[]"),
+        "profile_tags_used": json.loads(row["profile_tags_used"] or "[]"),
+        "genie_metadata": json.loads(row["genie_metadata"] or "{}"),
+        "total_tokens": row["total_tokens"] or 0,
+        "turn_count": row["turn_count"] or 0,
+        "status": row["status"] or "unknown",
+        "provider": row["provider"] or "Unknown",
+        "model": row["model"] or "Unknown",
+        "profile_type": row["profile_type"],
+    }
+
+
 async def _query_session_index(user_uuid: str, include_archived: bool = False,
                                 filter_by_user: bool = True) -> list[dict] | None:
     """
@@ -259,30 +494,7 @@ async def _query_session_index(user_uuid: str, include_archived: bool = False,
                         "SELECT * FROM session_index WHERE archived=0 ORDER BY last_updated DESC")
 
             rows = await cursor.fetchall()
-            summaries = []
-            for row in rows:
-                summaries.append({
-                    "id": row["session_id"],
-                    "user_uuid": row["user_uuid"],
-                    "name": row["name"] or "Unnamed Session",
-                    "created_at": row["created_at"] or "Unknown",
-                    "last_updated": row["last_updated"] or row["created_at"] or "Unknown",
-                    "profile_tag": row["profile_tag"],
-                    "profile_id": row["profile_id"],
-                    "archived": bool(row["archived"]),
-                    "archived_at": row["archived_at"],
-                    "is_temporary": bool(row["is_temporary"]),
-                    "temporary_purpose": row["temporary_purpose"],
-                    "models_used": json.loads(row["models_used"] or "[]"),
-                    "profile_tags_used": json.loads(row["profile_tags_used"] or "[]"),
-                    "genie_metadata": json.loads(row["genie_metadata"] or "{}"),
-                    "total_tokens": row["total_tokens"] or 0,
-                    "turn_count": row["turn_count"] or 0,
-                    "status": row["status"] or "unknown",
-                    "provider": row["provider"] or "Unknown",
-                    "model": row["model"] or "Unknown",
-                    "profile_type": row["profile_type"],
-                })
+            summaries = [_index_row_to_summary(row) for row in rows]
             app_logger.debug(f"Session index returned {len(summaries)} sessions for user {user_uuid}")
             return summaries
     except Exception as e:
@@ -290,6 +502,163 @@ async def _query_session_index(user_uuid: str, include_archived: bool = False,
         return None
 
 
+def _encode_session_cursor(sort_key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode("utf-8")).decode("ascii")
+
+
+def _decode_session_cursor(cursor: str) -> tuple:
+    """Decode a keyset cursor from get_all_sessions; raises ValueError if malformed."""
+    try:
+        sort_key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid session cursor: {e}") from None
+    if not isinstance(sort_key, list) or len(sort_key) != 3 or not all(isinstance(v, str) for v in sort_key):
+        raise ValueError("Invalid session cursor")
+    return tuple(sort_key)
+
+
+def _follows_session_cursor(sort_key: tuple, sort_updated: str, sort_root: str, sort_path: str) -> bool:
+    """True if ``sort_key`` comes after the cursor position in sidebar order."""
+    updated, root, path = sort_key
+    return (updated < sort_updated
+            or (updated == sort_updated and root < sort_root)
+            or (updated == sort_updated and root == sort_root and path > sort_path))
+
+
+def _sidebar_sort_keys(all_summaries: list, listed: list) -> dict:
+    """
+    File-scan equivalent of the sort columns computed by _query_session_page.
+
+    Returns {id(summary): (sort_updated, sort_root, sort_path)} for each listed
+    summary. Family roots are resolved over ``all_summaries`` (as the index does
+    over every indexed session); a session whose root is not listed sorts as its
+    own root.
+    """
+    def parent_of(summary):
+        genie_metadata = summary.get("genie_metadata") or {}
+        return genie_metadata.get("parent_session_id") if genie_metadata.get("is_genie_slave") else None
+
+    def updated_of(summary):
+        updated = summary.get("last_updated") or summary.get("created_at") or ""
+        return "" if updated == "Unknown" else updated
+
+    by_id = {s.get("id"): s for s in all_summaries}
+    listed_ids = {s.get("id") for s in listed}
+    keys = {}
+    for summary in listed:
+        chain, node, seen = [], summary, set()
+        while node is not None and node.get("id") not in seen:
+            seen.add(node.get("id"))
+            chain.append(node)
+            node = by_id.get(parent_of(node))
+        root = chain[-1]
+        if root is not summary and root.get("id") in listed_ids:
+            path = "".join(
+                _genie_path_segment(int((n.get("genie_metadata") or {}).get("slave_sequence_number") or 0), n.get("id"))
+                for n in reversed(chain[:-1]))
+            keys[id(summary)] = (updated_of(root), root.get("id"), path)
+        else:
+            keys[id(summary)] = (updated_of(summary), summary.get("id"), "")
+    return keys
+
+
+async def _query_session_page(user_uuid: str, include_archived: bool = False,
+                              filter_by_user: bool = True, limit: int = None,
+                              offset: int = 0, cursor: str = None) -> dict | None:
+    """
+    Query one page of session summaries from the index, in sidebar order.
+
+    Filtering, Genie parent/child ordering and pagination all run in SQLite;
+    only the returned rows are converted (and their JSON columns decoded).
+    Sessions are ordered by their family root's last_updated (newest first),
+    then depth-first within the family. A child whose root is not listed
+    (e.g. archived parent) is placed as its own root.
+
+    ``cursor`` (from a previous page's ``next_cursor``) continues after that
+    page's last row and takes precedence over ``offset``.
+
+    Cost: the sort key (sort_updated, sort_root, sort_path) comes from the
+    family root, and whether a child counts as its own root depends on the
+    archived filter, so no index can supply that order.  Every page, cursor
+    pages included, sorts all of the user's matching rows in a temp B-tree
+    (O(n log n) in SQLite, no Python-side decoding); only the LIMIT rows are
+    returned.  idx_si_user_family covers the row filter and the last-child
+    window.
+
+    Returns dict(sessions, total_count, has_more, next_cursor), or None if
+    the index is unavailable.
+    """
+    if not _session_index_ready:
+        return None
+
+    # {t} is the table alias: the same filter applies to a row and to its family root
+    conditions, params = ["{t}.session_id != ?"], [RAGTemplateGenerator.TEMPLATE_SESSION_ID]
+    if filter_by_user:
+        conditions.append("{t}.user_uuid = ?")
+        params.append(user_uuid)
+    if not include_archived:
+        conditions.append("{t}.archived = 0")
+    where = " AND ".join(conditions)
+
+    page_conditions, page_params = [], []
+    if cursor:
+        sort_updated, sort_root, sort_path = _decode_session_cursor(cursor)
+        page_conditions.append(
+            "(sort_updated < ? OR (sort_updated = ? AND sort_root < ?)"
+            " OR (sort_updated = ? AND sort_root = ? AND sort_path > ?))")
+        page_params += [sort_updated, sort_updated, sort_root, sort_updated, sort_root, sort_path]
+        offset = 0
+    page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+    limit_clause = ""
+    if limit is not None:
+        limit_clause = "LIMIT ? OFFSET ?"
+        page_params += [limit + 1, max(0, offset)]  # One extra row tells whether more exist
+
+    query = f"""
+        WITH ordered AS (
+            SELECT v.*,
+                   CASE WHEN r.session_id IS NULL THEN COALESCE(v.last_updated, v.created_at, '')
+                        ELSE COALESCE(r.last_updated, r.created_at, '') END AS sort_updated,
+                   COALESCE(r.session_id, v.session_id) AS sort_root,
+                   CASE WHEN r.session_id IS NULL THEN '' ELSE COALESCE(v.genie_path, '') END AS sort_path,
+                   v.genie_parent_id IS NOT NULL AND ROW_NUMBER() OVER (
+                       PARTITION BY v.genie_parent_id
+                       ORDER BY v.genie_sequence DESC, v.session_id DESC) = 1 AS is_last_child
+            FROM session_index v
+            LEFT JOIN session_index r
+                ON r.session_id = COALESCE(v.genie_root_id, v.session_id) AND {where.format(t="r")}
+            WHERE {where.format(t="v")}
+        )
+        SELECT * FROM ordered {page_where}
+        ORDER BY sort_updated DESC, sort_root DESC, sort_path ASC
+        {limit_clause}
+    """
+    try:
+        async with aiosqlite.connect(str(SESSION_INDEX_DB)) as db:
+            db.row_factory = aiosqlite.Row
+            total_count = (await (await db.execute(
+                f"SELECT COUNT(*) FROM session_index s WHERE {where.format(t='s')}", params)).fetchone())[0]
+            rows = await (await db.execute(query, params + params + page_params)).fetchall()
+    except Exception as e:
+        app_logger.warning(f"Session index page query failed, will fall back to file scan: {e}")
+        return None
+
+    has_more = limit is not None and len(rows) > limit
+    if has_more:
+        rows = rows[:limit]
+    sessions = []
+    for row in rows:
+        summary = _index_row_to_summary(row)
+        if row["is_last_child"]:
+            summary["genie_metadata"]["is_last_child"] = True
+        sessions.append(summary)
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = _encode_session_cursor((last["sort_updated"], last["sort_root"], last["sort_path"]))
+    return {"sessions": sessions, "total_count": total_count, "has_more": has_more, "next_cursor": next_cursor}
+
+
 _INDEX_KEYS = frozenset({
     "id", "name", "created_at", "last_updated", "profile_tag", "profile_id",
     "archived", "archived_at", "is_temporary", "temporary_purpose",
@@ -302,10 +671,7 @@ _INDEX_KEYS = frozenset({
 async def _read_session_metadata_only(session_file: Path) -> dict | None:
     """Read a session file and extract only the metadata fields needed for indexing.
     Avoids retaining the full chat/workflow history in memory."""
-    async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-        content = await f.read()
-    full_data = json.loads(content)
-    del content  # Release raw string for GC
+    full_data = await load_session_file(session_file)
     metadata = {k: full_data[k] for k in _INDEX_KEYS if k in full_data}
     # Compute turn_count from workflow_history without retaining it
     wf = full_data.get("last_turn_data", {}).get("workflow_history", [])
@@ -339,15 +705,20 @@ async def _rebuild_session_index():
             except Exception as e:
                 errors += 1
                 app_logger.debug(f"Skipped {session_file.name} during index rebuild: {e}")
+        # Files are scanned in arbitrary order; link children whose parent was indexed later
+        async with aiosqlite.connect(str(SESSION_INDEX_DB)) as db:
+            await _refresh_genie_hierarchy(db)
+            await db.commit()
         app_logger.info(f"Session index rebuilt: {count} sessions indexed, {errors} errors")
     except Exception as e:
         app_logger.error(f"Session index rebuild failed: {e}", exc_info=True)
 
 
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 @asynccontextmanager
-async def _session_transaction(user_uuid: str, session_id: str):
+async def _session_transaction(user_uuid: str, session_id: str, sections=None):
     """
     Context manager that serializes load-modify-save cycles for a session.
 
@@ -360,14 +731,184 @@ async def _session_transaction(user_uuid: str, session_id: str):
 
     The lock is held for the entire load-modify-save cycle, preventing concurrent
     writers from reading stale data and overwriting each other's changes.
+
+    ``session_data`` is the session cache's own dict, checked out under the
+    lock and handed back on exit without a copy, so the body must not keep
+    references into it past the block, and values it stores must not be
+    shared with the caller (copy them on the way in).
+
+    ``sections`` names the top-level keys the body may change (None: any).
+    Journal storage then re-encodes only those keys, plus whatever the
+    turn's pending usage updates touch.
     """
     lock = _get_session_lock(session_id)
     async with lock:
-        session_data = await _load_session(user_uuid, session_id)
-        yield session_data
+        session_data = await _load_session(user_uuid, session_id, checkout=True)
+        usage, applied = None, []
+        if session_data is not None:
+            # Usage deferred by this turn rides along with whatever is saved next
+            usage = _active_turn_usage(user_uuid, session_id)
+            applied = _apply_pending_usage(usage, session_data)
+            if sections is not None:
+                sections = _usage_update_sections(applied, sections)
+        try:
+            yield session_data
+        except BaseException:
+            _requeue_pending_usage(usage, applied)
+            _release_session(user_uuid, session_id, session_data)
+            raise
         if session_data is not None:
-            if not await _save_session(user_uuid, session_id, session_data):
+            if not await _save_session(user_uuid, session_id, session_data, handoff=True, sections=sections):
                 app_logger.error(f"Failed to save session {session_id} in transaction")
+                _requeue_pending_usage(usage, applied)
+                _release_session(user_uuid, session_id, session_data)
+
+
+def _release_session(user_uuid: str, session_id: str, session_data: dict | None):
+    """Give a checked-out session that was not saved back to the session cache."""
+    cache = _get_session_cache()
+    if cache is not None and session_data is not None:
+        cache.release((user_uuid, session_id), session_data)
+
+
+# --- Per-turn usage accumulation ---
+#
+# Every LLM call used to run update_token_count and update_models_used as two
+# separate load-modify-save transactions, plus two auth-database commits (token
+# quota and request counter).  Inside turn_usage_scope() those updates are
+# queued on the turn instead:
+#   - session mutations are applied, in call order, by the next transaction on
+#     the session (any writer, or get_session), so readers never see stale totals;
+#   - quota and consumption counters are written once, when the scope closes.
+
+class _TurnUsage:
+    """Usage recorded during one turn of one session, not yet persisted."""
+
+    __slots__ = ("user_uuid", "session_id", "session_updates", "input_tokens",
+                 "output_tokens", "requests", "closed")
+
+    def __init__(self, user_uuid: str, session_id: str):
+        self.user_uuid = user_uuid
+        self.session_id = session_id
+        self.session_updates: list = []  # (apply_fn, args) in call order
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.requests = 0
+        self.closed = False
+
+
+_turn_usage: ContextVar["_TurnUsage | None"] = ContextVar("session_turn_usage", default=None)
+
+
+def _active_turn_usage(user_uuid: str, session_id: str) -> "_TurnUsage | None":
+    """The open accumulator of the current turn, if it belongs to this session."""
+    usage = _turn_usage.get()
+    if usage is None or usage.closed or usage.session_id != session_id or usage.user_uuid != user_uuid:
+        return None
+    return usage
+
+
+def _apply_pending_usage(usage: "_TurnUsage | None", session_data: dict) -> list:
+    """Apply and dequeue the turn's session updates; returns them for _requeue_pending_usage."""
+    if usage is None or not usage.session_updates:
+        return []
+    updates, usage.session_updates = usage.session_updates, []
+    for apply_fn, args in updates:
+        apply_fn(session_data, *args)
+    return updates
+
+
+def _usage_update_sections(updates: list, sections) -> frozenset | None:
+    """``sections`` plus the top-level keys touched by applied usage updates (None if unknown)."""
+    sections = frozenset(sections)
+    for apply_fn, _args in updates:
+        touched = _USAGE_UPDATE_SECTIONS.get(apply_fn)
+        if touched is None:
+            return None
+        sections |= touched
+    return sections
+
+
+def _requeue_pending_usage(usage: "_TurnUsage | None", updates: list):
+    """Put updates back at the front of the queue when the transaction that took them did not save."""
+    if usage is not None and updates:
+        usage.session_updates[:0] = updates
+
+
+def _record_quota_usage(user_uuid: str, input_tokens: int, output_tokens: int, requests: int = 1):
+    """Write token quota usage and the request counters to the auth database."""
+    try:
+        from trusted_data_agent.auth.token_quota import record_token_usage
+        record_token_usage(user_uuid, input_tokens, output_tokens)
+        app_logger.debug(f"Recorded token usage for user {user_uuid}: input={input_tokens}, output={output_tokens}")
+    except Exception as e:
+        app_logger.error(f"Failed to record token usage for user {user_uuid}: {e}")
+
+    # --- CONSUMPTION TRACKING ---
+    try:
+        from trusted_data_agent.auth.database import get_db_session
+        from trusted_data_agent.auth.consumption_manager import ConsumptionManager
+
+        with get_db_session() as db_session:
+            manager = ConsumptionManager(db_session)
+            manager.increment_request_counter(user_uuid, count=requests)
+            app_logger.debug(f"Incremented request counter for user {user_uuid} by {requests}")
+    except Exception as e:
+        app_logger.warning(f"Failed to update consumption tracking for user {user_uuid}: {e}")
+
+
+async def flush_turn_usage(user_uuid: str, session_id: str):
+    """Apply the current turn's queued session updates now (e.g. at a phase boundary)."""
+    usage = _active_turn_usage(user_uuid, session_id)
+    if usage is not None and usage.session_updates:
+        async with _session_transaction(user_uuid, session_id, sections=()) as session_data:
+            if session_data is None:
+                app_logger.warning(f"Could not apply turn usage: Session {session_id} not found for user {user_uuid}.")
+                usage.session_updates = []
+
+
+@asynccontextmanager
+async def turn_usage_scope(user_uuid: str, session_id: str):
+    """
+    Batch per-call usage bookkeeping for one turn of a session.
+
+    Nested scopes for the same session join the outer one.  Usage recorded
+    after the scope closed (e.g. by a task that outlives the turn) is written
+    immediately, as outside a scope.
+    """
+    if (not APP_CONFIG.SESSION_USAGE_BATCHING_ENABLED or not user_uuid or not session_id
+            or _active_turn_usage(user_uuid, session_id) is not None):
+        yield
+        return
+
+    usage = _TurnUsage(user_uuid, session_id)
+    token = _turn_usage.set(usage)
+    try:
+        yield
+    finally:
+        _turn_usage.reset(token)
+        usage.closed = True
+        try:
+            if usage.session_updates:
+                # The transaction itself applies the queued updates
+                async with _session_transaction(user_uuid, session_id, sections=()) as session_data:
+                    if session_data is None:
+                        app_logger.warning(f"Could not apply turn usage: Session {session_id} not found for user {user_uuid}.")
+                    else:
+                        _apply_pending_usage(usage, session_data)
+        except Exception as e:
+            app_logger.error(f"Failed to apply turn usage for session {session_id}: {e}", exc_info=True)
+        if usage.requests:
+            _record_quota_usage(user_uuid, usage.input_tokens, usage.output_tokens, usage.requests)
+
+
+def batch_turn_usage(fn):
+    """Decorator: run ``fn(user_uuid, session_id, ...)`` inside turn_usage_scope."""
+    @functools.wraps(fn)
+    async def wrapper(user_uuid, session_id, *args, **kwargs):
+        async with turn_usage_scope(user_uuid, session_id):
+            return await fn(user_uuid, session_id, *args, **kwargs)
+    return wrapper
 
 
 # --- File I/O Helper Functions ---
@@ -406,8 +947,20 @@ def _find_session_path(user_uuid: str, session_id: str) -> Path | None:
                     return potential_path
         return None
 
-async def _load_session(user_uuid: str, session_id: str) -> dict | None:
-    """Loads session data from a file asynchronously."""
+async def _load_session(user_uuid: str, session_id: str, checkout: bool = False) -> dict | None:
+    """
+    Loads session data from the session cache, or from its file asynchronously.
+
+    With ``checkout=True`` (``_session_transaction`` only, under the session
+    lock) the result is the session cache's own dict rather than a copy.
+    """
+    cache = _get_session_cache()
+    if cache is not None:
+        key = (user_uuid, session_id)
+        cached = cache.checkout(key) if checkout else cache.get(key)
+        if cached is not None:
+            return cached
+
     session_path = _find_session_path(user_uuid, session_id)
     if not session_path:
         app_logger.warning(f"Session file not found for session_id: {session_id}")
@@ -417,11 +970,20 @@ async def _load_session(user_uuid: str, session_id: str) -> dict | None:
     try:
         # The check is technically redundant if _find_session_path finds something, but good for safety
         if session_path.is_file():
-            async with aiofiles.open(session_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                data = json.loads(content)
-                app_logger.debug(f"Successfully loaded session '{session_id}' (owned by {data.get('user_uuid')}) for requesting user '{user_uuid}'.")
-                return data
+            # Replay the journal whenever one exists, even in snapshot mode, so
+            # switching storage modes never loses journaled updates.
+            if (APP_CONFIG.SESSION_STORAGE_MODE == "journal"
+                    or session_journal.journal_path_for(session_path).is_file()):
+                data = await session_journal.load_journaled(session_path)
+                app_logger.debug(f"Successfully loaded journaled session '{session_id}' (owned by {data.get('user_uuid')}) for requesting user '{user_uuid}'.")
+            else:
+                async with aiofiles.open(session_path, 'r', encoding='utf-8') as f:
+                    content = await f.read()
+                    data = json.loads(content)
+                    app_logger.debug(f"Successfully loaded session '{session_id}' (owned by {data.get('user_uuid')}) for requesting user '{user_uuid}'.")
+            if cache is not None:
+                cache.put((user_uuid, session_id), session_path, data if checkout else copy.deepcopy(data))
+            return data
         else:
             app_logger.warning(f"Session file not found at: {session_path}")
             return None
@@ -429,9 +991,98 @@ async def _load_session(user_uuid: str, session_id: str) -> dict | None:
         app_logger.error(f"Error loading session file '{session_path}': {e}", exc_info=True)
         return None # Return None on error
 
-async def _save_session(user_uuid: str, session_id: str, session_data: dict):
-    """Saves session data to a file asynchronously, creating directories if needed."""
+def read_session_file(session_path: Path) -> dict:
+    """
+    Read a session file for code that scans session files directly instead of
+    going through ``_load_session``: the snapshot with any pending journal
+    replayed, or unflushed changes held by the session cache. Raises like
+    ``json.load`` does.
+
+    The result may be the session cache's own dict: treat it as read-only and
+    copy whatever you need to change.
+    """
+    cached = _peek_session_cache(session_path)
+    if cached is not None:
+        return cached
+    return session_journal.read_session_sync(session_path)
+
+
+async def load_session_file(session_path: Path) -> dict:
+    """Async variant of ``read_session_file``."""
+    cached = _peek_session_cache(session_path)
+    if cached is not None:
+        return cached
+    return await session_journal.read_session(session_path)
+
+
+def _peek_session_cache(session_path: Path) -> dict | None:
+    cache = _session_cache
+    if cache is None:
+        return None
+    return cache.peek((session_path.parent.name, session_path.stem))
+
+
+async def _write_session_file(session_path: Path, session_data: dict, sections=None):
+    """
+    Persist a session to disk in the configured storage mode.
+
+    ``sections`` (top-level keys changed since the last write, None if
+    unknown) narrows the journal delta computation.
+    """
+    if APP_CONFIG.SESSION_STORAGE_MODE == "journal":
+        # Append only the delta since the last persisted state; the journal
+        # is compacted into a fresh snapshot once it grows past the thresholds.
+        await session_journal.save_journaled(
+            session_path, session_data,
+            compact_entries=APP_CONFIG.SESSION_JOURNAL_COMPACT_ENTRIES,
+            compact_bytes=APP_CONFIG.SESSION_JOURNAL_COMPACT_BYTES,
+            sections=sections,
+        )
+        return
+
+    # Atomic write: write to temp file, then rename (os.replace is atomic on POSIX).
+    # This prevents file corruption when concurrent async tasks write simultaneously.
+    json_content = json.dumps(session_data, indent=2)
+    temp_fd, temp_path = tempfile.mkstemp(
+        dir=str(session_path.parent),
+        suffix='.tmp',
+        prefix='.session_'
+    )
+    try:
+        os.close(temp_fd)  # Close fd; we use aiofiles for async write
+        async with aiofiles.open(temp_path, 'w', encoding='utf-8') as f:
+            await f.write(json_content)
+        os.replace(temp_path, str(session_path))  # Atomic on POSIX
+    except BaseException:
+        # Clean up temp file on any error
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    # A full snapshot supersedes any journal left over from journal mode
+    session_journal.discard_journal(session_path)
+
+
+async def _flush_cached_session(key: tuple, session_path: Path, session_data: dict, sections=None):
+    """Session cache writer: persist a dirty cached session and refresh its index row."""
+    session_path.parent.mkdir(parents=True, exist_ok=True)
+    await _write_session_file(session_path, session_data, sections)
+    app_logger.debug(f"Flushed cached session '{key[1]}' for user '{key[0]}'.")
+    _schedule_session_index_upsert(key[1], session_data)
+
+
+async def _save_session(user_uuid: str, session_id: str, session_data: dict, handoff: bool = False, sections=None):
+    """
+    Saves session data to a file asynchronously, creating directories if needed.
+
+    With ``handoff=True`` the session cache keeps ``session_data`` itself rather
+    than a copy; the caller must not use it afterwards.  ``sections`` are the
+    top-level keys changed since the session was loaded (None: unknown).
+    """
     session_data['last_updated'] = datetime.now().isoformat()
+    if sections is not None:
+        sections = frozenset(sections) | {'last_updated'}
     session_path = _get_session_path(user_uuid, session_id)
     if not session_path:
         app_logger.error(f"Cannot save session '{session_id}' for user '{user_uuid}': Invalid path.")
@@ -443,30 +1094,17 @@ async def _save_session(user_uuid: str, session_id: str, session_data: dict):
         if not session_path.parent.exists():
              app_logger.warning(f"User session directory was just created (or failed silently): {session_path.parent}")
 
-        # Atomic write: write to temp file, then rename (os.replace is atomic on POSIX).
-        # This prevents file corruption when concurrent async tasks write simultaneously.
-        json_content = json.dumps(session_data, indent=2)
-        temp_fd, temp_path = tempfile.mkstemp(
-            dir=str(session_path.parent),
-            suffix='.tmp',
-            prefix='.session_'
-        )
-        try:
-            os.close(temp_fd)  # Close fd; we use aiofiles for async write
-            async with aiofiles.open(temp_path, 'w', encoding='utf-8') as f:
-                await f.write(json_content)
-            os.replace(temp_path, str(session_path))  # Atomic on POSIX
-        except BaseException:
-            # Clean up temp file on any error
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
-            raise
-        app_logger.debug(f"Successfully saved session '{session_id}' for user '{user_uuid}'.")
+        cache = _get_session_cache()
+        if cache is not None:
+            # Write-back: the disk write (and index update) happens in a
+            # debounced flush that coalesces the saves of a busy turn.
+            cache.mark_dirty((user_uuid, session_id), session_path, session_data, handoff=handoff, sections=sections)
+        else:
+            await _write_session_file(session_path, session_data, sections)
+            app_logger.debug(f"Successfully saved session '{session_id}' for user '{user_uuid}'.")
 
-        # Update session index (fire-and-forget — index is a cache)
-        asyncio.create_task(_upsert_session_index(session_id, session_data))
+            # Update session index (fire-and-forget — index is a cache)
+            _schedule_session_index_upsert(session_id, session_data)
 
         # --- MODIFICATION START: Send session_model_update notification (with deduplication) ---
         notification_queues = APP_STATE.get("notification_queues", {}).get(user_uuid, set())
@@ -566,6 +1204,8 @@ async def create_session(user_uuid: str, provider: str, llm_instance: any, chart
     }
 
     if await _save_session(user_uuid, session_id, session_data):
+        # New sessions are written through so the file and index entry exist immediately
+        await flush_session_cache(user_uuid, session_id)
         app_logger.info(f"Successfully created and saved session '{session_id}' for user '{user_uuid}'.")
         
         # --- CONSUMPTION TRACKING START ---
@@ -589,8 +1229,15 @@ async def create_session(user_uuid: str, provider: str, llm_instance: any, chart
         raise IOError(f"Failed to save session file for session {session_id}")
 
 
-async def get_session(user_uuid: str, session_id: str) -> dict | None:
+async def get_session(user_uuid: str, session_id: str, apply_turn_usage: bool = True) -> dict | None:
+    """
+    Load a session.  Usage queued by the current turn is applied first so token
+    totals and models are current; callers that only need the history can pass
+    ``apply_turn_usage=False`` to leave it queued.
+    """
     app_logger.debug(f"Getting session '{session_id}' for user '{user_uuid}'.")
+    if apply_turn_usage:
+        await flush_turn_usage(user_uuid, session_id)
     session_data = await _load_session(user_uuid, session_id)
     if session_data:
         history_modified = False
@@ -639,104 +1286,8 @@ async def get_session(user_uuid: str, session_id: str) -> dict | None:
 
     return session_data
 
-async def get_all_sessions(user_uuid: str, limit: int = None, offset: int = 0, include_archived: bool = False) -> dict:
-    """
-    Get all sessions for a user with optional pagination.
-
-    Args:
-        user_uuid: The user's UUID
-        limit: Maximum number of sessions to return (None = all sessions)
-        offset: Number of sessions to skip (for pagination)
-        include_archived: Whether to include archived sessions (default: False)
-
-    Returns:
-        dict with keys:
-            - sessions: list of session summaries
-            - total_count: total number of sessions (before pagination)
-            - has_more: boolean indicating if more sessions exist
-    """
-    from trusted_data_agent.core.config import APP_CONFIG
-
-    app_logger.debug(f"Getting all sessions for user '{user_uuid}'. Filter by user: {APP_CONFIG.SESSIONS_FILTER_BY_USER}, limit={limit}, offset={offset}")
-    session_summaries = []
-
-    # --- FAST PATH: Try session index first ---
-    indexed = await _query_session_index(
-        user_uuid,
-        include_archived=include_archived,
-        filter_by_user=APP_CONFIG.SESSIONS_FILTER_BY_USER
-    )
-    if indexed is not None:
-        session_summaries = indexed
-        app_logger.debug(f"Session index returned {len(session_summaries)} sessions (fast path)")
-    else:
-        # --- SLOW PATH: Fall back to file scan ---
-        app_logger.debug("Session index unavailable, falling back to file scan")
-
-        # Determine which directories to scan based on filter setting
-        if APP_CONFIG.SESSIONS_FILTER_BY_USER:
-            # User-specific mode: scan only the user's directory
-            user_session_dir = SESSIONS_DIR / "".join(c for c in user_uuid if c.isalnum() or c in ['-', '_'])
-            app_logger.debug(f"Scanning user-specific directory: {user_session_dir}")
-            if not user_session_dir.is_dir():
-                # Create the directory if it doesn't exist (first time for this user)
-                try:
-                    user_session_dir.mkdir(parents=True, exist_ok=True)
-                    app_logger.info(f"Created user session directory: {user_session_dir}")
-                except OSError as e:
-                    app_logger.error(f"Failed to create user session directory: {user_session_dir}. Error: {e}")
-                    return {"sessions": [], "total_count": 0, "has_more": False}
-            scan_dirs = [user_session_dir]
-        else:
-            # All users mode: scan all subdirectories
-            app_logger.debug(f"Scanning all user directories in: {SESSIONS_DIR}")
-            if not SESSIONS_DIR.is_dir():
-                app_logger.warning(f"Sessions directory not found: {SESSIONS_DIR}. Returning empty list.")
-                return {"sessions": [], "total_count": 0, "has_more": False}
-            scan_dirs = [d for d in SESSIONS_DIR.iterdir() if d.is_dir()]
-
-        # Scan all determined directories (recursively to include child Genie sessions)
-        # First pass: collect all session summaries WITHOUT genie metadata enrichment
-        for session_dir in scan_dirs:
-            for session_file in session_dir.glob("**/*.json"):
-                app_logger.debug(f"Found potential session file: {session_file.name}")
-                try:
-                    async with aiofiles.open(session_file, 'r', encoding='utf-8') as f:
-                        # Load only necessary fields for summary to improve performance
-                        content = await f.read()
-                        data = json.loads(content)
-
-                        genie_metadata = data.get("genie_metadata", {})
-
-                        summary = {
-                            "id": data.get("id", session_file.stem),
-                            "name": data.get("name", "Unnamed Session"),
-                            "created_at": data.get("created_at", "Unknown"),
-                            "models_used": data.get("models_used", []),
-                            "profile_tags_used": data.get("profile_tags_used", []),
-                            "last_updated": data.get("last_updated", data.get("created_at", "Unknown")),
-                            "archived": data.get("archived", False),
-                            "archived_at": data.get("archived_at"),
-                            # Additional fields for UI display
-                            "profile_tag": data.get("profile_tag"),
-                            "profile_id": data.get("profile_id"),
-                            "is_temporary": data.get("is_temporary", False),
-                            "temporary_purpose": data.get("temporary_purpose"),
-                            "genie_metadata": genie_metadata
-                        }
-                        app_logger.debug(f"Loaded summary for {session_file.name}: models_used={summary['models_used']}, profile_tags_used={summary['profile_tags_used']}")
-                        session_summaries.append(summary)
-                        app_logger.debug(f"Successfully loaded summary for {session_file.name}.")
-                except (json.JSONDecodeError, OSError, KeyError) as e:
-                    app_logger.error(f"Error loading summary from session file '{session_file}': {e}", exc_info=False) # Keep log concise
-                    # Optionally add a placeholder or skip corrupted files
-                    session_summaries.append({
-                         "id": session_file.stem,
-                         "name": f"Error Loading ({session_file.stem})",
-                         "created_at": "Unknown"
-                    })
-
-    # --- BATCH GENIE METADATA ENRICHMENT ---
+def _enrich_genie_slave_metadata(session_summaries: list, user_uuid: str):
+    """Add nesting_level / slave_profile_tag from genie_session_links to child session summaries."""
     # Collect all slave session IDs that need metadata enrichment
     slave_session_ids = [
         s["id"] for s in session_summaries
@@ -808,7 +1359,116 @@ async def get_all_sessions(user_uuid: str, limit: int = None, offset: int = 0, i
             app_logger.debug(f"Batch enriched {len(metadata_map)} genie slave sessions")
         except Exception as e:
             app_logger.error(f"Failed to batch enrich genie metadata: {e}", exc_info=True)
-    # --- END BATCH GENIE METADATA ENRICHMENT ---
+
+
+async def get_all_sessions(user_uuid: str, limit: int = None, offset: int = 0, include_archived: bool = False,
+                           cursor: str = None) -> dict:
+    """
+    Get all sessions for a user with optional pagination.
+
+    Args:
+        user_uuid: The user's UUID
+        limit: Maximum number of sessions to return (None = all sessions)
+        offset: Number of sessions to skip (for pagination)
+        include_archived: Whether to include archived sessions (default: False)
+        cursor: Keyset cursor (``next_cursor`` of the previous page); replaces offset
+
+    Returns:
+        dict with keys:
+            - sessions: list of session summaries
+            - total_count: total number of sessions (before pagination)
+            - has_more: boolean indicating if more sessions exist
+            - next_cursor: cursor for the next page (None on the last page)
+
+    Raises:
+        ValueError: if ``cursor`` is malformed
+    """
+    from trusted_data_agent.core.config import APP_CONFIG
+
+    app_logger.debug(f"Getting all sessions for user '{user_uuid}'. Filter by user: {APP_CONFIG.SESSIONS_FILTER_BY_USER}, limit={limit}, offset={offset}")
+    session_summaries = []
+
+    # --- FAST PATH: Filter, order and paginate in the session index ---
+    page = await _query_session_page(
+        user_uuid,
+        include_archived=include_archived,
+        filter_by_user=APP_CONFIG.SESSIONS_FILTER_BY_USER,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+    )
+    if page is not None:
+        _enrich_genie_slave_metadata(page["sessions"], user_uuid)
+        app_logger.debug(f"Session index returned {len(page['sessions'])} of {page['total_count']} sessions (fast path, has_more={page['has_more']})")
+        return page
+
+    # --- SLOW PATH: Fall back to file scan ---
+    app_logger.debug("Session index unavailable, falling back to file scan")
+
+    # Determine which directories to scan based on filter setting
+    if APP_CONFIG.SESSIONS_FILTER_BY_USER:
+        # User-specific mode: scan only the user's directory
+        user_session_dir = SESSIONS_DIR / "".join(c for c in user_uuid if c.isalnum() or c in ['-', '_'])
+        app_logger.debug(f"Scanning user-specific directory: {user_session_dir}")
+        if not user_session_dir.is_dir():
+            # Create the directory if it doesn't exist (first time for this user)
+            try:
+                user_session_dir.mkdir(parents=True, exist_ok=True)
+                app_logger.info(f"Created user session directory: {user_session_dir}")
+            except OSError as e:
+                app_logger.error(f"Failed to create user session directory: {user_session_dir}. Error: {e}")
+                return {"sessions": [], "total_count": 0, "has_more": False}
+        scan_dirs = [user_session_dir]
+    else:
+        # All users mode: scan all subdirectories
+        app_logger.debug(f"Scanning all user directories in: {SESSIONS_DIR}")
+        if not SESSIONS_DIR.is_dir():
+            app_logger.warning(f"Sessions directory not found: {SESSIONS_DIR}. Returning empty list.")
+            return {"sessions": [], "total_count": 0, "has_more": False}
+        scan_dirs = [d for d in SESSIONS_DIR.iterdir() if d.is_dir()]
+
+    # Scan all determined directories (recursively to include child Genie sessions)
+    # First pass: collect all session summaries WITHOUT genie metadata enrichment
+    for session_dir in scan_dirs:
+        for session_file in session_dir.glob("**/*.json"):
+            app_logger.debug(f"Found potential session file: {session_file.name}")
+            try:
+                data = await load_session_file(session_file)
+
+                # A copy: the summary is annotated below (nesting_level, is_last_child) and
+                # load_session_file may return the session cache's own dict
+                genie_metadata = dict(data.get("genie_metadata") or {})
+
+                summary = {
+                    "id": data.get("id", session_file.stem),
+                    "name": data.get("name", "Unnamed Session"),
+                    "created_at": data.get("created_at", "Unknown"),
+                    "models_used": data.get("models_used", []),
+                    "profile_tags_used": data.get("profile_tags_used", []),
+                    "last_updated": data.get("last_updated", data.get("created_at", "Unknown")),
+                    "archived": data.get("archived", False),
+                    "archived_at": data.get("archived_at"),
+                    # Additional fields for UI display
+                    "profile_tag": data.get("profile_tag"),
+                    "profile_id": data.get("profile_id"),
+                    "is_temporary": data.get("is_temporary", False),
+                    "temporary_purpose": data.get("temporary_purpose"),
+                    "genie_metadata": genie_metadata
+                }
+                app_logger.debug(f"Loaded summary for {session_file.name}: models_used={summary['models_used']}, profile_tags_used={summary['profile_tags_used']}")
+                session_summaries.append(summary)
+                app_logger.debug(f"Successfully loaded summary for {session_file.name}.")
+            except (json.JSONDecodeError, OSError, KeyError) as e:
+                app_logger.error(f"Error loading summary from session file '{session_file}': {e}", exc_info=False) # Keep log concise
+                # Optionally add a placeholder or skip corrupted files
+                session_summaries.append({
+                     "id": session_file.stem,
+                     "name": f"Error Loading ({session_file.stem})",
+                     "created_at": "Unknown"
+                })
+
+    # --- BATCH GENIE METADATA ENRICHMENT ---
+    _enrich_genie_slave_metadata(session_summaries, user_uuid)
 
 
     # Filter out template generation sessions
@@ -819,6 +1479,7 @@ async def get_all_sessions(user_uuid: str, limit: int = None, offset: int = 0, i
         nesting_level = session.get("genie_metadata", {}).get("nesting_level", "N/A")
         app_logger.debug(f"[Session Scan] {session_id}... (slave={is_slave}, level={nesting_level})")
 
+    all_summaries = session_summaries  # Genie roots are resolved across archived sessions too
     session_summaries = [
         session for session in session_summaries
         if session.get("id") != RAGTemplateGenerator.TEMPLATE_SESSION_ID
@@ -836,99 +1497,38 @@ async def get_all_sessions(user_uuid: str, limit: int = None, offset: int = 0, i
     else:
         app_logger.debug(f"[Include Archived] Keeping all {len(session_summaries)} sessions (including archived)")
 
-    # Sort sessions with genie child sessions appearing directly after their parent
-    # Build a lookup map for quick access
-    session_by_id = {s.get("id"): s for s in session_summaries}
+    # Order exactly like the index fast path, so pages and cursors agree across both paths
+    sort_keys = _sidebar_sort_keys(all_summaries, session_summaries)
+    session_summaries.sort(key=lambda s: sort_keys[id(s)][2])
+    session_summaries.sort(key=lambda s: sort_keys[id(s)][:2], reverse=True)
 
-    # Separate parent sessions from child sessions
-    parent_sessions = []
-    slave_sessions_by_parent = {}  # parent_id -> list of slaves
-
-    app_logger.debug(f"[Session Hierarchy] Processing {len(session_summaries)} total sessions")
+    # Mark last child for proper connector styling (└─ vs ├─)
+    last_children = {}
     for session in session_summaries:
-        genie_metadata = session.get("genie_metadata", {})
-        parent_id = genie_metadata.get("parent_session_id")
-        session_id = session.get("id")
-        nesting_level = genie_metadata.get("nesting_level", 0)
-
-        if genie_metadata.get("is_genie_slave") and parent_id:
-            # This is a child session
-            if parent_id not in slave_sessions_by_parent:
-                slave_sessions_by_parent[parent_id] = []
-            slave_sessions_by_parent[parent_id].append(session)
-            app_logger.debug(f"[Session Hierarchy] Child: {session_id} (L{nesting_level}) -> parent: {parent_id}")
-        else:
-            # This is a parent/normal session
-            parent_sessions.append(session)
-            app_logger.debug(f"[Session Hierarchy] Parent/Normal: {session_id}")
-
-    # Sort parent sessions by last_updated (most recent first)
-    def sort_key(session):
-        last_updated = session.get("last_updated") or session.get("created_at", "")
-        if last_updated == "Unknown" or not last_updated:
-            return datetime.min.isoformat()
-        return last_updated
-
-    parent_sessions.sort(key=sort_key, reverse=True)
-
-    # Sort child sessions by sequence number (if available) or created_at
-    for parent_id, slaves in slave_sessions_by_parent.items():
-        slaves.sort(key=lambda s: s.get("genie_metadata", {}).get("slave_sequence_number", 0))
-
-        # Mark last child for proper connector styling (└─ vs ├─)
-        if slaves:
-            slaves[-1]["genie_metadata"]["is_last_child"] = True
-            app_logger.debug(f"[Session Hierarchy] Marked last child: {slaves[-1].get('id')} for parent {parent_id}")
-
-    # Build final list with children inserted after their parents (recursively for nested Genies)
-    def add_session_with_children(session_id, sessions_dict, added_ids, depth=0):
-        """Recursively add a session and all its children (nested hierarchy support)"""
-        indent = "  " * depth
-
-        if session_id in added_ids:
-            app_logger.debug(f"{indent}[Recursive Build] Skipping {session_id} (already added)")
-            return  # Already added (prevent duplicates)
-
-        if session_id not in sessions_dict:
-            app_logger.debug(f"{indent}[Recursive Build] Session {session_id} not found in sessions_dict")
-            return  # Session not found
-
-        session = sessions_dict[session_id]
-        final_sessions.append(session)
-        added_ids.add(session_id)
-        app_logger.debug(f"{indent}[Recursive Build] Added session {session_id} (depth={depth})")
-
-        # Recursively add children
-        if session_id in slave_sessions_by_parent:
-            children = slave_sessions_by_parent[session_id]
-            app_logger.debug(f"{indent}[Recursive Build] Session {session_id} has {len(children)} children")
-            for child in children:
-                add_session_with_children(child.get("id"), sessions_dict, added_ids, depth + 1)
-        else:
-            app_logger.debug(f"{indent}[Recursive Build] Session {session_id} has no children")
-
-    final_sessions = []
-    added_ids = set()
-
-    # Add all parent sessions with their nested children
-    app_logger.debug(f"[Recursive Build] Starting with {len(parent_sessions)} top-level sessions")
-    for parent in parent_sessions:
-        add_session_with_children(parent.get("id"), session_by_id, added_ids, depth=0)
-
-    # Add any orphan children (parent not in list) at the end
-    for parent_id, slaves in slave_sessions_by_parent.items():
-        if parent_id not in session_by_id:
-            final_sessions.extend(slaves)
-
-    session_summaries = final_sessions
+        genie_metadata = session.get("genie_metadata") or {}
+        parent_id = genie_metadata.get("parent_session_id") if genie_metadata.get("is_genie_slave") else None
+        if parent_id:
+            rank = (int(genie_metadata.get("slave_sequence_number") or 0), session.get("id", ""))
+            if parent_id not in last_children or rank > last_children[parent_id][0]:
+                last_children[parent_id] = (rank, session)
+    for _, session in last_children.values():
+        session["genie_metadata"]["is_last_child"] = True
 
     # Calculate total count before pagination
     total_count = len(session_summaries)
 
+    if cursor:
+        sort_updated, sort_root, sort_path = _decode_session_cursor(cursor)
+        session_summaries = [
+            s for s in session_summaries
+            if _follows_session_cursor(sort_keys[id(s)], sort_updated, sort_root, sort_path)
+        ]
+        offset = 0
+
     # Apply pagination if limit is specified
     if limit is not None:
         paginated_sessions = session_summaries[offset:offset + limit]
-        has_more = offset + limit < total_count
+        has_more = offset + limit < len(session_summaries)
     else:
         paginated_sessions = session_summaries
         has_more = False
@@ -941,10 +1541,14 @@ async def get_all_sessions(user_uuid: str, limit: int = None, offset: int = 0, i
         name = session.get("name", "Unnamed")[:30]
         app_logger.debug(f"[FINAL] {i}. {session_id}... - {name} (slave={is_slave}, level={nesting_level})")
 
+    next_cursor = None
+    if has_more and paginated_sessions:
+        next_cursor = _encode_session_cursor(sort_keys[id(paginated_sessions[-1])])
     return {
         "sessions": paginated_sessions,
         "total_count": total_count,
-        "has_more": has_more
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
 async def delete_session(user_uuid: str, session_id: str, archived_reason: str = None) -> bool:
@@ -955,6 +1559,9 @@ async def delete_session(user_uuid: str, session_id: str, archived_reason: str =
         session_id: The session ID to archive
         archived_reason: Optional reason for archiving (e.g., "User manually deleted session")
     """
+    # Write out and drop any cached copy so the direct file access below is current
+    await flush_session_cache(session_id=session_id, evict=True)
+
     session_path = _find_session_path(user_uuid, session_id)
     if not session_path:
         app_logger.error(f"Cannot archive session '{session_id}' for user '{user_uuid}': Session not found.")
@@ -963,6 +1570,9 @@ async def delete_session(user_uuid: str, session_id: str, archived_reason: str =
     app_logger.info(f"Attempting to archive session file: {session_path}")
     try:
         if session_path.is_file():
+            # Fold any pending journal so the snapshot read below is current
+            await session_journal.fold_journal(session_path)
+
             # Load the session data
             async with aiofiles.open(session_path, 'r', encoding='utf-8') as f:
                 content = await f.read()
@@ -978,11 +1588,13 @@ async def delete_session(user_uuid: str, session_id: str, archived_reason: str =
             # Save back to file
             async with aiofiles.open(session_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(session_data, indent=2, ensure_ascii=False))
+            # Direct write bypasses the journal baseline — force a fresh one on next save
+            session_journal.discard_journal(session_path)
 
             app_logger.info(f"Successfully archived session file: {session_path}")
 
             # Update session index with archived status
-            asyncio.create_task(_upsert_session_index(session_id, session_data))
+            _schedule_session_index_upsert(session_id, session_data)
 
             # Clean up uploads directory for this session
             _cleanup_session_uploads(user_uuid, session_id)
@@ -1407,6 +2019,9 @@ def _cleanup_session_uploads(user_uuid: str, session_id: str):
             app_logger.warning(f"Failed to clean up uploads directory for session {session_id}: {e}")
 
 # --- MODIFICATION START: Rename and refactor add_to_history ---
+_HISTORY_SECTIONS = frozenset({'session_history', 'chat_object'})
+
+
 async def add_message_to_histories(user_uuid: str, session_id: str, role: str, content: str, html_content: str | None = None, source: str | None = None, profile_tag: str | None = None, is_session_primer: bool = False, attachments: list | None = None, extension_specs: list | None = None, skill_specs: list | None = None, tool_context: str | None = None):
     """
     Adds a message to the appropriate histories, decoupling UI from LLM context.
@@ -1416,7 +2031,7 @@ async def add_message_to_histories(user_uuid: str, session_id: str, role: str, c
     - `profile_tag` (if provided) stores which profile was used for this message.
     - `is_session_primer` (if True) marks this message as part of session initialization.
     """
-    async with _session_transaction(user_uuid, session_id) as session_data:
+    async with _session_transaction(user_uuid, session_id, sections=_HISTORY_SECTIONS) as session_data:
         if not session_data:
             app_logger.warning(f"Could not add history: Session {session_id} not found for user {user_uuid}.")
             return
@@ -1455,9 +2070,9 @@ async def add_message_to_histories(user_uuid: str, session_id: str, role: str, c
                 for att in attachments
             ]
         if extension_specs and role == 'user':
-            message_to_append['extension_specs'] = extension_specs
+            message_to_append['extension_specs'] = copy.deepcopy(extension_specs)
         if skill_specs and role == 'user':
-            message_to_append['skill_specs'] = skill_specs
+            message_to_append['skill_specs'] = copy.deepcopy(skill_specs)
 
         session_history.append(message_to_append)
 
@@ -1533,34 +2148,72 @@ async def set_session_context_limit(user_uuid: str, session_id: str, context_lim
             session_data['session_context_limit_override'] = int(context_limit)
 
 
+_TOKEN_COUNT_SECTIONS = frozenset({'input_tokens', 'output_tokens'})
+
+
+def _apply_token_count(session_data: dict, input_tokens: int, output_tokens: int):
+    session_data['input_tokens'] = session_data.get('input_tokens', 0) + input_tokens
+    session_data['output_tokens'] = session_data.get('output_tokens', 0) + output_tokens
+
+
 async def update_token_count(user_uuid: str, session_id: str, input_tokens: int, output_tokens: int):
-    """Updates the token counts for a given session."""
-    async with _session_transaction(user_uuid, session_id) as session_data:
+    """Updates the token counts for a given session (queued on the turn inside turn_usage_scope)."""
+    usage = _active_turn_usage(user_uuid, session_id)
+    if usage is not None:
+        usage.session_updates.append((_apply_token_count, (input_tokens, output_tokens)))
+        usage.input_tokens += input_tokens
+        usage.output_tokens += output_tokens
+        usage.requests += 1
+        return
+
+    async with _session_transaction(user_uuid, session_id, sections=_TOKEN_COUNT_SECTIONS) as session_data:
         if not session_data:
             app_logger.warning(f"Could not update tokens: Session {session_id} not found for user {user_uuid}.")
             return
-        session_data['input_tokens'] = session_data.get('input_tokens', 0) + input_tokens
-        session_data['output_tokens'] = session_data.get('output_tokens', 0) + output_tokens
+        _apply_token_count(session_data, input_tokens, output_tokens)
 
     # Post-save operations (outside lock for minimal lock hold time)
-    try:
-        from trusted_data_agent.auth.token_quota import record_token_usage
-        record_token_usage(user_uuid, input_tokens, output_tokens)
-        app_logger.debug(f"Recorded token usage for user {user_uuid}: input={input_tokens}, output={output_tokens}")
-    except Exception as e:
-        app_logger.error(f"Failed to record token usage for user {user_uuid}: {e}")
+    _record_quota_usage(user_uuid, input_tokens, output_tokens)
 
-    # --- CONSUMPTION TRACKING ---
-    try:
-        from trusted_data_agent.auth.database import get_db_session
-        from trusted_data_agent.auth.consumption_manager import ConsumptionManager
 
-        with get_db_session() as db_session:
-            manager = ConsumptionManager(db_session)
-            manager.increment_request_counter(user_uuid)
-            app_logger.debug(f"Incremented request counter for user {user_uuid}")
-    except Exception as e:
-        app_logger.warning(f"Failed to update consumption tracking for user {user_uuid}: {e}")
+_MODELS_USED_SECTIONS = frozenset({
+    'models_used', 'dual_model_usage', 'profile_tags_used', 'provider', 'model', 'profile_tag',
+})
+
+
+def _apply_models_used(session_data: dict, provider: str, model: str, profile_tag: str | None, planning_phase: str | None):
+    # Keep models_used for backwards compatibility
+    models_used = session_data.get('models_used', [])
+    model_string = f"{provider}/{model}"
+    if model_string not in models_used:
+        models_used.append(model_string)
+        session_data['models_used'] = models_used
+
+    # Track strategic vs tactical usage (NEW: Dual-model traceability)
+    if planning_phase and planning_phase in ["strategic", "tactical", "tactical_fastpath", "conversation"]:
+        if "dual_model_usage" not in session_data:
+            session_data["dual_model_usage"] = {
+                "strategic": [],
+                "tactical": [],
+                "tactical_fastpath": [],
+                "conversation": []
+            }
+
+        phase_models = session_data["dual_model_usage"][planning_phase]
+        if model_string not in phase_models:
+            phase_models.append(model_string)
+            app_logger.debug(f"[Dual-Model] Tracked {model_string} as {planning_phase} model")
+
+    # Add profile tag to profile_tags_used
+    if profile_tag:
+        profile_tags_used = session_data.get('profile_tags_used', [])
+        if profile_tag not in profile_tags_used:
+            profile_tags_used.append(profile_tag)
+            session_data['profile_tags_used'] = profile_tags_used
+
+    session_data['provider'] = provider
+    session_data['model'] = model
+    session_data['profile_tag'] = profile_tag
 
 
 async def update_models_used(user_uuid: str, session_id: str, provider: str, model: str, profile_tag: str | None = None, planning_phase: str | None = None):
@@ -1572,42 +2225,16 @@ async def update_models_used(user_uuid: str, session_id: str, provider: str, mod
                        for dual-model tracking
     """
     app_logger.debug(f"update_models_used called for session {session_id} with provider={provider}, model={model}, profile_tag={profile_tag}, planning_phase={planning_phase}")
-    async with _session_transaction(user_uuid, session_id) as session_data:
+    usage = _active_turn_usage(user_uuid, session_id)
+    if usage is not None:
+        usage.session_updates.append((_apply_models_used, (provider, model, profile_tag, planning_phase)))
+        return
+
+    async with _session_transaction(user_uuid, session_id, sections=_MODELS_USED_SECTIONS) as session_data:
         if not session_data:
             app_logger.warning(f"Could not update models used: Session {session_id} not found for user {user_uuid}.")
             return
-        # Keep models_used for backwards compatibility
-        models_used = session_data.get('models_used', [])
-        model_string = f"{provider}/{model}"
-        if model_string not in models_used:
-            models_used.append(model_string)
-            session_data['models_used'] = models_used
-
-        # Track strategic vs tactical usage (NEW: Dual-model traceability)
-        if planning_phase and planning_phase in ["strategic", "tactical", "tactical_fastpath", "conversation"]:
-            if "dual_model_usage" not in session_data:
-                session_data["dual_model_usage"] = {
-                    "strategic": [],
-                    "tactical": [],
-                    "tactical_fastpath": [],
-                    "conversation": []
-                }
-
-            phase_models = session_data["dual_model_usage"][planning_phase]
-            if model_string not in phase_models:
-                phase_models.append(model_string)
-                app_logger.debug(f"[Dual-Model] Tracked {model_string} as {planning_phase} model")
-
-        # Add profile tag to profile_tags_used
-        if profile_tag:
-            profile_tags_used = session_data.get('profile_tags_used', [])
-            if profile_tag not in profile_tags_used:
-                profile_tags_used.append(profile_tag)
-                session_data['profile_tags_used'] = profile_tags_used
-
-        session_data['provider'] = provider
-        session_data['model'] = model
-        session_data['profile_tag'] = profile_tag
+        _apply_models_used(session_data, provider, model, profile_tag, planning_phase)
 
 
 async def _ingest_turn_to_session_store(
@@ -1715,13 +2342,16 @@ async def _ingest_turn_to_session_store(
         )
 
 
+_TURN_DATA_SECTIONS = frozenset({'last_turn_data'})
+
+
 async def update_last_turn_data(user_uuid: str, session_id: str, turn_data: dict):
     """Saves the most recent turn's action history and plans to the session file."""
     # Capture values needed for post-save consumption tracking
     _session_name = None
     _consumption_data = None
 
-    async with _session_transaction(user_uuid, session_id) as session_data:
+    async with _session_transaction(user_uuid, session_id, sections=_TURN_DATA_SECTIONS) as session_data:
         if not session_data:
             app_logger.warning(f"Could not update last turn data: Session {session_id} not found for user {user_uuid}.")
             return
@@ -1773,7 +2403,7 @@ async def update_last_turn_data(user_uuid: str, session_id: str, turn_data: dict
                     app_logger.debug(f"RAG efficiency gain for current turn: {tokens_saved} tokens saved")
 
         # Append the new turn data
-        session_data["last_turn_data"]["workflow_history"].append(turn_data)
+        session_data["last_turn_data"]["workflow_history"].append(copy.deepcopy(turn_data))
 
         # Capture data for post-save consumption tracking (avoid secondary load)
         _session_name = session_data.get('name') or 'Untitled Session'
@@ -1863,7 +2493,7 @@ async def append_extension_results_to_turn(
         extension_input_tokens: Total input tokens consumed by extensions (for LLM-calling extensions)
         extension_output_tokens: Total output tokens consumed by extensions
     """
-    async with _session_transaction(user_uuid, session_id) as session_data:
+    async with _session_transaction(user_uuid, session_id, sections=_TURN_DATA_SECTIONS) as session_data:
         if not session_data:
             app_logger.warning(f"Cannot append extension results: session {session_id} not found")
             return
@@ -1875,9 +2505,9 @@ async def append_extension_results_to_turn(
 
         # Patch the last turn entry
         last_turn = workflow_history[-1]
-        last_turn["extension_results"] = extension_results
+        last_turn["extension_results"] = copy.deepcopy(extension_results)
         if extension_events:
-            last_turn["extension_events"] = extension_events
+            last_turn["extension_events"] = copy.deepcopy(extension_events)
 
         # Update turn-level token totals if extensions consumed tokens
         if extension_input_tokens > 0 or extension_output_tokens > 0:
@@ -2043,12 +2673,33 @@ async def toggle_turn_validity(user_uuid: str, session_id: str, turn_id: int) ->
         return False
 
 # --- MODIFICATION START: Add function to update turn system_events ---
+def _apply_turn_system_events(session_data: dict, turn_number: int, system_events: list) -> bool:
+    workflow_history = session_data.get("last_turn_data", {}).get("workflow_history", [])
+    for turn in workflow_history:
+        if turn.get("turn") == turn_number:
+            turn["system_events"] = copy.deepcopy(system_events)
+            return True
+    app_logger.warning(f"Could not update system_events: Turn {turn_number} not found in session {session_data.get('id')}.")
+    return False
+
+
+# Top-level keys each queued usage update may change
+_USAGE_UPDATE_SECTIONS = {
+    _apply_token_count: _TOKEN_COUNT_SECTIONS,
+    _apply_models_used: _MODELS_USED_SECTIONS,
+    _apply_turn_system_events: _TURN_DATA_SECTIONS,
+}
+
+
 async def update_turn_system_events(user_uuid: str, session_id: str, turn_number: int, system_events: list) -> bool:
     """
     Updates the system_events for a specific turn in the workflow_history.
     This is used when session name generation events need to be added after
     the turn has already been saved.
 
+    Inside turn_usage_scope the update is queued with the turn's other usage
+    and True is returned; a missing turn is then only logged when applied.
+
     Args:
         user_uuid: The user's UUID
         session_id: The session ID
@@ -2058,23 +2709,17 @@ async def update_turn_system_events(user_uuid: str, session_id: str, turn_number
     Returns:
         True if successful, False otherwise
     """
+    usage = _active_turn_usage(user_uuid, session_id)
+    if usage is not None:
+        usage.session_updates.append((_apply_turn_system_events, (turn_number, system_events)))
+        return True
+
     try:
-        async with _session_transaction(user_uuid, session_id) as session_data:
+        async with _session_transaction(user_uuid, session_id, sections=_TURN_DATA_SECTIONS) as session_data:
             if not session_data:
                 app_logger.warning(f"Could not update system_events: Session {session_id} not found for user {user_uuid}.")
                 return False
-
-            workflow_history = session_data.get("last_turn_data", {}).get("workflow_history", [])
-
-            turn_found = False
-            for turn in workflow_history:
-                if turn.get("turn") == turn_number:
-                    turn["system_events"] = system_events
-                    turn_found = True
-                    break
-
-            if not turn_found:
-                app_logger.warning(f"Could not update system_events: Turn {turn_number} not found in session {session_id}.")
+            if not _apply_turn_system_events(session_data, turn_number, system_events):
                 return False
 
         app_logger.debug(f"Updated system_events for turn {turn_number} in session {session_id}")
@@ -2102,7 +2747,7 @@ async def update_turn_token_counts(user_uuid: str, session_id: str, turn_number:
         True if successful, False otherwise
     """
     try:
-        async with _session_transaction(user_uuid, session_id) as session_data:
+        async with _session_transaction(user_uuid, session_id, sections=_TURN_DATA_SECTIONS) as session_data:
             if not session_data:
                 app_logger.warning(f"Could not update token counts: Session {session_id} not found for user {user_uuid}.")
                 return False
@@ -0,0 +1,581 @@
+# src/trusted_data_agent/core/task_registry.py
+"""
+Registry of REST background tasks (``APP_STATE["background_tasks"]``).
+
+Every ``POST /v1/sessions/<id>/query`` creates a task whose state (status,
+result, event log, intermediate data) is read back by ``GET /v1/tasks/<id>``.
+The registry keeps that state bounded and lets clients wait for changes
+instead of polling:
+
+  - **Eviction**   — finished tasks are dropped ``ttl_seconds`` after they
+                     finish, and the oldest finished tasks go first once more
+                     than ``max_tasks`` are held.  Running tasks are never
+                     evicted.
+  - **Compact events** — each event is serialized to compact JSON once, when
+                     it is recorded; the status endpoints splice those strings
+                     into their responses without re-encoding the log.
+  - **Spill**      — above ``max_events_in_memory`` the oldest events move to
+                     a SQLite table (when ``spill_db_path`` is set) or are
+                     dropped; snapshots report the count as ``events_dropped``.
+                     A background thread does the SQLite writes; spilled
+                     events stay readable from memory until committed.
+  - **Waiting**    — every state change bumps the task's ``version`` and wakes
+                     ``wait_for_change`` callers (long-poll / SSE endpoints).
+
+Reads keep the dict interface of the plain dict this replaces: ``get()``
+returns the live state dict (without ``events``) and ``items()`` iterates
+``(task_id, state)`` pairs.  Writes go through ``create``, ``append_event``
+and ``update`` so waiters are notified.  None of them touch SQLite; event loop
+code reads events with ``snapshot_json_async`` / ``event_strings_async``,
+which load spilled events in a worker thread.
+"""
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+app_logger = logging.getLogger("quart.app")
+
+TERMINAL_STATUSES = frozenset({"complete", "completed", "error", "failed", "cancelled"})
+
+# Spilled rows older than this (or the task TTL, if longer) are removed when a
+# process opens the spill file
+_SPILL_RETENTION_SECONDS = 24 * 3600
+
+# Spill operations waiting for the writer thread; chunks beyond this are dropped
+_SPILL_QUEUE_MAX_SIZE = 1000
+_SPILL_BATCH_SIZE = 100
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class _TaskEntry:
+    __slots__ = ("state", "events", "first_event", "spilled", "dropped", "version", "changed", "finished_at")
+
+    def __init__(self, state: dict):
+        self.state = state
+        self.events: list[str] = []     # Compact JSON, in order
+        self.first_event = 0            # Sequence number of events[0]
+        self.spilled = 0                # Events moved to SQLite
+        self.dropped = 0                # Events discarded (no spill store)
+        self.version = 0
+        self.changed: Optional[asyncio.Event] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def event_count(self) -> int:
+        return self.first_event + len(self.events)
+
+
+class _SpillWriter:
+    """
+    Background thread that writes spilled events to (and deletes them from) SQLite.
+
+    A chunk is kept in ``_pending`` until its transaction commits, and reads
+    merge it with the stored rows, so events are never missing while queued.
+    Chunks that could not be queued or written are collected for the registry
+    to count as dropped (``take_failures``).
+    """
+
+    def __init__(self, connect, max_size: int = _SPILL_QUEUE_MAX_SIZE, batch_size: int = _SPILL_BATCH_SIZE):
+        self._connect = connect
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_size))
+        self._batch_size = max(1, batch_size)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()      # One user of the connection at a time
+        self._pending_lock = threading.Lock()   # Guards _pending and _failures
+        self._pending: dict[str, dict[int, list[str]]] = {}  # task_id -> first seq -> events
+        self._failures: list[tuple[str, int]] = []
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def insert(self, task_id: str, start: int, events: list[str]) -> bool:
+        """Queue events ``start``.. of a task. Returns False if the queue is full."""
+        with self._pending_lock:
+            self._pending.setdefault(task_id, {})[start] = events
+        if self._submit(("insert", task_id, start, events)):
+            return True
+        with self._pending_lock:
+            self._forget(task_id, start, events)
+        return False
+
+    def delete(self, task_id: str):
+        """Queue removal of every spilled event of a task."""
+        with self._pending_lock:
+            self._pending.pop(task_id, None)
+        if not self._submit(("delete", task_id, None, None)):
+            # The rows are removed by the retention sweep of a later process
+            app_logger.warning(f"Task event spill queue full, spilled events of {task_id} left in place")
+
+    def read(self, task_id: str, start: int, end: int) -> list[str]:
+        """Events ``start`` to ``end - 1`` that were spilled (blocking; call off the event loop)."""
+        # Pending chunks first: one committed meanwhile is then also found in SQLite
+        with self._pending_lock:
+            chunks = [(first, events) for first, events in self._pending.get(task_id, {}).items()
+                      if first < end and first + len(events) > start]
+        found: dict[int, str] = {}
+        try:
+            with self._conn_lock:
+                rows = self._get_conn().execute(
+                    "SELECT seq, event_json FROM task_events WHERE task_id = ? AND seq >= ? AND seq < ?",
+                    (task_id, start, end),
+                ).fetchall()
+            found.update(rows)
+        except sqlite3.Error as e:
+            app_logger.warning(f"Could not read spilled events of task {task_id}: {e}")
+        for first, events in chunks:
+            for seq in range(max(start, first), min(end, first + len(events))):
+                found[seq] = events[seq - first]
+        return [found[seq] for seq in sorted(found)]
+
+    def take_failures(self) -> list[tuple[str, int]]:
+        """(task_id, event count) of chunks that could not be written since the last call."""
+        with self._pending_lock:
+            failures, self._failures = self._failures, []
+        return failures
+
+    def _submit(self, op: tuple) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(op)
+            return True
+        except queue.Full:
+            return False
+
+    def _forget(self, task_id: str, start: int, events: list[str]):
+        # Caller holds _pending_lock. The identity check keeps a chunk of a
+        # re-created task with the same id.
+        chunks = self._pending.get(task_id)
+        if chunks is not None and chunks.get(start) is events:
+            del chunks[start]
+            if not chunks:
+                del self._pending[task_id]
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="task-event-spill", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if first is None:  # Shutdown sentinel
+                self._queue.task_done()
+                break
+            batch = self._drain([first])
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _drain(self, batch: list[tuple]) -> list[tuple]:
+        while len(batch) < self._batch_size:
+            try:
+                op = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is None:
+                self._queue.task_done()
+                break
+            batch.append(op)
+        return batch
+
+    def _write(self, batch: list[tuple]):
+        inserts = [op for op in batch if op[0] == "insert"]
+        try:
+            with self._conn_lock:
+                conn = self._get_conn()
+                now = time.time()
+                try:
+                    # In queue order, so a delete also removes rows queued before it
+                    for kind, task_id, start, events in batch:
+                        if kind == "insert":
+                            conn.executemany(
+                                "INSERT OR REPLACE INTO task_events (task_id, seq, event_json, spilled_at) "
+                                "VALUES (?, ?, ?, ?)",
+                                [(task_id, start + i, e, now) for i, e in enumerate(events)],
+                            )
+                        else:
+                            conn.execute("DELETE FROM task_events WHERE task_id = ?", (task_id,))
+                    conn.commit()
+                except sqlite3.Error:
+                    conn.rollback()
+                    raise
+        except sqlite3.Error as e:
+            app_logger.warning(f"Task event spill failed, dropping {len(inserts)} chunk(s): {e}")
+            with self._pending_lock:
+                for _, task_id, start, events in inserts:
+                    self._forget(task_id, start, events)
+                    self._failures.append((task_id, len(events)))
+            return
+        with self._pending_lock:
+            for _, task_id, start, events in inserts:
+                self._forget(task_id, start, events)
+
+    def flush(self):
+        """Block until every queued operation is written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+            return
+        while True:
+            try:
+                first = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if first is None:
+                self._queue.task_done()
+                continue
+            batch = self._drain([first])
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def shutdown(self, timeout: float = 10.0):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            try:
+                self._queue.put(None, timeout=timeout)  # Wake the writer
+            except queue.Full:
+                pass
+            thread.join(timeout=timeout)
+        self.flush()
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TaskRegistry:
+    """
+    Bounded store of background task state.
+
+    Args:
+        max_tasks: finished tasks kept at most (running tasks don't count against eviction).
+        ttl_seconds: lifetime of a finished task.
+        max_events_in_memory: events per task kept as JSON strings in memory.
+        spill_db_path: SQLite file for events beyond the in-memory cap ('' = drop them);
+            relative paths resolve against the project root. Several processes may
+            share the file.
+    """
+
+    def __init__(
+        self,
+        max_tasks: int = 1000,
+        ttl_seconds: float = 3600.0,
+        max_events_in_memory: int = 1000,
+        spill_db_path: str = "",
+    ):
+        self.max_tasks = max(1, int(max_tasks))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.max_events_in_memory = max(1, int(max_events_in_memory))
+        self.spill_db_path = spill_db_path or ""
+        self._entries: dict[str, _TaskEntry] = {}
+        self._finished: "OrderedDict[str, float]" = OrderedDict()  # Eviction order
+        self._spill_writer = _SpillWriter(self._open_spill_conn) if self.spill_db_path else None
+        self._stats = {"created": 0, "evicted": 0, "events": 0, "events_spilled": 0, "events_dropped": 0}
+
+    # ------------------------------------------------------------------
+    # Dict-style reads
+    # ------------------------------------------------------------------
+
+    def get(self, task_id: str, default=None) -> Optional[dict]:
+        entry = self._entries.get(task_id)
+        return entry.state if entry is not None else default
+
+    def __getitem__(self, task_id: str) -> dict:
+        return self._entries[task_id].state
+
+    def __contains__(self, task_id) -> bool:
+        return task_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def items(self) -> list[tuple[str, dict]]:
+        return [(task_id, entry.state) for task_id, entry in self._entries.items()]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def create(self, task_id: str, state: dict) -> dict:
+        """Register a new task; ``state`` should not contain ``events``."""
+        state.pop("events", None)
+        state.setdefault("last_updated", _now_iso())
+        self.discard(task_id)
+        self._entries[task_id] = _TaskEntry(state)
+        self._stats["created"] += 1
+        self._evict()
+        return state
+
+    def append_event(self, task_id: str, event: dict):
+        """Record one event and wake waiters."""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return
+        self._apply_spill_failures()
+        entry.events.append(_compact_json(event))
+        self._stats["events"] += 1
+        if len(entry.events) > self.max_events_in_memory:
+            self._trim_events(task_id, entry)
+        entry.state["last_updated"] = _now_iso()
+        self._notify(entry)
+
+    def update(self, task_id: str, **fields):
+        """Set state fields, stamp ``last_updated`` and wake waiters."""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return
+        entry.state.update(fields)
+        entry.state["last_updated"] = _now_iso()
+        if entry.state.get("status") in TERMINAL_STATUSES:
+            if entry.finished_at is None:
+                entry.finished_at = time.monotonic()
+                self._finished[task_id] = entry.finished_at
+        elif entry.finished_at is not None:
+            # Re-opened (e.g. "cancelling" after a late cancel); not evictable yet
+            entry.finished_at = None
+            self._finished.pop(task_id, None)
+        self._notify(entry)
+        if entry.finished_at is not None:
+            self._evict()
+
+    def discard(self, task_id: str):
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return
+        self._finished.pop(task_id, None)
+        if entry.spilled:
+            self._spill_writer.delete(task_id)
+        # Wake waiters so they observe the task is gone
+        if entry.changed is not None:
+            entry.changed.set()
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def version(self, task_id: str) -> Optional[int]:
+        entry = self._entries.get(task_id)
+        return entry.version if entry is not None else None
+
+    def snapshot_json(self, task_id: str, since_event: int = 0) -> Optional[str]:
+        """
+        JSON document of the task: its state plus ``events`` from ``since_event`` on.
+
+        Also carries ``version`` and ``event_count`` so clients can resume with
+        ``since_event=event_count`` and wait for ``version`` to change.  Reads
+        spilled events from SQLite; event loop code uses ``snapshot_json_async``.
+        """
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        head = self._snapshot_head(entry)
+        spilled, events = self._event_slices(entry, since_event)
+        if spilled:
+            events = self._spill_writer.read(task_id, *spilled) + events
+        return f'{head[:-1]},"events":[{",".join(events)}]}}'
+
+    async def snapshot_json_async(self, task_id: str, since_event: int = 0) -> Optional[str]:
+        """``snapshot_json`` with spilled events loaded in a worker thread."""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        head = self._snapshot_head(entry)
+        spilled, events = self._event_slices(entry, since_event)
+        if spilled:
+            events = await asyncio.to_thread(self._spill_writer.read, task_id, *spilled) + events
+        return f'{head[:-1]},"events":[{",".join(events)}]}}'
+
+    def snapshot(self, task_id: str, since_event: int = 0) -> Optional[dict]:
+        """Parsed form of ``snapshot_json`` (for in-process consumers)."""
+        text = self.snapshot_json(task_id, since_event)
+        return json.loads(text) if text is not None else None
+
+    async def snapshot_async(self, task_id: str, since_event: int = 0) -> Optional[dict]:
+        """Parsed form of ``snapshot_json_async``."""
+        text = await self.snapshot_json_async(task_id, since_event)
+        return json.loads(text) if text is not None else None
+
+    def event_strings(self, task_id: str, since_event: int = 0) -> list[str]:
+        """Compact JSON of the events numbered ``since_event`` and later."""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return []
+        spilled, events = self._event_slices(entry, since_event)
+        if spilled:
+            events = self._spill_writer.read(task_id, *spilled) + events
+        return events
+
+    async def event_strings_async(self, task_id: str, since_event: int = 0) -> list[str]:
+        """``event_strings`` with spilled events loaded in a worker thread."""
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return []
+        spilled, events = self._event_slices(entry, since_event)
+        if spilled:
+            events = await asyncio.to_thread(self._spill_writer.read, task_id, *spilled) + events
+        return events
+
+    def _snapshot_head(self, entry: _TaskEntry) -> str:
+        self._apply_spill_failures()
+        header = dict(entry.state)
+        header["version"] = entry.version
+        header["event_count"] = entry.event_count
+        header["events_dropped"] = entry.dropped
+        return _compact_json(header)
+
+    @staticmethod
+    def _event_slices(entry: _TaskEntry, since_event: int) -> tuple[Optional[tuple[int, int]], list[str]]:
+        """(range of spilled events to load or None, copy of the in-memory events from ``since_event``)."""
+        since_event = max(0, since_event)
+        spilled = (since_event, entry.first_event) if since_event < entry.first_event and entry.spilled else None
+        return spilled, entry.events[max(0, since_event - entry.first_event):]
+
+    async def wait_for_change(self, task_id: str, since_version: int, timeout: float) -> bool:
+        """
+        Wait until the task's version exceeds ``since_version``.
+
+        Returns True on a change (or if the task no longer exists), False on timeout.
+        """
+        entry = self._entries.get(task_id)
+        if entry is None or entry.version > since_version:
+            return True
+        if entry.changed is None:
+            entry.changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(entry.changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _notify(self, entry: _TaskEntry):
+        entry.version += 1
+        if entry.changed is not None:
+            entry.changed.set()
+            entry.changed = None
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict(self):
+        if not self._finished:
+            return
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff and len(self._entries) <= self.max_tasks:
+                break
+            self.discard(task_id)
+            self._stats["evicted"] += 1
+
+    # ------------------------------------------------------------------
+    # Event spill
+    # ------------------------------------------------------------------
+
+    def _trim_events(self, task_id: str, entry: _TaskEntry):
+        # Move out the older half so trimming runs once per max/2 events
+        count = len(entry.events) - self.max_events_in_memory // 2
+        moved = entry.events[:count]
+        del entry.events[:count]
+        start = entry.first_event
+        entry.first_event += count
+        if self._spill_writer is not None and self._spill_writer.insert(task_id, start, moved):
+            entry.spilled += count
+            self._stats["events_spilled"] += count
+        else:
+            entry.dropped += count
+            self._stats["events_dropped"] += count
+
+    def _apply_spill_failures(self):
+        """Count chunks the spill writer could not store as dropped."""
+        if self._spill_writer is None:
+            return
+        for task_id, count in self._spill_writer.take_failures():
+            self._stats["events_spilled"] -= count
+            self._stats["events_dropped"] += count
+            entry = self._entries.get(task_id)
+            if entry is not None and entry.spilled >= count:
+                entry.spilled -= count
+                entry.dropped += count
+
+    def _resolve_spill_path(self) -> str:
+        path = Path(self.spill_db_path)
+        if not path.is_absolute():
+            from trusted_data_agent.core.utils import get_project_root
+            path = get_project_root() / path
+        return str(path)
+
+    def _open_spill_conn(self) -> sqlite3.Connection:
+        """Open the spill file (called by the spill writer, off the event loop)."""
+        conn = sqlite3.connect(self._resolve_spill_path(), timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_events ("
+            "task_id TEXT NOT NULL, seq INTEGER NOT NULL, event_json TEXT NOT NULL, "
+            "spilled_at REAL NOT NULL, "
+            "PRIMARY KEY (task_id, seq)) WITHOUT ROWID"
+        )
+        # Other workers may share the file, so only rows too old to belong to a
+        # live task are removed (leftovers of processes that exited)
+        conn.execute(
+            "DELETE FROM task_events WHERE spilled_at < ?",
+            (time.time() - max(self.ttl_seconds, _SPILL_RETENTION_SECONDS),),
+        )
+        conn.commit()
+        return conn
+
+    def flush_spill(self):
+        """Block until all queued spill writes are stored."""
+        if self._spill_writer is not None:
+            self._spill_writer.flush()
+
+    def close(self):
+        """Write the queued spill operations and stop the writer thread (on shutdown)."""
+        if self._spill_writer is not None:
+            self._spill_writer.shutdown()
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> dict:
+        self._apply_spill_failures()
+        stats = dict(self._stats)
+        stats["tasks"] = len(self._entries)
+        stats["finished_tasks"] = len(self._finished)
+        stats["events_in_memory"] = sum(len(e.events) for e in self._entries.values())
+        return stats
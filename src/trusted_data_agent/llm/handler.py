@@ -647,7 +647,7 @@ def _normalize_bedrock_model_id(model_id: str) -> str:
     return model_id.split(':')[0]
 
     # --- MODIFICATION START: Add user_uuid parameter ---
-async def call_llm_api(llm_instance: any, prompt: str, user_uuid: str = None, session_id: str = None, chat_history=None, raise_on_error: bool = False, system_prompt_override: str = None, dependencies: dict = None, reason: str = "No reason provided.", disabled_history: bool = False, active_prompt_name_for_filter: str = None, source: str = "text", active_profile_id: str = None, current_provider: str = None, current_model: str = None, multimodal_content: list = None, planning_phase: str = None, thinking_budget: int = None) -> tuple[str, int, int, str, str]: # Added provider, model, planning_phase, and thinking_budget parameters
+async def call_llm_api(llm_instance: any, prompt: str, user_uuid: str = None, session_id: str = None, chat_history=None, raise_on_error: bool = False, system_prompt_override: str = None, dependencies: dict = None, reason: str = "No reason provided.", disabled_history: bool = False, active_prompt_name_for_filter: str = None, source: str = "text", active_profile_id: str = None, current_provider: str = None, current_model: str = None, multimodal_content: list = None, planning_phase: str = None, thinking_budget: int = None, cache_reason: str = None) -> tuple[str, int, int, str, str]: # Added provider, model, planning_phase, and thinking_budget parameters
 # --- MODIFICATION END ---
     if not llm_instance:
         raise RuntimeError("LLM is not initialized.")
@@ -665,50 +665,75 @@ async def call_llm_api(llm_instance: any, prompt: str, user_uuid: str = None, se
     max_retries = APP_CONFIG.LLM_API_MAX_RETRIES
     base_delay = APP_CONFIG.LLM_API_BASE_DELAY
     # --- MODIFICATION START: Pass user_uuid to get_session ---
-    session_data = await get_session(user_uuid, session_id) if user_uuid and session_id else None
+    # Only history and prompt context are read here; queued token/model usage stays queued
+    session_data = await get_session(user_uuid, session_id, apply_turn_usage=False) if user_uuid and session_id else None
     # --- MODIFICATION END ---
     system_prompt = _get_full_system_prompt(session_data, dependencies, system_prompt_override, active_prompt_name_for_filter, source, active_profile_id, current_provider, user_uuid=user_uuid)
 
-    history_for_log_str = "No history available."
     history_source = [] # Initialize history source
-    if session_data:
-        if not disabled_history:
-            # --- MODIFICATION START: Use session_data['chat_object'] for history if available ---
-            # Prioritize explicitly passed chat_history if present
-            history_source = chat_history if chat_history is not None else session_data.get('chat_object', [])
-            # Ensure history_source is a list
-            if not isinstance(history_source, list):
-                 app_logger.warning(f"History source for {effective_provider} was not a list, resetting. Type: {type(history_source)}")
-                 history_source = []
-            # --- MODIFICATION END ---
-
-        # --- MODIFICATION START: Handle Google history logging explicitly ---
-        if effective_provider == "Google" and isinstance(history_source, list) and history_source and hasattr(history_source[0], 'role'):
-             # Assume Google's genai history object list
-             normalized_history_for_log = [
-                 {'role': msg.role, 'content': msg.parts[0].text if msg.parts and hasattr(msg.parts[0], 'text') else '[Content missing]'} for msg in history_source
-             ]
-             history_json_obj = {"chat_history": normalized_history_for_log}
-        elif isinstance(history_source, list):
-             # Assume list of dicts for other providers
-             history_json_obj = {"chat_history": history_source}
-        else:
-             history_json_obj = {"chat_history": []}
+    if session_data and not disabled_history:
+        # --- MODIFICATION START: Use session_data['chat_object'] for history if available ---
+        # Prioritize explicitly passed chat_history if present
+        history_source = chat_history if chat_history is not None else session_data.get('chat_object', [])
+        # Ensure history_source is a list
+        if not isinstance(history_source, list):
+             app_logger.warning(f"History source for {effective_provider} was not a list, resetting. Type: {type(history_source)}")
+             history_source = []
         # --- MODIFICATION END ---
-        history_for_log_str = json.dumps(history_json_obj, indent=2)
 
+    # The full-context dump serializes the whole history; only build it when it will be written
+    if llm_history_logger.isEnabledFor(logging.DEBUG):
+        history_for_log_str = "No history available."
+        if session_data:
+            # --- MODIFICATION START: Handle Google history logging explicitly ---
+            if effective_provider == "Google" and isinstance(history_source, list) and history_source and hasattr(history_source[0], 'role'):
+                 # Assume Google's genai history object list
+                 normalized_history_for_log = [
+                     {'role': msg.role, 'content': msg.parts[0].text if msg.parts and hasattr(msg.parts[0], 'text') else '[Content missing]'} for msg in history_source
+                 ]
+                 history_json_obj = {"chat_history": normalized_history_for_log}
+            elif isinstance(history_source, list):
+                 # Assume list of dicts for other providers
+                 history_json_obj = {"chat_history": history_source}
+            else:
+                 history_json_obj = {"chat_history": []}
+            # --- MODIFICATION END ---
+            history_for_log_str = json.dumps(history_json_obj, indent=2)
 
-    full_log_message = (
-        # --- MODIFICATION START: Include user_uuid in log ---
-        f"--- FULL CONTEXT (User: {user_uuid}, Session: {session_id or 'one-off'}) ---\n"
-        # --- MODIFICATION END ---
-        f"--- REASON FOR CALL ---\n{reason}\n\n"
-        f"--- History (History Disabled for LLM Call: {disabled_history}) ---\n{history_for_log_str}\n\n"
-        f"--- Current User Prompt (with System Prompt) ---\n"
-        f"SYSTEM PROMPT:\n{system_prompt}\n\n"
-        f"USER PROMPT:\n{prompt}\n"
-    )
-    llm_history_logger.info(full_log_message)
+        full_log_message = (
+            # --- MODIFICATION START: Include user_uuid in log ---
+            f"--- FULL CONTEXT (User: {user_uuid}, Session: {session_id or 'one-off'}) ---\n"
+            # --- MODIFICATION END ---
+            f"--- REASON FOR CALL ---\n{reason}\n\n"
+            f"--- History (History Disabled for LLM Call: {disabled_history}) ---\n{history_for_log_str}\n\n"
+            f"--- Current User Prompt (with System Prompt) ---\n"
+            f"SYSTEM PROMPT:\n{system_prompt}\n\n"
+            f"USER PROMPT:\n{prompt}\n"
+        )
+        llm_history_logger.debug(full_log_message)
+    else:
+        llm_history_logger.info(
+            f"--- LLM CALL (User: {user_uuid}, Session: {session_id or 'one-off'}) ---\n"
+            f"--- REASON FOR CALL ---\n{reason}\n"
+            f"History messages: {len(history_source) if isinstance(history_source, list) else 0} "
+            f"(disabled: {disabled_history}), prompt chars: {len(prompt or '')}\n"
+        )
+
+    # Opt-in response cache for deterministic utility calls (see llm/response_cache.py).
+    # A hit costs no tokens, so session totals, quota and models_used are left untouched.
+    response_cache, cache_key = None, None
+    if cache_reason and not multimodal_content:
+        from trusted_data_agent.llm.response_cache import get_llm_response_cache
+        response_cache = get_llm_response_cache()
+        if response_cache.is_enabled_for(cache_reason):
+            cache_key = response_cache.make_key(
+                effective_provider, effective_model, system_prompt, prompt,
+                history=history_source, params={"thinking_budget": thinking_budget},
+            )
+            cached_text = await response_cache.get(cache_key, cache_reason, effective_provider, effective_model)
+            if cached_text is not None:
+                llm_logger.info(f"--- REASON FOR CALL ---\n{reason}\n--- RESPONSE (cached: {cache_reason}) ---\n{cached_text}\n" + "-"*50 + "\n")
+                return cached_text, 0, 0, effective_provider, effective_model
 
 
     for attempt in range(max_retries):
@@ -1166,6 +1191,9 @@ async def call_llm_api(llm_instance: any, prompt: str, user_uuid: str = None, se
 
     llm_logger.info(f"--- REASON FOR CALL ---\n{reason}\n--- RESPONSE ---\n{response_text}\n" + "-"*50 + "\n")
 
+    if cache_key and response_text:
+        await response_cache.put(cache_key, cache_reason, response_text, input_tokens, output_tokens)
+
     # --- MODIFICATION START: Pass user_uuid to update_token_count ---
     if user_uuid and session_id:
         await update_token_count(user_uuid, session_id, input_tokens, output_tokens)
@@ -0,0 +1,265 @@
+# trusted_data_agent/llm/response_cache.py
+"""
+Response cache for deterministic utility LLM calls.
+
+Several ``call_llm_api`` side calls are effectively pure functions of their
+input: session-name generation, date-query classification, MCP capability
+(profile) classification and knowledge reranking.  Callers opt in by passing
+``cache_reason`` (one of ``CACHEABLE_REASONS``); the call is then looked up by
+a key over (provider, model, system prompt hash, prompt hash, history hash,
+parameters) before the provider is contacted.
+
+  - **Memory tier** — LRU of ``max_entries`` responses.
+  - **SQLite tier** — entries persist for ``ttl_seconds`` across restarts and
+                      workers sharing the database file.
+  - **Per reason**  — only reasons listed in ``LLM_RESPONSE_CACHE_REASONS``
+                      are cached.
+  - **Metrics**     — hits, misses and the tokens/cost a hit avoided (priced by
+                      ``CostManager``) are counted per reason.
+
+A hit returns zero tokens: nothing was sent to the provider, so nothing is
+charged to the session or the user's quota.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from trusted_data_agent.core.config import APP_CONFIG
+
+app_logger = logging.getLogger("quart.app")
+
+CACHEABLE_REASONS = frozenset({
+    "session_name",
+    "date_classification",
+    "profile_classification",
+    "knowledge_rerank",
+})
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class _CachedResponse:
+    __slots__ = ("response_text", "input_tokens", "output_tokens", "expires_at")
+
+    def __init__(self, response_text: str, input_tokens: int, output_tokens: int, expires_at: float):
+        self.response_text = response_text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.expires_at = expires_at
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of LLM responses.
+
+    Args:
+        enabled: master switch.
+        reasons: cache reasons that may be served from / stored in the cache.
+        max_entries: responses kept in the memory tier.
+        ttl_seconds: lifetime of an entry in both tiers.
+        db_path: SQLite file of the persistent tier ('' = memory tier only).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        reasons: frozenset = CACHEABLE_REASONS,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        db_path: str = "",
+    ):
+        self.enabled = enabled
+        self.reasons = frozenset(reasons)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.db_path = db_path or ""
+        self._memory: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def is_enabled_for(self, cache_reason: Optional[str]) -> bool:
+        return self.enabled and cache_reason in self.reasons
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, prompt: str,
+                 history=None, params: Optional[dict] = None) -> str:
+        """Stable key over everything that shapes the response."""
+        history_hash = _sha256(json.dumps(history, sort_keys=True, default=repr)) if history else ""
+        material = json.dumps([
+            provider or "", model or "",
+            _sha256(system_prompt or ""), _sha256(prompt or ""), history_hash,
+            params or {},
+        ], sort_keys=True, default=repr)
+        return _sha256(material)
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str, cache_reason: str, provider: str = None, model: str = None) -> Optional[str]:
+        """Return the cached response text, or None (recorded as a miss)."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del self._memory[key]
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self.db_path:
+            entry = await self._db_call(self._db_get, key, now)
+            if entry is not None:
+                self._remember(key, entry)
+
+        stats = self._reason_stats(cache_reason)
+        if entry is None:
+            stats["misses"] += 1
+            return None
+
+        stats["hits"] += 1
+        stats["saved_input_tokens"] += entry.input_tokens
+        stats["saved_output_tokens"] += entry.output_tokens
+        stats["saved_cost_usd"] += self._price(provider, model, entry.input_tokens, entry.output_tokens)
+        return entry.response_text
+
+    async def put(self, key: str, cache_reason: str, response_text: str, input_tokens: int, output_tokens: int):
+        if not response_text:
+            return
+        entry = _CachedResponse(response_text, int(input_tokens or 0), int(output_tokens or 0),
+                                time.time() + self.ttl_seconds)
+        self._remember(key, entry)
+        self._reason_stats(cache_reason)["stores"] += 1
+        if self.db_path:
+            await self._db_call(self._db_put, key, cache_reason, entry)
+
+    def _remember(self, key: str, entry: _CachedResponse):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def clear(self):
+        self._memory.clear()
+        if self.db_path:
+            await self._db_call(self._db_clear)
+
+    # ------------------------------------------------------------------
+    # SQLite tier
+    # ------------------------------------------------------------------
+
+    async def _db_call(self, fn, *args):
+        # One connection, used from a worker thread one call at a time
+        async with self._db_lock:
+            try:
+                return await asyncio.to_thread(fn, *args)
+            except sqlite3.Error as e:
+                app_logger.warning(f"LLM response cache database error: {e}")
+                return None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                "cache_key TEXT PRIMARY KEY, cache_reason TEXT NOT NULL, response_text TEXT NOT NULL, "
+                "input_tokens INTEGER NOT NULL, output_tokens INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expiry ON llm_response_cache(expires_at)")
+            conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _db_get(self, key: str, now: float) -> Optional[_CachedResponse]:
+        row = self._get_conn().execute(
+            "SELECT response_text, input_tokens, output_tokens, expires_at FROM llm_response_cache "
+            "WHERE cache_key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        return _CachedResponse(*row) if row else None
+
+    def _db_put(self, key: str, cache_reason: str, entry: _CachedResponse):
+        conn = self._get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_response_cache "
+            "(cache_key, cache_reason, response_text, input_tokens, output_tokens, expires_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, cache_reason, entry.response_text, entry.input_tokens, entry.output_tokens, entry.expires_at),
+        )
+        conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (time.time(),))
+        conn.commit()
+
+    def _db_clear(self):
+        conn = self._get_conn()
+        conn.execute("DELETE FROM llm_response_cache")
+        conn.commit()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _reason_stats(self, cache_reason: str) -> dict:
+        stats = self._stats.get(cache_reason)
+        if stats is None:
+            stats = self._stats[cache_reason] = {
+                "hits": 0, "misses": 0, "stores": 0,
+                "saved_input_tokens": 0, "saved_output_tokens": 0, "saved_cost_usd": 0.0,
+            }
+        return stats
+
+    @staticmethod
+    def _price(provider: str, model: str, input_tokens: int, output_tokens: int) -> float:
+        try:
+            from trusted_data_agent.core.cost_manager import get_cost_manager
+            return get_cost_manager().calculate_cost(provider or "Unknown", model or "Unknown", input_tokens, output_tokens)
+        except Exception as e:
+            app_logger.debug(f"Could not price cached LLM response: {e}")
+            return 0.0
+
+    def get_stats(self) -> dict:
+        by_reason = {reason: dict(stats, saved_cost_usd=round(stats["saved_cost_usd"], 6))
+                     for reason, stats in self._stats.items()}
+        hits = sum(s["hits"] for s in by_reason.values())
+        misses = sum(s["misses"] for s in by_reason.values())
+        return {
+            "enabled": self.enabled,
+            "reasons": sorted(self.reasons),
+            "memory_entries": len(self._memory),
+            "persistent": bool(self.db_path),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "saved_cost_usd": round(sum(s["saved_cost_usd"] for s in by_reason.values()), 6),
+            "by_reason": by_reason,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache, creating it on first use."""
+    global _response_cache
+    if _response_cache is None:
+        db_path = APP_CONFIG.LLM_RESPONSE_CACHE_DB
+        if not db_path:
+            from trusted_data_agent.core.utils import get_project_root
+            db_path = str(get_project_root() / "tda_llm_cache.db")
+        reasons = {r.strip() for r in APP_CONFIG.LLM_RESPONSE_CACHE_REASONS.split(",") if r.strip()}
+        _response_cache = LLMResponseCache(
+            enabled=APP_CONFIG.LLM_RESPONSE_CACHE_ENABLED,
+            reasons=frozenset(reasons),
+            max_entries=APP_CONFIG.LLM_RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=APP_CONFIG.LLM_RESPONSE_CACHE_TTL_SECONDS,
+            db_path=db_path if APP_CONFIG.LLM_RESPONSE_CACHE_PERSIST else "",
+        )
+    return _response_cache
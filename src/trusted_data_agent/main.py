@@ -77,7 +77,8 @@ llm_logger.propagate = False
 llm_history_log_handler = logging.FileHandler(os.path.join(LOG_DIR, "llm_conversation_history.log"))
 llm_history_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
 llm_history_logger = logging.getLogger("llm_conversation_history")
-llm_history_logger.setLevel(logging.INFO)
+# DEBUG adds the full context (system prompt + serialized chat history) of every LLM call
+llm_history_logger.setLevel(logging.DEBUG if os.environ.get('TDA_LLM_HISTORY_LOG_FULL_CONTEXT', 'false').lower() == 'true' else logging.INFO)
 llm_history_logger.addHandler(llm_history_log_handler)
 llm_history_logger.propagate = False
 # --- End Logging Setup ---
@@ -189,6 +190,7 @@ def create_app():
 
     app.register_blueprint(api_bp)
     app.register_blueprint(rest_api_bp, url_prefix="/api")
+    APP_STATE["in_process_query_dispatch"] = True
     app.register_blueprint(auth_bp)  # Auth routes are already prefixed with /api/v1/auth
     app.register_blueprint(admin_api_bp, url_prefix="/api")  # Phase 4 admin & credential management
     app.register_blueprint(system_prompts_bp)  # Phase 3: System prompts (database-backed)
@@ -402,6 +404,35 @@ def create_app():
             await stop_scheduler()
         except Exception:
             pass
+        try:
+            from trusted_data_agent.mcp_adapter.session_pool import get_mcp_session_pool
+            await get_mcp_session_pool().close_all()
+        except Exception:
+            pass
+        try:
+            from trusted_data_agent.auth.security import stop_access_token_usage_flusher
+            await asyncio.to_thread(stop_access_token_usage_flusher)
+        except Exception as e:
+            app_logger.error(f"Failed to flush access token usage on shutdown: {e}")
+        try:
+            from trusted_data_agent.auth.audit import shutdown_audit_writer
+            await asyncio.to_thread(shutdown_audit_writer)
+        except Exception as e:
+            app_logger.error(f"Failed to flush audit log on shutdown: {e}")
+        try:
+            from trusted_data_agent.auth.usage_ledger import shutdown_usage_ledger
+            await asyncio.to_thread(shutdown_usage_ledger)
+        except Exception as e:
+            app_logger.error(f"Failed to checkpoint usage ledger on shutdown: {e}")
+        try:
+            from trusted_data_agent.core.session_manager import flush_session_cache
+            await flush_session_cache()
+        except Exception as e:
+            app_logger.error(f"Failed to flush session cache on shutdown: {e}")
+        try:
+            await asyncio.to_thread(APP_STATE["background_tasks"].close)
+        except Exception as e:
+            app_logger.error(f"Failed to flush spilled task events on shutdown: {e}")
 
     return app
 
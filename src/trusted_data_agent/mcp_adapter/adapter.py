@@ -5,11 +5,9 @@ import json
 import logging
 import os
 import re
-import math as _math
-import statistics as _stats
 import uuid
-from collections import Counter
 from datetime import datetime, timedelta
+from typing import Iterable
 
 # Configurable MCP tool call timeout (seconds). Prevents infinite hangs.
 _MCP_TOOL_TIMEOUT = int(os.environ.get('TDA_MCP_TOOL_TIMEOUT', '120'))
@@ -20,6 +18,9 @@ from trusted_data_agent.llm import handler as llm_handler
 from trusted_data_agent.core.config import APP_CONFIG, AppConfig
 from trusted_data_agent.core.config import get_user_mcp_server_id
 from trusted_data_agent.agent.response_models import CanonicalResponse, PromptReportResponse
+from trusted_data_agent.mcp_adapter.session_pool import get_mcp_session_pool
+from trusted_data_agent.mcp_adapter.column_stats import compute_column_statistics
+from trusted_data_agent.mcp_adapter.result_ingest import has_spilled_rows, iter_result_rows, parse_tool_result_text
 
 app_logger = logging.getLogger("quart.app")
 
@@ -86,124 +87,13 @@ def _distill_workflow_for_report(workflow_state: dict) -> tuple[dict, dict | Non
 # naive first-N rows. This gives the report LLM precise quantitative data
 # (min/max/mean/percentiles/distributions) with minimal token overhead.
 
-_TEMPORAL_NAME_HINTS = frozenset({
-    "date", "time", "timestamp", "logdate", "thedate",
-    "created", "modified", "updated", "datetime", "collecttimestamp",
-})
-
-
-def _compute_column_statistics(results_list: list[dict]) -> dict:
+def _compute_column_statistics(results_list: Iterable[dict]) -> dict:
     """Compute per-column statistics for analytical distillation.
 
     Classifies each column as numeric, temporal, or categorical and
-    returns appropriate statistics.  Uses only Python stdlib.
+    returns appropriate statistics (see ``column_stats``).
     """
-    if not results_list:
-        return {}
-
-    columns = list(results_list[0].keys())
-    col_stats = {}
-
-    for col in columns:
-        raw_values = [row.get(col) for row in results_list if row.get(col) is not None]
-        if not raw_values:
-            col_stats[col] = {"type": "empty", "count": 0}
-            continue
-
-        total_count = len(raw_values)
-
-        # --- Type detection ---
-        col_lower = col.lower().replace("_", "").replace("-", "").replace(" ", "")
-        is_temporal_name = any(hint in col_lower for hint in _TEMPORAL_NAME_HINTS)
-
-        # Numeric check: float() on sample of up to 50 values
-        sample_for_detection = raw_values[:50]
-        numeric_successes = 0
-        for v in sample_for_detection:
-            try:
-                float(v)
-                numeric_successes += 1
-            except (ValueError, TypeError):
-                pass
-        is_numeric = len(sample_for_detection) > 0 and numeric_successes / len(sample_for_detection) > 0.8
-
-        if is_numeric and not is_temporal_name:
-            # --- Numeric column ---
-            numeric_vals = []
-            for v in raw_values:
-                try:
-                    numeric_vals.append(float(v))
-                except (ValueError, TypeError):
-                    pass
-
-            if not numeric_vals:
-                col_stats[col] = {"type": "categorical", "count": total_count,
-                                  "distinct_count": len(set(str(v) for v in raw_values))}
-                continue
-
-            sorted_vals = sorted(numeric_vals)
-            n = len(sorted_vals)
-
-            entry = {
-                "type": "numeric",
-                "count": total_count,
-                "min": round(sorted_vals[0], 4),
-                "max": round(sorted_vals[-1], 4),
-                "mean": round(_stats.mean(sorted_vals), 4),
-                "sum": round(sum(sorted_vals), 4),
-            }
-
-            if n >= 2:
-                entry["median"] = round(_stats.median(sorted_vals), 4)
-                p25_idx = max(0, int(n * 0.25) - 1)
-                p75_idx = min(n - 1, int(n * 0.75))
-                entry["p25"] = round(sorted_vals[p25_idx], 4)
-                entry["p75"] = round(sorted_vals[p75_idx], 4)
-            if n >= 3:
-                try:
-                    finite_vals = [v for v in sorted_vals if _math.isfinite(v)]
-                    if len(finite_vals) >= 3:
-                        entry["stddev"] = round(_stats.stdev(finite_vals), 4)
-                except (_stats.StatisticsError, AttributeError, ValueError):
-                    pass
-
-            col_stats[col] = entry
-
-        elif is_temporal_name:
-            # --- Temporal column ---
-            str_values = [str(v) for v in raw_values]
-            counter = Counter(str_values)
-            sorted_unique = sorted(counter.keys())
-
-            top_values = [
-                {"value": val, "count": cnt, "pct": round(cnt / total_count * 100, 1)}
-                for val, cnt in counter.most_common(10)
-            ]
-            col_stats[col] = {
-                "type": "temporal",
-                "count": total_count,
-                "distinct_count": len(counter),
-                "range": {"min": sorted_unique[0], "max": sorted_unique[-1]},
-                "top_values": top_values,
-            }
-
-        else:
-            # --- Categorical column ---
-            str_values = [str(v) for v in raw_values]
-            counter = Counter(str_values)
-
-            top_values = [
-                {"value": val, "count": cnt, "pct": round(cnt / total_count * 100, 1)}
-                for val, cnt in counter.most_common(10)
-            ]
-            col_stats[col] = {
-                "type": "categorical",
-                "count": total_count,
-                "distinct_count": len(counter),
-                "top_values": top_values,
-            }
-
-    return col_stats
+    return compute_column_statistics(results_list)
 
 
 def _select_representative_sample(results_list: list[dict], max_rows: int) -> list[dict]:
@@ -253,20 +143,26 @@ def _distill_value_for_report(data):
             )
             if is_large and results_list and all(isinstance(r, dict) for r in results_list[:5]):
                 # Analytical distillation: statistics on FULL data + stratified sample
-                column_stats = _compute_column_statistics(results_list)
+                if has_spilled_rows(data):
+                    # Rows beyond the in-memory cap were spilled to disk at ingestion
+                    column_stats = _compute_column_statistics(iter_result_rows(data))
+                    total_row_count = data['metadata']['row_count']
+                else:
+                    column_stats = _compute_column_statistics(results_list)
+                    total_row_count = len(results_list)
                 sample = _select_representative_sample(results_list, max_rows)
 
                 distilled = dict(data)
                 distilled['results'] = sample
                 distilled.setdefault('metadata', {})
-                distilled['metadata']['total_row_count'] = len(results_list)
+                distilled['metadata']['total_row_count'] = total_row_count
                 distilled['metadata']['sample_rows_included'] = len(sample)
                 distilled['metadata']['sampling_method'] = 'stratified'
                 distilled['metadata']['columns'] = list(results_list[0].keys()) if results_list else []
                 distilled['metadata']['column_statistics'] = column_stats
                 distilled['metadata']['truncated'] = True
                 distilled['metadata']['truncation_note'] = (
-                    f"Analytical summary of {len(results_list)} rows with {len(sample)} "
+                    f"Analytical summary of {total_row_count} rows with {len(sample)} "
                     f"representative samples (stratified). Use column_statistics for precise "
                     f"quantitative claims about the full dataset."
                 )
@@ -734,7 +630,9 @@ async def load_and_categorize_mcp_resources(STATE: dict, user_uuid: str = None,
 
         classified_capabilities_str, _, _, _, _ = await llm_handler.call_llm_api(
             llm_instance, classification_prompt, raise_on_error=True,
-            system_prompt_override=categorization_system_prompt
+            system_prompt_override=categorization_system_prompt,
+            reason="Classifying MCP capabilities into categories",
+            cache_reason="profile_classification"
         )
 
         match = re.search(r'\{.*\}', classified_capabilities_str, re.DOTALL)
@@ -1969,6 +1867,10 @@ async def invoke_mcp_tool(STATE: dict, command: dict, user_uuid: str = None, ses
             raise Exception("MCP server ID not found in configuration.")
 
         async def _do_mcp_call():
+            if APP_CONFIG.MCP_SESSION_POOL_ENABLED:
+                # Reuse a warm pooled session instead of a fresh handshake per call
+                async with get_mcp_session_pool().session(mcp_client, server_id, user_uuid=user_uuid) as pooled_session:
+                    return await pooled_session.call_tool(tool_name, aligned_args)
             async with mcp_client.session(server_id) as temp_session:
                 return await temp_session.call_tool(tool_name, aligned_args)
 
@@ -1989,14 +1891,12 @@ async def invoke_mcp_tool(STATE: dict, command: dict, user_uuid: str = None, ses
         if hasattr(text_content_obj, 'text') and isinstance(text_content_obj.text, str):
             raw_text = text_content_obj.text
             try:
-                # Attempt to find JSON within the string
-                json_match = re.search(r'\{.*\}|\[.*\]', raw_text, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    result = json.loads(json_str)
+                # Locate and decode the JSON payload (large results are streamed row by row)
+                result = parse_tool_result_text(raw_text, tool_name)
+                if result is not None:
                     # Add metadata if missing and result looks like success
-                    if isinstance(result, dict) and "metadata" not in result and "status" not in result:
-                         result["metadata"] = {"tool_name": tool_name}
+                    if isinstance(result, dict) and "status" not in result and ("metadata" not in result or has_spilled_rows(result)):
+                         result.setdefault("metadata", {})["tool_name"] = tool_name
                          result["status"] = "success"
                     # --- MODIFICATION START: Add tool_name to existing metadata if missing ---
                     elif isinstance(result, dict) and "metadata" in result and isinstance(result["metadata"], dict) and "tool_name" not in result["metadata"]:
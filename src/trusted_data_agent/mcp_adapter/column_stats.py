@@ -0,0 +1,232 @@
+# trusted_data_agent/mcp_adapter/column_stats.py
+"""
+Columnar statistics engine for analytical report distillation.
+
+``compute_column_statistics`` turns a list of row dicts into per-column
+statistics (numeric / temporal / categorical) on the FULL dataset before the
+rows are sampled down for the report LLM.
+
+The rows (a list, or a row iterator read in a single pass) are transposed
+into per-column value lists.  Numeric columns are converted to a float64
+array in one call and summarized with vectorized NumPy operations: ``np.partition`` selects the median and quartile order
+statistics in O(n) instead of sorting the column.  When NumPy is not
+installed (or a column has non-finite values) the same statistics are
+computed with the stdlib, using float arithmetic (``math.fsum``) instead of
+the exact-fraction ``statistics.mean``/``stdev``.
+
+Distinct counts and top values stay exact: ``Counter`` over the stringified
+values runs at C speed and the report prompt presents these numbers as
+precise, so approximate sketches would trade correctness for little gain.
+"""
+import itertools
+import logging
+import math
+from collections import Counter
+from typing import Iterable
+
+app_logger = logging.getLogger("quart.app")
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+_TEMPORAL_NAME_HINTS = frozenset({
+    "date", "time", "timestamp", "logdate", "thedate",
+    "created", "modified", "updated", "datetime", "collecttimestamp",
+})
+
+# Values probed with float() to classify a column as numeric
+_TYPE_DETECTION_SAMPLE = 50
+_TOP_VALUES = 10
+
+
+def compute_column_statistics(results_list: Iterable[dict]) -> dict:
+    """Compute per-column statistics for analytical distillation.
+
+    Classifies each column as numeric, temporal, or categorical and
+    returns appropriate statistics.  ``results_list`` may also be a row
+    iterator (e.g. rows spilled to disk at ingestion); it is read once.
+    """
+    col_stats = {}
+    for col, raw_values in _column_values(results_list).items():
+        if not raw_values:
+            col_stats[col] = {"type": "empty", "count": 0}
+            continue
+
+        col_lower = col.lower().replace("_", "").replace("-", "").replace(" ", "")
+        is_temporal_name = any(hint in col_lower for hint in _TEMPORAL_NAME_HINTS)
+
+        if is_temporal_name:
+            col_stats[col] = _temporal_stats(raw_values)
+        elif _looks_numeric(raw_values):
+            col_stats[col] = _numeric_stats(raw_values)
+        else:
+            col_stats[col] = _categorical_stats(raw_values)
+
+    return col_stats
+
+
+def _column_values(rows: Iterable[dict]) -> dict[str, list]:
+    """Transpose rows into non-None value lists per column (columns of the first row)."""
+    if isinstance(rows, list):
+        if not rows:
+            return {}
+        return {
+            col: [v for row in rows if (v := row.get(col)) is not None]
+            for col in rows[0].keys()
+        }
+
+    iterator = iter(rows)
+    first = next(iterator, None)
+    if first is None:
+        return {}
+    columns = {col: [] for col in first.keys()}
+    for row in itertools.chain((first,), iterator):
+        for col, values in columns.items():
+            v = row.get(col)
+            if v is not None:
+                values.append(v)
+    return columns
+
+
+# ---------------------------------------------------------------------------
+# Type detection
+# ---------------------------------------------------------------------------
+
+def _looks_numeric(raw_values: list) -> bool:
+    sample = raw_values[:_TYPE_DETECTION_SAMPLE]
+    successes = 0
+    for v in sample:
+        try:
+            float(v)
+            successes += 1
+        except (ValueError, TypeError):
+            pass
+    return successes / len(sample) > 0.8
+
+
+def _to_floats(raw_values: list):
+    """Convert values to floats, dropping the ones float() rejects.
+
+    Returns a float64 array when NumPy is available, else a list.
+    """
+    if NUMPY_AVAILABLE:
+        try:
+            return np.asarray(raw_values, dtype=np.float64)
+        except (ValueError, TypeError):
+            pass  # mixed column: convert value by value below
+
+    numeric_vals = []
+    for v in raw_values:
+        try:
+            numeric_vals.append(float(v))
+        except (ValueError, TypeError):
+            pass
+    if NUMPY_AVAILABLE:
+        return np.asarray(numeric_vals, dtype=np.float64)
+    return numeric_vals
+
+
+# ---------------------------------------------------------------------------
+# Per-type statistics
+# ---------------------------------------------------------------------------
+
+def _quantile_indices(n: int) -> tuple[int, int, int, int]:
+    """Indices of (median low, median high, p25, p75) in the sorted column."""
+    mid = n // 2
+    median_lo = mid if n % 2 else mid - 1
+    return median_lo, mid, max(0, int(n * 0.25) - 1), min(n - 1, int(n * 0.75))
+
+
+def _numeric_stats(raw_values: list) -> dict:
+    total_count = len(raw_values)
+    values = _to_floats(raw_values)
+    n = len(values)
+    if not n:
+        return {"type": "categorical", "count": total_count,
+                "distinct_count": len(set(map(str, raw_values)))}
+
+    if NUMPY_AVAILABLE and bool(np.isfinite(values).all()):
+        return _numeric_stats_vectorized(values, total_count)
+    return _numeric_stats_stdlib(values.tolist() if NUMPY_AVAILABLE else values, total_count)
+
+
+def _numeric_stats_vectorized(arr, total_count: int) -> dict:
+    n = arr.size
+    total = float(arr.sum())
+    entry = {
+        "type": "numeric",
+        "count": total_count,
+        "min": round(float(arr.min()), 4),
+        "max": round(float(arr.max()), 4),
+        "mean": round(total / n, 4),
+        "sum": round(total, 4),
+    }
+    if n >= 2:
+        median_lo, median_hi, p25_idx, p75_idx = _quantile_indices(n)
+        part = np.partition(arr, sorted({median_lo, median_hi, p25_idx, p75_idx}))
+        entry["median"] = round((float(part[median_lo]) + float(part[median_hi])) / 2, 4)
+        entry["p25"] = round(float(part[p25_idx]), 4)
+        entry["p75"] = round(float(part[p75_idx]), 4)
+    if n >= 3:
+        entry["stddev"] = round(float(arr.std(ddof=1)), 4)
+    return entry
+
+
+def _numeric_stats_stdlib(values: list, total_count: int) -> dict:
+    sorted_vals = sorted(values)
+    n = len(sorted_vals)
+    total = math.fsum(sorted_vals) if all(map(math.isfinite, sorted_vals)) else sum(sorted_vals)
+    entry = {
+        "type": "numeric",
+        "count": total_count,
+        "min": round(sorted_vals[0], 4),
+        "max": round(sorted_vals[-1], 4),
+        "mean": round(total / n, 4),
+        "sum": round(total, 4),
+    }
+    if n >= 2:
+        median_lo, median_hi, p25_idx, p75_idx = _quantile_indices(n)
+        entry["median"] = round((sorted_vals[median_lo] + sorted_vals[median_hi]) / 2, 4)
+        entry["p25"] = round(sorted_vals[p25_idx], 4)
+        entry["p75"] = round(sorted_vals[p75_idx], 4)
+    if n >= 3:
+        finite_vals = [v for v in sorted_vals if math.isfinite(v)]
+        if len(finite_vals) >= 3:
+            mean = math.fsum(finite_vals) / len(finite_vals)
+            variance = math.fsum((v - mean) ** 2 for v in finite_vals) / (len(finite_vals) - 1)
+            entry["stddev"] = round(math.sqrt(variance), 4)
+    return entry
+
+
+def _top_values(counter: Counter, total_count: int) -> list[dict]:
+    return [
+        {"value": val, "count": cnt, "pct": round(cnt / total_count * 100, 1)}
+        for val, cnt in counter.most_common(_TOP_VALUES)
+    ]
+
+
+def _temporal_stats(raw_values: list) -> dict:
+    total_count = len(raw_values)
+    counter = Counter(map(str, raw_values))
+    return {
+        "type": "temporal",
+        "count": total_count,
+        "distinct_count": len(counter),
+        "range": {"min": min(counter), "max": max(counter)},
+        "top_values": _top_values(counter, total_count),
+    }
+
+
+def _categorical_stats(raw_values: list) -> dict:
+    total_count = len(raw_values)
+    counter = Counter(map(str, raw_values))
+    return {
+        "type": "categorical",
+        "count": total_count,
+        "distinct_count": len(counter),
+        "top_values": _top_values(counter, total_count),
+    }
@@ -0,0 +1,339 @@
+# trusted_data_agent/mcp_adapter/session_pool.py
+"""
+Persistent MCP client session pool.
+
+``MultiServerMCPClient.session(server_id)`` performs a full transport handshake
+(stdio subprocess spawn, SSE/HTTP stream setup, MCP ``initialize``) every time
+it is entered.  Opening one session per tool call means a plan with 10-20 tool
+calls spends most of its wall time on session setup.
+
+This pool keeps warm sessions per ``(user_uuid, server_id)`` and hands them out
+exclusively for the duration of one call:
+
+  - **Warm reuse**      — idle sessions are reused LIFO (most recently used first).
+  - **Concurrency cap** — at most ``max_sessions_per_key`` sessions per key;
+                          further callers wait for a session to be returned.
+  - **Health checks**   — a session idle longer than ``health_check_interval``
+                          is pinged before reuse and discarded if the ping fails.
+  - **Idle eviction**   — sessions idle longer than ``idle_ttl`` are closed by a
+                          background reaper task (and at checkout), so
+                          sessions of users who never come back are closed too.
+  - **Invalidation**    — ``invalidate(server_id=...)`` retires sessions when a
+                          server's configuration changes.
+
+Each session's transport context is entered and exited by a dedicated owner
+task, because the anyio task groups used by the MCP transports must be closed
+from the task that opened them.  Callers only ever use the live
+``ClientSession`` object.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from trusted_data_agent.core.config import APP_CONFIG
+
+app_logger = logging.getLogger("quart.app")
+
+
+class _PooledSession:
+    """A single warm MCP session kept open by its owner task."""
+
+    def __init__(self, key: tuple, mcp_client, server_id: str):
+        self.key = key
+        self.mcp_client = mcp_client
+        self.server_id = server_id
+        self.session = None
+        now = time.monotonic()
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+        self.broken = False
+        self.retired = False
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, timeout: float):
+        """Spawn the owner task and wait until the session is initialized."""
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # The owner task is still stuck in the transport handshake: closing
+            # the event does not reach it, so cancel it and wait for it to unwind.
+            self.close()
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            raise
+        if self._error is not None:
+            raise self._error
+        if self.session is None:
+            raise RuntimeError(f"MCP session for server '{self.server_id}' closed during startup")
+
+    async def _run(self):
+        try:
+            async with self.mcp_client.session(self.server_id) as session:
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+            app_logger.debug(f"[MCP Pool] Session owner for server '{self.server_id}' exited with error: {e}")
+        finally:
+            self.broken = True
+            self.session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return (
+            not self.broken
+            and self.session is not None
+            and self._task is not None
+            and not self._task.done()
+        )
+
+    def close(self):
+        """Signal the owner task to exit the transport context."""
+        self.broken = True
+        self._closing.set()
+
+
+class MCPSessionPool:
+    """
+    Pool of warm MCP ``ClientSession`` objects keyed by ``(user_uuid, server_id)``.
+
+    Use ``session()`` as a drop-in replacement for ``mcp_client.session(server_id)``::
+
+        async with get_mcp_session_pool().session(mcp_client, server_id, user_uuid) as s:
+            result = await s.call_tool(tool_name, args)
+    """
+
+    # Minimum spacing between idle-eviction sweeps (seconds)
+    _SWEEP_INTERVAL = 30.0
+
+    def __init__(
+        self,
+        max_sessions_per_key: int = 4,
+        idle_ttl: float = 300.0,
+        health_check_interval: float = 60.0,
+        connect_timeout: float = 30.0,
+        ping_timeout: float = 5.0,
+    ):
+        self.max_sessions_per_key = max(1, int(max_sessions_per_key))
+        self.idle_ttl = idle_ttl
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+        self.ping_timeout = ping_timeout
+
+        self._idle: dict[tuple, deque] = {}
+        self._in_use: dict[tuple, set] = {}
+        # Weak values: a key's semaphore lives only while some caller holds or
+        # waits on it, so the map does not grow with every user/server pair seen.
+        self._semaphores: "weakref.WeakValueDictionary[tuple, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+        self._last_sweep = time.monotonic()
+        self._reaper: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0,
+            "creates": 0,
+            "waits": 0,
+            "create_failures": 0,
+            "health_check_failures": 0,
+            "discarded": 0,
+            "evicted_idle": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def session(self, mcp_client, server_id: str, user_uuid: str = None):
+        """
+        Check out a warm session for ``(user_uuid, server_id)``.
+
+        The session is returned to the pool on normal exit.  If the body
+        raises (including timeouts/cancellation), the session is discarded,
+        since an interrupted request can leave the transport in an unknown state.
+        """
+        key = (user_uuid, server_id)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_sessions_per_key)
+            self._semaphores[key] = semaphore
+
+        self._ensure_reaper()
+        if semaphore.locked():
+            self._stats["waits"] += 1
+        await semaphore.acquire()
+
+        pooled = None
+        try:
+            self._maybe_sweep()
+            pooled = await self._checkout(key, mcp_client, server_id)
+            try:
+                yield pooled.session
+            except BaseException:
+                pooled.broken = True
+                raise
+        finally:
+            if pooled is not None:
+                self._checkin(pooled)
+            semaphore.release()
+
+    def invalidate(self, server_id: str = None, user_uuid: str = None):
+        """
+        Retire pooled sessions matching ``server_id`` and/or ``user_uuid``.
+
+        Idle sessions are closed immediately; in-use sessions are closed when
+        they are returned.  With no arguments, every session is retired.
+        """
+        def _matches(key: tuple) -> bool:
+            return ((user_uuid is None or key[0] == user_uuid)
+                    and (server_id is None or key[1] == server_id))
+
+        closed = []
+        for key in [k for k in self._idle if _matches(k)]:
+            for pooled in self._idle.pop(key):
+                pooled.close()
+                closed.append(pooled)
+        for key, busy in self._in_use.items():
+            if _matches(key):
+                for pooled in busy:
+                    pooled.retired = True
+        if closed:
+            app_logger.info(f"[MCP Pool] Closed {len(closed)} idle session(s) (server_id={server_id}, user={user_uuid})")
+        return closed
+
+    async def close_all(self, timeout: float = 5.0):
+        """Close every idle session and wait briefly for their transports to shut down."""
+        reaper, self._reaper = self._reaper, None
+        if reaper is not None and not reaper.done():
+            reaper.cancel()
+            await asyncio.gather(reaper, return_exceptions=True)
+        tasks = [p._task for p in self.invalidate() if p._task is not None]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def get_stats(self) -> dict:
+        """Return pool counters plus current idle/in-use session counts."""
+        stats = dict(self._stats)
+        stats["idle_sessions"] = sum(len(q) for q in self._idle.values())
+        stats["in_use_sessions"] = sum(len(s) for s in self._in_use.values())
+        stats["keys"] = len(set(self._idle) | {k for k, s in self._in_use.items() if s})
+        lookups = stats["hits"] + stats["creates"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _checkout(self, key: tuple, mcp_client, server_id: str) -> _PooledSession:
+        idle = self._idle.get(key)
+        while idle:
+            pooled = idle.pop()
+            if not pooled.alive or pooled.mcp_client is not mcp_client:
+                # Dead transport, or the user's client was reconfigured
+                pooled.close()
+                self._stats["discarded"] += 1
+                continue
+            if time.monotonic() - pooled.last_checked > self.health_check_interval:
+                if not await self._ping(pooled):
+                    pooled.close()
+                    self._stats["health_check_failures"] += 1
+                    continue
+            self._stats["hits"] += 1
+            self._in_use.setdefault(key, set()).add(pooled)
+            return pooled
+
+        pooled = _PooledSession(key, mcp_client, server_id)
+        try:
+            await pooled.start(self.connect_timeout)
+        except BaseException:
+            self._stats["create_failures"] += 1
+            raise
+        self._stats["creates"] += 1
+        app_logger.debug(f"[MCP Pool] Opened new session for server '{server_id}' (user={key[0]})")
+        self._in_use.setdefault(key, set()).add(pooled)
+        return pooled
+
+    def _checkin(self, pooled: _PooledSession):
+        busy = self._in_use.get(pooled.key)
+        if busy is not None:
+            busy.discard(pooled)
+            if not busy:
+                del self._in_use[pooled.key]
+
+        if pooled.broken or pooled.retired or not pooled.alive:
+            pooled.close()
+            self._stats["discarded"] += 1
+            return
+
+        now = time.monotonic()
+        pooled.last_used = now
+        pooled.last_checked = now
+        self._idle.setdefault(pooled.key, deque()).append(pooled)
+
+    async def _ping(self, pooled: _PooledSession) -> bool:
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), timeout=self.ping_timeout)
+            pooled.last_checked = time.monotonic()
+            return True
+        except Exception as e:
+            app_logger.info(f"[MCP Pool] Health check failed for server '{pooled.server_id}': {e}")
+            return False
+
+    def _ensure_reaper(self):
+        """Start the idle reaper on the running loop (restarted if a previous loop went away)."""
+        reaper = self._reaper
+        loop = asyncio.get_running_loop()
+        if reaper is not None and not reaper.done() and reaper.get_loop() is loop:
+            return
+        self._reaper = loop.create_task(self._reap())
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self._SWEEP_INTERVAL)
+            try:
+                self._sweep(time.monotonic())
+            except Exception as e:
+                app_logger.warning(f"[MCP Pool] Idle session sweep failed: {e}")
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < self._SWEEP_INTERVAL:
+            return
+        self._sweep(now)
+
+    def _sweep(self, now: float):
+        """Close sessions idle longer than ``idle_ttl``."""
+        self._last_sweep = now
+        for key in list(self._idle):
+            idle = self._idle[key]
+            # Deque is ordered oldest -> newest, so expired sessions sit at the left
+            while idle and now - idle[0].last_used > self.idle_ttl:
+                idle.popleft().close()
+                self._stats["evicted_idle"] += 1
+            if not idle:
+                del self._idle[key]
+
+
+_session_pool: Optional[MCPSessionPool] = None
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """Return the process-wide MCP session pool, creating it on first use."""
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = MCPSessionPool(
+            max_sessions_per_key=APP_CONFIG.MCP_SESSION_POOL_MAX_PER_SERVER,
+            idle_ttl=APP_CONFIG.MCP_SESSION_POOL_IDLE_TTL_SECONDS,
+            health_check_interval=APP_CONFIG.MCP_SESSION_POOL_HEALTH_CHECK_SECONDS,
+        )
+    return _session_pool
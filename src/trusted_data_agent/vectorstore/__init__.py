@@ -23,7 +23,9 @@ from .embedding_providers import (
     EmbeddingProvider,
     SentenceTransformerProvider,
     ServerSideEmbeddingProvider,
+    QueryEmbeddingCache,
     get_embedding_provider,
+    get_query_embedding_cache,
 )
 from .factory import (
     get_backend,
@@ -70,7 +72,9 @@ __all__ = [
     "EmbeddingProvider",
     "SentenceTransformerProvider",
     "ServerSideEmbeddingProvider",
+    "QueryEmbeddingCache",
     "get_embedding_provider",
+    "get_query_embedding_cache",
     # Factory
     "get_backend",
     "get_default_chromadb_backend",
@@ -0,0 +1,242 @@
+"""
+On-disk BM25 inverted index for ChromaDB collections.
+
+ChromaDB has no sparse / keyword retrieval, so ``ChromaDBBackend`` keeps a
+lexical index in a SQLite file next to its persist directory
+(``bm25_index.sqlite3``) and fuses it with dense results for
+``SearchMode.HYBRID`` and ``SearchMode.KEYWORD``.
+
+  - **Lazy**        — a collection is indexed the first time it is searched
+                      lexically; semantic-only collections cost nothing.
+  - **Incremental** — once indexed, the backend's add / upsert / delete keep
+                      it current.  A document is re-indexed by replacing its
+                      postings, so applying an update twice is harmless.
+  - **Self-healing** — when the indexed document count differs from the
+                      collection count (writes through the raw ChromaDB
+                      client, a failed index write) the collection is rebuilt
+                      from its stored documents before searching.
+  - **Scoring**     — Okapi BM25 (k1=1.2, b=0.75) over lowercased ``\\w+``
+                      tokens, so identifiers like ``sales_fact_2024`` match
+                      as one term.
+
+All methods are synchronous and thread-safe; the backend calls them from
+``asyncio.to_thread`` workers.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("vectorstore.bm25")
+
+_TOKEN_RE = re.compile(r"\w+")
+_K1 = 1.2
+_B = 0.75
+_SQL_BATCH = 500  # Bound on "IN (...)" parameters per statement
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _batches(items: list, size: int = _SQL_BATCH):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class BM25Index:
+    """BM25 inverted index over the documents of many collections.
+
+    Args:
+        db_path: SQLite file ('' = in-memory, for in-memory ChromaDB clients).
+    """
+
+    def __init__(self, db_path: str = ""):
+        self.db_path = db_path or ":memory:"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._indexed: Set[str] = set()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS bm25_collections ("
+                "  collection TEXT PRIMARY KEY, doc_count INTEGER NOT NULL, total_length INTEGER NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS bm25_documents ("
+                "  collection TEXT NOT NULL, doc_id TEXT NOT NULL, length INTEGER NOT NULL,"
+                "  PRIMARY KEY (collection, doc_id)) WITHOUT ROWID;"
+                "CREATE TABLE IF NOT EXISTS bm25_postings ("
+                "  collection TEXT NOT NULL, term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL,"
+                "  PRIMARY KEY (collection, term, doc_id)) WITHOUT ROWID;"
+                "CREATE INDEX IF NOT EXISTS idx_bm25_postings_doc ON bm25_postings(collection, doc_id);"
+            )
+            conn.commit()
+            self._indexed = {row[0] for row in conn.execute("SELECT collection FROM bm25_collections")}
+            self._conn = conn
+        return self._conn
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def index_documents(self, collection: str, documents: Iterable[Tuple[str, str]]) -> None:
+        """Add or replace ``(doc_id, text)`` pairs; no-op until the collection is indexed."""
+        with self._lock:
+            conn = self._get_conn()
+            if collection not in self._indexed:
+                return
+            with conn:
+                self._write(conn, collection, list(documents))
+
+    def remove_documents(self, collection: str, ids: List[str]) -> None:
+        with self._lock:
+            conn = self._get_conn()
+            if collection not in self._indexed or not ids:
+                return
+            with conn:
+                count, length = self._remove(conn, collection, ids)
+                self._adjust_stats(conn, collection, -count, -length)
+
+    def drop_collection(self, collection: str) -> None:
+        """Forget a collection; the next lexical search rebuilds it."""
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                for table in ("bm25_postings", "bm25_documents", "bm25_collections"):
+                    conn.execute(f"DELETE FROM {table} WHERE collection = ?", (collection,))
+            self._indexed.discard(collection)
+
+    def rebuild(self, collection: str, document_batches: Iterable[List[Tuple[str, str]]]) -> int:
+        """Re-index a collection from scratch from batches of ``(doc_id, text)``."""
+        indexed = 0
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                for table in ("bm25_postings", "bm25_documents", "bm25_collections"):
+                    conn.execute(f"DELETE FROM {table} WHERE collection = ?", (collection,))
+                conn.execute(
+                    "INSERT INTO bm25_collections (collection, doc_count, total_length) VALUES (?, 0, 0)",
+                    (collection,),
+                )
+                for batch in document_batches:
+                    self._write(conn, collection, batch)
+                    indexed += len(batch)
+            self._indexed.add(collection)
+        logger.info(f"BM25 index rebuilt for '{collection}' ({indexed} documents)")
+        return indexed
+
+    def _write(self, conn: sqlite3.Connection, collection: str, documents: List[Tuple[str, str]]) -> None:
+        if not documents:
+            return
+        # Last write wins for ids repeated within one batch
+        latest = dict(documents)
+        removed_count, removed_length = self._remove(conn, collection, list(latest))
+        doc_rows, posting_rows = [], []
+        added_length = 0
+        for doc_id, text in latest.items():
+            terms = Counter(tokenize(text))
+            length = sum(terms.values())
+            added_length += length
+            doc_rows.append((collection, doc_id, length))
+            posting_rows.extend((collection, term, doc_id, tf) for term, tf in terms.items())
+        conn.executemany("INSERT INTO bm25_documents (collection, doc_id, length) VALUES (?, ?, ?)", doc_rows)
+        conn.executemany(
+            "INSERT INTO bm25_postings (collection, term, doc_id, tf) VALUES (?, ?, ?, ?)", posting_rows
+        )
+        self._adjust_stats(conn, collection, len(doc_rows) - removed_count, added_length - removed_length)
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, collection: str, ids: List[str]) -> Tuple[int, int]:
+        count = length = 0
+        for batch in _batches(ids):
+            marks = ",".join("?" * len(batch))
+            row = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM bm25_documents "
+                f"WHERE collection = ? AND doc_id IN ({marks})",
+                (collection, *batch),
+            ).fetchone()
+            count += row[0]
+            length += row[1]
+            conn.execute(f"DELETE FROM bm25_postings WHERE collection = ? AND doc_id IN ({marks})", (collection, *batch))
+            conn.execute(f"DELETE FROM bm25_documents WHERE collection = ? AND doc_id IN ({marks})", (collection, *batch))
+        return count, length
+
+    @staticmethod
+    def _adjust_stats(conn: sqlite3.Connection, collection: str, count: int, length: int) -> None:
+        conn.execute(
+            "UPDATE bm25_collections SET doc_count = doc_count + ?, total_length = total_length + ? "
+            "WHERE collection = ?",
+            (count, length, collection),
+        )
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def indexed_count(self, collection: str) -> Optional[int]:
+        """Number of indexed documents, or None if the collection is not indexed."""
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT doc_count FROM bm25_collections WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def search(
+        self, collection: str, query_text: str, limit: int, allowed_ids: Optional[Set[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Top ``limit`` ``(doc_id, bm25_score)`` pairs, best first.
+
+        With ``allowed_ids``, only those documents are ranked (a metadata
+        filter resolved by the caller); corpus statistics stay collection-wide.
+        """
+        terms = sorted(set(tokenize(query_text)))
+        if not terms or limit <= 0 or allowed_ids is not None and not allowed_ids:
+            return []
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "SELECT doc_count, total_length FROM bm25_collections WHERE collection = ?", (collection,)
+            ).fetchone()
+            if not row or not row[0]:
+                return []
+            doc_count, total_length = row
+            avg_length = total_length / doc_count or 1.0
+
+            scores: dict = {}
+            for batch in _batches(terms):
+                marks = ",".join("?" * len(batch))
+                doc_freq = dict(conn.execute(
+                    f"SELECT term, COUNT(*) FROM bm25_postings WHERE collection = ? AND term IN ({marks}) "
+                    f"GROUP BY term",
+                    (collection, *batch),
+                ).fetchall())
+                idf = {
+                    term: math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+                    for term, df in doc_freq.items()
+                }
+                postings = conn.execute(
+                    f"SELECT p.doc_id, p.term, p.tf, d.length FROM bm25_postings p "
+                    f"JOIN bm25_documents d ON d.collection = p.collection AND d.doc_id = p.doc_id "
+                    f"WHERE p.collection = ? AND p.term IN ({marks})",
+                    (collection, *batch),
+                )
+                for doc_id, term, tf, length in postings:
+                    if allowed_ids is not None and doc_id not in allowed_ids:
+                        continue
+                    norm = _K1 * (1.0 - _B + _B * length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf[term] * tf * (_K1 + 1.0) / (tf + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._indexed = set()
@@ -8,6 +8,10 @@ VectorStoreBackend interface.
 
 All synchronous ChromaDB calls are wrapped in asyncio.to_thread() so they
 never block the Quart event loop.
+
+Keyword and hybrid search use a local BM25 index (see bm25_index.py) kept
+next to the persist directory; hybrid results fuse the dense and BM25 legs
+with Reciprocal Rank Fusion.
 """
 
 from __future__ import annotations
@@ -17,6 +21,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 
 from .base import VectorStoreBackend
+from .bm25_index import BM25Index
 from .capabilities import VectorStoreCapability
 from .embedding_providers import EmbeddingProvider, SentenceTransformerProvider
 from .filters import MetadataFilter, to_chromadb_where
@@ -38,6 +43,9 @@ _METRIC_TO_HNSW: Dict[DistanceMetric, str] = {
     DistanceMetric.DOT_PRODUCT: "ip",
 }
 
+_RRF_K = 60
+_LEXICAL_REBUILD_BATCH = 1000  # Documents read per get() when (re)building the BM25 index
+
 
 class ChromaDBBackend(VectorStoreBackend):
     """ChromaDB vector store backend.
@@ -56,6 +64,7 @@ class ChromaDBBackend(VectorStoreBackend):
         self._client: Any = None          # chromadb.Client or PersistentClient
         # Cache: collection_name -> chromadb collection object
         self._coll_cache: Dict[str, Any] = {}
+        self._lexical_index: Optional[BM25Index] = None
 
     # ── Identity & capabilities ───────────────────────────────────────────────
 
@@ -77,6 +86,7 @@ class ChromaDBBackend(VectorStoreBackend):
             VectorStoreCapability.UPDATE_METADATA,
             VectorStoreCapability.EMBEDDING_PASSTHROUGH,
             VectorStoreCapability.GET_ALL,
+            VectorStoreCapability.HYBRID_SEARCH,
         }
 
     # ── Lifecycle ─────────────────────────────────────────────────────────────
@@ -95,6 +105,8 @@ class ChromaDBBackend(VectorStoreBackend):
 
     async def shutdown(self) -> None:
         self._coll_cache.clear()
+        if self._lexical_index is not None:
+            self._lexical_index.close()
 
     @property
     def raw_client(self) -> Any:
@@ -111,6 +123,28 @@ class ChromaDBBackend(VectorStoreBackend):
             return provider.chromadb_embedding_function
         return None  # server-side provider — ChromaDB won't need it
 
+    def _get_lexical_index(self) -> BM25Index:
+        if self._lexical_index is None:
+            db_path = str(self._persist_directory / "bm25_index.sqlite3") if self._persist_directory else ""
+            self._lexical_index = BM25Index(db_path)
+        return self._lexical_index
+
+    def _update_lexical_index(self, collection_name: str, ids: List[str], texts: Optional[List[str]] = None) -> None:
+        """Mirror a write into the BM25 index (texts=None means the ids were deleted)."""
+        index = self._get_lexical_index()
+        try:
+            if texts is None:
+                index.remove_documents(collection_name, ids)
+            else:
+                index.index_documents(collection_name, zip(ids, texts))
+        except Exception as e:
+            # A stale index is worse than none: drop it so the next keyword search rebuilds it
+            logger.warning(f"BM25 index update failed for '{collection_name}', dropping it: {e}")
+            try:
+                index.drop_collection(collection_name)
+            except Exception:
+                pass
+
     def _hnsw_space(self, metric: DistanceMetric) -> str:
         return _METRIC_TO_HNSW.get(metric, "cosine")
 
@@ -260,9 +294,13 @@ class ChromaDBBackend(VectorStoreBackend):
             try:
                 self._client.delete_collection(name=name)
                 self._coll_cache.pop(name, None)
-                return True
             except Exception:
                 return False
+            try:
+                self._get_lexical_index().drop_collection(name)
+            except Exception as e:
+                logger.warning(f"Could not drop BM25 index of '{name}': {e}")
+            return True
 
         return await asyncio.to_thread(_sync)
 
@@ -295,6 +333,7 @@ class ChromaDBBackend(VectorStoreBackend):
                 metadatas=metadatas,
                 embeddings=embeddings,
             )
+            self._update_lexical_index(collection_name, ids, texts)
 
         await asyncio.to_thread(_sync)
         return len(ids)
@@ -315,6 +354,7 @@ class ChromaDBBackend(VectorStoreBackend):
 
         def _sync():
             coll.upsert(ids=ids, documents=texts, metadatas=metadatas)
+            self._update_lexical_index(collection_name, ids, texts)
 
         await asyncio.to_thread(_sync)
         return len(ids)
@@ -326,6 +366,7 @@ class ChromaDBBackend(VectorStoreBackend):
 
         def _sync():
             coll.delete(ids=ids)
+            self._update_lexical_index(collection_name, ids)
 
         await asyncio.to_thread(_sync)
         return len(ids)
@@ -361,7 +402,6 @@ class ChromaDBBackend(VectorStoreBackend):
         search_mode: SearchMode = SearchMode.SEMANTIC,
         keyword_weight: float = 0.3,
     ) -> QueryResult:
-        # ChromaDB does not declare HYBRID_SEARCH — always resolves to SEMANTIC.
         search_mode = self._resolve_search_mode(search_mode)
 
         coll = self._get_chroma_collection(collection_name)
@@ -373,16 +413,92 @@ class ChromaDBBackend(VectorStoreBackend):
         if include_metadata:
             include.append("metadatas")
 
-        def _sync():
+        def _dense(limit: int) -> Dict[str, Any]:
+            # With the collection's client-side provider, embed through the
+            # shared query-vector cache so collections sharing a model reuse
+            # one embedding; otherwise ChromaDB embeds with the collection's EF.
+            if isinstance(embedding_provider, SentenceTransformerProvider):
+                return coll.query(
+                    query_embeddings=[embedding_provider.embed_query_cached(query_text)],
+                    n_results=limit,
+                    where=chroma_where,
+                    include=include,
+                )
             return coll.query(
                 query_texts=[query_text],
-                n_results=n_results,
+                n_results=limit,
                 where=chroma_where,
                 include=include,
             )
 
-        raw = await asyncio.to_thread(_sync)
-        return self._normalize_query_result(raw)
+        if search_mode == SearchMode.SEMANTIC:
+            raw = await asyncio.to_thread(_dense, n_results)
+            return self._normalize_query_result(raw)
+
+        def _sync() -> QueryResult:
+            self._ensure_lexical_index(collection_name, coll)
+            # Rank only documents passing `where`, so a selective filter cannot
+            # empty the lexical leg by filtering its global top hits afterwards
+            allowed = None
+            if chroma_where is not None:
+                allowed = set(coll.get(where=chroma_where, include=[]).get("ids") or [])
+            lexical = self._get_lexical_index().search(collection_name, query_text, n_results * 2, allowed)
+            dense = self._normalize_query_result(_dense(n_results * 2)) \
+                if search_mode == SearchMode.HYBRID else QueryResult([], [], 0)
+
+            # Lexical hits the dense leg did not return: load them
+            known = {doc.id: doc for doc in dense.documents}
+            missing = [doc_id for doc_id, _ in lexical if doc_id not in known]
+            if missing:
+                raw = coll.get(ids=missing, include=include[1:])
+                for doc in self._normalize_get_result(raw).documents:
+                    known[doc.id] = doc
+            lexical = [(doc_id, score) for doc_id, score in lexical if doc_id in known]
+
+            if search_mode == SearchMode.KEYWORD:
+                # Distance relative to the best BM25 score of this query
+                top_score = lexical[0][1] if lexical else 1.0
+                ranked = [(doc_id, 1.0 - score / top_score) for doc_id, score in lexical[:n_results]]
+            else:
+                ranked = self._rrf_fuse([doc.id for doc in dense.documents],
+                                        [doc_id for doc_id, _ in lexical], n_results)
+            docs = [known[doc_id] for doc_id, _ in ranked]
+            return QueryResult(documents=docs, distances=[d for _, d in ranked], total_results=len(docs))
+
+        return await asyncio.to_thread(_sync)
+
+    def _ensure_lexical_index(self, collection_name: str, coll: Any) -> None:
+        """(Re)build the collection's BM25 index when it is missing or out of step."""
+        index = self._get_lexical_index()
+        if index.indexed_count(collection_name) == coll.count():
+            return
+
+        def _batches():
+            offset = 0
+            while True:
+                raw = coll.get(include=["documents"], limit=_LEXICAL_REBUILD_BATCH, offset=offset)
+                ids = raw.get("ids") or []
+                if not ids:
+                    return
+                yield list(zip(ids, raw.get("documents") or [""] * len(ids)))
+                offset += len(ids)
+
+        index.rebuild(collection_name, _batches())
+
+    @staticmethod
+    def _rrf_fuse(dense_ids: List[str], lexical_ids: List[str], n_results: int) -> List[tuple]:
+        """Reciprocal Rank Fusion of two ranked id lists.
+
+        Returns ``(id, distance)`` pairs, best first.  The fused score is
+        scaled so a document ranked first by both legs has distance 0 and one
+        ranked first by a single leg has distance 0.5.
+        """
+        fused: Dict[str, float] = {}
+        for ranked in (dense_ids, lexical_ids):
+            for rank, doc_id in enumerate(ranked, start=1):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (_RRF_K + rank)
+        best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:n_results]
+        return [(doc_id, 1.0 - score * (_RRF_K + 1) / 2) for doc_id, score in best]
 
     async def get(
         self,
@@ -7,16 +7,87 @@ Separates embedding concerns from vector store concerns:
 
 The class-level model cache mirrors the existing ``embedding_functions_cache``
 in RAGRetriever so no model is loaded more than once per process.
+
+Query vectors are memoized in a small process-wide LRU keyed by
+``(model_name, normalized query text)`` — see ``embed_query_cached()`` — so a
+retrieval that fans out over many collections sharing one model embeds the
+query exactly once.
 """
 
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
+import threading
 
 logger = logging.getLogger("vectorstore.embedding")
 
 
+# ── Query embedding LRU ───────────────────────────────────────────────────────
+
+def normalize_query_text(text: str) -> str:
+    """Collapse whitespace so trivially different query strings share a cache entry."""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of recent query vectors keyed by ``(model_name, normalized_text)``.
+
+    Retrieval may embed from worker threads (parallel collection fan-out),
+    so all access is guarded by a lock.  The model call itself runs outside
+    the lock; two threads racing on the same miss both compute, last write wins.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self,
+        model_name: str,
+        query: str,
+        compute: Callable[[str], List[float]],
+    ) -> List[float]:
+        key = (model_name, normalize_query_text(query))
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        vector = list(compute(key[1]))
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return vector
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+_QUERY_EMBEDDING_CACHE = QueryEmbeddingCache()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Return the process-wide query embedding cache."""
+    return _QUERY_EMBEDDING_CACHE
+
+
 class EmbeddingProvider(ABC):
     """Abstract base for embedding providers."""
 
@@ -30,6 +101,13 @@ class EmbeddingProvider(ABC):
         """Generate an embedding for a single query string."""
         ...
 
+    def embed_query_cached(self, query: str) -> List[float]:
+        """Embed a query, reusing a recent vector for the same model and normalized text.
+
+        Callers must treat the returned list as read-only — it is shared.
+        """
+        return _QUERY_EMBEDDING_CACHE.get_or_compute(self.model_name, query, self.embed_query)
+
     @property
     @abstractmethod
     def model_name(self) -> str:
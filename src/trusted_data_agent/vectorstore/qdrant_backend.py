@@ -457,7 +457,7 @@ class QdrantBackend(VectorStoreBackend):
                 raise ValueError(
                     "embedding_provider is required for Qdrant similarity search"
                 )
-            query_vector = embedding_provider.embed_query(query_text)
+            query_vector = embedding_provider.embed_query_cached(query_text)
             results = await self._client.query_points(
                 collection_name=collection_name,
                 query=query_vector,
@@ -473,7 +473,7 @@ class QdrantBackend(VectorStoreBackend):
                 raise ValueError(
                     "embedding_provider is required for hybrid search (dense component)"
                 )
-            dense_vector = embedding_provider.embed_query(query_text)
+            dense_vector = embedding_provider.embed_query_cached(query_text)
             sparse_vector = self._compute_sparse_vector(query_text)
 
             results = await self._client.query_points(
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Knowledge Graph Subgraph Extraction Benchmark.
+
+Builds a synthetic schema-shaped knowledge graph (databases -> tables ->
+columns, foreign keys, business concepts) in a temporary SQLite database and
+times GraphStore.extract_subgraph / extract_subgraph_adaptive against a naive
+reference implementation (list-based BFS queue, per-node neighbor sets and a
+full edge scan), checking that both return the same subgraph.
+
+Runs offline - no server, LLM or MCP connection required.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Repository root (for `components.builtin...`) and src/ (for trusted_data_agent)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from components.builtin.knowledge_graph.graph_store import GraphStore, HAS_NETWORKX  # noqa: E402
+
+KG_ID = "benchmark_kg"
+PROFILE_ID = "benchmark_profile"
+USER_UUID = "benchmark_user"
+
+SCHEMA_SQL = """
+CREATE TABLE kg_entities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kg_id TEXT NOT NULL DEFAULT '',
+    profile_id TEXT NOT NULL,
+    user_uuid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    entity_type TEXT NOT NULL,
+    properties_json TEXT DEFAULT '{}',
+    source TEXT NOT NULL DEFAULT 'manual',
+    source_detail TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    UNIQUE(kg_id, name, entity_type)
+);
+CREATE TABLE kg_relationships (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kg_id TEXT NOT NULL DEFAULT '',
+    profile_id TEXT NOT NULL,
+    user_uuid TEXT NOT NULL,
+    source_entity_id INTEGER NOT NULL,
+    target_entity_id INTEGER NOT NULL,
+    relationship_type TEXT NOT NULL,
+    cardinality TEXT,
+    metadata_json TEXT DEFAULT '{}',
+    source TEXT NOT NULL DEFAULT 'manual',
+    created_at TEXT,
+    UNIQUE(kg_id, source_entity_id, target_entity_id, relationship_type)
+);
+CREATE INDEX idx_kg_entities_kg_id ON kg_entities(kg_id);
+CREATE INDEX idx_kg_relationships_kg_id ON kg_relationships(kg_id);
+"""
+
+# Shared column names create implicit join paths between tables (Phase 1b)
+SHARED_COLUMN_NAMES = ["customer_id", "order_id", "product_id", "store_id", "region_id", "created_at"]
+
+
+def build_database(db_path: str, databases: int, tables_per_db: int, columns_per_table: int,
+                   concepts: int, seed: int) -> dict:
+    """Populate a fresh knowledge graph database and return entity id groups."""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA_SQL)
+
+    entities = []
+    for d in range(databases):
+        entities.append((f"db_{d}", "database"))
+        for t in range(tables_per_db):
+            entities.append((f"db_{d}.table_{t}", "table"))
+            for c in range(columns_per_table):
+                if c < 2:
+                    cname = rng.choice(SHARED_COLUMN_NAMES)
+                else:
+                    cname = f"col_{c}"
+                entities.append((f"db_{d}.table_{t}.{cname}", "column"))
+    for k in range(concepts):
+        entities.append((f"concept_{k}", rng.choice(["business_concept", "metric", "domain", "taxonomy"])))
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO kg_entities (kg_id, profile_id, user_uuid, name, entity_type, properties_json) "
+        "VALUES (?, ?, ?, ?, ?, '{}')",
+        [(KG_ID, PROFILE_ID, USER_UUID, name, etype) for name, etype in entities],
+    )
+
+    ids = {(row[1], row[2]): row[0] for row in conn.execute("SELECT id, name, entity_type FROM kg_entities")}
+    groups = {"database": [], "table": [], "column": [], "semantic": []}
+    for (name, etype), eid in ids.items():
+        groups["semantic" if etype not in groups else etype].append(eid)
+
+    rels = set()
+    for (name, etype), eid in ids.items():
+        if etype == "table":
+            rels.add((ids[(name.split(".")[0], "database")], eid, "contains"))
+        elif etype == "column":
+            rels.add((ids[(name.rsplit(".", 1)[0], "table")], eid, "contains"))
+    tables = groups["table"]
+    for _ in range(len(tables)):
+        src, tgt = rng.sample(tables, 2)
+        rels.add((src, tgt, "foreign_key"))
+    for cid in groups["semantic"]:
+        for tid in rng.sample(tables, 3):
+            rels.add((cid, tid, "relates_to"))
+
+    conn.executemany(
+        "INSERT INTO kg_relationships (kg_id, profile_id, user_uuid, source_entity_id, target_entity_id, "
+        "relationship_type, metadata_json) VALUES (?, ?, ?, ?, ?, ?, '{}')",
+        [(KG_ID, PROFILE_ID, USER_UUID, s, t, r) for s, t, r in sorted(rels)],
+    )
+    conn.commit()
+    conn.close()
+    return {"entities": len(ids), "relationships": len(rels), "groups": groups}
+
+
+def naive_extract_subgraph(G, entity_ids, depth, max_nodes):
+    """Reference BFS: list queue, neighbor sets rebuilt per node, full edge scan."""
+    visited = set()
+    queue = []
+    for eid in entity_ids:
+        if eid in G:
+            queue.append((eid, 0))
+            visited.add(eid)
+    while queue and len(visited) <= max_nodes:
+        node_id, d = queue.pop(0)
+        if d >= depth:
+            continue
+        for neighbor in set(G.successors(node_id)) | set(G.predecessors(node_id)):
+            if neighbor not in visited and len(visited) < max_nodes:
+                visited.add(neighbor)
+                queue.append((neighbor, d + 1))
+    edges = [(s, t) for s, t in G.edges() if s in visited and t in visited]
+    return visited, edges
+
+
+def subgraph_mismatch(store, G, seeds, depth, max_nodes):
+    """
+    Compare store.extract_subgraph() with the reference BFS.
+
+    Both must return as many nodes, every node within ``depth`` hops of a
+    seed, and every graph edge among the returned nodes.  Below the node cap
+    the node sets must be identical; at the cap the two may break ties
+    between equally distant nodes differently.  Returns a description of
+    the first mismatch, or None.
+    """
+    expected_nodes, _ = naive_extract_subgraph(G, seeds, depth, max_nodes)
+    result = store.extract_subgraph(seeds, depth=depth, max_nodes=max_nodes)
+    got_nodes = {e["id"] for e in result["entities"]}
+    got_edges = {(r["source_id"], r["target_id"]) for r in result["relationships"]}
+    if len(got_nodes) != len(expected_nodes):
+        return f"{len(got_nodes)} nodes, reference has {len(expected_nodes)}"
+    if len(expected_nodes) < max_nodes and got_nodes != expected_nodes:
+        return "node sets differ"
+    reachable, _ = naive_extract_subgraph(G, seeds, depth, G.number_of_nodes())
+    if not got_nodes <= reachable:
+        return "nodes beyond the requested depth"
+    if got_edges != {(s, t) for s, t in G.edges() if s in got_nodes and t in got_nodes}:
+        return "edge sets differ"
+    return None
+
+
+def memo_leaks(store, seeds, depth, max_nodes) -> bool:
+    """True if mutating a result (including nested properties) changes the next memo hit."""
+    first = store.extract_subgraph(seeds, depth=depth, max_nodes=max_nodes)
+    for entity in first["entities"]:
+        entity["properties"]["annotated"] = True
+    first["entities"].clear()
+    again = store.extract_subgraph(seeds, depth=depth, max_nodes=max_nodes)
+    return not again["entities"] or any("annotated" in e["properties"] for e in again["entities"])
+
+
+def timed(fn, repeat: int) -> list:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def summarize(label: str, samples: list) -> dict:
+    result = {
+        "label": label,
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+    print(f"  {label:<44} median {result['median_ms']:>10.3f} ms   "
+          f"min {result['min_ms']:>10.3f} ms   max {result['max_ms']:>10.3f} ms")
+    return result
+
+
+def main():
+    """Main entry point for the subgraph benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark knowledge graph subgraph extraction",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default graph (~12k entities)
+  python kg_subgraph_benchmark.py
+
+  # Larger graph, deeper traversal, JSON results
+  python kg_subgraph_benchmark.py --tables 1000 --columns 20 --depth 3 --output results/kg_subgraph.json
+        """
+    )
+    parser.add_argument("--databases", type=int, default=10, help="Number of database entities (default: 10)")
+    parser.add_argument("--tables", type=int, default=60, help="Tables per database (default: 60)")
+    parser.add_argument("--columns", type=int, default=18, help="Columns per table (default: 18)")
+    parser.add_argument("--concepts", type=int, default=300, help="Semantic entities (default: 300)")
+    parser.add_argument("--depth", type=int, default=2, help="BFS depth for extract_subgraph (default: 2)")
+    parser.add_argument("--max-nodes", type=int, default=200, help="Node cap per extraction (default: 200)")
+    parser.add_argument("--queries", type=int, default=20, help="Distinct seed sets to extract (default: 20)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if not HAS_NETWORKX:
+        print("NetworkX is not installed - nothing to benchmark.")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "kg_benchmark.db")
+        started = time.perf_counter()
+        info = build_database(db_path, args.databases, args.tables, args.columns, args.concepts, args.seed)
+        print(f"Built graph: {info['entities']} entities, {info['relationships']} relationships "
+              f"({(time.perf_counter() - started):.1f}s)")
+
+        store = GraphStore(PROFILE_ID, USER_UUID, kg_id=KG_ID, db_path=db_path)
+        load_ms = timed(store._get_graph, 1)[0]
+        G = store._get_graph()
+        print(f"Graph load: {load_ms:.1f} ms")
+
+        rng = random.Random(args.seed)
+        groups = info["groups"]
+        seed_sets = []
+        for _ in range(args.queries):
+            seeds = rng.sample(groups["table"], 2) + rng.sample(groups["column"], 1) + rng.sample(groups["semantic"], 1)
+            seed_sets.append(seeds)
+
+        # Correctness: same node/edge sets as the reference implementation
+        for seeds in seed_sets:
+            mismatch = subgraph_mismatch(store, G, seeds, args.depth, args.max_nodes)
+            if mismatch:
+                print(f"MISMATCH for seeds {seeds}: {mismatch}")
+                return 1
+        print(f"Correctness: {len(seed_sets)} seed sets match the reference BFS")
+
+        # Memo isolation: annotating a result must not leak into the next memo hit
+        if memo_leaks(store, seed_sets[0], args.depth, args.max_nodes):
+            print("MISMATCH: caller mutation leaked into the memoized subgraph")
+            return 1
+
+        results = []
+        print(f"\nextract_subgraph (depth={args.depth}, max_nodes={args.max_nodes}, {len(seed_sets)} seed sets)")
+        results.append(summarize("reference (list queue + full edge scan)", timed(
+            lambda: [naive_extract_subgraph(G, s, args.depth, args.max_nodes) for s in seed_sets], 3)))
+
+        def _cold_bfs():
+            GraphStore.invalidate_shared_graph(KG_ID, db_path)
+            store._get_graph()
+            started = time.perf_counter()
+            for s in seed_sets:
+                store.extract_subgraph(s, depth=args.depth, max_nodes=args.max_nodes)
+            return (time.perf_counter() - started) * 1000
+
+        results.append(summarize("GraphStore (cold: adjacency build + memo miss)", [_cold_bfs() for _ in range(3)]))
+        results.append(summarize("GraphStore (memoized, same graph version)", timed(
+            lambda: [store.extract_subgraph(s, depth=args.depth, max_nodes=args.max_nodes) for s in seed_sets], 5)))
+
+        print(f"\nextract_subgraph_adaptive (max_nodes={args.max_nodes}, {len(seed_sets)} seed sets)")
+
+        def _cold_adaptive():
+            GraphStore.invalidate_shared_graph(KG_ID, db_path)
+            store._get_graph()
+            started = time.perf_counter()
+            for s in seed_sets:
+                store.extract_subgraph_adaptive(s, max_nodes=args.max_nodes)
+            return (time.perf_counter() - started) * 1000
+
+        results.append(summarize("GraphStore adaptive (cold)", [_cold_adaptive() for _ in range(3)]))
+        results.append(summarize("GraphStore adaptive (memoized)", timed(
+            lambda: [store.extract_subgraph_adaptive(s, max_nodes=args.max_nodes) for s in seed_sets], 5)))
+
+        if args.output:
+            output_path = Path(args.output)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "w") as f:
+                json.dump({
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "parameters": vars(args),
+                    "entities": info["entities"],
+                    "relationships": info["relationships"],
+                    "graph_load_ms": round(load_ms, 3),
+                    "results": results,
+                }, f, indent=2)
+            print(f"\nResults written to {output_path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
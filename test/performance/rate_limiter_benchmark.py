@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Storage Benchmark.
+
+Measures the per-check overhead of the rate limiter storage backends
+(auth/rate_limit_storage.py) and checks that the SQLite backend enforces one
+shared limit across worker processes: several processes consume from the
+same bucket concurrently and the total number of allowed checks must equal
+the limit. The in-memory backend is run the same way to show the per-process
+multiplication it has.
+
+Runs offline - no server required. The SQLite file lives in a temporary
+directory.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# src/ (for trusted_data_agent)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from trusted_data_agent.auth.rate_limit_storage import (  # noqa: E402
+    MemoryRateLimitStorage,
+    SQLiteRateLimitStorage,
+)
+
+
+def make_storage(backend: str, db_path: str):
+    return SQLiteRateLimitStorage(db_path) if backend == "sqlite" else MemoryRateLimitStorage()
+
+
+def per_check_latency(storage, checks: int, identifiers: int) -> list:
+    """Microseconds per consume() call, cycling over ``identifiers`` distinct users."""
+    samples = []
+    for i in range(checks):
+        identifier = f"user:{i % identifiers}"
+        started = time.perf_counter()
+        storage.consume(identifier, "prompts_hourly", 100, 3600)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return samples
+
+
+def summarize(label: str, samples: list) -> dict:
+    ordered = sorted(samples)
+    result = {
+        "label": label,
+        "checks": len(samples),
+        "median_us": round(statistics.median(ordered), 2),
+        "p99_us": round(ordered[int(len(ordered) * 0.99) - 1], 2),
+        "max_us": round(ordered[-1], 2),
+    }
+    print(f"  {label:<44} median {result['median_us']:>9.2f} us   "
+          f"p99 {result['p99_us']:>9.2f} us   max {result['max_us']:>9.2f} us")
+    return result
+
+
+def _worker(backend: str, db_path: str, attempts: int, limit: int, start_event, result_queue):
+    storage = make_storage(backend, db_path)
+    start_event.wait()
+    allowed = sum(
+        1 for _ in range(attempts)
+        if storage.consume("user:shared", "prompts_daily", limit, 86400)[0]
+    )
+    storage.close()
+    result_queue.put(allowed)
+
+
+def shared_limit_check(backend: str, db_path: str, processes: int, attempts: int, limit: int) -> int:
+    """Total checks allowed when ``processes`` workers hammer one bucket."""
+    ctx = multiprocessing.get_context("spawn")
+    start_event = ctx.Event()
+    result_queue = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(backend, db_path, attempts, limit, start_event, result_queue))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    start_event.set()
+    total = sum(result_queue.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return total
+
+
+def expiry_overhead(storage, stale: int, checks: int) -> list:
+    """Per-check latency while ``stale`` expired buckets are waiting to be removed."""
+    past = time.time() - 120
+    for i in range(stale):
+        storage.consume(f"ip:stale-{i}", "login", 5, 60, now=past)
+    return per_check_latency(storage, checks, 100)
+
+
+def main():
+    """Main entry point for the rate limiter benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark rate limiter storage backends",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Default run (memory + sqlite, 4 worker processes)
+  python rate_limiter_benchmark.py
+
+  # More contention, JSON results
+  python rate_limiter_benchmark.py --processes 8 --attempts 2000 --output results/rate_limiter.json
+        """
+    )
+    parser.add_argument("--checks", type=int, default=20000, help="Checks per latency run (default: 20000)")
+    parser.add_argument("--identifiers", type=int, default=1000, help="Distinct identifiers (default: 1000)")
+    parser.add_argument("--processes", type=int, default=4, help="Worker processes sharing a bucket (default: 4)")
+    parser.add_argument("--attempts", type=int, default=500, help="Checks per worker process (default: 500)")
+    parser.add_argument("--limit", type=int, default=300, help="Shared bucket limit (default: 300)")
+    parser.add_argument("--stale", type=int, default=50000, help="Expired buckets for the expiry run (default: 50000)")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    shared = {}
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\nPer-check overhead ({args.checks} checks over {args.identifiers} identifiers)")
+        for backend in ("memory", "sqlite"):
+            storage = make_storage(backend, os.path.join(tmp, "latency.db"))
+            results.append(summarize(backend, per_check_latency(storage, args.checks, args.identifiers)))
+            storage.close()
+
+        print(f"\nPer-check overhead with {args.stale} expired buckets pending")
+        for backend in ("memory", "sqlite"):
+            storage = make_storage(backend, os.path.join(tmp, "expiry.db"))
+            results.append(summarize(f"{backend} (expiry)", expiry_overhead(storage, args.stale, args.checks)))
+            storage.close()
+
+        print(f"\nShared bucket: {args.processes} processes x {args.attempts} checks, limit {args.limit}")
+        for backend in ("memory", "sqlite"):
+            allowed = shared_limit_check(
+                backend, os.path.join(tmp, "shared.db"), args.processes, args.attempts, args.limit
+            )
+            shared[backend] = allowed
+            print(f"  {backend:<44} allowed {allowed} (limit {args.limit})")
+        if shared["sqlite"] != min(args.limit, args.processes * args.attempts):
+            print("MISMATCH: SQLite storage did not enforce the shared limit")
+            failed = True
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "parameters": vars(args),
+                "results": results,
+                "shared_bucket_allowed": shared,
+            }, f, indent=2)
+        print(f"\nResults written to {output_path}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
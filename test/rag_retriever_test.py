@@ -14,11 +14,9 @@ from rag_retriever import RAGRetriever
 TEST_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = TEST_DIR.parent
 RAG_CASES_TEST_DIR = PROJECT_ROOT / "rag" / "tda_rag_cases"
-PERSIST_TEST_DIR = PROJECT_ROOT / ".chromadb_test_cache"
 
 # Ensure test directories exist
 RAG_CASES_TEST_DIR.mkdir(parents=True, exist_ok=True)
-PERSIST_TEST_DIR.mkdir(parents=True, exist_ok=True)
 
 # Helper function to create dummy RAG case files
 def create_dummy_rag_case(case_id: str, user_query: str, strategy_type: str, phases: list = None, error_summary: str = None, is_most_efficient: bool = False):
@@ -65,16 +63,12 @@ def setup_and_teardown_rag_cases():
     for f in RAG_CASES_TEST_DIR.glob("case_*.json"):
         os.remove(f)
 
-import uuid
 @pytest.fixture(scope="function")
-def rag_retriever_instance():
-    # Use a unique persist directory for each test function to avoid conflicts
-    unique_persist_dir = PERSIST_TEST_DIR / str(uuid.uuid4())
-    unique_persist_dir.mkdir(parents=True, exist_ok=True)
-
+def rag_retriever_instance(tmp_path):
+    # Use a fresh persist directory for each test function to avoid conflicts
     retriever = RAGRetriever(
         rag_cases_dir=RAG_CASES_TEST_DIR,
-        persist_directory=unique_persist_dir
+        persist_directory=tmp_path / "chromadb"
     )
     # Ensure the collection is empty before each test
     retriever.collection.delete(ids=retriever.collection.get()["ids"])
@@ -82,11 +76,6 @@ def rag_retriever_instance():
 
     yield retriever
 
-    # Clean up the unique persist directory after the test
-    if unique_persist_dir.exists():
-        import shutil
-        shutil.rmtree(unique_persist_dir)
-
 def test_rag_retriever_initialization(rag_retriever_instance):
     assert rag_retriever_instance is not None
     assert rag_retriever_instance.collection.count() >= 4 # At least successful cases
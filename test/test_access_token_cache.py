@@ -0,0 +1,292 @@
+"""
+Unit tests for the access token verification cache and write-behind usage
+counters in auth/security.py.
+
+The auth database is replaced by an in-memory SQLite engine holding only the
+users / access_tokens tables, so no tda_auth.db is touched.
+
+Run with:
+  PYTHONPATH=src python test/test_access_token_cache.py -v
+"""
+
+import asyncio
+import sys
+import types
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.auth import database, security
+from trusted_data_agent.auth.models import AccessToken, AuthToken, Base, ConsumptionProfile, User
+from trusted_data_agent.core.config import APP_CONFIG
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _AccessTokenTestCase(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[
+            ConsumptionProfile.__table__, User.__table__, AccessToken.__table__, AuthToken.__table__,
+        ])
+        database.SessionLocal.configure(bind=engine)
+        self.addCleanup(database.SessionLocal.configure, bind=database.engine)
+        self.addCleanup(engine.dispose)
+
+        self._patches = [
+            patch.object(APP_CONFIG, "ACCESS_TOKEN_CACHE_TTL_SECONDS", 60),
+            patch.object(APP_CONFIG, "ACCESS_TOKEN_CACHE_MAX_SIZE", 100),
+            patch.object(APP_CONFIG, "ACCESS_TOKEN_USAGE_FLUSH_SECONDS", 3600),
+        ]
+        for p in self._patches:
+            p.start()
+        security.invalidate_access_token_cache()
+        security._pending_token_usage.clear()
+
+        self.user_id = self._add_user("alice")
+        self.token_id, self.token = security.create_access_token(self.user_id, "ci")
+
+    def tearDown(self):
+        security.stop_access_token_usage_flusher()
+        security.invalidate_access_token_cache()
+        security._pending_token_usage.clear()
+        for p in self._patches:
+            p.stop()
+
+    def _add_user(self, username):
+        with database.get_db_session() as session:
+            user = User(username=username, email=f"{username}@example.com", password_hash="x")
+            session.add(user)
+            session.flush()
+            return user.id
+
+    def _token_row(self, token_id=None):
+        with database.get_db_session() as session:
+            row = session.query(AccessToken).filter_by(id=token_id or self.token_id).one()
+            return row.use_count, row.last_used_at
+
+    def _update_token(self, **values):
+        with database.get_db_session() as session:
+            session.query(AccessToken).filter_by(id=self.token_id).update(values)
+
+    def _set_user_active(self, active):
+        with database.get_db_session() as session:
+            session.query(User).filter_by(id=self.user_id).update({"is_active": active})
+
+
+# ---------------------------------------------------------------------------
+# Verification cache
+# ---------------------------------------------------------------------------
+
+class TestVerificationCache(_AccessTokenTestCase):
+
+    def test_verified_token_is_served_from_cache(self):
+        self.assertEqual(security.verify_access_token(self.token).id, self.user_id)
+        with patch.object(security, "get_db_session", side_effect=AssertionError("database hit")):
+            self.assertEqual(security.verify_access_token(self.token).id, self.user_id)
+
+    def test_invalid_tokens_are_not_cached(self):
+        self.assertIsNone(security.verify_access_token("tda_unknown"))
+        self.assertIsNone(security.verify_access_token("not-a-token"))
+        self.assertEqual(security._access_token_cache, {})
+
+    def test_entry_expires_after_ttl(self):
+        security.verify_access_token(self.token)
+        # Revoked behind the cache's back: only the TTL bounds staleness
+        self._update_token(revoked=True)
+        self.assertIsNotNone(security.verify_access_token(self.token))
+
+        later = security.time.time() + 61
+        with patch.object(security.time, "time", return_value=later):
+            self.assertIsNone(security.verify_access_token(self.token))
+
+    def test_entry_does_not_outlive_token_expiry(self):
+        self._update_token(expires_at=datetime.now(timezone.utc) + timedelta(seconds=30))
+        security.verify_access_token(self.token)
+
+        later = security.time.time() + 31
+        with patch.object(security.time, "time", return_value=later):
+            self.assertIsNone(security._get_cached_access_token(security.hash_access_token(self.token)))
+
+    def test_zero_ttl_disables_cache(self):
+        with patch.object(APP_CONFIG, "ACCESS_TOKEN_CACHE_TTL_SECONDS", 0):
+            self.assertIsNotNone(security.verify_access_token(self.token))
+        self.assertEqual(security._access_token_cache, {})
+
+    def test_oldest_entry_is_evicted_at_max_size(self):
+        _, second = security.create_access_token(self.user_id, "second")
+        _, third = security.create_access_token(self.user_id, "third")
+        with patch.object(APP_CONFIG, "ACCESS_TOKEN_CACHE_MAX_SIZE", 2):
+            for token in (self.token, second, third):
+                security.verify_access_token(token)
+
+        cached = set(security._access_token_cache)
+        self.assertEqual(cached, {security.hash_access_token(second), security.hash_access_token(third)})
+
+
+# ---------------------------------------------------------------------------
+# Invalidation
+# ---------------------------------------------------------------------------
+
+class TestInvalidation(_AccessTokenTestCase):
+
+    def test_revoke_drops_cached_verification(self):
+        security.verify_access_token(self.token)
+        self.assertTrue(security.revoke_access_token(self.token_id, self.user_id))
+        self.assertIsNone(security.verify_access_token(self.token))
+
+    def test_revoke_leaves_other_tokens_cached(self):
+        _, other = security.create_access_token(self.user_id, "other")
+        security.verify_access_token(self.token)
+        security.verify_access_token(other)
+        security.revoke_access_token(self.token_id, self.user_id)
+        self.assertIn(security.hash_access_token(other), security._access_token_cache)
+
+    def test_failed_revoke_keeps_cache(self):
+        security.verify_access_token(self.token)
+        self.assertFalse(security.revoke_access_token(self.token_id, "someone-else"))
+        self.assertIsNotNone(security.verify_access_token(self.token))
+
+    def test_deactivated_user_is_rejected_after_invalidation(self):
+        other_user = self._add_user("bob")
+        _, other_token = security.create_access_token(other_user, "bob")
+        security.verify_access_token(self.token)
+        security.verify_access_token(other_token)
+
+        # What the admin routes do when a user is deactivated
+        self._set_user_active(False)
+        security.invalidate_access_token_cache(user_id=self.user_id)
+
+        self.assertIsNone(security.verify_access_token(self.token))
+        self.assertIn(security.hash_access_token(other_token), security._access_token_cache)
+
+    def test_invalidate_without_arguments_clears_everything(self):
+        security.verify_access_token(self.token)
+        security.invalidate_access_token_cache()
+        self.assertEqual(security._access_token_cache, {})
+
+
+class TestSSOTierSync(_AccessTokenTestCase):
+    """SSO group sync can demote a user; cached verifications must not keep the old tier."""
+
+    _CFG = {"id": "sso-1", "default_tier": "user", "group_tier_map": {"admins": "admin"}}
+
+    def setUp(self):
+        super().setUp()
+        with database.get_db_session() as session:
+            session.query(User).filter_by(id=self.user_id).update({
+                "profile_tier": "admin", "is_admin": True,
+                "auth_method": "oidc", "sso_config_id": "sso-1",
+            })
+        self.assertTrue(security.verify_access_token(self.token).is_admin)
+        p = patch("trusted_data_agent.auth.saml_provider.log_sync_event")
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_sso_login_demotion_drops_cached_verification(self):
+        from trusted_data_agent.api.auth_routes import _provision_sso_user
+
+        user_info = {"email": "alice@example.com", "sub": "alice-sub", "groups": []}
+        jwt_token, user_dict, created = _run(_provision_sso_user(user_info, self._CFG, "oidc"))
+        self.assertIsNotNone(jwt_token)
+        self.assertFalse(created)
+        self.assertEqual(user_dict["profile_tier"], "user")
+
+        user = security.verify_access_token(self.token)
+        self.assertEqual(user.profile_tier, "user")
+        self.assertFalse(user.is_admin)
+
+    def test_manual_sso_sync_demotion_drops_cached_verification(self):
+        from quart import Quart
+        from trusted_data_agent.api.auth_routes import auth_bp
+
+        app = Quart(__name__)
+        app.register_blueprint(auth_bp)
+        admin = types.SimpleNamespace(id="admin", username="admin", is_admin=True)
+        stored = [{"auth_method": "oidc", "sso_config_id": "sso-1", "sso_groups": [], "profile_tier": "admin"}]
+
+        async def scenario():
+            response = await app.test_client().post(f"/api/v1/auth/sso/users/{self.user_id}/sync")
+            return response.status_code, await response.get_json()
+
+        with patch("trusted_data_agent.auth.middleware.get_current_user", return_value=admin), \
+             patch("trusted_data_agent.auth.saml_provider.list_sso_users", return_value=stored), \
+             patch("trusted_data_agent.auth.oidc_provider.get_sso_config", return_value=self._CFG):
+            status, body = _run(scenario())
+        self.assertEqual(status, 200)
+        self.assertEqual(body["new_tier"], "user")
+
+        user = security.verify_access_token(self.token)
+        self.assertEqual(user.profile_tier, "user")
+        self.assertFalse(user.is_admin)
+
+
+# ---------------------------------------------------------------------------
+# Write-behind usage counters
+# ---------------------------------------------------------------------------
+
+class TestUsageFlush(_AccessTokenTestCase):
+
+    def test_uses_are_buffered_and_flushed_in_one_write(self):
+        for _ in range(5):
+            security.verify_access_token(self.token)
+        self.assertEqual(self._token_row()[0], 0)
+
+        self.assertEqual(security.flush_access_token_usage(), 1)
+        use_count, last_used = self._token_row()
+        self.assertEqual(use_count, 5)
+        self.assertIsNotNone(last_used)
+        self.assertEqual(security.flush_access_token_usage(), 0)
+
+    def test_failed_flush_merges_uses_back(self):
+        for _ in range(3):
+            security.verify_access_token(self.token)
+        with patch.object(security, "_write_token_usage", side_effect=RuntimeError("db locked")):
+            self.assertEqual(security.flush_access_token_usage(), 0)
+        security.verify_access_token(self.token)
+
+        security.flush_access_token_usage()
+        self.assertEqual(self._token_row()[0], 4)
+
+    def test_flush_disabled_writes_each_use(self):
+        with patch.object(APP_CONFIG, "ACCESS_TOKEN_USAGE_FLUSH_SECONDS", 0):
+            security.verify_access_token(self.token)
+            security.verify_access_token(self.token)
+        self.assertEqual(self._token_row()[0], 2)
+        self.assertEqual(security._pending_token_usage, {})
+
+    def test_listing_flushes_first(self):
+        security.verify_access_token(self.token)
+        tokens = security.list_access_tokens(self.user_id)
+        self.assertEqual(tokens[0]["use_count"], 1)
+
+    def test_stop_flusher_writes_remaining_usage(self):
+        security.verify_access_token(self.token)
+        self.assertTrue(security._usage_flusher.is_alive())
+        security.stop_access_token_usage_flusher()
+        self.assertIsNone(security._usage_flusher)
+        self.assertEqual(self._token_row()[0], 1)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
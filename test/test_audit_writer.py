@@ -0,0 +1,225 @@
+"""
+Unit tests for the batched audit log writer (auth/audit.py).
+
+The auth database is replaced by an in-memory SQLite engine holding only the
+tables the audit trail needs. Most tests keep the background thread from
+starting so queue contents are deterministic, and drain it explicitly.
+
+Run with:
+  PYTHONPATH=src python test/test_audit_writer.py -v
+"""
+
+import asyncio
+import sys
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.auth import audit, database
+from trusted_data_agent.auth.models import AuditLog, Base, ConsumptionProfile, User
+from trusted_data_agent.auth.oauth_audit_logger import OAuthAnalytics
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _row(action="config_change", details="d"):
+    return audit._audit_row(None, action, details, True, None, "127.0.0.1", "test")
+
+
+class _AuditTestCase(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[
+            ConsumptionProfile.__table__, User.__table__, AuditLog.__table__,
+        ])
+        database.SessionLocal.configure(bind=engine)
+        self.addCleanup(database.SessionLocal.configure, bind=database.engine)
+        self.addCleanup(engine.dispose)
+
+    def _writer(self, max_size=100, batch_size=100, flush_interval=60.0, start_thread=False):
+        writer = audit._AuditWriter(max_size, batch_size, flush_interval)
+        if not start_thread:
+            writer._ensure_started = lambda: None
+        self.addCleanup(writer.shutdown, timeout=1)
+        return writer
+
+    def _actions(self):
+        with database.get_db_session() as session:
+            return sorted(action for (action,) in session.query(AuditLog.action))
+
+
+# ---------------------------------------------------------------------------
+# Batching
+# ---------------------------------------------------------------------------
+
+class TestBatching(_AuditTestCase):
+
+    def test_queued_rows_are_written_in_batches(self):
+        writer = self._writer(batch_size=3)
+        for i in range(7):
+            self.assertTrue(writer.submit(_row(details=str(i))))
+        self.assertEqual(self._actions(), [])
+
+        writer.flush()
+        self.assertEqual(len(self._actions()), 7)
+        stats = writer.get_stats()
+        self.assertEqual((stats["written"], stats["batches"], stats["queued"]), (7, 3, 0))
+
+    def test_background_thread_drains_the_queue(self):
+        writer = self._writer(flush_interval=0.05, start_thread=True)
+        for _ in range(5):
+            writer.submit(_row())
+        deadline = time.time() + 5
+        while writer.get_stats()["written"] < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self._actions()), 5)
+
+    def test_failed_batch_is_counted(self):
+        writer = self._writer()
+        writer.submit(_row())
+        with patch.object(audit, "get_db_session", side_effect=RuntimeError("db locked")):
+            writer.flush()
+        self.assertEqual(writer.get_stats()["failed"], 1)
+
+
+# ---------------------------------------------------------------------------
+# Full queue: drop or write synchronously
+# ---------------------------------------------------------------------------
+
+class TestQueueFull(_AuditTestCase):
+
+    def test_high_volume_events_are_dropped_and_reported(self):
+        writer = self._writer(max_size=1)
+        self.assertTrue(writer.submit(_row("api_access")))
+        self.assertFalse(writer.submit(_row("api_access")))
+        self.assertFalse(writer.submit(_row("session_access")))
+        self.assertEqual(writer.get_stats()["dropped"], 2)
+
+        writer.flush()
+        actions = self._actions()
+        self.assertEqual(actions, ["api_access", "audit_events_dropped"])
+        with database.get_db_session() as session:
+            details = session.query(AuditLog.details).filter_by(action="audit_events_dropped").scalar()
+        self.assertIn("api_access=1", details)
+        self.assertIn("session_access=1", details)
+
+    def test_other_events_are_written_synchronously(self):
+        writer = self._writer(max_size=1)
+        writer.submit(_row("api_access"))
+        self.assertTrue(writer.submit(_row("login_attempt")))
+
+        # Written by the caller, while the queued row is still waiting
+        self.assertEqual(self._actions(), ["login_attempt"])
+        stats = writer.get_stats()
+        self.assertEqual((stats["sync_writes"], stats["dropped"], stats["queued"]), (1, 0, 1))
+
+
+# ---------------------------------------------------------------------------
+# Shutdown and module-level entry points
+# ---------------------------------------------------------------------------
+
+class TestShutdown(_AuditTestCase):
+
+    def test_shutdown_drains_queue(self):
+        writer = self._writer(batch_size=2)
+        for _ in range(5):
+            writer.submit(_row())
+        writer.shutdown()
+        self.assertEqual(len(self._actions()), 5)
+
+    def test_shutdown_stops_background_thread(self):
+        writer = self._writer(flush_interval=60.0, start_thread=True)
+        writer.submit(_row())
+        thread = writer._thread
+        writer.shutdown(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(writer._thread)
+        self.assertEqual(len(self._actions()), 1)
+
+
+class TestModuleFunctions(_AuditTestCase):
+
+    def setUp(self):
+        super().setUp()
+        writer = self._writer()
+        self._patches = [
+            patch.object(audit, "_audit_writer", writer),
+            patch.object(audit, "AUDIT_LOGGING_ENABLED", True),
+            patch.object(audit, "AUDIT_ASYNC_ENABLED", True),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    def _log(self, action, resource=None):
+        return audit.log_audit_event(None, action, "d", resource=resource, ip_address="1.2.3.4", user_agent="t")
+
+    def test_events_are_queued_until_flushed(self):
+        self.assertTrue(self._log("config_change"))
+        self.assertEqual(self._actions(), [])
+        audit.flush_audit_log()
+        self.assertEqual(self._actions(), ["config_change"])
+
+    def test_sync_mode_commits_inline(self):
+        with patch.object(audit, "AUDIT_ASYNC_ENABLED", False):
+            self._log("config_change")
+        self.assertEqual(self._actions(), ["config_change"])
+
+    def test_stats_report_writer_counters(self):
+        self._log("config_change")
+        stats = audit.get_audit_writer_stats()
+        self.assertEqual(stats["queued"], 1)
+        self.assertTrue(stats["async_enabled"])
+
+    def test_oauth_stats_include_queued_events(self):
+        self._log("oauth_login", resource="oauth:github")
+        stats = OAuthAnalytics.get_oauth_stats()
+        self.assertEqual(stats["successful_logins"], 1)
+        self.assertEqual(OAuthAnalytics.get_provider_popularity(), {"github": 1})
+
+    def test_admin_stats_include_queued_events(self):
+        from quart import Quart
+        from trusted_data_agent.api.admin_routes import admin_api_bp
+
+        app = Quart(__name__)
+        app.register_blueprint(admin_api_bp, url_prefix="/api")
+        admin = types.SimpleNamespace(id="admin", username="admin", profile_tier="admin")
+        self._log("config_change")
+
+        async def scenario():
+            response = await app.test_client().get("/api/v1/admin/stats")
+            return response.status_code, await response.get_json()
+
+        with patch("trusted_data_agent.auth.admin.get_current_user_from_request", return_value=admin):
+            status, body = _run(scenario())
+        self.assertEqual(status, 200)
+        self.assertEqual(body["stats"]["recent_audit_events_24h"], 1)
+        self.assertEqual(body["stats"]["audit_writer"]["written"], 1)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
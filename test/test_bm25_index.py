@@ -0,0 +1,293 @@
+"""
+Unit tests for the BM25 keyword index (vectorstore/bm25_index.py) and the
+keyword / hybrid query paths of ChromaDBBackend that use it.
+
+The backend tests register a fake ChromaDB collection, so no ChromaDB client
+or embedding model is needed.
+
+Run with:
+  PYTHONPATH=src python test/test_bm25_index.py -v
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.vectorstore.bm25_index import BM25Index, tokenize
+from trusted_data_agent.vectorstore.chromadb_backend import ChromaDBBackend, _RRF_K
+from trusted_data_agent.vectorstore.filters import FieldFilter, FilterOp
+from trusted_data_agent.vectorstore.types import SearchMode
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+_DOCS = [
+    ("d1", "Quarterly sales by region from sales_fact_2024"),
+    ("d2", "Customer churn model and retention metrics"),
+    ("d3", "Sales pipeline forecast for the next quarter"),
+    ("d4", "Warehouse inventory levels"),
+]
+
+
+def _indexed(docs=_DOCS, db_path="") -> BM25Index:
+    index = BM25Index(db_path)
+    index.rebuild("c", [list(docs)])
+    return index
+
+
+def _ids(hits):
+    return [doc_id for doc_id, _ in hits]
+
+
+class _FakeCollection:
+    """Stand-in for a ChromaDB collection; query() returns a fixed dense ranking."""
+
+    def __init__(self, docs, dense_ids=(), metadatas=None):
+        self.docs = dict(docs)
+        self.dense_ids = list(dense_ids)
+        self.metadatas = metadatas or {}
+        self.get_calls = 0
+
+    def count(self):
+        return len(self.docs)
+
+    def _matches(self, doc_id, where):
+        # Only the single-field {"field": {"$eq": value}} form FieldFilter(EQ) produces
+        meta = self.metadatas.get(doc_id, {})
+        return all(meta.get(field) == cond["$eq"] for field, cond in (where or {}).items())
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        self.get_calls += 1
+        selected = [doc_id for doc_id in self.docs
+                    if (ids is None or doc_id in ids) and self._matches(doc_id, where)]
+        if limit is not None:
+            selected = selected[offset:offset + limit]
+        return {"ids": selected, "documents": [self.docs[d] for d in selected],
+                "metadatas": [self.metadatas.get(d, {}) for d in selected]}
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=10, where=None, include=None):
+        ids = self.dense_ids[:n_results]
+        return {"ids": [ids], "documents": [[self.docs[d] for d in ids]],
+                "metadatas": [[{} for _ in ids]], "distances": [[0.1 * (i + 1) for i in range(len(ids))]]}
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer and scoring
+# ---------------------------------------------------------------------------
+
+class TestSearch(unittest.TestCase):
+
+    def test_tokenize_keeps_identifiers_whole(self):
+        self.assertEqual(tokenize("Read sales_fact_2024, NOW!"), ["read", "sales_fact_2024", "now"])
+        self.assertEqual(tokenize(""), [])
+
+    def test_matching_documents_rank_by_bm25(self):
+        hits = _indexed().search("c", "sales quarter", 10)
+        # d3 has both terms; d1 has "sales" only ("quarterly" is a different token)
+        self.assertEqual(_ids(hits), ["d3", "d1"])
+        self.assertGreater(hits[0][1], hits[1][1])
+
+    def test_rare_terms_weigh_more(self):
+        index = _indexed()
+        common = dict(index.search("c", "sales", 10))
+        rare = dict(index.search("c", "sales_fact_2024", 10))
+        self.assertGreater(rare["d1"], common["d1"])
+
+    def test_allowed_ids_restrict_ranking(self):
+        index = _indexed()
+        self.assertEqual(_ids(index.search("c", "sales quarter", 1, allowed_ids={"d1", "d4"})), ["d1"])
+        self.assertEqual(index.search("c", "sales quarter", 10, allowed_ids=set()), [])
+        # Scores are unchanged by the restriction
+        self.assertEqual(dict(index.search("c", "sales", 10, {"d1"}))["d1"],
+                         dict(index.search("c", "sales", 10))["d1"])
+
+    def test_limit_and_empty_queries(self):
+        index = _indexed()
+        self.assertEqual(len(index.search("c", "sales quarter", 1)), 1)
+        self.assertEqual(index.search("c", "", 10), [])
+        self.assertEqual(index.search("c", "sales", 0), [])
+        self.assertEqual(index.search("unknown", "sales", 10), [])
+
+    def test_collections_are_isolated(self):
+        index = _indexed()
+        index.rebuild("other", [[("x1", "sales everywhere")]])
+        self.assertEqual(_ids(index.search("other", "sales", 10)), ["x1"])
+        self.assertNotIn("x1", _ids(index.search("c", "sales", 10)))
+
+
+# ---------------------------------------------------------------------------
+# Incremental writes
+# ---------------------------------------------------------------------------
+
+class TestWrites(unittest.TestCase):
+
+    def test_writes_are_ignored_until_collection_is_indexed(self):
+        index = BM25Index()
+        index.index_documents("c", [("d1", "sales")])
+        self.assertIsNone(index.indexed_count("c"))
+        self.assertEqual(index.search("c", "sales", 10), [])
+
+    def test_rebuild_counts_documents_across_batches(self):
+        index = BM25Index()
+        self.assertEqual(index.rebuild("c", [_DOCS[:2], _DOCS[2:]]), 4)
+        self.assertEqual(index.indexed_count("c"), 4)
+
+    def test_upsert_replaces_postings_and_is_idempotent(self):
+        index = _indexed()
+        for _ in range(2):
+            index.index_documents("c", [("d4", "Sales warehouse report")])
+        self.assertEqual(index.indexed_count("c"), 4)
+        self.assertIn("d4", _ids(index.search("c", "sales", 10)))
+        self.assertEqual(index.search("c", "inventory", 10), [])
+
+    def test_last_write_wins_within_a_batch(self):
+        index = _indexed()
+        index.index_documents("c", [("d5", "alpha"), ("d5", "beta")])
+        self.assertEqual(index.indexed_count("c"), 5)
+        self.assertEqual(index.search("c", "alpha", 10), [])
+        self.assertEqual(_ids(index.search("c", "beta", 10)), ["d5"])
+
+    def test_remove_updates_counts_and_results(self):
+        index = _indexed()
+        index.remove_documents("c", ["d1", "missing"])
+        self.assertEqual(index.indexed_count("c"), 3)
+        self.assertEqual(_ids(index.search("c", "sales", 10)), ["d3"])
+
+    def test_stats_match_a_fresh_rebuild(self):
+        index = _indexed()
+        index.index_documents("c", [("d2", "churn"), ("d6", "new sales doc")])
+        index.remove_documents("c", ["d4"])
+        fresh = _indexed([("d1", _DOCS[0][1]), ("d2", "churn"), ("d3", _DOCS[2][1]), ("d6", "new sales doc")])
+        self.assertEqual(index.search("c", "sales doc", 10), fresh.search("c", "sales doc", 10))
+
+    def test_drop_collection_forgets_it(self):
+        index = _indexed()
+        index.drop_collection("c")
+        self.assertIsNone(index.indexed_count("c"))
+        index.index_documents("c", [("d9", "sales")])
+        self.assertIsNone(index.indexed_count("c"))
+
+    def test_index_survives_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "bm25_index.sqlite3")
+            _indexed(db_path=path).close()
+            reopened = BM25Index(path)
+            reopened.index_documents("c", [("d7", "sales ledger")])
+            self.assertEqual(reopened.indexed_count("c"), 5)
+            self.assertIn("d7", _ids(reopened.search("c", "ledger", 10)))
+            reopened.close()
+
+
+# ---------------------------------------------------------------------------
+# Reciprocal Rank Fusion distances
+# ---------------------------------------------------------------------------
+
+class TestRrfFuse(unittest.TestCase):
+
+    def test_first_in_both_legs_has_distance_zero(self):
+        fused = ChromaDBBackend._rrf_fuse(["a", "b"], ["a", "c"], 10)
+        self.assertEqual(fused[0], ("a", 0.0))
+
+    def test_first_in_one_leg_has_distance_one_half(self):
+        fused = dict(ChromaDBBackend._rrf_fuse(["a"], ["b"], 10))
+        self.assertAlmostEqual(fused["a"], 0.5)
+        self.assertAlmostEqual(fused["b"], 0.5)
+
+    def test_distance_grows_with_rank(self):
+        fused = ChromaDBBackend._rrf_fuse(["a", "b", "c"], [], 10)
+        self.assertEqual(_ids(fused), ["a", "b", "c"])
+        distances = [d for _, d in fused]
+        self.assertEqual(distances, sorted(distances))
+        self.assertAlmostEqual(distances[2], 1.0 - (_RRF_K + 1) / (2 * (_RRF_K + 3)))
+        self.assertTrue(all(0.0 <= d < 1.0 for d in distances))
+
+    def test_agreement_outranks_a_single_top_rank(self):
+        fused = ChromaDBBackend._rrf_fuse(["x", "both"], ["y", "both"], 10)
+        self.assertEqual(fused[0][0], "both")
+
+    def test_truncates_to_n_results(self):
+        self.assertEqual(len(ChromaDBBackend._rrf_fuse(["a", "b", "c"], ["d", "e"], 2)), 2)
+
+
+# ---------------------------------------------------------------------------
+# ChromaDBBackend keyword / hybrid queries
+# ---------------------------------------------------------------------------
+
+class TestBackendQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = ChromaDBBackend()
+        self.coll = _FakeCollection(_DOCS, dense_ids=["d2", "d3"])
+        self.backend.register_collection("c", self.coll)
+
+    def tearDown(self):
+        _run(self.backend.shutdown())
+
+    def _query(self, mode, n_results=10):
+        return _run(self.backend.query("c", "sales quarter", n_results=n_results, search_mode=mode))
+
+    def test_keyword_distances_are_relative_to_best_score(self):
+        result = self._query(SearchMode.KEYWORD)
+        self.assertEqual([doc.id for doc in result.documents], ["d3", "d1"])
+        self.assertEqual(result.distances[0], 0.0)
+        self.assertTrue(0.0 < result.distances[1] < 1.0)
+        self.assertEqual(result.documents[1].content, _DOCS[0][1])
+
+    def test_hybrid_fuses_dense_and_keyword_legs(self):
+        result = self._query(SearchMode.HYBRID)
+        ids = [doc.id for doc in result.documents]
+        # d3 is in both legs; d2 only dense, d1 only keyword
+        self.assertEqual(ids[0], "d3")
+        self.assertEqual(sorted(ids), ["d1", "d2", "d3"])
+        self.assertEqual(result.distances, sorted(result.distances))
+
+    def test_index_is_rebuilt_when_counts_diverge(self):
+        self._query(SearchMode.KEYWORD)
+        # A write through the raw client bypasses the index
+        self.coll.docs["d8"] = "sales quarter summary"
+        result = self._query(SearchMode.KEYWORD)
+        self.assertIn("d8", [doc.id for doc in result.documents])
+        self.assertEqual(self.backend._get_lexical_index().indexed_count("c"), 5)
+
+    def test_filter_applies_before_keyword_ranking(self):
+        # Ten documents outrank the only one matching the filter
+        docs = [(f"top{i}", "sales quarter sales quarter") for i in range(10)] + [("tagged", "sales notes")]
+        coll = _FakeCollection(docs, metadatas={"tagged": {"document_id": "doc-7"}})
+        self.backend.register_collection("f", coll)
+        where = FieldFilter("document_id", FilterOp.EQ, "doc-7")
+
+        for mode in (SearchMode.KEYWORD, SearchMode.HYBRID):
+            with self.subTest(mode=mode):
+                result = _run(self.backend.query("f", "sales quarter", n_results=2, where=where, search_mode=mode))
+                self.assertEqual([doc.id for doc in result.documents], ["tagged"])
+                self.assertEqual(result.documents[0].metadata, {"document_id": "doc-7"})
+
+    def test_filter_without_matches_returns_nothing(self):
+        where = FieldFilter("document_id", FilterOp.EQ, "missing")
+        result = _run(self.backend.query("c", "sales", n_results=5, where=where, search_mode=SearchMode.KEYWORD))
+        self.assertEqual(result.documents, [])
+
+    def test_semantic_mode_does_not_build_the_index(self):
+        self._query(SearchMode.SEMANTIC)
+        self.assertIsNone(self.backend._lexical_index)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,292 @@
+"""
+Parity tests for the columnar statistics engine (mcp_adapter/column_stats.py).
+
+The engine replaced the row-by-row ``_compute_column_statistics`` in
+mcp_adapter/adapter.py.  A verbatim copy of that implementation is kept
+below as the reference; every dataset is summarized by both, on the NumPy
+path and on the stdlib path (NUMPY_AVAILABLE patched off), and the outputs
+must be identical.  The one intended difference is ``sum`` under catastrophic
+cancellation, where the reference's plain ``sum()`` was the less accurate one.
+
+Run with:
+  PYTHONPATH=src python test/test_column_stats.py -v
+"""
+
+import json
+import math as _math
+import random
+import statistics as _stats
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.mcp_adapter import column_stats
+from trusted_data_agent.mcp_adapter.column_stats import _quantile_indices, compute_column_statistics
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (adapter._compute_column_statistics before the engine)
+# ---------------------------------------------------------------------------
+
+_TEMPORAL_NAME_HINTS = frozenset({
+    "date", "time", "timestamp", "logdate", "thedate",
+    "created", "modified", "updated", "datetime", "collecttimestamp",
+})
+
+
+def _baseline_column_statistics(results_list: list[dict]) -> dict:
+    if not results_list:
+        return {}
+
+    columns = list(results_list[0].keys())
+    col_stats = {}
+
+    for col in columns:
+        raw_values = [row.get(col) for row in results_list if row.get(col) is not None]
+        if not raw_values:
+            col_stats[col] = {"type": "empty", "count": 0}
+            continue
+
+        total_count = len(raw_values)
+
+        col_lower = col.lower().replace("_", "").replace("-", "").replace(" ", "")
+        is_temporal_name = any(hint in col_lower for hint in _TEMPORAL_NAME_HINTS)
+
+        sample_for_detection = raw_values[:50]
+        numeric_successes = 0
+        for v in sample_for_detection:
+            try:
+                float(v)
+                numeric_successes += 1
+            except (ValueError, TypeError):
+                pass
+        is_numeric = len(sample_for_detection) > 0 and numeric_successes / len(sample_for_detection) > 0.8
+
+        if is_numeric and not is_temporal_name:
+            numeric_vals = []
+            for v in raw_values:
+                try:
+                    numeric_vals.append(float(v))
+                except (ValueError, TypeError):
+                    pass
+
+            if not numeric_vals:
+                col_stats[col] = {"type": "categorical", "count": total_count,
+                                  "distinct_count": len(set(str(v) for v in raw_values))}
+                continue
+
+            sorted_vals = sorted(numeric_vals)
+            n = len(sorted_vals)
+
+            entry = {
+                "type": "numeric",
+                "count": total_count,
+                "min": round(sorted_vals[0], 4),
+                "max": round(sorted_vals[-1], 4),
+                "mean": round(_stats.mean(sorted_vals), 4),
+                "sum": round(sum(sorted_vals), 4),
+            }
+
+            if n >= 2:
+                entry["median"] = round(_stats.median(sorted_vals), 4)
+                p25_idx = max(0, int(n * 0.25) - 1)
+                p75_idx = min(n - 1, int(n * 0.75))
+                entry["p25"] = round(sorted_vals[p25_idx], 4)
+                entry["p75"] = round(sorted_vals[p75_idx], 4)
+            if n >= 3:
+                try:
+                    finite_vals = [v for v in sorted_vals if _math.isfinite(v)]
+                    if len(finite_vals) >= 3:
+                        entry["stddev"] = round(_stats.stdev(finite_vals), 4)
+                except (_stats.StatisticsError, AttributeError, ValueError):
+                    pass
+
+            col_stats[col] = entry
+
+        elif is_temporal_name:
+            str_values = [str(v) for v in raw_values]
+            counter = Counter(str_values)
+            sorted_unique = sorted(counter.keys())
+
+            top_values = [
+                {"value": val, "count": cnt, "pct": round(cnt / total_count * 100, 1)}
+                for val, cnt in counter.most_common(10)
+            ]
+            col_stats[col] = {
+                "type": "temporal",
+                "count": total_count,
+                "distinct_count": len(counter),
+                "range": {"min": sorted_unique[0], "max": sorted_unique[-1]},
+                "top_values": top_values,
+            }
+
+        else:
+            str_values = [str(v) for v in raw_values]
+            counter = Counter(str_values)
+
+            top_values = [
+                {"value": val, "count": cnt, "pct": round(cnt / total_count * 100, 1)}
+                for val, cnt in counter.most_common(10)
+            ]
+            col_stats[col] = {
+                "type": "categorical",
+                "count": total_count,
+                "distinct_count": len(counter),
+                "top_values": top_values,
+            }
+
+    return col_stats
+
+
+# ---------------------------------------------------------------------------
+# Datasets
+# ---------------------------------------------------------------------------
+
+def _mixed_rows(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    regions = ["north", "south", "east", "west", "central"]
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": i,
+            "amount": round(rng.uniform(-500, 5000), 2),
+            "qty": rng.randint(0, 40),
+            "ratio": rng.gauss(0.5, 0.2),
+            "price_text": f"{rng.uniform(1, 99):.2f}",      # numeric strings
+            "region": rng.choice(regions),
+            "order_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "UpdatedTime": 1_700_000_000 + rng.randint(0, 10_000),  # numeric but temporal by name
+            "note": None if i % 3 else f"note {i % 7}",
+            "flag": rng.random() < 0.3,
+        })
+    return rows
+
+
+_DATASETS = {
+    "mixed_odd": _mixed_rows(301),
+    "mixed_even": _mixed_rows(300, seed=11),
+    "single_row": _mixed_rows(1),
+    "two_rows": _mixed_rows(2),
+    "three_rows": _mixed_rows(3),
+    "empty": [],
+    "all_none": [{"a": None, "b": 1}, {"a": None, "b": 2}],
+    # Mostly numeric with a few unparseable values (> 80 % of the sample parse)
+    "mixed_column": [{"v": "n/a" if i % 10 == 0 else str(i * 1.5)} for i in range(100)],
+    # Mostly text: below the numeric threshold
+    "mostly_text": [{"v": str(i) if i % 2 else f"item{i}"} for i in range(60)],
+    # Numeric detection only looks at the first 50 values
+    "late_text": [{"v": i if i < 50 else "text"} for i in range(80)],
+    "non_finite": [{"v": v} for v in [1.0, 2.5, float("inf"), -3.0, 4.0, 7.25]],
+    "nan": [{"v": v} for v in [1.0, float("nan"), 3.0, 5.5]],
+    "neg_inf_only_two_finite": [{"v": v} for v in [float("-inf"), 1.0, 2.0]],
+    "columns_of_first_row": [{"a": 1, "b": "x"}, {"a": 2, "c": "ignored"}, {"a": 3, "b": "y"}],
+}
+
+# Catastrophic cancellation: the reference's plain sum() over the sorted values
+# loses the small terms (6.375 instead of 6.3333).
+_CANCELLATION = [{"v": v} for v in [1e15, 1.0, -1e15, 3.3333333, 1e-9, 2.0]]
+
+
+def _canonical(stats: dict) -> str:
+    # NaN != NaN: compare the serialized form instead of the dicts
+    return json.dumps(stats, sort_keys=True)
+
+
+# ---------------------------------------------------------------------------
+# Parity
+# ---------------------------------------------------------------------------
+
+class _ParityTests:
+    """Mixin: subclasses set numpy_available."""
+
+    numpy_available = True
+
+    def setUp(self):
+        if self.numpy_available and not column_stats.NUMPY_AVAILABLE:
+            self.skipTest("NumPy not installed")
+        p = patch.object(column_stats, "NUMPY_AVAILABLE", self.numpy_available)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_matches_baseline(self):
+        for name, rows in _DATASETS.items():
+            with self.subTest(dataset=name):
+                self.assertEqual(_canonical(compute_column_statistics(rows)),
+                                 _canonical(_baseline_column_statistics(rows)))
+
+    def test_iterator_input_matches_list_input(self):
+        for name, rows in _DATASETS.items():
+            with self.subTest(dataset=name):
+                self.assertEqual(_canonical(compute_column_statistics(iter(rows))),
+                                 _canonical(_baseline_column_statistics(rows)))
+
+    def test_sum_under_cancellation_is_at_least_as_accurate(self):
+        engine = compute_column_statistics(_CANCELLATION)["v"]
+        reference = _baseline_column_statistics(_CANCELLATION)["v"]
+        exact = round(_math.fsum(row["v"] for row in _CANCELLATION), 4)
+
+        self.assertLessEqual(abs(engine["sum"] - exact), abs(reference["sum"] - exact))
+        del engine["sum"], reference["sum"]
+        self.assertEqual(engine, reference)
+
+    def test_column_types(self):
+        stats = compute_column_statistics(_DATASETS["mixed_odd"])
+        types = {col: entry["type"] for col, entry in stats.items()}
+        self.assertEqual(types, {
+            "id": "numeric", "amount": "numeric", "qty": "numeric", "ratio": "numeric",
+            "price_text": "numeric", "region": "categorical", "order_date": "temporal",
+            "UpdatedTime": "temporal", "note": "categorical", "flag": "numeric",
+        })
+
+
+class TestParityNumpy(_ParityTests, unittest.TestCase):
+    numpy_available = True
+
+
+class TestParityStdlib(_ParityTests, unittest.TestCase):
+    numpy_available = False
+
+
+# ---------------------------------------------------------------------------
+# Quantile indices
+# ---------------------------------------------------------------------------
+
+class TestQuantileIndices(unittest.TestCase):
+
+    def test_indices_match_baseline_positions(self):
+        for n in range(2, 200):
+            with self.subTest(n=n):
+                median_lo, median_hi, p25_idx, p75_idx = _quantile_indices(n)
+                values = list(range(n))
+                self.assertEqual((values[median_lo] + values[median_hi]) / 2, _stats.median(values))
+                self.assertEqual(p25_idx, max(0, int(n * 0.25) - 1))
+                self.assertEqual(p75_idx, min(n - 1, int(n * 0.75)))
+
+    def test_partition_selects_sorted_order_statistics(self):
+        if not column_stats.NUMPY_AVAILABLE:
+            self.skipTest("NumPy not installed")
+        rng = random.Random(3)
+        for n in (2, 3, 4, 5, 10, 101, 1000):
+            values = [rng.uniform(-1, 1) for _ in range(n)]
+            sorted_vals = sorted(values)
+            stats = column_stats._numeric_stats_vectorized(column_stats.np.asarray(values), n)
+            median_lo, median_hi, p25_idx, p75_idx = _quantile_indices(n)
+            with self.subTest(n=n):
+                self.assertEqual(stats["p25"], round(sorted_vals[p25_idx], 4))
+                self.assertEqual(stats["p75"], round(sorted_vals[p75_idx], 4))
+                self.assertEqual(stats["median"], round((sorted_vals[median_lo] + sorted_vals[median_hi]) / 2, 4))
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
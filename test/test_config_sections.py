@@ -0,0 +1,324 @@
+"""
+Unit tests for the per-user configuration store in core/config_manager.py:
+section rows, legacy preferences_json migration, config_version invalidation
+across processes, the LRU-bounded cache and the dict-by-id section indexes.
+
+The auth database is replaced by an in-memory SQLite engine holding only the
+tables the configuration store needs; two ConfigManager instances stand in
+for two worker processes. Vector store bootstrap/migration is patched out.
+
+Run with:
+  PYTHONPATH=src python test/test_config_sections.py -v
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.auth import database
+from trusted_data_agent.auth.models import (
+    Base,
+    ConsumptionProfile,
+    User,
+    UserConfigSection,
+    UserPreference,
+)
+from trusted_data_agent.core.config import APP_CONFIG
+from trusted_data_agent.core.config_manager import ConfigManager
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+_TEMPLATE = {
+    "schema_version": ConfigManager.CURRENT_SCHEMA_VERSION,
+    "mcp_servers": [{"id": "srv-1", "name": "one"}],
+    "active_mcp_server_id": None,
+    "llm_configurations": [],
+    "profiles": [
+        {"id": "p-a", "tag": "A", "profile_type": "tool_enabled", "mcpServerId": "srv-1"},
+        {"id": "p-b", "tag": "B", "profile_type": "llm_only"},
+    ],
+}
+
+
+class _ConfigTestCase(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[
+            ConsumptionProfile.__table__, User.__table__, UserPreference.__table__, UserConfigSection.__table__,
+        ])
+        database.SessionLocal.configure(bind=engine)
+        self.addCleanup(database.SessionLocal.configure, bind=database.engine)
+        self.addCleanup(engine.dispose)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.template_path = Path(tmp.name) / "tda_config.json"
+        self.template_path.write_text(json.dumps(_TEMPLATE), encoding="utf-8")
+
+        for p in (
+            patch.object(ConfigManager, "ensure_default_vector_store_config", lambda self, user_uuid: None),
+            patch.object(ConfigManager, "migrate_inline_vector_store_configs", lambda self, user_uuid: None),
+            patch.object(APP_CONFIG, "CONFIG_CACHE_MAX_USERS", 500),
+            patch.object(APP_CONFIG, "CONFIG_CACHE_VERSION_CHECK_SECONDS", 3600),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.writes = []
+        original = ConfigManager._write_sections
+
+        def record_write(user_uuid, sections, digests, stored_digests):
+            result = original(user_uuid, sections, digests, stored_digests)
+            self.writes.append(result[1])
+            return result
+
+        p = patch.object(ConfigManager, "_write_sections", staticmethod(record_write))
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _manager(self) -> ConfigManager:
+        return ConfigManager(config_path=self.template_path)
+
+    def _sections(self, user_uuid="u1"):
+        with database.get_db_session() as session:
+            rows = session.query(UserConfigSection.section, UserConfigSection.data_json).filter_by(
+                user_id=user_uuid).all()
+        return {section: json.loads(data) for section, data in rows}
+
+    def _prefs(self, user_uuid="u1"):
+        with database.get_db_session() as session:
+            prefs = session.query(UserPreference).filter_by(user_id=user_uuid).one()
+            return prefs.preferences_json, prefs.config_version
+
+
+# ---------------------------------------------------------------------------
+# Section store
+# ---------------------------------------------------------------------------
+
+class TestSectionStore(_ConfigTestCase):
+
+    def test_bootstrap_stores_one_row_per_section(self):
+        config = self._manager().load_config("u1")
+        sections = self._sections()
+        self.assertEqual(set(sections), set(config))
+        self.assertEqual(sections["profiles"], _TEMPLATE["profiles"])
+        self.assertEqual(self._prefs(), (None, 1))
+
+    def test_only_changed_sections_are_written(self):
+        manager = self._manager()
+        config = manager.load_config("u1")
+        config["active_mcp_server_id"] = "srv-1"
+        manager.save_config(config, "u1")
+
+        # The changed scalar plus last_modified
+        self.assertEqual(self.writes[-1], 2)
+        self.assertEqual(self._sections()["active_mcp_server_id"], "srv-1")
+        self.assertEqual(self._prefs()[1], 2)
+
+    def test_removed_key_deletes_its_row(self):
+        manager = self._manager()
+        config = manager.load_config("u1")
+        del config["llm_configurations"]
+        manager.save_config(config, "u1")
+        self.assertNotIn("llm_configurations", self._sections())
+
+    def test_credentials_are_not_stored(self):
+        manager = self._manager()
+        config = manager.load_config("u1")
+        config["llm_configurations"] = [{"id": "llm-1", "credentials": {"api_key": "secret"}}]
+        manager.save_config(config, "u1")
+        self.assertEqual(self._sections()["llm_configurations"], [{"id": "llm-1", "credentials": {}}])
+        self.assertEqual(manager.load_config("u1")["llm_configurations"][0]["credentials"], {"api_key": "secret"})
+
+    def test_reload_in_new_process_returns_saved_config(self):
+        first = self._manager()
+        config = first.load_config("u1")
+        config["profiles"].append({"id": "p-c", "tag": "C", "profile_type": "llm_only"})
+        first.save_config(config, "u1")
+
+        reloaded = self._manager().load_config("u1")
+        self.assertEqual([p["id"] for p in reloaded["profiles"]], ["p-a", "p-b", "p-c"])
+
+    def test_save_without_cached_config_writes_only_changes(self):
+        self._manager().load_config("u1")
+        config = json.loads(json.dumps(self._manager().load_config("u1")))
+
+        # A process that never loaded (or evicted) this user saves a modified copy
+        fresh = self._manager()
+        config["active_mcp_server_id"] = "srv-1"
+        self.assertTrue(fresh.save_config(config, "u1"))
+        self.assertEqual(self.writes[-1], 2)
+        self.assertEqual(self._prefs()[1], 2)
+
+    def test_save_without_cached_config_keeps_unchanged_rows(self):
+        config = json.loads(json.dumps(self._manager().load_config("u1")))
+        with database.get_db_session() as session:
+            before = dict(session.query(UserConfigSection.section, UserConfigSection.updated_at).filter_by(
+                user_id="u1"))
+
+        config["active_mcp_server_id"] = "srv-1"
+        self._manager().save_config(config, "u1")
+        with database.get_db_session() as session:
+            after = dict(session.query(UserConfigSection.section, UserConfigSection.updated_at).filter_by(
+                user_id="u1"))
+
+        self.assertEqual(set(after), set(before))
+        self.assertEqual(after["profiles"], before["profiles"])
+        self.assertEqual(after["mcp_servers"], before["mcp_servers"])
+
+
+# ---------------------------------------------------------------------------
+# Legacy preferences_json migration
+# ---------------------------------------------------------------------------
+
+class TestLegacyMigration(_ConfigTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.legacy = dict(_TEMPLATE, active_mcp_server_id="srv-1", last_modified="2025-01-01T00:00:00+00:00")
+        with database.get_db_session() as session:
+            session.add(UserPreference(user_id="u1", preferences_json=json.dumps(self.legacy), config_version=0))
+
+    def test_legacy_blob_is_read(self):
+        config = self._manager().load_config("u1")
+        self.assertEqual(config["active_mcp_server_id"], "srv-1")
+        self.assertEqual(self._sections(), {})
+
+    def test_first_save_migrates_to_sections_and_clears_blob(self):
+        manager = self._manager()
+        config = manager.load_config("u1")
+        manager.save_config(config, "u1")
+
+        self.assertEqual(set(self._sections()), set(config))
+        self.assertEqual(self._prefs(), (None, 1))
+        self.assertEqual(self._manager().load_config("u1")["active_mcp_server_id"], "srv-1")
+
+    def test_save_without_load_migrates_too(self):
+        config = dict(self.legacy, active_mcp_server_id=None)
+        self._manager().save_config(config, "u1")
+        self.assertIsNone(self._sections()["active_mcp_server_id"])
+        self.assertIsNone(self._prefs()[0])
+
+
+# ---------------------------------------------------------------------------
+# config_version invalidation
+# ---------------------------------------------------------------------------
+
+class TestVersionInvalidation(_ConfigTestCase):
+
+    def test_cached_config_is_reloaded_after_another_process_writes(self):
+        worker_a, worker_b = self._manager(), self._manager()
+        worker_a.load_config("u1")
+        config_b = worker_b.load_config("u1")
+        config_b["active_mcp_server_id"] = "srv-1"
+        worker_b.save_config(config_b, "u1")
+
+        # Within the check interval the cached copy is served
+        self.assertIsNone(worker_a.load_config("u1")["active_mcp_server_id"])
+        with patch.object(APP_CONFIG, "CONFIG_CACHE_VERSION_CHECK_SECONDS", 0):
+            self.assertEqual(worker_a.load_config("u1")["active_mcp_server_id"], "srv-1")
+
+    def test_interleaved_save_forces_reload(self):
+        worker_a, worker_b = self._manager(), self._manager()
+        config_a = worker_a.load_config("u1")
+        config_b = worker_b.load_config("u1")
+
+        config_b["active_mcp_server_id"] = "srv-1"
+        worker_b.save_config(config_b, "u1")
+        config_a["profiles"] = config_a["profiles"][:1]
+        worker_a.save_config(config_a, "u1")
+
+        # worker_a wrote only profiles; the next access reloads and sees worker_b's edit
+        merged = worker_a.load_config("u1")
+        self.assertEqual(merged["active_mcp_server_id"], "srv-1")
+        self.assertEqual([p["id"] for p in merged["profiles"]], ["p-a"])
+
+
+# ---------------------------------------------------------------------------
+# LRU bound
+# ---------------------------------------------------------------------------
+
+class TestCacheBound(_ConfigTestCase):
+
+    def test_least_recently_used_user_is_evicted(self):
+        manager = self._manager()
+        with patch.object(APP_CONFIG, "CONFIG_CACHE_MAX_USERS", 2):
+            for user in ("u1", "u2"):
+                manager.load_config(user)
+            manager.load_config("u1")  # u2 becomes least recently used
+            manager.load_config("u3")
+
+        self.assertEqual(list(manager._user_configs), ["u1", "u3"])
+
+    def test_evicted_user_reloads_from_database(self):
+        manager = self._manager()
+        with patch.object(APP_CONFIG, "CONFIG_CACHE_MAX_USERS", 1):
+            config = manager.load_config("u1")
+            config["active_mcp_server_id"] = "srv-1"
+            manager.save_config(config, "u1")
+            manager.load_config("u2")
+            self.assertNotIn("u1", manager._user_configs)
+            self.assertEqual(manager.load_config("u1")["active_mcp_server_id"], "srv-1")
+
+
+# ---------------------------------------------------------------------------
+# Section indexes
+# ---------------------------------------------------------------------------
+
+class TestSectionIndex(_ConfigTestCase):
+
+    def test_lookup_uses_current_list_contents(self):
+        manager = self._manager()
+        profiles = manager.get_profiles("u1")
+        self.assertEqual(manager.get_profile("p-a", "u1")["tag"], "A")
+
+        profiles.append({"id": "p-c", "tag": "C", "profile_type": "llm_only"})
+        self.assertEqual(manager.get_profile("p-c", "u1")["tag"], "C")
+
+    def test_element_replaced_in_place_is_found(self):
+        manager = self._manager()
+        profiles = manager.get_profiles("u1")
+        manager.get_profile("p-a", "u1")  # Build the index
+
+        profiles[0] = {"id": "p-a", "tag": "A2", "profile_type": "tool_enabled", "mcpServerId": "srv-1"}
+        self.assertEqual(manager.get_profile("p-a", "u1")["tag"], "A2")
+
+    def test_removed_element_is_not_found_after_same_length_append(self):
+        manager = self._manager()
+        profiles = manager.get_profiles("u1")
+        manager.get_profile("p-a", "u1")
+
+        profiles.pop(0)
+        profiles.append({"id": "p-c", "tag": "C", "profile_type": "llm_only"})
+        self.assertIsNone(manager.get_profile("p-a", "u1"))
+        self.assertEqual(manager.get_profile("p-c", "u1")["tag"], "C")
+
+    def test_update_profile_edits_the_cached_element(self):
+        manager = self._manager()
+        manager.get_profiles("u1")
+        self.assertTrue(manager.update_profile("p-b", {"tag": "B2"}, "u1"))
+        self.assertEqual(manager.get_profile("p-b", "u1")["tag"], "B2")
+        self.assertEqual(self._manager().get_profile("p-b", "u1")["tag"], "B2")
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
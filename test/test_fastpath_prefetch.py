@@ -0,0 +1,198 @@
+"""
+Unit tests for FASTPATH tool-call prefetching (agent/phase_executor.py).
+
+``mcp_adapter.invoke_mcp_tool`` is replaced by a fake whose calls finish in
+reverse order, so no MCP server is required.
+
+Run with:
+  PYTHONPATH=src python test/test_fastpath_prefetch.py -v
+"""
+
+import asyncio
+import gc
+import os
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.agent import phase_executor
+from trusted_data_agent.agent.phase_executor import _ToolCallPrefetcher
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _executor(user_uuid: str = "u1"):
+    return SimpleNamespace(
+        user_uuid=user_uuid,
+        session_id="s1",
+        active_profile_id="p1",
+        original_user_input="q",
+        workflow_goal_prompt="goal",
+        workflow_state={},
+        dependencies={"STATE": {}},
+    )
+
+
+class _FakeTool:
+    """invoke_mcp_tool stand-in: item ``i`` of ``n`` takes (n - i) ticks, so later items finish first."""
+
+    def __init__(self, count: int, tick: float = 0.01):
+        self.count = count
+        self.tick = tick
+        self.running = 0
+        self.max_running = 0
+        self.finished = []
+        self.cancelled = []
+
+    async def __call__(self, state, command, **kwargs):
+        index = command["arguments"]["i"]
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep((self.count - index) * self.tick)
+            self.finished.append(index)
+            return {"status": "success", "results": [{"i": index}]}, 0, 0
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        finally:
+            self.running -= 1
+
+
+def _commands(count: int) -> list:
+    return [{"tool_name": "base_readQuery", "arguments": {"i": i}} for i in range(count)]
+
+
+# ---------------------------------------------------------------------------
+# Ordering, cancellation, semaphore map
+# ---------------------------------------------------------------------------
+
+class TestToolCallPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self._patches = [
+            patch.object(phase_executor, "get_user_mcp_server_id", return_value="srv"),
+            patch.object(phase_executor.APP_CONFIG, "FASTPATH_MAX_CONCURRENCY_PER_SERVER", 8),
+            patch.object(phase_executor.APP_CONFIG, "MCP_SESSION_POOL_ENABLED", False),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    def test_results_consumed_in_input_order_when_calls_finish_out_of_order(self):
+        async def scenario():
+            tool = _FakeTool(6)
+            with patch.object(phase_executor.mcp_adapter, "invoke_mcp_tool", tool):
+                prefetcher = _ToolCallPrefetcher(_executor(), _commands(6), window=6)
+                consumed = []
+                for i in range(6):
+                    result, _, _ = await prefetcher.take(i)
+                    consumed.append(result["results"][0]["i"])
+                await prefetcher.cancel()
+            return tool, consumed
+
+        tool, consumed = _run(scenario())
+        self.assertEqual(consumed, list(range(6)))
+        self.assertEqual(tool.finished, list(reversed(range(6))))
+        self.assertGreater(tool.max_running, 1)
+
+    def test_window_limits_calls_in_flight(self):
+        async def scenario():
+            tool = _FakeTool(8)
+            with patch.object(phase_executor.mcp_adapter, "invoke_mcp_tool", tool):
+                prefetcher = _ToolCallPrefetcher(_executor(), _commands(8), window=3)
+                for i in range(8):
+                    await prefetcher.take(i)
+            return tool
+
+        self.assertLessEqual(_run(scenario()).max_running, 3)
+
+    def test_unprefetchable_items_are_skipped(self):
+        async def scenario():
+            tool = _FakeTool(3)
+            commands = _commands(3)
+            commands[1] = None  # e.g. a client-side TDA_* tool
+            with patch.object(phase_executor.mcp_adapter, "invoke_mcp_tool", tool):
+                prefetcher = _ToolCallPrefetcher(_executor(), commands, window=3)
+                taken = [prefetcher.take(i) for i in range(3)]
+                results = [await t if t is not None else None for t in taken]
+            return results
+
+        results = _run(scenario())
+        self.assertIsNone(results[1])
+        self.assertEqual([r[0]["results"][0]["i"] for r in (results[0], results[2])], [0, 2])
+
+    def test_cancel_waits_for_abandoned_calls(self):
+        async def scenario():
+            tool = _FakeTool(5, tick=1.0)
+            with patch.object(phase_executor.mcp_adapter, "invoke_mcp_tool", tool):
+                prefetcher = _ToolCallPrefetcher(_executor(), _commands(5), window=5)
+                first = prefetcher.take(0)
+                await asyncio.sleep(0)  # Let the calls start
+                first.cancel()
+                await asyncio.gather(first, return_exceptions=True)
+                await prefetcher.cancel()
+                pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            return tool, pending
+
+        tool, pending = _run(scenario())
+        self.assertEqual(pending, [])
+        self.assertEqual(sorted(tool.cancelled), [0, 1, 2, 3, 4])
+        self.assertEqual(tool.running, 0)
+
+    def test_semaphore_shared_per_server_and_released_when_unused(self):
+        async def scenario():
+            a = _ToolCallPrefetcher(_executor("u1"), _commands(2), window=2)
+            b = _ToolCallPrefetcher(_executor("u1"), _commands(2), window=2)
+            c = _ToolCallPrefetcher(_executor("u2"), _commands(2), window=2)
+            shared = a._semaphore is b._semaphore and a._semaphore is not c._semaphore
+            del a, b, c
+            gc.collect()
+            return shared, len(phase_executor._SERVER_CALL_SEMAPHORES)
+
+        shared, remaining = _run(scenario())
+        self.assertTrue(shared)
+        self.assertEqual(remaining, 0)
+
+    @unittest.skipIf("TDA_FASTPATH_LOOP_CONCURRENCY" in os.environ, "overridden by the environment")
+    def test_prefetch_is_off_by_default(self):
+        window = phase_executor.APP_CONFIG.FASTPATH_LOOP_CONCURRENCY
+        self.assertEqual(window, 1)
+        self.assertIsNone(_ToolCallPrefetcher(_executor(), _commands(3), window=window).take(0))
+
+    def test_session_pool_caps_calls_instead_of_semaphore(self):
+        async def scenario():
+            tool = _FakeTool(4)
+            with patch.object(phase_executor.APP_CONFIG, "MCP_SESSION_POOL_ENABLED", True), \
+                    patch.object(phase_executor.mcp_adapter, "invoke_mcp_tool", tool):
+                prefetcher = _ToolCallPrefetcher(_executor(), _commands(4), window=4)
+                results = [await prefetcher.take(i) for i in range(4)]
+            return prefetcher, results
+
+        prefetcher, results = _run(scenario())
+        self.assertIsNone(prefetcher._semaphore)
+        self.assertEqual([r[0]["results"][0]["i"] for r in results], [0, 1, 2, 3])
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
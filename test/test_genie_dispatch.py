@@ -0,0 +1,150 @@
+"""
+Unit tests for Genie in-process child dispatch (agent/genie_coordinator.py).
+
+The REST routes module is replaced by a fake exposing ``start_query_task`` and
+``validate_query_session``, so no server, LLM or MCP connection is required.
+
+Run with:
+  PYTHONPATH=src python test/test_genie_dispatch.py -v
+"""
+
+import asyncio
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.agent.genie_coordinator import SlaveSessionTool, _use_in_process_dispatch
+from trusted_data_agent.core.config import APP_CONFIG, APP_STATE
+from trusted_data_agent.core.task_registry import TaskRegistry
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _tool() -> SlaveSessionTool:
+    return SlaveSessionTool(
+        name="invoke_CHAT",
+        description="chat",
+        profile_id="p1",
+        profile_tag="CHAT",
+        user_uuid="u1",
+        parent_session_id="parent",
+        auth_token="token",
+        query_timeout=5.0,
+    )
+
+
+def _fake_rest_routes(owns_session: bool):
+    module = types.ModuleType("trusted_data_agent.api.rest_routes")
+    module.validate_query_session = AsyncMock(return_value=owns_session)
+    module.start_query_task = AsyncMock(return_value="task-1")
+    return module
+
+
+# ---------------------------------------------------------------------------
+# Dispatch decision
+# ---------------------------------------------------------------------------
+
+class TestUseInProcessDispatch(unittest.TestCase):
+
+    def test_requires_server_flag(self):
+        with patch.object(APP_CONFIG, "GENIE_IN_PROCESS_DISPATCH", True), \
+             patch.dict(APP_STATE, {"in_process_query_dispatch": False}):
+            self.assertFalse(_use_in_process_dispatch("http://localhost:5050"))
+        with patch.object(APP_CONFIG, "GENIE_IN_PROCESS_DISPATCH", True), \
+             patch.dict(APP_STATE, {"in_process_query_dispatch": True}):
+            self.assertTrue(_use_in_process_dispatch("http://localhost:5050"))
+            self.assertTrue(_use_in_process_dispatch("http://127.0.0.1:5050"))
+
+    def test_remote_base_url_uses_http(self):
+        with patch.object(APP_CONFIG, "GENIE_IN_PROCESS_DISPATCH", True), \
+             patch.dict(APP_STATE, {"in_process_query_dispatch": True}):
+            self.assertFalse(_use_in_process_dispatch("https://uderia.example.com"))
+
+    def test_config_switch_disables(self):
+        with patch.object(APP_CONFIG, "GENIE_IN_PROCESS_DISPATCH", False), \
+             patch.dict(APP_STATE, {"in_process_query_dispatch": True}):
+            self.assertFalse(_use_in_process_dispatch("http://localhost:5050"))
+
+
+# ---------------------------------------------------------------------------
+# Session ownership
+# ---------------------------------------------------------------------------
+
+class TestInProcessOwnership(unittest.TestCase):
+
+    def test_foreign_session_is_rejected_before_starting_a_task(self):
+        fake = _fake_rest_routes(owns_session=False)
+        with patch.dict(sys.modules, {"trusted_data_agent.api.rest_routes": fake}):
+            with self.assertRaises(Exception) as ctx:
+                _run(_tool()._run_in_process("other-users-session", "hi"))
+        self.assertIn("not found", str(ctx.exception))
+        fake.validate_query_session.assert_awaited_once_with("u1", "other-users-session")
+        fake.start_query_task.assert_not_awaited()
+
+    def test_owned_session_starts_task(self):
+        fake = _fake_rest_routes(owns_session=True)
+        registry = TaskRegistry()
+        registry.create("task-1", {"status": "completed", "task_id": "task-1"})
+        with patch.dict(sys.modules, {"trusted_data_agent.api.rest_routes": fake}), \
+             patch.dict(APP_STATE, {"active_tasks": {}, "background_tasks": registry}):
+            state, _ = _run(_tool()._run_in_process("s1", "hi"))
+        fake.start_query_task.assert_awaited_once()
+        self.assertEqual(state["task_id"], "task-1")
+
+
+# ---------------------------------------------------------------------------
+# Waiting for the child task
+# ---------------------------------------------------------------------------
+
+class TestInProcessWait(unittest.TestCase):
+
+    def _wait(self, registry, tool=None):
+        fake = _fake_rest_routes(owns_session=True)
+        with patch.dict(sys.modules, {"trusted_data_agent.api.rest_routes": fake}), \
+             patch.dict(APP_STATE, {"active_tasks": {}, "background_tasks": registry}):
+            return _run((tool or _tool())._run_in_process("s1", "hi"))[0]
+
+    def test_waits_for_final_status_without_asyncio_task(self):
+        registry = TaskRegistry()
+        registry.create("task-1", {"status": "pending", "task_id": "task-1"})
+
+        async def finish_later():
+            await asyncio.sleep(0.01)
+            registry.update("task-1", status="processing")
+            await asyncio.sleep(0.01)
+            registry.update("task-1", status="completed", result="done")
+
+        loop = asyncio.get_event_loop()
+        finisher = loop.create_task(finish_later())
+        state = self._wait(registry)
+        _run(finisher)
+        self.assertEqual(state["status"], "completed")
+        self.assertEqual(state["result"], "done")
+
+    def test_times_out_if_task_never_finishes(self):
+        registry = TaskRegistry()
+        registry.create("task-1", {"status": "processing", "task_id": "task-1"})
+        tool = _tool()
+        tool.query_timeout = 0.05
+        self.assertIsNone(self._wait(registry, tool))
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
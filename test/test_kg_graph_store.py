@@ -0,0 +1,517 @@
+"""
+Unit tests for the shared NetworkX graph of the knowledge graph component
+(components/builtin/knowledge_graph/graph_store.py).
+
+Writes through GraphStore are applied to the loaded graph incrementally
+instead of reloading it.  After every write the incrementally maintained
+graph must equal a graph freshly loaded from the SQLite rows: same nodes,
+same edges, same attributes.
+
+Each test uses a temporary SQLite database with the post-migration
+(kg_id-scoped) knowledge graph schema, so no auth database is required.
+
+Run with:
+  PYTHONPATH=src python test/test_kg_graph_store.py -v
+"""
+
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+# Repository root (for `components.builtin...`) and src/ (for trusted_data_agent)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.builtin.knowledge_graph import graph_store
+from components.builtin.knowledge_graph.graph_store import GraphStore, HAS_NETWORKX
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+KG_ID = "test_kg"
+
+# kg_entities / kg_relationships after the multi-KG migration (auth/database.py)
+_SCHEMA_SQL = """
+CREATE TABLE kg_entities (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    kg_id         TEXT NOT NULL DEFAULT '',
+    profile_id    TEXT NOT NULL,
+    user_uuid     TEXT NOT NULL,
+    name          TEXT NOT NULL,
+    entity_type   TEXT NOT NULL,
+    properties_json TEXT DEFAULT '{}',
+    source        TEXT NOT NULL DEFAULT 'manual',
+    source_detail TEXT,
+    created_at    TEXT,
+    updated_at    TEXT,
+    UNIQUE(kg_id, name, entity_type)
+);
+CREATE TABLE kg_relationships (
+    id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+    kg_id                TEXT NOT NULL DEFAULT '',
+    profile_id           TEXT NOT NULL,
+    user_uuid            TEXT NOT NULL,
+    source_entity_id     INTEGER NOT NULL,
+    target_entity_id     INTEGER NOT NULL,
+    relationship_type    TEXT NOT NULL,
+    cardinality          TEXT,
+    metadata_json        TEXT DEFAULT '{}',
+    source               TEXT NOT NULL DEFAULT 'manual',
+    created_at           TEXT,
+    FOREIGN KEY (source_entity_id) REFERENCES kg_entities(id) ON DELETE CASCADE,
+    FOREIGN KEY (target_entity_id) REFERENCES kg_entities(id) ON DELETE CASCADE,
+    UNIQUE(kg_id, source_entity_id, target_entity_id, relationship_type)
+);
+CREATE INDEX idx_kg_entities_kg_id ON kg_entities(kg_id);
+"""
+
+
+def _graph_state(G) -> tuple:
+    """Comparable form of a DiGraph: sorted nodes and edges with their attributes."""
+    nodes = sorted((n, sorted(d.items())) for n, d in G.nodes(data=True))
+    edges = sorted((s, t, sorted(d.items(), key=lambda kv: kv[0])) for s, t, d in G.edges(data=True))
+    return nodes, edges
+
+
+class _GraphStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        if not HAS_NETWORKX:
+            self.skipTest("NetworkX not installed")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = str(Path(tmp.name) / "kg.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(_SCHEMA_SQL)
+        conn.close()
+
+        p = patch.object(graph_store, "_snapshots_enabled", lambda: False)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(GraphStore.invalidate_shared_graph, KG_ID)
+        self.addCleanup(graph_store._FTS_READY.pop, self.db_path, None)
+        self.addCleanup(graph_store._VERSIONS_READY.pop, self.db_path, None)
+
+        self.store = self._store()
+
+    def _store(self) -> GraphStore:
+        return GraphStore("profile", "user", kg_id=KG_ID, db_path=self.db_path)
+
+    def _fresh_graph(self):
+        conn = self.store._get_conn()
+        try:
+            return self.store._load_graph_from_rows(conn, KG_ID)
+        finally:
+            conn.close()
+
+    def assertMatchesFreshLoad(self):
+        self.assertEqual(_graph_state(self.store._get_graph()), _graph_state(self._fresh_graph()))
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates vs. a fresh reload
+# ---------------------------------------------------------------------------
+
+class TestIncrementalMatchesReload(_GraphStoreTestCase):
+
+    def setUp(self):
+        super().setUp()
+        s = self.store
+        self.db = s.add_entity("sales", "database")
+        self.orders = s.add_entity("sales.orders", "table", {"description": "Orders"})
+        self.customers = s.add_entity("sales.customers", "table")
+        self.order_cust = s.add_entity("sales.orders.customer_id", "column", {"data_type": "INTEGER"})
+        s.add_relationship(self.db, self.orders, "contains")
+        s.add_relationship(self.db, self.customers, "contains")
+        s.add_relationship(self.orders, self.order_cust, "contains", cardinality="1:N")
+        # Load the shared graph; every later write is applied incrementally
+        self.assertIsNotNone(s._get_graph())
+        self.assertEqual(s.graph_version, 0)
+
+    def test_add_entity(self):
+        self.store.add_entity("revenue", "metric", {"formula": "sum(amount)"}, source="llm_inferred")
+        self.assertMatchesFreshLoad()
+
+    def test_entity_upsert_replaces_attributes(self):
+        self.store.add_entity("sales.orders", "table", {"description": "All orders"}, source="mcp_discovery")
+        self.assertMatchesFreshLoad()
+        self.assertEqual(self.store._get_graph().nodes[self.orders]["source"], "mcp_discovery")
+
+    def test_update_entity_merges_properties(self):
+        self.store.update_entity(self.orders, {"row_count": 42})
+        self.assertMatchesFreshLoad()
+        self.assertEqual(self.store._get_graph().nodes[self.orders]["properties"],
+                         {"description": "Orders", "row_count": 42})
+
+    def test_add_relationship(self):
+        self.store.add_relationship(self.orders, self.customers, "foreign_key", "N:1", {"via": "customer_id"})
+        self.assertMatchesFreshLoad()
+
+    def test_relationship_upsert_replaces_attributes(self):
+        self.store.add_relationship(self.orders, self.order_cust, "contains", cardinality="1:1",
+                                    metadata={"confidence": 0.9})
+        self.assertMatchesFreshLoad()
+
+    def test_second_relationship_type_on_a_pair(self):
+        # One DiGraph edge per pair: the newest relationship row is the visible edge
+        self.store.add_relationship(self.db, self.orders, "depends_on")
+        self.assertMatchesFreshLoad()
+        self.assertEqual(self.store._get_graph().edges[self.db, self.orders]["relationship_type"], "depends_on")
+
+    def test_upserting_the_older_type_keeps_the_newer_edge(self):
+        self.store.add_relationship(self.db, self.orders, "depends_on")
+        self.store.add_relationship(self.db, self.orders, "contains", metadata={"note": "refreshed"})
+        self.assertMatchesFreshLoad()
+
+    def test_delete_relationship(self):
+        rel_id = self.store.add_relationship(self.orders, self.customers, "foreign_key")
+        self.store.delete_relationship(rel_id)
+        self.assertMatchesFreshLoad()
+        self.assertFalse(self.store._get_graph().has_edge(self.orders, self.customers))
+
+    def test_deleting_the_visible_edge_restores_the_other_type(self):
+        rel_id = self.store.add_relationship(self.db, self.orders, "depends_on")
+        self.store.delete_relationship(rel_id)
+        self.assertMatchesFreshLoad()
+        self.assertEqual(self.store._get_graph().edges[self.db, self.orders]["relationship_type"], "contains")
+
+    def test_deleting_a_hidden_relationship_keeps_the_visible_edge(self):
+        hidden = self.store._get_graph().edges[self.db, self.orders]["rel_id"]
+        self.store.add_relationship(self.db, self.orders, "depends_on")
+        self.store.delete_relationship(hidden)
+        self.assertMatchesFreshLoad()
+
+    def test_delete_entity_cascades_to_relationships(self):
+        self.store.add_relationship(self.orders, self.customers, "foreign_key")
+        self.store.delete_entity(self.orders)
+        self.assertMatchesFreshLoad()
+        self.assertNotIn(self.orders, self.store._get_graph())
+        self.assertEqual(self.store._get_graph().number_of_edges(), 1)
+
+    def test_clear_graph(self):
+        self.store.clear_graph()
+        self.assertMatchesFreshLoad()
+        self.assertEqual(self.store._get_graph().number_of_nodes(), 0)
+
+    def test_mixed_sequence(self):
+        s = self.store
+        metric = s.add_entity("revenue", "metric")
+        fk = s.add_relationship(self.orders, self.customers, "foreign_key")
+        s.add_relationship(metric, self.orders, "measures")
+        s.add_relationship(self.orders, self.customers, "relates_to")
+        s.update_entity(metric, {"unit": "USD"})
+        s.delete_relationship(fk)
+        s.delete_entity(self.customers)
+        s.add_entity("sales.customers", "table", {"recreated": True})
+        s.add_entity("revenue", "metric", {"unit": "EUR"})
+        self.assertMatchesFreshLoad()
+
+    def test_failed_write_leaves_graph_unchanged(self):
+        before = _graph_state(self.store._get_graph())
+        with self.assertRaises(ValueError):
+            self.store.add_entity("x", "not_a_type")
+        self.assertFalse(self.store.delete_entity(999_999))
+        self.assertFalse(self.store.delete_relationship(999_999))
+        self.assertEqual(_graph_state(self.store._get_graph()), before)
+        self.assertEqual(self.store.graph_version, 0)
+
+
+# ---------------------------------------------------------------------------
+# Sharing and versioning
+# ---------------------------------------------------------------------------
+
+class TestSharedGraph(_GraphStoreTestCase):
+
+    def test_instances_share_one_graph(self):
+        self.store.add_entity("sales", "database")
+        other = self._store()
+        self.assertIs(other._get_graph(), self.store._get_graph())
+
+        other.add_entity("sales.orders", "table")
+        self.assertEqual(self.store._get_graph().number_of_nodes(), 2)
+        self.assertMatchesFreshLoad()
+
+    def test_every_write_bumps_the_version(self):
+        db = self.store.add_entity("sales", "database")
+        self.assertIsNone(self.store.graph_version)  # not loaded yet
+        self.store._get_graph()
+
+        table = self.store.add_entity("sales.orders", "table")
+        rel_id = self.store.add_relationship(db, table, "contains")
+        self.store.update_entity(table, {"a": 1})
+        self.store.delete_relationship(rel_id)
+        self.store.delete_entity(table)
+        self.assertEqual(self.store.graph_version, 5)
+
+    def test_derived_adjacency_follows_writes(self):
+        db = self.store.add_entity("sales", "database")
+        table = self.store.add_entity("sales.orders", "table")
+        shared = self.store._get_shared_graph()
+        self.assertEqual(shared.undirected_adjacency()[db], set())
+
+        self.store.add_relationship(db, table, "contains")
+        self.assertEqual(shared.undirected_adjacency()[db], {table})
+        self.store.delete_entity(table)
+        self.assertNotIn(table, shared.undirected_adjacency())
+
+    def test_invalidate_reloads_from_rows(self):
+        self.store.add_entity("sales", "database")
+        graph = self.store._get_graph()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, profile_id, user_uuid, name, entity_type) "
+            "VALUES (?, 'profile', 'user', 'outside', 'domain')",
+            (KG_ID,),
+        )
+        conn.commit()
+        conn.close()
+
+        GraphStore.invalidate_shared_graph(KG_ID, self.db_path)
+        self.assertIsNot(self.store._get_graph(), graph)
+        self.assertEqual(self.store._get_graph().number_of_nodes(), 2)
+
+    def _write_from_outside(self, name):
+        # Another worker process writes through its own connection
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT INTO kg_entities (kg_id, profile_id, user_uuid, name, entity_type) "
+            "VALUES (?, 'profile', 'user', ?, 'domain')",
+            (KG_ID, name),
+        )
+        conn.commit()
+        conn.close()
+
+    def test_outside_write_reloads_graph(self):
+        self.store.add_entity("sales", "database")
+        graph = self.store._get_graph()
+        self.assertIs(self.store._get_graph(), graph)
+
+        self._write_from_outside("outside")
+        self.assertIsNot(self.store._get_graph(), graph)
+        self.assertEqual(self.store._get_graph().number_of_nodes(), 2)
+
+    def test_own_write_after_outside_write_reloads_instead_of_patching(self):
+        self.store.add_entity("sales", "database")
+        shared = self.store._get_shared_graph()
+
+        self._write_from_outside("outside")
+        self.store.add_entity("sales.orders", "table")
+        self.assertIsNot(self.store._get_shared_graph(), shared)
+        self.assertMatchesFreshLoad()
+
+
+# ---------------------------------------------------------------------------
+# Entity search: FTS5 trigram index vs. the LIKE scan it replaced
+# ---------------------------------------------------------------------------
+
+def _like_search(db_path: str, query_text: str, entity_type=None) -> list:
+    """The LIKE search that search_entities() used before the FTS index."""
+    conn = sqlite3.connect(db_path)
+    try:
+        pattern = f"%{query_text}%"
+        sql = ("SELECT id FROM kg_entities WHERE kg_id=?"
+               + (" AND entity_type=?" if entity_type else "")
+               + " AND (name LIKE ? COLLATE NOCASE OR properties_json LIKE ? COLLATE NOCASE) ORDER BY name")
+        params = [KG_ID] + ([entity_type] if entity_type else []) + [pattern, pattern]
+        return [row[0] for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+class TestSearchSemantics(_GraphStoreTestCase):
+
+    _ENTITIES = [
+        ("Orders", "table", {"description": "Customer orders"}),
+        ("order_items", "table", {"description": "Line items per order"}),
+        ("sales.orders.order_date", "column", {"data_type": "DATE"}),
+        ("CUSTOMERS", "table", {"description": "Master data", "owner": "CRM team"}),
+        ("customer_id", "column", {"data_type": "INTEGER", "note": "joins ORDERS"}),
+        ("Revenue", "metric", {"formula": "SUM(order_total)", "unit": "USD"}),
+        ("churn", "business_concept", {"description": "Customers lost in a period"}),
+        ("Order Management", "domain", {}),
+        ("fiscal_calendar", "taxonomy", {"levels": ["year", "quarter", "month"]}),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        for name, etype, props in self._ENTITIES:
+            self.store.add_entity(name, etype, props)
+        conn = self.store._get_conn()
+        try:
+            if not GraphStore._ensure_fts_index(conn, self.db_path):
+                self.skipTest("SQLite build lacks FTS5 trigram support")
+        finally:
+            conn.close()
+
+    def _search_ids(self, query_text, entity_type=None) -> list:
+        return [e["id"] for e in self.store.search_entities(query_text, limit=100, entity_type=entity_type)]
+
+    def assertSameMatches(self, query_text, entity_type=None):
+        expected = _like_search(self.db_path, query_text, entity_type)
+        self.assertEqual(sorted(self._search_ids(query_text, entity_type)), sorted(expected))
+        return expected
+
+    def test_fts_matches_like_result_set(self):
+        for query_text in ("order", "ORDER", "Order", "orders", "customer", "rev", "data",
+                           "year", "USD", "sum(", "der ma", "sales.orders", "nothing here"):
+            with self.subTest(query=query_text):
+                self.assertSameMatches(query_text)
+
+    def test_fts_matches_like_with_entity_type_filter(self):
+        for query_text, entity_type in (("order", "table"), ("order", "column"),
+                                        ("customer", "business_concept"), ("order", "metric")):
+            with self.subTest(query=query_text, entity_type=entity_type):
+                self.assertSameMatches(query_text, entity_type)
+
+    def test_properties_are_searched(self):
+        matches = self.assertSameMatches("CRM team")
+        self.assertEqual(len(matches), 1)
+
+    def test_name_matches_rank_first(self):
+        ids = self._search_ids("orders")
+        names = [self.store.get_entity(i)["name"] for i in ids]
+        # exact name, then prefix, then substring, then property-only matches
+        self.assertEqual(names[0], "Orders")
+        self.assertEqual(names[1], "sales.orders.order_date")
+        self.assertEqual(set(names[2:]), {"customer_id"})
+
+    def test_limit_keeps_the_best_ranked(self):
+        ranked = self._search_ids("order")
+        self.assertEqual([e["id"] for e in self.store.search_entities("order", limit=3)], ranked[:3])
+
+    def test_short_queries_use_like(self):
+        for query_text in ("or", "id", "X"):
+            with self.subTest(query=query_text):
+                self.assertEqual(self._search_ids(query_text), _like_search(self.db_path, query_text))
+
+    def test_quotes_in_query_are_literal(self):
+        self.assertEqual(self._search_ids('"order'), [])
+        self.assertSameMatches('"unit"')
+
+    def test_underscore_is_literal(self):
+        # LIKE treated "_" as a single-character wildcard; the FTS phrase does not
+        self.store.add_entity("orderXdate", "column")
+        self.assertIn(self.store.get_entity_by_name("orderXdate")["id"], _like_search(self.db_path, "order_date"))
+        names = {e["name"] for e in self.store.search_entities("order_date", limit=100)}
+        self.assertEqual(names, {"sales.orders.order_date"})
+
+    def test_index_follows_writes(self):
+        churn = self.store.get_entity_by_name("churn")["id"]
+        self.store.update_entity(churn, {"synonyms": ["attrition"]})
+        self.assertEqual(self._search_ids("attrition"), [churn])
+
+        self.store.delete_entity(churn)
+        self.assertEqual(self._search_ids("attrition"), [])
+        self.assertSameMatches("customer")
+
+        self.store.add_entity("attrition_rate", "metric")
+        self.assertSameMatches("attrition")
+
+    def test_other_kg_is_not_returned(self):
+        other = GraphStore("profile", "user", kg_id="other_kg", db_path=self.db_path)
+        self.addCleanup(GraphStore.invalidate_shared_graph, "other_kg")
+        other.add_entity("orders_archive", "table")
+        self.assertSameMatches("orders")
+        self.assertEqual([e["name"] for e in other.search_entities("orders")], ["orders_archive"])
+
+
+# ---------------------------------------------------------------------------
+# Subgraph extraction vs. the benchmark's reference BFS
+# ---------------------------------------------------------------------------
+
+class TestSubgraphEquivalence(unittest.TestCase):
+    """The benchmark's correctness check (test/performance/kg_subgraph_benchmark.py) on a small graph."""
+
+    def setUp(self):
+        if not HAS_NETWORKX:
+            self.skipTest("NetworkX not installed")
+        sys.path.insert(0, str(Path(__file__).parent / "performance"))
+        self.addCleanup(sys.path.remove, str(Path(__file__).parent / "performance"))
+        import kg_subgraph_benchmark as benchmark
+        self.benchmark = benchmark
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_path = str(Path(tmp.name) / "kg.db")
+        info = benchmark.build_database(db_path, databases=3, tables_per_db=8, columns_per_table=5,
+                                        concepts=12, seed=7)
+        self.groups = info["groups"]
+
+        p = patch.object(graph_store, "_snapshots_enabled", lambda: False)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(GraphStore.invalidate_shared_graph, benchmark.KG_ID)
+        self.store = GraphStore(benchmark.PROFILE_ID, benchmark.USER_UUID, kg_id=benchmark.KG_ID, db_path=db_path)
+
+    def _seed_sets(self, count=15):
+        import random
+        rng = random.Random(11)
+        g = self.groups
+        return [rng.sample(g["table"], 2) + rng.sample(g["column"], 1) + rng.sample(g["semantic"], 1)
+                for _ in range(count)]
+
+    def assertMatchesReference(self, seeds, depth, max_nodes):
+        mismatch = self.benchmark.subgraph_mismatch(self.store, self.store._get_graph(), seeds, depth, max_nodes)
+        self.assertIsNone(mismatch, f"seeds={seeds} depth={depth} max_nodes={max_nodes}")
+
+    def test_matches_reference_bfs(self):
+        for seeds in self._seed_sets():
+            for depth, max_nodes in ((0, 50), (1, 50), (2, 200), (3, 1000), (2, 10)):
+                with self.subTest(seeds=seeds, depth=depth, max_nodes=max_nodes):
+                    self.assertMatchesReference(seeds, depth, max_nodes)
+
+    def test_memo_hit_matches_reference(self):
+        seeds = self._seed_sets(1)[0]
+        cold = self.store.extract_subgraph(seeds, depth=2, max_nodes=200)
+        self.assertMatchesReference(seeds, 2, 200)  # served from the memo
+        self.assertEqual(self.store.extract_subgraph(seeds, depth=2, max_nodes=200), cold)
+
+    def test_memo_is_isolated_from_caller_mutation(self):
+        for seeds in self._seed_sets(3):
+            with self.subTest(seeds=seeds):
+                self.assertFalse(self.benchmark.memo_leaks(self.store, seeds, 2, 200))
+
+    def test_matches_reference_after_writes(self):
+        seed_sets = self._seed_sets(5)
+        for seeds in seed_sets:
+            self.store.extract_subgraph(seeds, depth=2, max_nodes=200)  # fill the memo
+
+        tables = self.groups["table"]
+        self.store.add_relationship(tables[0], tables[-1], "depends_on")
+        concept = self.store.add_entity("new_concept", "business_concept")
+        self.store.add_relationship(concept, seed_sets[0][0], "relates_to")
+        self.store.delete_entity(seed_sets[1][2])
+
+        for seeds in seed_sets:
+            with self.subTest(seeds=seeds):
+                self.assertMatchesReference(seeds, 2, 200)
+
+    def test_unknown_seeds(self):
+        self.assertEqual(self.store.extract_subgraph([999_999], depth=2), {"entities": [], "relationships": []})
+
+    def test_output_is_sorted(self):
+        for seeds in self._seed_sets(3):
+            with self.subTest(seeds=seeds):
+                result = self.store.extract_subgraph(seeds, depth=2, max_nodes=200)
+                entity_ids = [e["id"] for e in result["entities"]]
+                rel_keys = [(r["source_id"], r["target_id"], r["relationship_type"])
+                            for r in result["relationships"]]
+                self.assertEqual(entity_ids, sorted(entity_ids))
+                self.assertEqual(rel_keys, sorted(rel_keys))
+                self.assertGreater(len(rel_keys), 1)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -30,6 +30,7 @@ import os
 import sys
 import tempfile
 import unittest
+from contextlib import ExitStack
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -77,6 +78,11 @@ def _make_collection(collection_id=1, source_root=None, sync_interval="daily"):
     }
 
 
+def _chunk_counts(embedded=0, reused=0, deleted=0):
+    """Return value of _sync_upsert_document."""
+    return {"chunks_embedded": embedded, "chunks_reused": reused, "chunks_deleted": deleted}
+
+
 def _make_doc(doc_id="doc-001", filename="guide.md", source_uri=None,
               content_hash=None, sync_enabled=1):
     return {
@@ -353,10 +359,12 @@ class TestSyncKnowledgeCollection(unittest.TestCase):
              patch("trusted_data_agent.core.knowledge_sync.fetch_source",
                    new=AsyncMock(return_value=new_content)), \
              patch("trusted_data_agent.core.knowledge_sync._sync_upsert_document",
-                   new=AsyncMock()) as mock_upsert:
+                   new=AsyncMock(return_value=_chunk_counts(2, 5, 1))) as mock_upsert:
             result = _run(sync_knowledge_collection(1, "user-1"))
         self.assertEqual(result["updated"], 1)
         self.assertEqual(result["unchanged"], 0)
+        self.assertEqual(
+            (result["chunks_embedded"], result["chunks_reused"], result["chunks_deleted"]), (2, 5, 1))
         mock_upsert.assert_called_once()
         call_kwargs = mock_upsert.call_args[1]
         self.assertEqual(call_kwargs["content_hash"], _sha256(new_content))
@@ -467,10 +475,11 @@ class TestSyncKnowledgeCollection(unittest.TestCase):
              patch("trusted_data_agent.core.knowledge_sync.fetch_source",
                    new=AsyncMock(side_effect=_fetch)), \
              patch("trusted_data_agent.core.knowledge_sync._sync_upsert_document",
-                   new=AsyncMock()):
+                   new=AsyncMock(return_value=_chunk_counts(embedded=3))):
             result = _run(sync_knowledge_collection(1, "user-1"))
 
         self.assertEqual(result["checked"], 4)
+        self.assertEqual(result["chunks_embedded"], 3)
         self.assertEqual(result["updated"], 1)
         self.assertEqual(result["unchanged"], 2)
         self.assertEqual(result["errors"], 1)
@@ -613,6 +622,184 @@ class TestReindexKnowledgeCollection(unittest.TestCase):
         self.assertEqual(result["errors"], 1)
 
 
+# ---------------------------------------------------------------------------
+# Shadow-swap reindex, rollback and the fetch pipeline
+# ---------------------------------------------------------------------------
+
+class TestShadowSwapReindex(unittest.TestCase):
+    """reindex_knowledge_collection(strategy="shadow_swap") end to end, with the RAG stack mocked."""
+
+    def setUp(self):
+        self.mock_db = MagicMock()
+        self.mock_db.get_collection_by_id.return_value = _make_collection()
+        self.mock_db.update_collection.return_value = True
+        self.backend = AsyncMock()
+        self.backend.backend_type = "chromadb"
+        self.backend.delete_collection.return_value = True
+        self.retriever = MagicMock()
+        self.retriever._get_knowledge_backend = AsyncMock(return_value=self.backend)
+        self.upsert_targets = []
+
+    async def _fake_upsert(self, **kwargs):
+        """_sync_upsert_document stand-in: defers the metadata row like the real one."""
+        doc = kwargs["existing_doc"]
+        if doc["filename"].startswith("bad"):
+            raise RuntimeError("Embedding failed")
+        self.upsert_targets.append(kwargs["collection"]["collection_name"])
+        kwargs["metadata_updates"].append({"document_id": doc["document_id"], "collection_id": 1})
+        return _chunk_counts(embedded=2)
+
+    def _patched(self, documents):
+        async def upsert(**kwargs):
+            return await self._fake_upsert(**kwargs)
+
+        self.mock_db.get_all_documents_in_collection.return_value = documents
+        stack = ExitStack()
+        stack.enter_context(patch(_PATCH_DB, return_value=self.mock_db))
+        stack.enter_context(patch("trusted_data_agent.agent.rag_retriever.get_rag_retriever",
+                                  return_value=self.retriever))
+        stack.enter_context(patch("trusted_data_agent.core.knowledge_sync.fetch_source",
+                                  new=AsyncMock(return_value=b"content")))
+        stack.enter_context(patch("trusted_data_agent.core.knowledge_sync._sync_upsert_document",
+                                  new=AsyncMock(side_effect=upsert)))
+        stack.enter_context(patch("trusted_data_agent.vectorstore.embedding_providers.get_embedding_provider",
+                                  return_value=None))
+        return stack
+
+    def _reindex(self, documents):
+        with self._patched(documents):
+            return _run(reindex_knowledge_collection(1, "user-1", strategy="shadow_swap"))
+
+    def _dropped(self):
+        return [c.args[0] for c in self.backend.delete_collection.call_args_list]
+
+    def test_successful_build_swaps_in_shadow(self):
+        docs = [_make_doc("d1", "a.md", source_uri="file://a.md"),
+                _make_doc("d2", "b.md", source_uri="file://b.md")]
+        result = self._reindex(docs)
+
+        self.assertTrue(result["swapped"])
+        self.assertEqual(result["reindexed"], 2)
+        self.assertEqual(result["chunks_embedded"], 4)
+        shadow = self.upsert_targets[0]
+        self.assertTrue(shadow.startswith("tda_rag_coll_1_"))
+        self.assertEqual(set(self.upsert_targets), {shadow})
+        self.mock_db.update_collection.assert_any_call(1, {"collection_name": shadow})
+        self.retriever.rebind_knowledge_collection.assert_called_once_with(1, "test_collection_1", shadow)
+        # Deferred rows are written only after the swap
+        self.assertEqual(
+            sorted(c.kwargs["document_id"] for c in self.mock_db.upsert_document_metadata.call_args_list),
+            ["d1", "d2"])
+        self.assertEqual(self._dropped(), ["test_collection_1"])
+        self.mock_db.update_collection.assert_called_with(1, {"embedding_model_locked": 1})
+
+    def test_documents_without_source_are_carried_over(self):
+        from trusted_data_agent.vectorstore.types import GetResult, VectorDocument
+        self.backend.get.return_value = GetResult(
+            documents=[VectorDocument(id="d1_chunk_0_x", content="text", metadata={"document_id": "d1"})],
+            total_count=1)
+        result = self._reindex([_make_doc("d1", "a.md", source_uri=None)])
+
+        self.assertTrue(result["swapped"])
+        self.assertEqual(result["carried_over"], 1)
+        shadow_name = self.backend.upsert.call_args.args[0]
+        self.assertTrue(shadow_name.startswith("tda_rag_coll_1_"))
+        self.assertEqual([d.id for d in self.backend.upsert.call_args.args[1]], ["d1_chunk_0_x"])
+
+    def test_failed_build_drops_shadow_and_keeps_live(self):
+        docs = [_make_doc("d1", "a.md", source_uri="file://a.md"),
+                _make_doc("d2", "bad.md", source_uri="file://bad.md")]
+        result = self._reindex(docs)
+
+        self.assertFalse(result["swapped"])
+        self.assertEqual(result["errors"], 1)
+        self.assertEqual(self._dropped(), [self.upsert_targets[0]])
+        self.mock_db.update_collection.assert_not_called()  # No swap, embedding model left unlocked
+        self.mock_db.upsert_document_metadata.assert_not_called()
+        self.retriever.rebind_knowledge_collection.assert_not_called()
+
+    def test_failed_carry_over_rolls_back(self):
+        self.backend.get.side_effect = RuntimeError("live collection unreadable")
+        result = self._reindex([_make_doc("d1", "a.md", source_uri=None)])
+
+        self.assertFalse(result["swapped"])
+        self.assertEqual(result["errors"], 1)
+        dropped = self._dropped()
+        self.assertEqual(len(dropped), 1)
+        self.assertNotEqual(dropped[0], "test_collection_1")
+        self.mock_db.upsert_document_metadata.assert_not_called()
+
+    def test_writes_wait_for_the_reindex(self):
+        from trusted_data_agent.core.knowledge_sync import collection_write_lock
+        events = []
+        release = asyncio.Event()
+        fake_upsert = self._fake_upsert
+
+        async def slow_upsert(**kwargs):
+            await release.wait()
+            return await fake_upsert(**kwargs)
+
+        self._fake_upsert = slow_upsert
+        self.mock_db.update_collection.side_effect = lambda cid, fields: events.append(fields) or True
+
+        async def writer():
+            async with collection_write_lock(1):
+                events.append("write")
+
+        async def scenario():
+            reindex = asyncio.ensure_future(
+                reindex_knowledge_collection(1, "user-1", strategy="shadow_swap"))
+            await asyncio.sleep(0.01)
+            write = asyncio.ensure_future(writer())
+            await asyncio.sleep(0.01)
+            waiting = list(events)
+            release.set()
+            await asyncio.gather(reindex, write)
+            return waiting
+
+        with self._patched([_make_doc("d1", "a.md", source_uri="file://a.md")]):
+            waiting = _run(scenario())
+
+        self.assertEqual(waiting, [])
+        # Swap, then embedding-model lock, then the queued write
+        self.assertTrue(events[0]["collection_name"].startswith("tda_rag_coll_1_"))
+        self.assertEqual(events[-1], "write")
+
+
+class TestFetchPipeline(unittest.TestCase):
+
+    def test_ingest_exception_is_isolated_and_counted(self):
+        from trusted_data_agent.core.knowledge_sync import _run_fetch_pipeline
+        docs = [_make_doc(f"d{i}", f"{i}.md", source_uri=f"file://{i}.md") for i in range(4)]
+        ingested = []
+
+        async def ingest(doc, content_bytes, fetch_err):
+            if doc["document_id"] == "d1":
+                raise RuntimeError("bookkeeping bug")
+            ingested.append(doc["document_id"])
+
+        with patch("trusted_data_agent.core.knowledge_sync.fetch_source", new=AsyncMock(return_value=b"c")):
+            failed = _run(_run_fetch_pipeline(docs, "user-1", None, ingest))
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(sorted(ingested), ["d0", "d2", "d3"])
+
+    def test_fetch_errors_are_passed_to_ingest(self):
+        from trusted_data_agent.core.knowledge_sync import _run_fetch_pipeline
+        docs = [_make_doc("d0", "a.md", source_uri="file://a.md")]
+        seen = []
+
+        async def ingest(doc, content_bytes, fetch_err):
+            seen.append((content_bytes, type(fetch_err)))
+
+        with patch("trusted_data_agent.core.knowledge_sync.fetch_source",
+                   new=AsyncMock(side_effect=OSError("gone"))):
+            failed = _run(_run_fetch_pipeline(docs, "user-1", None, ingest))
+
+        self.assertEqual(failed, 0)
+        self.assertEqual(seen, [(None, OSError)])
+
+
 # ---------------------------------------------------------------------------
 # Stale chunk cleanup (ingest_epoch-based)
 # ---------------------------------------------------------------------------
@@ -741,6 +928,148 @@ class TestStaleChunkCleanup(unittest.TestCase):
         self.assertGreater(call_kwargs["ingest_epoch"], doc["ingest_epoch"])
 
 
+# ---------------------------------------------------------------------------
+# Chunk-level delta (KnowledgeRepositoryConstructor._plan/_apply_chunk_delta)
+# ---------------------------------------------------------------------------
+
+class _FakeDeltaBackend:
+    """In-memory backend that records which chunks were embedded, re-tagged or deleted."""
+
+    backend_type = "chromadb"
+
+    def __init__(self, stored=None, capable=True):
+        self.stored = dict(stored or {})   # chunk ID -> metadata
+        self.capable = capable
+        self.embedded, self.retagged, self.deleted = [], [], []
+
+    def has_capability(self, capability):
+        return self.capable
+
+    async def get(self, collection_name, where=None, **kwargs):
+        from trusted_data_agent.vectorstore.types import GetResult, VectorDocument
+        docs = [
+            VectorDocument(id=chunk_id, content="", metadata={})
+            for chunk_id, metadata in self.stored.items()
+            if metadata.get("document_id") == where.value
+        ]
+        return GetResult(documents=docs, total_count=len(docs))
+
+    async def upsert(self, collection_name, documents, embedding_provider):
+        for doc in documents:
+            self.embedded.append(doc.id)
+            self.stored[doc.id] = doc.metadata
+
+    async def update_metadata(self, collection_name, ids, metadatas):
+        for chunk_id, metadata in zip(ids, metadatas):
+            self.retagged.append(chunk_id)
+            self.stored[chunk_id] = metadata
+
+    async def delete(self, collection_name, ids):
+        for chunk_id in ids:
+            self.deleted.append(chunk_id)
+            self.stored.pop(chunk_id, None)
+
+
+class TestChunkDelta(unittest.TestCase):
+
+    def _constructor(self, backend):
+        from trusted_data_agent.agent.repository_constructor import KnowledgeRepositoryConstructor
+        constructor = KnowledgeRepositoryConstructor.__new__(KnowledgeRepositoryConstructor)
+        constructor._backend = backend
+        return constructor
+
+    def _chunks(self, texts, doc_id="doc-001"):
+        from trusted_data_agent.agent.repository_constructor import DocumentChunk
+        return [DocumentChunk(text, {"document_id": doc_id}, chunk_index=i) for i, text in enumerate(texts)]
+
+    def _stored(self, chunks, doc_id="doc-001"):
+        return {c.chunk_id: {"document_id": doc_id, "ingest_epoch": 1} for c in chunks}
+
+    def _plan_and_apply(self, backend, chunks, doc_id="doc-001"):
+        constructor = self._constructor(backend)
+
+        async def scenario():
+            delta = await constructor._plan_chunk_delta("coll", doc_id, chunks)
+            if delta is None:
+                return None, None
+            counts = await constructor._apply_chunk_delta("coll", chunks, delta, 2, None)
+            return delta, counts
+
+        return _run(scenario())
+
+    def test_unchanged_chunks_are_reused(self):
+        old = self._chunks(["alpha", "beta", "gamma"])
+        backend = _FakeDeltaBackend(self._stored(old))
+        new = self._chunks(["alpha", "beta changed", "gamma"])
+
+        _, counts = self._plan_and_apply(backend, new)
+
+        self.assertEqual(counts, {"chunks_embedded": 1, "chunks_reused": 2, "chunks_deleted": 1})
+        self.assertEqual(backend.embedded, [new[1].chunk_id])
+        self.assertEqual(sorted(backend.retagged), sorted([old[0].chunk_id, old[2].chunk_id]))
+        self.assertEqual(backend.deleted, [old[1].chunk_id])
+        # Reused chunks carry the new epoch and their new position
+        self.assertEqual(backend.stored[old[2].chunk_id]["ingest_epoch"], 2)
+        self.assertEqual(backend.stored[old[2].chunk_id]["chunk_index"], 2)
+
+    def test_moved_chunks_keep_stored_ids(self):
+        old = self._chunks(["alpha", "beta"])
+        backend = _FakeDeltaBackend(self._stored(old))
+        new = self._chunks(["inserted", "alpha", "beta"])  # Every index shifts by one
+
+        delta, counts = self._plan_and_apply(backend, new)
+
+        self.assertEqual(delta["reused"], {1: old[0].chunk_id, 2: old[1].chunk_id})
+        self.assertEqual(counts, {"chunks_embedded": 1, "chunks_reused": 2, "chunks_deleted": 0})
+        self.assertEqual(backend.embedded, [new[0].chunk_id])
+        self.assertEqual(backend.stored[old[0].chunk_id]["chunk_index"], 1)
+
+    def test_duplicate_content_reuses_each_stored_chunk_once(self):
+        old = self._chunks(["same", "other"])
+        backend = _FakeDeltaBackend(self._stored(old))
+        new = self._chunks(["other", "same", "same"])
+
+        delta, counts = self._plan_and_apply(backend, new)
+
+        self.assertEqual(counts["chunks_reused"], 2)
+        self.assertEqual(counts["chunks_embedded"], 1)
+        self.assertEqual(len(set(delta["reused"].values())), 2)
+
+    def test_removed_chunks_are_deleted(self):
+        old = self._chunks(["alpha", "beta", "gamma"])
+        backend = _FakeDeltaBackend(self._stored(old))
+        new = self._chunks(["alpha"])
+
+        _, counts = self._plan_and_apply(backend, new)
+
+        self.assertEqual(counts, {"chunks_embedded": 0, "chunks_reused": 1, "chunks_deleted": 2})
+        self.assertEqual(sorted(backend.stored), [old[0].chunk_id])
+
+    def test_other_documents_are_untouched(self):
+        other = self._chunks(["alpha"], doc_id="doc-002")
+        backend = _FakeDeltaBackend(self._stored(other, doc_id="doc-002"))
+        new = self._chunks(["alpha"])
+
+        _, counts = self._plan_and_apply(backend, new)
+
+        self.assertEqual(counts, {"chunks_embedded": 1, "chunks_reused": 0, "chunks_deleted": 0})
+        self.assertIn(other[0].chunk_id, backend.stored)
+
+    def test_backend_without_delta_capability_returns_none(self):
+        old = self._chunks(["alpha"])
+        backend = _FakeDeltaBackend(self._stored(old), capable=False)
+
+        delta, _ = self._plan_and_apply(backend, self._chunks(["alpha"]))
+
+        self.assertIsNone(delta)
+        self.assertEqual((backend.embedded, backend.retagged, backend.deleted), ([], [], []))
+
+    def test_missing_document_id_returns_none(self):
+        backend = _FakeDeltaBackend()
+        delta, _ = self._plan_and_apply(backend, self._chunks(["alpha"]), doc_id=None)
+        self.assertIsNone(delta)
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
@@ -0,0 +1,286 @@
+"""
+Unit tests for the LLM response cache (llm/response_cache.py) and the
+``cache_reason`` path of ``call_llm_api`` in llm/handler.py.
+
+The SQLite tier writes to a temporary file; the handler tests use a fake
+Anthropic client and patch out system prompt assembly, so no provider,
+session or auth database is required.
+
+Run with:
+  PYTHONPATH=src python test/test_llm_response_cache.py -v
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.llm import response_cache
+from trusted_data_agent.llm.response_cache import LLMResponseCache
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _key(prompt: str = "name this session", **overrides) -> str:
+    args = dict(provider="Anthropic", model="claude", system_prompt="sys", prompt=prompt,
+                history=None, params={"thinking_budget": None})
+    args.update(overrides)
+    return LLMResponseCache.make_key(**args)
+
+
+def _price(provider, model, input_tokens, output_tokens):
+    # $1 per 1k input tokens, $2 per 1k output tokens
+    return input_tokens / 1000 + output_tokens * 2 / 1000
+
+
+class _CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        p = patch.object(LLMResponseCache, "_price", staticmethod(_price))
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _db_path(self) -> str:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        return str(Path(tmp.name) / "llm_cache.db")
+
+    def _close(self, cache: LLMResponseCache):
+        if cache._conn is not None:
+            cache._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Key
+# ---------------------------------------------------------------------------
+
+class TestMakeKey(unittest.TestCase):
+
+    def test_same_inputs_give_same_key(self):
+        self.assertEqual(_key(), _key())
+        self.assertEqual(_key(params={"b": 2, "a": 1}), _key(params={"a": 1, "b": 2}))
+
+    def test_every_input_changes_the_key(self):
+        base = _key()
+        for field, value in (
+            ("provider", "OpenAI"),
+            ("model", "other-model"),
+            ("system_prompt", "sys2"),
+            ("prompt", "another prompt"),
+            ("history", [{"role": "user", "content": "hi"}]),
+            ("params", {"thinking_budget": 1024}),
+        ):
+            with self.subTest(field=field):
+                self.assertNotEqual(_key(**{field: value}), base)
+
+    def test_empty_history_equals_no_history(self):
+        self.assertEqual(_key(history=[]), _key(history=None))
+
+
+# ---------------------------------------------------------------------------
+# Memory tier
+# ---------------------------------------------------------------------------
+
+class TestMemoryTier(_CacheTestCase):
+
+    def test_miss_then_hit(self):
+        cache = LLMResponseCache(enabled=True)
+        key = _key()
+        self.assertIsNone(_run(cache.get(key, "session_name")))
+        _run(cache.put(key, "session_name", "Sales Report", 100, 5))
+        self.assertEqual(_run(cache.get(key, "session_name")), "Sales Report")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LLMResponseCache(enabled=True, max_entries=2)
+        k1, k2, k3 = _key("one"), _key("two"), _key("three")
+        _run(cache.put(k1, "session_name", "1", 1, 1))
+        _run(cache.put(k2, "session_name", "2", 1, 1))
+        _run(cache.get(k1, "session_name"))  # k2 becomes least recently used
+        _run(cache.put(k3, "session_name", "3", 1, 1))
+
+        self.assertEqual(list(cache._memory), [k1, k3])
+        self.assertIsNone(_run(cache.get(k2, "session_name")))
+
+    def test_expired_entry_is_a_miss(self):
+        cache = LLMResponseCache(enabled=True, ttl_seconds=60)
+        key = _key()
+        with patch.object(response_cache.time, "time", return_value=1000.0):
+            _run(cache.put(key, "session_name", "Sales Report", 100, 5))
+        with patch.object(response_cache.time, "time", return_value=1059.0):
+            self.assertEqual(_run(cache.get(key, "session_name")), "Sales Report")
+        with patch.object(response_cache.time, "time", return_value=1061.0):
+            self.assertIsNone(_run(cache.get(key, "session_name")))
+        self.assertNotIn(key, cache._memory)
+
+    def test_empty_response_is_not_stored(self):
+        cache = LLMResponseCache(enabled=True)
+        _run(cache.put(_key(), "session_name", "", 100, 0))
+        self.assertEqual(len(cache._memory), 0)
+
+
+# ---------------------------------------------------------------------------
+# SQLite tier
+# ---------------------------------------------------------------------------
+
+class TestPersistentTier(_CacheTestCase):
+
+    def test_entry_survives_a_new_instance(self):
+        db_path = self._db_path()
+        first = LLMResponseCache(enabled=True, db_path=db_path)
+        _run(first.put(_key(), "session_name", "Sales Report", 100, 5))
+        self._close(first)
+
+        second = LLMResponseCache(enabled=True, db_path=db_path)
+        self.addCleanup(self._close, second)
+        self.assertEqual(_run(second.get(_key(), "session_name")), "Sales Report")
+        # Promoted to the memory tier, with its token counts
+        self.assertEqual(second._memory[_key()].input_tokens, 100)
+        self.assertEqual(second.get_stats()["by_reason"]["session_name"]["saved_output_tokens"], 5)
+
+    def test_expired_entry_is_not_loaded(self):
+        db_path = self._db_path()
+        first = LLMResponseCache(enabled=True, ttl_seconds=60, db_path=db_path)
+        with patch.object(response_cache.time, "time", return_value=1000.0):
+            _run(first.put(_key(), "session_name", "Sales Report", 100, 5))
+        self._close(first)
+
+        second = LLMResponseCache(enabled=True, ttl_seconds=60, db_path=db_path)
+        self.addCleanup(self._close, second)
+        with patch.object(response_cache.time, "time", return_value=1061.0):
+            self.assertIsNone(_run(second.get(_key(), "session_name")))
+
+    def test_clear_empties_both_tiers(self):
+        db_path = self._db_path()
+        cache = LLMResponseCache(enabled=True, db_path=db_path)
+        self.addCleanup(self._close, cache)
+        _run(cache.put(_key(), "session_name", "Sales Report", 100, 5))
+        _run(cache.clear())
+
+        self.assertEqual(len(cache._memory), 0)
+        self.assertIsNone(_run(cache.get(_key(), "session_name")))
+
+
+# ---------------------------------------------------------------------------
+# Enablement and metrics
+# ---------------------------------------------------------------------------
+
+class TestEnablementAndStats(_CacheTestCase):
+
+    def test_master_switch(self):
+        self.assertFalse(LLMResponseCache(enabled=False).is_enabled_for("session_name"))
+        self.assertTrue(LLMResponseCache(enabled=True).is_enabled_for("session_name"))
+
+    def test_only_listed_reasons_are_enabled(self):
+        cache = LLMResponseCache(enabled=True, reasons=frozenset({"session_name"}))
+        self.assertTrue(cache.is_enabled_for("session_name"))
+        self.assertFalse(cache.is_enabled_for("knowledge_rerank"))
+        self.assertFalse(cache.is_enabled_for(None))
+
+    def test_hits_record_saved_tokens_and_cost_per_reason(self):
+        cache = LLMResponseCache(enabled=True)
+        _run(cache.put(_key("a"), "session_name", "A", 1000, 500))
+        _run(cache.put(_key("b"), "knowledge_rerank", "B", 2000, 0))
+        _run(cache.get(_key("a"), "session_name"))
+        _run(cache.get(_key("a"), "session_name"))
+        _run(cache.get(_key("b"), "knowledge_rerank"))
+        _run(cache.get(_key("missing"), "knowledge_rerank"))
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (3, 1, 0.75))
+        session_name = stats["by_reason"]["session_name"]
+        self.assertEqual(session_name["saved_input_tokens"], 2000)
+        self.assertEqual(session_name["saved_output_tokens"], 1000)
+        self.assertAlmostEqual(session_name["saved_cost_usd"], 4.0)
+        self.assertEqual(stats["by_reason"]["knowledge_rerank"]["stores"], 1)
+        self.assertAlmostEqual(stats["saved_cost_usd"], 6.0)
+
+
+# ---------------------------------------------------------------------------
+# call_llm_api cache_reason path
+# ---------------------------------------------------------------------------
+
+class TestHandlerCachePath(_CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        from trusted_data_agent.core.config import APP_CONFIG
+        from trusted_data_agent.llm import handler
+        self.handler = handler
+        self.cache = LLMResponseCache(enabled=True)
+
+        for p in (
+            patch.object(handler, "_get_full_system_prompt", lambda *args, **kwargs: "SYSTEM"),
+            patch.object(response_cache, "get_llm_response_cache", lambda: self.cache),
+            patch.object(APP_CONFIG, "LLM_API_MAX_RETRIES", 1),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _client(self, text: str = "Sales Report"):
+        client = MagicMock()
+        client.messages.create = AsyncMock(return_value=SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=120, output_tokens=4),
+            dict=lambda: {},
+        ))
+        return client
+
+    def _call(self, client, **kwargs):
+        return _run(self.handler.call_llm_api(
+            client, "name this session", reason="Generating session name",
+            current_provider="Anthropic", current_model="claude", **kwargs))
+
+    def test_second_call_is_served_without_tokens(self):
+        client = self._client()
+        first = self._call(client, cache_reason="session_name")
+        second = self._call(client, cache_reason="session_name")
+
+        self.assertEqual(first, ("Sales Report", 120, 4, "Anthropic", "claude"))
+        self.assertEqual(second, ("Sales Report", 0, 0, "Anthropic", "claude"))
+        self.assertEqual(client.messages.create.await_count, 1)
+        stats = self.cache.get_stats()["by_reason"]["session_name"]
+        self.assertEqual((stats["hits"], stats["saved_input_tokens"]), (1, 120))
+
+    def test_call_without_cache_reason_always_reaches_the_provider(self):
+        client = self._client()
+        self._call(client)
+        self.assertEqual(self._call(client)[1:3], (120, 4))
+        self.assertEqual(client.messages.create.await_count, 2)
+        self.assertEqual(len(self.cache._memory), 0)
+
+    def test_disabled_reason_is_not_cached(self):
+        self.cache.reasons = frozenset({"knowledge_rerank"})
+        client = self._client()
+        self._call(client, cache_reason="session_name")
+        self._call(client, cache_reason="session_name")
+        self.assertEqual(client.messages.create.await_count, 2)
+
+    def test_multimodal_call_bypasses_the_cache(self):
+        client = self._client()
+        self._call(client, cache_reason="session_name")
+        with tempfile.NamedTemporaryFile(suffix=".png") as image:
+            block = {"type": "image", "path": image.name, "mime_type": "image/png", "filename": "x.png"}
+            self.assertEqual(self._call(client, cache_reason="session_name", multimodal_content=[block])[1], 120)
+        self.assertEqual(client.messages.create.await_count, 2)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,187 @@
+"""
+Unit tests for the MCP client session pool (mcp_adapter/session_pool.py).
+
+The MCP client is replaced by a fake whose ``session()`` context manager
+records opens/closes, so no MCP server or transport is required.
+
+Run with:
+  PYTHONPATH=src python test/test_mcp_session_pool.py -v
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.mcp_adapter.session_pool import MCPSessionPool
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _FakeSession:
+    async def send_ping(self):
+        return None
+
+
+class _FakeClient:
+    """Stand-in for MultiServerMCPClient; ``hang`` blocks the handshake forever."""
+
+    def __init__(self, hang: bool = False):
+        self.hang = hang
+        self.opened = 0
+        self.closed = 0
+        self.cancelled = 0
+
+    @asynccontextmanager
+    async def session(self, server_id):
+        self.opened += 1
+        try:
+            if self.hang:
+                await asyncio.Event().wait()
+            yield _FakeSession()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.closed += 1
+
+
+# ---------------------------------------------------------------------------
+# Reuse, idle reaper, startup timeout
+# ---------------------------------------------------------------------------
+
+class TestMCPSessionPool(unittest.TestCase):
+
+    def test_session_reused_between_calls(self):
+        """A returned session is handed out again instead of opening a new one."""
+        async def scenario():
+            pool = MCPSessionPool()
+            client = _FakeClient()
+            async with pool.session(client, "srv", "u1") as first:
+                pass
+            async with pool.session(client, "srv", "u1") as second:
+                pass
+            await pool.close_all()
+            return first, second, client, pool.get_stats()
+
+        first, second, client, stats = _run(scenario())
+        self.assertIs(first, second)
+        self.assertEqual(client.opened, 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["creates"], 1)
+
+    def test_reaper_closes_idle_sessions_without_new_checkouts(self):
+        """Sessions idle past the TTL are closed even if no one checks out again."""
+        async def scenario():
+            pool = MCPSessionPool(idle_ttl=0.05)
+            pool._SWEEP_INTERVAL = 0.02
+            client = _FakeClient()
+            async with pool.session(client, "srv", "u1"):
+                pass
+            deadline = time.monotonic() + 2.0
+            while pool.get_stats()["idle_sessions"] and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+            await asyncio.sleep(0.02)  # Let the owner task exit the transport
+            stats = pool.get_stats()
+            await pool.close_all()
+            return client, stats
+
+        client, stats = _run(scenario())
+        self.assertEqual(stats["idle_sessions"], 0)
+        self.assertEqual(stats["evicted_idle"], 1)
+        self.assertEqual(client.closed, 1)
+
+    def test_startup_timeout_cancels_owner_task(self):
+        """A handshake that times out is cancelled instead of left running."""
+        async def scenario():
+            pool = MCPSessionPool(connect_timeout=0.05)
+            client = _FakeClient(hang=True)
+            with self.assertRaises(asyncio.TimeoutError):
+                async with pool.session(client, "srv", "u1"):
+                    pass
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()
+                       and t is not pool._reaper]
+            await pool.close_all()
+            return client, pending, pool.get_stats()
+
+        client, pending, stats = _run(scenario())
+        self.assertEqual(client.cancelled, 1)
+        self.assertEqual(client.closed, 1)
+        self.assertEqual(pending, [])
+        self.assertEqual(stats["create_failures"], 1)
+
+    def test_close_all_stops_reaper(self):
+        async def scenario():
+            pool = MCPSessionPool()
+            async with pool.session(_FakeClient(), "srv", "u1"):
+                pass
+            reaper = pool._reaper
+            await pool.close_all()
+            return reaper
+
+        reaper = _run(scenario())
+        self.assertTrue(reaper.done())
+
+    def test_semaphores_are_released_after_use(self):
+        """Per-key semaphores do not accumulate for every user/server pair seen."""
+        async def scenario():
+            pool = MCPSessionPool(max_sessions_per_key=1)
+            client = _FakeClient()
+            async with pool.session(client, "srv", "u1"):
+                during = len(pool._semaphores)
+            for i in range(20):
+                async with pool.session(client, "srv", f"user{i}"):
+                    pass
+            after = len(pool._semaphores)
+            await pool.close_all()
+            return during, after
+
+        during, after = _run(scenario())
+        self.assertEqual(during, 1)
+        self.assertEqual(after, 0)
+
+    def test_waiters_share_the_key_semaphore(self):
+        """The per-key cap still holds while callers are waiting."""
+        async def scenario():
+            pool = MCPSessionPool(max_sessions_per_key=1)
+            client = _FakeClient()
+            active, peak = 0, 0
+
+            async def call():
+                nonlocal active, peak
+                async with pool.session(client, "srv", "u1"):
+                    active += 1
+                    peak = max(peak, active)
+                    await asyncio.sleep(0.01)
+                    active -= 1
+
+            await asyncio.gather(*(call() for _ in range(5)))
+            stats = pool.get_stats()
+            await pool.close_all()
+            return peak, stats, client
+
+        peak, stats, client = _run(scenario())
+        self.assertEqual(peak, 1)
+        self.assertEqual(stats["waits"], 4)
+        self.assertEqual(client.opened, 1)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -522,7 +522,7 @@ class TestDocumentReads(unittest.TestCase):
     def test_query(self):
         backend = self._initialized_backend()
         mock_provider = MagicMock()
-        mock_provider.embed_query.return_value = [0.1, 0.2, 0.3]
+        mock_provider.embed_query_cached.return_value = [0.1, 0.2, 0.3]
 
         # Mock query_points response
         point1 = MagicMock()
@@ -710,7 +710,7 @@ class TestHybridSearch(unittest.TestCase):
         """SearchMode.SEMANTIC should use the existing dense-only path."""
         backend = self._initialized_backend()
         mock_provider = MagicMock()
-        mock_provider.embed_query.return_value = [0.1, 0.2, 0.3]
+        mock_provider.embed_query_cached.return_value = [0.1, 0.2, 0.3]
 
         # Mock _collection_has_sparse_vectors — not called for SEMANTIC
         point = MagicMock()
@@ -736,7 +736,7 @@ class TestHybridSearch(unittest.TestCase):
         backend._client = _mock_client(has_sparse_vectors=True)
         backend._initialized = True
         mock_provider = MagicMock()
-        mock_provider.embed_query.return_value = [0.1, 0.2, 0.3]
+        mock_provider.embed_query_cached.return_value = [0.1, 0.2, 0.3]
 
         point = MagicMock()
         point.id = "p1"
@@ -789,7 +789,7 @@ class TestHybridSearch(unittest.TestCase):
         """Collections without sparse vectors should fall back to SEMANTIC."""
         backend = self._initialized_backend()  # default: no sparse vectors
         mock_provider = MagicMock()
-        mock_provider.embed_query.return_value = [0.1, 0.2, 0.3]
+        mock_provider.embed_query_cached.return_value = [0.1, 0.2, 0.3]
 
         point = MagicMock()
         point.id = "p1"
@@ -0,0 +1,185 @@
+"""
+Unit tests for the query embedding LRU (vectorstore/embedding_providers.py):
+hits, misses, key normalization, eviction and the provider-level
+``embed_query_cached()`` used by the retrieval fan-out.
+
+Embedding models are replaced by counting fakes, so no SentenceTransformers
+model is loaded.
+
+Run with:
+  PYTHONPATH=src python test/test_query_embedding_cache.py -v
+"""
+
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.vectorstore.embedding_providers import (
+    EmbeddingProvider,
+    QueryEmbeddingCache,
+    get_query_embedding_cache,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class _CountingModel:
+    """Stand-in embedding call returning a vector derived from the text."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return (float(len(text)), float(sum(map(ord, text)) % 97))
+
+
+class _FakeProvider(EmbeddingProvider):
+
+    def __init__(self, model_name: str):
+        self._model_name = model_name
+        self.model = _CountingModel()
+
+    def embed_texts(self, texts):
+        return [list(self.model(t)) for t in texts]
+
+    def embed_query(self, query):
+        return list(self.model(query))
+
+    @property
+    def model_name(self):
+        return self._model_name
+
+    @property
+    def dimensions(self):
+        return 2
+
+
+# ---------------------------------------------------------------------------
+# QueryEmbeddingCache
+# ---------------------------------------------------------------------------
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+
+    def test_miss_computes_then_hit_reuses(self):
+        cache, model = QueryEmbeddingCache(), _CountingModel()
+        first = cache.get_or_compute("m", "top customers", model)
+        second = cache.get_or_compute("m", "top customers", model)
+
+        self.assertEqual(first, [13.0, float(sum(map(ord, "top customers")) % 97)])
+        self.assertIs(second, first)
+        self.assertEqual(model.calls, ["top customers"])
+        self.assertEqual(cache.stats(), {"size": 1, "maxsize": 256, "hits": 1, "misses": 1})
+
+    def test_whitespace_variants_share_an_entry(self):
+        cache, model = QueryEmbeddingCache(), _CountingModel()
+        cache.get_or_compute("m", "top  customers\n", model)
+        cache.get_or_compute("m", " top customers", model)
+        # The model sees the normalized text
+        self.assertEqual(model.calls, ["top customers"])
+
+    def test_different_text_or_model_is_a_miss(self):
+        cache, model = QueryEmbeddingCache(), _CountingModel()
+        cache.get_or_compute("m", "top customers", model)
+        cache.get_or_compute("m", "Top customers", model)
+        cache.get_or_compute("other", "top customers", model)
+        self.assertEqual(len(model.calls), 3)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache, model = QueryEmbeddingCache(maxsize=2), _CountingModel()
+        cache.get_or_compute("m", "a", model)
+        cache.get_or_compute("m", "b", model)
+        cache.get_or_compute("m", "a", model)  # b becomes least recently used
+        cache.get_or_compute("m", "c", model)
+
+        self.assertEqual(list(cache._entries), [("m", "a"), ("m", "c")])
+        cache.get_or_compute("m", "b", model)
+        self.assertEqual(model.calls, ["a", "b", "c", "b"])
+
+    def test_zero_maxsize_stores_nothing(self):
+        cache, model = QueryEmbeddingCache(maxsize=0), _CountingModel()
+        cache.get_or_compute("m", "a", model)
+        cache.get_or_compute("m", "a", model)
+        self.assertEqual(len(model.calls), 2)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_failed_compute_is_not_cached(self):
+        cache = QueryEmbeddingCache()
+
+        def fail(text):
+            raise RuntimeError("model unavailable")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("m", "a", fail)
+        self.assertEqual(cache.stats()["size"], 0)
+        self.assertEqual(cache.get_or_compute("m", "a", _CountingModel()), [1.0, float(ord("a") % 97)])
+
+    def test_clear(self):
+        cache, model = QueryEmbeddingCache(), _CountingModel()
+        cache.get_or_compute("m", "a", model)
+        cache.clear()
+        cache.get_or_compute("m", "a", model)
+        self.assertEqual(len(model.calls), 2)
+
+    def test_concurrent_access_keeps_the_bound(self):
+        cache, model = QueryEmbeddingCache(maxsize=8), _CountingModel()
+
+        def worker(offset):
+            for i in range(200):
+                cache.get_or_compute("m", f"q{(i + offset) % 20}", model)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = cache.stats()
+        self.assertLessEqual(stats["size"], 8)
+        self.assertEqual(stats["hits"] + stats["misses"], 800)
+
+
+# ---------------------------------------------------------------------------
+# EmbeddingProvider.embed_query_cached
+# ---------------------------------------------------------------------------
+
+class TestProviderCachedQuery(unittest.TestCase):
+
+    def setUp(self):
+        get_query_embedding_cache().clear()
+        self.addCleanup(get_query_embedding_cache().clear)
+
+    def test_repeated_query_embeds_once(self):
+        provider = _FakeProvider("fake-model")
+        vectors = [provider.embed_query_cached("top customers") for _ in range(3)]
+        self.assertEqual(provider.model.calls, ["top customers"])
+        self.assertEqual(vectors[0], vectors[2])
+
+    def test_providers_of_one_model_share_vectors(self):
+        first, second = _FakeProvider("fake-model"), _FakeProvider("fake-model")
+        first.embed_query_cached("top customers")
+        second.embed_query_cached("top customers")
+        self.assertEqual(second.model.calls, [])
+
+    def test_models_are_kept_apart(self):
+        first, second = _FakeProvider("fake-a"), _FakeProvider("fake-b")
+        first.embed_query_cached("top customers")
+        second.embed_query_cached("top customers")
+        self.assertEqual(second.model.calls, ["top customers"])
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
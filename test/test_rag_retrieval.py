@@ -0,0 +1,332 @@
+"""
+Unit tests for RAGRetriever.retrieve_examples() collection handling and the
+parallel per-collection fan-out (_run_retrieval_jobs).
+
+The retriever is built without its constructor (no ChromaDB client, embedding
+model or collection loading); collections are fakes whose ``query()`` returns
+canned ChromaDB results, and collection metadata is served from a dict.
+
+Run with:
+  PYTHONPATH=src python test/test_rag_retrieval.py -v
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.agent.rag_retriever import RAGRetriever, record_retrieval_timings
+from trusted_data_agent.core.config import APP_CONFIG
+from trusted_data_agent.vectorstore.embedding_providers import get_query_embedding_cache
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+async def _no_vectors(retriever, query, models):
+    # Collections fall back to embedding the query text themselves
+    return {}
+
+
+class _FakeCollection:
+    """Stand-in for a ChromaDB collection returning fixed (id, distance) hits."""
+
+    def __init__(self, name: str, hits: list, fail: bool = False, delay: float = 0.0,
+                 gate: threading.Event = None):
+        self.name = name
+        self.hits = hits
+        self.fail = fail
+        self.delay = delay
+        self.gate = gate
+        self.queries = 0
+        self.last_query = None
+
+    def query(self, **kwargs):
+        self.queries += 1
+        self.last_query = kwargs
+        if self.delay:
+            time.sleep(self.delay)
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError(f"Collection [{self.name}] does not exist")
+        return {
+            "ids": [[h[0] for h in self.hits]],
+            "distances": [[h[1] for h in self.hits]],
+            "metadatas": [[{"document_id": h[0]} for h in self.hits]],
+            "documents": [[f"text of {h[0]}" for h in self.hits]],
+        }
+
+
+class _RetrieverTestCase(unittest.TestCase):
+
+    # Collections embed the query text themselves unless a subclass opts out
+    stub_query_embedding = True
+
+    def setUp(self):
+        retriever = RAGRetriever.__new__(RAGRetriever)
+        retriever.collections = {}
+        retriever._knowledge_backends = {}
+        retriever._retrieval_executor = None
+        retriever._retrieval_lock = threading.Lock()
+        retriever._stranded_retrievals = 0
+        retriever.embedding_model_name = "test-model"
+        retriever.client = MagicMock()
+        self.retriever = retriever
+        self.metadata = {}
+
+        db = MagicMock()
+        db.get_all_collections.return_value = []
+        self._patches = [
+            patch.object(RAGRetriever, "get_collection_metadata", lambda _self, cid: self.metadata.get(cid)),
+            patch("trusted_data_agent.core.collection_db.get_collection_db", return_value=db),
+            patch.object(APP_CONFIG, "RAG_PARALLEL_RETRIEVAL", True),
+            patch.object(APP_CONFIG, "RAG_COLLECTION_QUERY_TIMEOUT_SECONDS", 5),
+        ]
+        if self.stub_query_embedding:
+            self._patches.append(patch.object(RAGRetriever, "_embed_query_per_model", _no_vectors))
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        if self.retriever._retrieval_executor is not None:
+            self.retriever._retrieval_executor.shutdown(wait=True)
+
+    def _add_knowledge(self, collection_id: int, collection: _FakeCollection, db_name: str = None):
+        self.retriever.collections[collection_id] = collection
+        self.metadata[collection_id] = {
+            "id": collection_id,
+            "name": f"Collection {collection_id}",
+            "collection_name": db_name or collection.name,
+            "repository_type": "knowledge",
+        }
+
+    def _retrieve(self, k=5, **kwargs):
+        return _run(self.retriever.retrieve_examples(
+            "question", k=k, min_score=0.0, repository_type="knowledge", **kwargs))
+
+
+# ---------------------------------------------------------------------------
+# Collections swapped by another worker
+# ---------------------------------------------------------------------------
+
+class TestSwappedCollection(_RetrieverTestCase):
+    """A reindex in another process renames the collection and drops the old one."""
+
+    def test_stale_handle_is_rebound_before_querying(self):
+        stale = _FakeCollection("tda_rag_coll_1", [("old", 0.1)], fail=True)
+        fresh = _FakeCollection("tda_rag_coll_1_shadow", [("new", 0.1)])
+        self._add_knowledge(1, stale, db_name=fresh.name)
+        self.retriever.client.get_collection.return_value = fresh
+
+        with patch.object(RAGRetriever, "_register_knowledge_collection_with_backend"):
+            results = self._retrieve()
+
+        self.assertEqual([r["case_id"] for r in results], ["new"])
+        self.assertEqual(stale.queries, 0)
+        self.assertIs(self.retriever.collections[1], fresh)
+        self.retriever.client.get_collection.assert_called_once_with(name=fresh.name)
+
+    def test_matching_name_is_not_reloaded(self):
+        self._add_knowledge(1, _FakeCollection("tda_rag_coll_1", [("a", 0.1)]))
+        self.assertEqual([r["case_id"] for r in self._retrieve()], ["a"])
+        self.retriever.client.get_collection.assert_not_called()
+
+    def test_unloadable_new_collection_is_skipped(self):
+        stale = _FakeCollection("tda_rag_coll_1", [("old", 0.1)], fail=True)
+        self._add_knowledge(1, stale, db_name="tda_rag_coll_1_shadow")
+        self._add_knowledge(2, _FakeCollection("tda_rag_coll_2", [("b", 0.2)]))
+        self.retriever.client.get_collection.side_effect = RuntimeError("not found")
+
+        self.assertEqual([r["case_id"] for r in self._retrieve()], ["b"])
+        self.assertEqual(stale.queries, 0)
+
+
+# ---------------------------------------------------------------------------
+# Parallel fan-out
+# ---------------------------------------------------------------------------
+
+class TestParallelFanOut(_RetrieverTestCase):
+
+    def _add_three(self):
+        # Collection 1 answers last but holds the best hit
+        self._add_knowledge(1, _FakeCollection("c1", [("a1", 0.05), ("a2", 0.5)], delay=0.1))
+        self._add_knowledge(2, _FakeCollection("c2", [("b1", 0.2), ("b2", 0.3)]))
+        self._add_knowledge(3, _FakeCollection("c3", [("c1", 0.1), ("c2", 0.4)], delay=0.05))
+
+    def test_results_are_merged_by_score_across_collections(self):
+        self._add_three()
+        with record_retrieval_timings() as timings:
+            results = self._retrieve(k=4)
+        self.assertEqual([r["case_id"] for r in results], ["a1", "c1", "b1", "b2"])
+        self.assertEqual(set(timings), {1, 2, 3})
+
+    def test_parallel_and_sequential_results_match(self):
+        self._add_three()
+        parallel = self._retrieve(k=6)
+        with patch.object(APP_CONFIG, "RAG_PARALLEL_RETRIEVAL", False):
+            sequential = self._retrieve(k=6)
+        self.assertEqual([r["case_id"] for r in parallel], [r["case_id"] for r in sequential])
+
+    def test_queries_overlap(self):
+        for cid in (1, 2, 3):
+            self._add_knowledge(cid, _FakeCollection(f"c{cid}", [(f"x{cid}", 0.1 * cid)], delay=0.2))
+        started = time.perf_counter()
+        self._retrieve()
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_collection_past_deadline_is_skipped(self):
+        self._add_knowledge(1, _FakeCollection("c1", [("slow", 0.01)], delay=0.5))
+        self._add_knowledge(2, _FakeCollection("c2", [("fast", 0.3)]))
+        with patch.object(APP_CONFIG, "RAG_COLLECTION_QUERY_TIMEOUT_SECONDS", 0.1), \
+             record_retrieval_timings() as timings:
+            results = self._retrieve()
+        self.assertEqual([r["case_id"] for r in results], ["fast"])
+        self.assertLess(timings[1], 400)
+
+    def test_concurrent_callers_get_their_own_timings(self):
+        self._add_knowledge(1, _FakeCollection("c1", [("a", 0.1)], delay=0.05))
+        self._add_knowledge(2, _FakeCollection("c2", [("b", 0.1)]))
+
+        async def retrieve(collection_ids):
+            with record_retrieval_timings() as timings:
+                await self.retriever.retrieve_examples(
+                    "question", k=5, min_score=0.0, repository_type="knowledge",
+                    allowed_collection_ids=collection_ids)
+            return timings
+
+        async def both():
+            return await asyncio.gather(retrieve({1}), retrieve({2}))
+
+        first, second = _run(both())
+        self.assertEqual(set(first), {1})
+        self.assertEqual(set(second), {2})
+
+
+# ---------------------------------------------------------------------------
+# Workers held by queries past their deadline
+# ---------------------------------------------------------------------------
+
+class TestStrandedWorkers(_RetrieverTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.gate = threading.Event()
+        self.addCleanup(self.gate.set)
+        for p in (
+            patch.object(APP_CONFIG, "RAG_RETRIEVAL_MAX_WORKERS", 1),
+            patch.object(APP_CONFIG, "RAG_COLLECTION_QUERY_TIMEOUT_SECONDS", 0.1),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_hung_query_is_counted_until_it_returns(self):
+        hung = _FakeCollection("c1", [("hung", 0.1)], gate=self.gate)
+        self._add_knowledge(1, hung)
+        self._add_knowledge(2, _FakeCollection("c2", [("b", 0.2)]))
+
+        # One worker: c1 holds it past the deadline, c2 is queued behind it
+        self.assertEqual(self._retrieve(), [])
+        self.assertEqual(self.retriever._stranded_retrievals, 1)
+
+        self.gate.set()
+        deadline = time.monotonic() + 2
+        while self.retriever._stranded_retrievals and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.retriever._stranded_retrievals, 0)
+
+    def test_queued_query_past_deadline_never_runs(self):
+        self._add_knowledge(1, _FakeCollection("c1", [("hung", 0.1)], gate=self.gate))
+        queued = _FakeCollection("c2", [("b", 0.2)])
+        self._add_knowledge(2, queued)
+        self._retrieve()
+
+        self.gate.set()
+        self.retriever._retrieval_executor.shutdown(wait=True)
+        self.assertEqual(queued.queries, 0)
+
+    def test_pool_is_replaced_when_every_worker_is_stranded(self):
+        self._add_knowledge(1, _FakeCollection("c1", [("hung", 0.1)], gate=self.gate))
+        self._add_knowledge(2, _FakeCollection("c2", [("b", 0.2)]))
+        self._retrieve()
+        starved = self.retriever._retrieval_executor
+
+        # The hung collection is gone; the next fan-out must not queue behind it
+        del self.retriever.collections[1]
+        self._add_knowledge(3, _FakeCollection("c3", [("c", 0.3)]))
+        self.assertEqual([r["case_id"] for r in self._retrieve()], ["b", "c"])
+        self.assertIsNot(self.retriever._retrieval_executor, starved)
+        self.assertEqual(self.retriever._stranded_retrievals, 0)
+
+        # The retired pool's worker exits without touching the new pool's count
+        self.gate.set()
+        starved.shutdown(wait=True)
+        self.assertEqual(self.retriever._stranded_retrievals, 0)
+
+
+# ---------------------------------------------------------------------------
+# Query embedding shared across collections
+# ---------------------------------------------------------------------------
+
+class TestQueryEmbeddingReuse(_RetrieverTestCase):
+
+    stub_query_embedding = False
+
+    def setUp(self):
+        super().setUp()
+        get_query_embedding_cache().clear()
+        self.addCleanup(get_query_embedding_cache().clear)
+
+        self.embedded = []
+
+        class _Provider:
+            def __init__(provider, model):
+                provider.model = model
+
+            def embed_query_cached(provider, query):
+                return get_query_embedding_cache().get_or_compute(provider.model, query, provider._embed)
+
+            def _embed(provider, text):
+                self.embedded.append((provider.model, text))
+                return [0.1, 0.2] if provider.model == "test-model" else [0.3, 0.4]
+
+        p = patch("trusted_data_agent.agent.rag_retriever.SentenceTransformerProvider.get_cached", _Provider)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_query_is_embedded_once_per_model(self):
+        colls = [_FakeCollection(f"c{cid}", [(f"x{cid}", 0.1)]) for cid in (1, 2, 3)]
+        for cid, coll in enumerate(colls, start=1):
+            self._add_knowledge(cid, coll)
+        self.metadata[3]["embedding_model"] = "other-model"
+
+        self._retrieve()
+        self._retrieve()
+
+        self.assertEqual(sorted(self.embedded), [("other-model", "question"), ("test-model", "question")])
+        self.assertEqual(colls[0].last_query["query_embeddings"], [[0.1, 0.2]])
+        self.assertEqual(colls[1].last_query["query_embeddings"], [[0.1, 0.2]])
+        self.assertEqual(colls[2].last_query["query_embeddings"], [[0.3, 0.4]])
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,246 @@
+"""
+Unit tests for the rate limiter's token bucket storage backends
+(auth/rate_limit_storage.py).
+
+The same scenarios run against the in-memory and the SQLite backend with an
+explicit clock, so refill and expiry are deterministic.
+
+Run with:
+  PYTHONPATH=src python test/test_rate_limit_storage.py -v
+"""
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.auth import rate_limit_storage
+from trusted_data_agent.auth.rate_limit_storage import (
+    _EXPIRE_BATCH,
+    MemoryRateLimitStorage,
+    SQLiteRateLimitStorage,
+)
+from trusted_data_agent.core.config import APP_CONFIG
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+# ---------------------------------------------------------------------------
+# Shared scenarios
+# ---------------------------------------------------------------------------
+
+class _StorageTests:
+    """Mixin: subclasses provide self.storage and _bucket_count()."""
+
+    def _consume(self, now, identifier="u1", bucket_key="b", limit=2, window=10):
+        return self.storage.consume(identifier, bucket_key, limit, window, now=now)
+
+    def test_allows_up_to_limit_then_rejects_with_retry_after(self):
+        self.assertEqual(self._consume(0), (True, 0))
+        self.assertEqual(self._consume(0), (True, 0))
+        # Empty bucket refills at 0.2 tokens/s: one token in 5 s
+        self.assertEqual(self._consume(0), (False, 6))
+
+    def test_retry_after_shrinks_as_bucket_refills(self):
+        self._consume(0)
+        self._consume(0)
+        self.assertEqual(self._consume(2.5), (False, 3))
+
+    def test_consume_async_shares_buckets_with_consume(self):
+        self._consume(0)
+        self.assertEqual(_run(self.storage.consume_async("u1", "b", 2, 10, now=0)), (True, 0))
+        self.assertFalse(self._consume(0)[0])
+
+    def test_bucket_refills_over_time(self):
+        self._consume(0)
+        self._consume(0)
+        self.assertEqual(self._consume(5), (True, 0))
+        self.assertFalse(self._consume(5)[0])
+
+    def test_refill_is_capped_at_limit(self):
+        self._consume(0)
+        self.assertTrue(self._consume(1000)[0])
+        self.assertTrue(self._consume(1000)[0])
+        self.assertFalse(self._consume(1000)[0])
+
+    def test_rejected_checks_do_not_consume(self):
+        self._consume(0)
+        self._consume(0)
+        for _ in range(5):
+            self._consume(1)
+        self.assertTrue(self._consume(5)[0])
+
+    def test_buckets_are_independent(self):
+        self._consume(0)
+        self._consume(0)
+        self.assertTrue(self._consume(0, bucket_key="other")[0])
+        self.assertTrue(self._consume(0, identifier="u2")[0])
+
+    def test_status_reports_tokens_and_last_update(self):
+        self._consume(0)
+        self._consume(3, bucket_key="other", limit=5)
+        status = self.storage.status("u1")
+        self.assertEqual(set(status), {"b", "other"})
+        self.assertEqual(status["b"], (1.0, 0))
+        self.assertEqual(status["other"], (4.0, 3))
+        self.assertEqual(self.storage.status("nobody"), {})
+
+    def test_reset_forgets_only_that_identifier(self):
+        self._consume(0)
+        self._consume(0)
+        self._consume(0, identifier="u2")
+        self.storage.reset("u1")
+        self.assertEqual(self.storage.status("u1"), {})
+        self.assertIn("b", self.storage.status("u2"))
+        self.assertEqual(self._consume(0), (True, 0))
+
+    def test_expired_buckets_are_removed_in_bounded_batches(self):
+        for i in range(_EXPIRE_BATCH + 10):
+            self._consume(0, identifier=f"user{i}")
+        self._consume(20, identifier="late")
+
+        # One pass removes at most _EXPIRE_BATCH buckets; the next pass the rest
+        self.assertEqual(self._bucket_count(), 10 + 1)
+        self._consume(20, identifier="late")
+        self.assertEqual(self._bucket_count(), 1)
+
+    def test_unexpired_buckets_are_kept(self):
+        self._consume(0, identifier="old")
+        self._consume(9, identifier="recent")
+        self._consume(10, identifier="late")
+        self.assertEqual(self.storage.status("old"), {})
+        self.assertIn("b", self.storage.status("recent"))
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class TestMemoryStorage(_StorageTests, unittest.TestCase):
+
+    def setUp(self):
+        self.storage = MemoryRateLimitStorage()
+
+    def _bucket_count(self):
+        return sum(len(buckets) for buckets in self.storage._buckets.values())
+
+
+class TestSQLiteStorage(_StorageTests, unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self._tmp.name) / "rate_limits.db")
+        # Expire on every check so the batch bound is observable
+        self.storage = SQLiteRateLimitStorage(self.db_path, expire_every=1)
+
+    def tearDown(self):
+        self.storage.close()
+        self._tmp.cleanup()
+
+    def _bucket_count(self):
+        return self.storage._get_conn().execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+
+    def test_workers_share_buckets(self):
+        other_worker = SQLiteRateLimitStorage(self.db_path)
+        try:
+            self._consume(0)
+            self.assertTrue(other_worker.consume("u1", "b", 2, 10, now=0)[0])
+            self.assertFalse(self._consume(0)[0])
+        finally:
+            other_worker.close()
+
+    def test_consume_async_runs_off_the_event_loop_thread(self):
+        threads = []
+        consume = self.storage.consume
+
+        def recording_consume(*args):
+            threads.append(threading.get_ident())
+            return consume(*args)
+
+        with patch.object(self.storage, "consume", recording_consume):
+            self.assertEqual(_run(self.storage.consume_async("u1", "b", 2, 10, now=0)), (True, 0))
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+    def test_busy_database_falls_back_to_memory_bucket_quickly(self):
+        self._consume(0)
+        self._consume(0)
+        locker = sqlite3.connect(self.db_path, isolation_level=None)
+        locker.execute("BEGIN EXCLUSIVE")
+        try:
+            started = time.monotonic()
+            # The per-process bucket still enforces the limit while the file is busy
+            self.assertEqual(self._consume(0), (True, 0))
+            self.assertEqual(self._consume(0), (True, 0))
+            self.assertEqual(self._consume(0), (False, 6))
+            self.assertLess(time.monotonic() - started, 1.0)
+            self.storage.reset("u1")
+            self.assertEqual(self._consume(0), (True, 0))
+            # WAL readers are not blocked by the writer
+            self.assertEqual(self.storage.status("u1"), {"b": (0.0, 0)})
+        finally:
+            locker.execute("ROLLBACK")
+            locker.close()
+        # The bucket was neither consumed nor reset while the file was busy
+        self.assertFalse(self._consume(0)[0])
+
+
+# ---------------------------------------------------------------------------
+# Backend selection
+# ---------------------------------------------------------------------------
+
+class TestBackendSelection(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._patches = [
+            patch.object(rate_limit_storage, "_storage", None),
+            patch.object(APP_CONFIG, "RATE_LIMIT_STORAGE", "sqlite"),
+            patch.object(APP_CONFIG, "RATE_LIMIT_DB", str(Path(self._tmp.name) / "rate_limits.db")),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        rate_limit_storage._storage.close()
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+
+    def test_sqlite_backend_is_selected(self):
+        self.assertIsInstance(rate_limit_storage.get_rate_limit_storage(), SQLiteRateLimitStorage)
+
+    def test_old_sqlite_falls_back_to_memory(self):
+        with patch.object(rate_limit_storage.sqlite3, "sqlite_version_info", (3, 31, 1)), \
+             self.assertLogs("quart.app", level="WARNING") as logs:
+            storage = rate_limit_storage.get_rate_limit_storage()
+        self.assertIsInstance(storage, MemoryRateLimitStorage)
+        self.assertIn("3.35.0+", logs.output[0])
+
+    def test_unknown_backend_falls_back_to_memory(self):
+        with patch.object(APP_CONFIG, "RATE_LIMIT_STORAGE", "redis"):
+            self.assertIsInstance(rate_limit_storage.get_rate_limit_storage(), MemoryRateLimitStorage)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,201 @@
+"""
+Unit tests for MCP tool result ingestion (mcp_adapter/result_ingest.py).
+
+Covers JSON span detection, the incremental (row-by-row) object parser and the
+opt-in row cap with its JSONL spill file. The streaming threshold is lowered so
+small payloads exercise the incremental path whenever a row cap is set.
+
+Run with:
+  PYTHONPATH=src python test/test_result_ingest.py -v
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.core.config import APP_CONFIG
+from trusted_data_agent.mcp_adapter import result_ingest
+from trusted_data_agent.mcp_adapter.result_ingest import (
+    has_spilled_rows,
+    iter_result_rows,
+    locate_json_span,
+    parse_tool_result_text,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _rows(n: int) -> list:
+    return [{"id": i, "name": f"row{i}", "tags": [i, {"even": i % 2 == 0}]} for i in range(n)]
+
+
+class _IngestTestCase(unittest.TestCase):
+    """Forces the incremental parser and points spill files at a temp dir."""
+
+    max_rows = 0
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self._patches = [
+            patch.object(APP_CONFIG, "MCP_RESULT_STREAMING_THRESHOLD_BYTES", 0),
+            patch.object(APP_CONFIG, "MCP_RESULT_MAX_ROWS_IN_MEMORY", self.max_rows),
+            patch.object(APP_CONFIG, "MCP_RESULT_SPILL_DIR", self._tmp.name),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+
+    def _spill_files(self) -> list:
+        return list(Path(self._tmp.name).glob("rows_*.jsonl"))
+
+
+# ---------------------------------------------------------------------------
+# Span detection
+# ---------------------------------------------------------------------------
+
+class TestLocateJsonSpan(unittest.TestCase):
+
+    def test_matches_regex_semantics(self):
+        text = 'Result: {"a": [1, 2]} done'
+        start, end = locate_json_span(text)
+        self.assertEqual(text[start:end], '{"a": [1, 2]}')
+
+    def test_earliest_opening_bracket_wins(self):
+        text = 'x [1, {"a": 2}] y'
+        start, end = locate_json_span(text)
+        self.assertEqual(text[start:end], '[1, {"a": 2}]')
+
+    def test_no_candidate(self):
+        self.assertIsNone(locate_json_span("no json here"))
+        self.assertIsNone(parse_tool_result_text("no json here"))
+
+
+# ---------------------------------------------------------------------------
+# Incremental parser
+# ---------------------------------------------------------------------------
+
+class TestIncrementalParser(_IngestTestCase):
+
+    # A cap above every row count used here: the incremental path, no spilling
+    max_rows = 1000
+
+    def test_matches_json_loads(self):
+        payload = {"status": "success", "metadata": {"tool_name": "t"}, "results": _rows(25),
+                   "extra": {"nested": [1, 2, {"x": None}]}}
+        for text in (json.dumps(payload), json.dumps(payload, indent=2)):
+            self.assertEqual(parse_tool_result_text(f"Output:\n{text}\n", "t"), payload)
+
+    def test_empty_object_and_empty_results(self):
+        self.assertEqual(parse_tool_result_text("{}"), {})
+        self.assertEqual(parse_tool_result_text('{"results": []}'), {"results": []})
+
+    def test_nested_results_key_is_not_streamed_twice(self):
+        """Only the first top-level ``results`` array goes through the row buffer."""
+        payload = {"results": _rows(3), "inner": {"results": [{"z": 1}]}, "tail": {"results": []}}
+        self.assertEqual(parse_tool_result_text(json.dumps(payload)), payload)
+
+    def test_results_that_is_not_an_array(self):
+        payload = {"results": {"rows": _rows(2)}, "count": 2}
+        self.assertEqual(parse_tool_result_text(json.dumps(payload)), payload)
+
+    def test_malformed_json_raises(self):
+        bad = [
+            '{"results": [{"a": 1}, {"a": 2}',      # truncated array
+            '{"results": [{"a": 1} {"a": 2}]}',     # missing comma between rows
+            '{"results": [1, 2], "x": }',           # missing value
+            '{results: [1]}',                       # unquoted key
+            '{"a" 1}',                              # missing colon
+            '{"a": 1} {"b": 2}',                    # two values in the span
+        ]
+        for text in bad:
+            with self.subTest(text=text), self.assertRaises(json.JSONDecodeError):
+                parse_tool_result_text(text)
+
+
+# ---------------------------------------------------------------------------
+# Default configuration (no row cap)
+# ---------------------------------------------------------------------------
+
+class TestWithoutCap(_IngestTestCase):
+
+    def test_large_results_are_decoded_in_one_pass(self):
+        payload = {"status": "success", "results": _rows(50)}
+        with patch.object(result_ingest, "_decode_object_streaming") as streaming:
+            self.assertEqual(parse_tool_result_text(json.dumps(payload)), payload)
+        streaming.assert_not_called()
+
+    def test_no_spill_without_cap(self):
+        result = parse_tool_result_text(json.dumps({"results": _rows(50)}))
+        self.assertEqual(len(result["results"]), 50)
+        self.assertFalse(has_spilled_rows(result))
+        self.assertNotIn("metadata", result)
+        self.assertEqual(self._spill_files(), [])
+
+    def test_malformed_json_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            parse_tool_result_text('{"results": [{"a": 1} {"a": 2}]}')
+
+
+# ---------------------------------------------------------------------------
+# Opt-in row cap and spill files
+# ---------------------------------------------------------------------------
+
+class TestRowCap(_IngestTestCase):
+
+    max_rows = 10
+
+    def test_spill_round_trip(self):
+        rows = _rows(35)
+        for text in (json.dumps({"results": rows}), json.dumps({"results": rows}, indent=2)):
+            with self.subTest(indent="\n" in text):
+                result = parse_tool_result_text(text, "t")
+                self.assertEqual(result["results"], rows[:10])
+                self.assertTrue(has_spilled_rows(result))
+                self.assertEqual(list(iter_result_rows(result)), rows)
+
+    def test_truncation_is_flagged_in_metadata(self):
+        result = parse_tool_result_text(json.dumps({"metadata": {"tool_name": "t"}, "results": _rows(12)}), "t")
+        metadata = result["metadata"]
+        self.assertTrue(metadata["results_truncated"])
+        self.assertEqual(metadata["row_count"], 12)
+        self.assertEqual(metadata["rows_in_memory"], 10)
+        self.assertEqual(metadata["spilled_rows"], 2)
+        self.assertEqual(metadata["tool_name"], "t")
+
+    def test_within_cap_is_not_flagged(self):
+        result = parse_tool_result_text(json.dumps({"results": _rows(10)}))
+        self.assertNotIn("metadata", result)
+        self.assertEqual(self._spill_files(), [])
+
+    def test_failed_parse_removes_spill_file(self):
+        text = json.dumps({"results": _rows(20)})[:-1] + ", oops}"
+        with self.assertRaises(json.JSONDecodeError):
+            parse_tool_result_text(text)
+        self.assertEqual(self._spill_files(), [])
+
+    def test_missing_spill_file_yields_in_memory_rows(self):
+        result = parse_tool_result_text(json.dumps({"results": _rows(15)}))
+        Path(result["metadata"]["spill_file"]).unlink()
+        self.assertEqual(list(iter_result_rows(result)), _rows(10))
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,140 @@
+"""
+Unit tests for SEMANTIC chunking in agent/repository_constructor.py
+(DocumentProcessor._chunk_semantic).
+
+Sentences are embedded by a fake provider that maps each sentence to a fixed
+topic vector, so topic shifts are deterministic and no model is loaded.
+
+Run with:
+  PYTHONPATH=src python test/test_semantic_chunking.py -v
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.agent.repository_constructor import ChunkingStrategy, DocumentProcessor
+from trusted_data_agent.core.config import APP_CONFIG
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class _TopicProvider:
+    """Embeds a sentence as the unit vector of the topic word it starts with."""
+
+    _TOPICS = {"Cats": [1.0, 0.0, 0.0], "Rockets": [0.0, 1.0, 0.0], "Bonds": [0.0, 0.0, 1.0]}
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_texts(self, texts):
+        self.batches.append(len(texts))
+        return [self._TOPICS[text.split()[0]] for text in texts]
+
+
+def _sentences(topic, count):
+    return " ".join(f"{topic} sentence {i:02d}." for i in range(count))
+
+
+def _processor(chunk_size=200, chunk_overlap=0, provider=None):
+    return DocumentProcessor(ChunkingStrategy.SEMANTIC, chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                             embedding_provider=provider or _TopicProvider())
+
+
+# ---------------------------------------------------------------------------
+# Boundaries
+# ---------------------------------------------------------------------------
+
+class TestSemanticBoundaries(unittest.TestCase):
+
+    def setUp(self):
+        self._patches = [
+            patch.object(APP_CONFIG, "KNOWLEDGE_SEMANTIC_EMBED_BATCH", 4),
+            patch.object(APP_CONFIG, "KNOWLEDGE_SEMANTIC_BREAKPOINT_STDDEV", 1.0),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    def test_topic_shift_starts_a_new_chunk(self):
+        content = _sentences("Cats", 8) + " " + _sentences("Rockets", 8)
+        chunks = _processor(chunk_size=400).process_document(content, {"filename": "f"})
+
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(chunks[0].content.startswith("Cats") and "Rockets" not in chunks[0].content)
+        self.assertTrue(chunks[1].content.startswith("Rockets") and "Cats" not in chunks[1].content)
+        self.assertEqual([c.chunk_index for c in chunks], [0, 1])
+        self.assertEqual(chunks[0].metadata["chunk_method"], "semantic")
+
+    def test_chunks_are_capped_at_one_and_a_half_chunk_size(self):
+        chunks = _processor(chunk_size=60).process_document(_sentences("Cats", 20), {})
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(c.content) <= 90 for c in chunks))
+        self.assertEqual(" ".join(c.content for c in chunks), _sentences("Cats", 20))
+
+    def test_sentences_are_embedded_in_batches(self):
+        provider = _TopicProvider()
+        _processor(provider=provider).process_document(_sentences("Cats", 10), {})
+        self.assertEqual(provider.batches, [4, 4, 2])
+
+    def test_without_provider_falls_back_to_paragraphs(self):
+        processor = DocumentProcessor(ChunkingStrategy.SEMANTIC, chunk_size=200, chunk_overlap=0)
+        chunks = processor.process_document(_sentences("Cats", 3), {})
+        self.assertEqual(chunks[0].metadata["chunk_method"], "paragraph")
+
+
+# ---------------------------------------------------------------------------
+# Overlap
+# ---------------------------------------------------------------------------
+
+class TestSemanticOverlap(unittest.TestCase):
+
+    def test_trailing_sentences_within_overlap_are_repeated(self):
+        # Each sentence is 17 characters; an overlap of 40 carries two of them
+        chunks = _processor(chunk_size=60, chunk_overlap=40).process_document(_sentences("Cats", 12), {})
+
+        self.assertGreater(len(chunks), 2)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            carried = previous.content.split(". ")[-2:]
+            self.assertTrue(chunk.content.startswith(". ".join(carried)), (previous.content, chunk.content))
+        self.assertTrue(all(len(c.content) <= 90 for c in chunks))
+
+    def test_every_sentence_appears_in_order(self):
+        chunks = _processor(chunk_size=60, chunk_overlap=40).process_document(_sentences("Cats", 12), {})
+        seen = []
+        for chunk in chunks:
+            for sentence in chunk.content.split(" Cats"):
+                number = int(sentence.rstrip(".").split()[-1])
+                if not seen or number > seen[-1]:
+                    seen.append(number)
+        self.assertEqual(seen, list(range(12)))
+
+    def test_zero_overlap_repeats_nothing(self):
+        content = _sentences("Cats", 12)
+        chunks = _processor(chunk_size=60, chunk_overlap=0).process_document(content, {})
+        self.assertEqual(" ".join(c.content for c in chunks), content)
+
+    def test_overlap_never_repeats_a_whole_chunk(self):
+        chunks = _processor(chunk_size=60, chunk_overlap=1000).process_document(_sentences("Cats", 12), {})
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertNotEqual(previous.content, chunk.content)
+            self.assertFalse(chunk.content.startswith(previous.content + " "))
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,427 @@
+"""
+Unit tests for the write-back session cache (core/session_cache.py).
+
+The disk writer is replaced by a recorder, so no session files are touched.
+Covers save coalescing, flushing on shutdown, LRU eviction, the ownership
+rules of cached sessions, the copies made by session_manager transactions and
+the file-scan session listing.
+
+Run with:
+  PYTHONPATH=src python test/test_session_cache.py -v
+"""
+
+import asyncio
+import copy
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.core import session_cache, session_manager
+from trusted_data_agent.core.session_cache import SessionCache
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Recorder:
+    """Stand-in for the session writer; records every persisted session."""
+
+    def __init__(self):
+        self.writes = []
+        self.sections = []
+        self.locks = defaultdict(asyncio.Lock)
+
+    async def writer(self, key, path, data, sections):
+        self.writes.append((key, data))
+        self.sections.append(sections)
+
+    def lock_for(self, session_id):
+        return self.locks[session_id]
+
+
+def _make_cache(recorder, **kwargs) -> SessionCache:
+    return SessionCache(writer=recorder.writer, lock_for=recorder.lock_for, **kwargs)
+
+
+_PATH = Path("/nonexistent/u1/s1.json")
+
+
+# ---------------------------------------------------------------------------
+# Coalescing and shutdown flush
+# ---------------------------------------------------------------------------
+
+class TestWriteBack(unittest.TestCase):
+
+    def test_saves_within_window_coalesce_into_one_write(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=0.05)
+            for i in range(5):
+                cache.mark_dirty(("u1", "s1"), _PATH, {"turn": i})
+            await asyncio.sleep(0.2)
+            return recorder, cache.get_stats()
+
+        recorder, stats = _run(scenario())
+        self.assertEqual(len(recorder.writes), 1)
+        self.assertEqual(recorder.writes[0][1], {"turn": 4})
+        self.assertEqual(stats["saves"], 5)
+        self.assertEqual(stats["flushes"], 1)
+        self.assertEqual(stats["saves_coalesced"], 4)
+        self.assertEqual(stats["dirty_entries"], 0)
+
+    def test_flush_all_writes_pending_entries_on_shutdown(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1})
+            cache.mark_dirty(("u1", "s2"), _PATH, {"b": 2})
+            await cache.flush_all()
+            return recorder, cache.get_stats()
+
+        recorder, stats = _run(scenario())
+        self.assertEqual(sorted(k for k, _ in recorder.writes), [("u1", "s1"), ("u1", "s2")])
+        self.assertEqual(stats["dirty_entries"], 0)
+
+    def test_flush_with_evict_drops_entry(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1})
+            await cache.flush(("u1", "s1"), evict=True)
+            return recorder, cache.peek(("u1", "s1"))
+
+        recorder, cached = _run(scenario())
+        self.assertEqual(len(recorder.writes), 1)
+        self.assertIsNone(cached)
+
+    def test_failed_flush_keeps_entry_dirty(self):
+        async def scenario():
+            recorder = _Recorder()
+
+            async def failing_writer(key, path, data, sections):
+                raise OSError("disk full")
+
+            cache = SessionCache(writer=failing_writer, lock_for=recorder.lock_for, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1})
+            await cache.flush(("u1", "s1"))
+            stats = cache.get_stats()
+            cache.invalidate(("u1", "s1"))
+            return stats
+
+        stats = _run(scenario())
+        self.assertEqual(stats["flush_errors"], 1)
+        self.assertEqual(stats["dirty_entries"], 1)
+
+    def test_coalesced_saves_merge_their_sections(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1}, sections={"a"})
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1, "b": 2}, sections={"b"})
+            await cache.flush(("u1", "s1"))
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 2}, sections={"a"})
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 3})  # changed keys unknown
+            await cache.flush(("u1", "s1"))
+            return recorder
+
+        recorder = _run(scenario())
+        self.assertEqual(recorder.sections, [frozenset({"a", "b"}), None])
+
+    def test_failed_flush_keeps_its_sections(self):
+        async def scenario():
+            recorder = _Recorder()
+            fail = [False, True]
+
+            async def flaky_writer(key, path, data, sections):
+                if fail.pop():
+                    raise OSError("disk full")
+                await recorder.writer(key, path, data, sections)
+
+            cache = SessionCache(writer=flaky_writer, lock_for=recorder.lock_for, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1}, sections={"a"})
+            await cache.flush(("u1", "s1"))
+            cache.mark_dirty(("u1", "s1"), _PATH, {"a": 1, "b": 2}, sections={"b"})
+            await cache.flush(("u1", "s1"))
+            return recorder
+
+        recorder = _run(scenario())
+        self.assertEqual(recorder.sections, [frozenset({"a", "b"})])
+
+
+# ---------------------------------------------------------------------------
+# LRU bound
+# ---------------------------------------------------------------------------
+
+class TestEviction(unittest.TestCase):
+
+    def test_least_recently_used_clean_entry_is_evicted(self):
+        cache = _make_cache(_Recorder(), max_entries=2)
+        cache.put(("u1", "s1"), _PATH, {"id": "s1"})
+        cache.put(("u1", "s2"), _PATH, {"id": "s2"})
+        cache.get(("u1", "s1"))  # s2 becomes least recently used
+        cache.put(("u1", "s3"), _PATH, {"id": "s3"})
+
+        self.assertIsNotNone(cache.peek(("u1", "s1")))
+        self.assertIsNone(cache.peek(("u1", "s2")))
+        self.assertIsNotNone(cache.peek(("u1", "s3")))
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_dirty_entries_are_not_evicted(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, max_entries=1, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"id": "s1"})
+            cache.mark_dirty(("u1", "s2"), _PATH, {"id": "s2"})
+            kept = (cache.peek(("u1", "s1")), cache.peek(("u1", "s2")))
+            await cache.flush_all()
+            return kept, cache.get_stats()
+
+        (first, second), stats = _run(scenario())
+        self.assertEqual(first, {"id": "s1"})
+        self.assertEqual(second, {"id": "s2"})
+        # Once flushed the bound applies again
+        self.assertEqual(stats["entries"], 1)
+
+    def test_disk_read_does_not_clobber_dirty_entry(self):
+        async def scenario():
+            cache = _make_cache(_Recorder(), flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"v": "new"})
+            cache.put(("u1", "s1"), _PATH, {"v": "stale"})
+            cached = cache.get(("u1", "s1"))
+            cache.invalidate(("u1", "s1"))
+            return cached
+
+        self.assertEqual(_run(scenario()), {"v": "new"})
+
+
+# ---------------------------------------------------------------------------
+# Ownership
+# ---------------------------------------------------------------------------
+
+class TestOwnership(unittest.TestCase):
+
+    def test_get_returns_private_copy(self):
+        cache = _make_cache(_Recorder())
+        cache.put(("u1", "s1"), _PATH, {"chat": ["hi"]})
+        loaded = cache.get(("u1", "s1"))
+        loaded["chat"].append("unsaved")
+        self.assertEqual(cache.get(("u1", "s1")), {"chat": ["hi"]})
+
+    def test_put_and_peek_share_the_cached_dict(self):
+        cache = _make_cache(_Recorder())
+        data = {"chat": ["hi"]}
+        cache.put(("u1", "s1"), _PATH, data)
+        self.assertIs(cache.peek(("u1", "s1")), data)
+
+    def test_caller_mutation_after_save_is_not_persisted(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=60)
+            data = {"chat": ["hi"]}
+            cache.mark_dirty(("u1", "s1"), _PATH, data)
+            data["chat"].append("unsaved")
+            await cache.flush_all()
+            return recorder
+
+        recorder = _run(scenario())
+        self.assertEqual(recorder.writes[0][1], {"chat": ["hi"]})
+
+    def test_handoff_keeps_the_saved_dict(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=60)
+            data = {"chat": ["hi"]}
+            cache.mark_dirty(("u1", "s1"), _PATH, data, handoff=True)
+            cached = cache.peek(("u1", "s1"))
+            await cache.flush_all()
+            return data, cached, recorder
+
+        data, cached, recorder = _run(scenario())
+        self.assertIs(cached, data)
+        self.assertIs(recorder.writes[0][1], data)
+
+    def test_checkout_returns_the_cached_dict(self):
+        cache = _make_cache(_Recorder())
+        data = {"chat": ["hi"]}
+        cache.put(("u1", "s1"), _PATH, data)
+        self.assertIs(cache.checkout(("u1", "s1")), data)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_release_drops_clean_entry(self):
+        cache = _make_cache(_Recorder())
+        cache.put(("u1", "s1"), _PATH, {"chat": ["hi"]})
+        data = cache.checkout(("u1", "s1"))
+        data["chat"].append("half-applied")
+        cache.release(("u1", "s1"), data)
+        self.assertIsNone(cache.peek(("u1", "s1")))
+
+    def test_dirty_entry_is_checked_out_as_a_copy(self):
+        async def scenario():
+            recorder = _Recorder()
+            cache = _make_cache(recorder, flush_delay=60)
+            cache.mark_dirty(("u1", "s1"), _PATH, {"chat": ["hi"]})
+            data = cache.checkout(("u1", "s1"))
+            data["chat"].append("half-applied")
+            cache.release(("u1", "s1"), data)
+            await cache.flush_all()
+            return recorder, cache.get_stats()
+
+        recorder, stats = _run(scenario())
+        self.assertEqual(recorder.writes[0][1], {"chat": ["hi"]})
+        self.assertEqual(stats["checkout_copies"], 1)
+
+    def test_peek_does_not_count_as_lookup(self):
+        cache = _make_cache(_Recorder())
+        cache.put(("u1", "s1"), _PATH, {"id": "s1"})
+        cache.peek(("u1", "s1"))
+        cache.peek(("u1", "missing"))
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 0)
+        self.assertEqual(stats["misses"], 0)
+
+
+# ---------------------------------------------------------------------------
+# session_manager transactions over the cache
+# ---------------------------------------------------------------------------
+
+class TestTransactionCopies(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / "u1" / "s1.json"
+        self.recorder = _Recorder()
+        self.cache = _make_cache(self.recorder, flush_delay=60)
+        self.cache.put(("u1", "s1"), path, {"id": "s1", "last_turn_data": {"workflow_history": []}})
+        self.copies = 0
+        real_deepcopy = copy.deepcopy
+
+        def counting_deepcopy(obj, *args, **kwargs):
+            self.copies += 1
+            return real_deepcopy(obj, *args, **kwargs)
+
+        for p in (
+            patch.object(session_manager, "_session_cache", self.cache),
+            patch.object(session_manager.APP_CONFIG, "SESSION_CACHE_ENABLED", True),
+            patch.object(session_manager.APP_CONFIG, "SESSIONS_FILTER_BY_USER", True),
+            patch.object(session_manager.APP_CONFIG, "SESSION_USAGE_BATCHING_ENABLED", False),
+            patch.object(session_manager, "_get_session_path", lambda user_uuid, session_id: path),
+            patch.object(session_cache.copy, "deepcopy", counting_deepcopy),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(self.cache.invalidate, ("u1", "s1"))
+
+    def test_transaction_does_not_copy_the_session(self):
+        cached = self.cache.peek(("u1", "s1"))
+
+        async def scenario():
+            async with session_manager._session_transaction("u1", "s1") as session_data:
+                session_data["name"] = "renamed"
+                return session_data
+
+        self.assertIs(_run(scenario()), cached)
+        self.assertEqual(self.copies, 0)
+        self.assertEqual(self.cache.peek(("u1", "s1"))["name"], "renamed")
+        self.assertEqual(self.cache.get_stats()["dirty_entries"], 1)
+
+    def test_failed_transaction_drops_clean_cached_session(self):
+        async def scenario():
+            async with session_manager._session_transaction("u1", "s1") as session_data:
+                session_data["name"] = "renamed"
+                raise RuntimeError("writer failed")
+
+        with self.assertRaises(RuntimeError):
+            _run(scenario())
+        self.assertIsNone(self.cache.peek(("u1", "s1")))
+
+    def test_failed_transaction_leaves_dirty_cached_session_untouched(self):
+        async def scenario():
+            async with session_manager._session_transaction("u1", "s1") as session_data:
+                session_data["name"] = "saved"
+            async with session_manager._session_transaction("u1", "s1") as session_data:
+                session_data["name"] = "renamed"
+                raise RuntimeError("writer failed")
+
+        with self.assertRaises(RuntimeError):
+            _run(scenario())
+        self.assertEqual(self.cache.peek(("u1", "s1"))["name"], "saved")
+        self.assertEqual(self.cache.get_stats()["dirty_entries"], 1)
+
+    def test_stored_turn_is_not_shared_with_the_caller(self):
+        turn = {"turn": 1, "events": ["a"]}
+        with patch("trusted_data_agent.auth.database.get_db_session", side_effect=RuntimeError("no db")):
+            _run(session_manager.update_last_turn_data("u1", "s1", turn))
+        turn["events"].append("later")
+
+        stored = self.cache.peek(("u1", "s1"))["last_turn_data"]["workflow_history"]
+        self.assertEqual(stored, [{"turn": 1, "events": ["a"], "isValid": True}])
+
+
+class TestSessionListing(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        sessions_dir = Path(tmp.name)
+        (sessions_dir / "u1").mkdir()
+        self.child = {
+            "id": "child",
+            "name": "Child",
+            "genie_metadata": {"is_genie_slave": True, "parent_session_id": "parent",
+                               "slave_sequence_number": 1},
+        }
+        self.snapshot = copy.deepcopy(self.child)
+        self.cache = _make_cache(_Recorder())
+        for session in ({"id": "parent", "name": "Parent"}, self.child):
+            path = sessions_dir / "u1" / f"{session['id']}.json"
+            path.write_text("{}")
+            self.cache.put(("u1", session["id"]), path, session)
+
+        def enrich(summaries, user_uuid):
+            for summary in summaries:
+                if summary.get("genie_metadata", {}).get("is_genie_slave"):
+                    summary["genie_metadata"]["nesting_level"] = 1
+                    summary["genie_metadata"]["slave_profile_tag"] = "@CHILD"
+
+        async def no_index(*args, **kwargs):
+            return None
+
+        for p in (
+            patch.object(session_manager, "_session_cache", self.cache),
+            patch.object(session_manager, "SESSIONS_DIR", sessions_dir),
+            patch.object(session_manager.APP_CONFIG, "SESSIONS_FILTER_BY_USER", True),
+            patch.object(session_manager, "_query_session_page", no_index),
+            patch.object(session_manager, "_enrich_genie_slave_metadata", enrich),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_file_scan_listing_leaves_cached_session_untouched(self):
+        page = _run(session_manager.get_all_sessions("u1"))
+
+        listed = next(s for s in page["sessions"] if s["id"] == "child")
+        self.assertTrue(listed["genie_metadata"]["is_last_child"])
+        self.assertEqual(listed["genie_metadata"]["nesting_level"], 1)
+        self.assertEqual(self.cache.peek(("u1", "child")), self.snapshot)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,251 @@
+"""
+Unit tests for the session index (core/session_manager.py): Genie hierarchy
+columns and paginated session listing.
+
+Sessions are written as plain JSON files under a temporary SESSIONS_DIR and the
+index database lives next to them. The same sessions are listed through the
+index fast path and through the file-scan fallback, and both must return the
+same order, the same last-child markers and interchangeable cursors.
+
+Run with:
+  PYTHONPATH=src python test/test_session_index.py -v
+"""
+
+import asyncio
+import json
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.core import session_manager
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _session(session_id, updated, parent=None, sequence=0, archived=False):
+    genie_metadata = {}
+    if parent:
+        genie_metadata = {"is_genie_slave": True, "parent_session_id": parent, "slave_sequence_number": sequence}
+    return {
+        "id": session_id,
+        "user_uuid": "u1",
+        "name": session_id,
+        "created_at": updated,
+        "last_updated": updated,
+        "archived": archived,
+        "genie_metadata": genie_metadata,
+    }
+
+
+# A -> A1 -> A1a, A -> A2 (archived) -> A2x, A -> A3; C (archived) -> C1;
+# O's parent does not exist; D and E tie on last_updated.
+_SESSIONS = [
+    _session("A1a", "2026-01-05T00:00:00", parent="A1", sequence=1),
+    _session("A1", "2026-01-05T00:00:00", parent="A", sequence=1),
+    _session("A2x", "2026-01-05T00:00:00", parent="A2", sequence=1),
+    _session("A2", "2026-01-05T00:00:00", parent="A", sequence=2, archived=True),
+    _session("A3", "2026-01-05T00:00:00", parent="A", sequence=3),
+    _session("A", "2026-01-04T00:00:00"),
+    _session("C", "2026-01-06T00:00:00", archived=True),
+    _session("C1", "2026-01-03T00:00:00", parent="C", sequence=1),
+    _session("O", "2026-01-02T12:00:00", parent="missing", sequence=1),
+    _session("D", "2026-01-02T00:00:00"),
+    _session("E", "2026-01-02T00:00:00"),
+    _session("F", "2026-01-01T00:00:00"),
+]
+
+_EXPECTED_ORDER = ["A", "A1", "A1a", "A2x", "A3", "C1", "O", "E", "D", "F"]
+
+
+class _SessionIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        sessions_dir = Path(self._tmp.name)
+        self.user_dir = sessions_dir / "u1"
+        self.user_dir.mkdir()
+        self._patches = [
+            patch.object(session_manager, "SESSIONS_DIR", sessions_dir),
+            patch.object(session_manager, "SESSION_INDEX_DB", sessions_dir / "session_index.db"),
+            patch.object(session_manager, "_session_index_ready", False),
+            patch.object(session_manager, "_enrich_genie_slave_metadata", lambda summaries, user_uuid: None),
+            patch.object(session_manager.APP_CONFIG, "SESSIONS_FILTER_BY_USER", True),
+        ]
+        for p in self._patches:
+            p.start()
+        _run(session_manager._init_session_index())
+        self.assertTrue(session_manager._session_index_ready)
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+
+    def _write(self, sessions):
+        for data in sessions:
+            (self.user_dir / f"{data['id']}.json").write_text(json.dumps(data), encoding="utf-8")
+
+    def _index(self, sessions):
+        for data in sessions:
+            _run(session_manager._upsert_session_index(data["id"], data))
+
+    def _rows(self):
+        conn = sqlite3.connect(str(session_manager.SESSION_INDEX_DB))
+        try:
+            rows = conn.execute("SELECT session_id, genie_root_id, genie_path FROM session_index").fetchall()
+        finally:
+            conn.close()
+        return {session_id: (root, path) for session_id, root, path in rows}
+
+    def _list(self, use_index, **kwargs):
+        with patch.object(session_manager, "_session_index_ready", use_index):
+            return _run(session_manager.get_all_sessions("u1", **kwargs))
+
+    def _pages(self, use_index, limit, cursor_from=None):
+        ids, cursor = [], None
+        while True:
+            page = self._list(use_index, limit=limit, cursor=cursor)
+            ids.append([s["id"] for s in page["sessions"]])
+            if not page["has_more"]:
+                return ids
+            cursor = page["next_cursor"]
+            self.assertIsNotNone(cursor)
+
+
+# ---------------------------------------------------------------------------
+# Hierarchy columns
+# ---------------------------------------------------------------------------
+
+class TestGenieHierarchy(_SessionIndexTestCase):
+
+    def test_children_indexed_before_parent_are_relinked(self):
+        # _SESSIONS lists descendants before their ancestors
+        self._index(_SESSIONS)
+        rows = self._rows()
+        self.assertEqual(rows["A1a"], ("A", "/000001:A1/000001:A1a"))
+        self.assertEqual(rows["A2x"], ("A", "/000002:A2/000001:A2x"))
+        self.assertEqual(rows["A3"], ("A", "/000003:A3"))
+        self.assertEqual(rows["C1"], ("C", "/000001:C1"))
+        self.assertEqual(rows["O"], ("O", ""))
+
+    def test_full_refresh_matches_incremental_links(self):
+        self._index(_SESSIONS)
+        incremental = self._rows()
+        conn = sqlite3.connect(str(session_manager.SESSION_INDEX_DB))
+        conn.execute("UPDATE session_index SET genie_root_id = NULL, genie_path = ''")
+        conn.commit()
+        conn.close()
+
+        async def refresh():
+            import aiosqlite
+            async with aiosqlite.connect(str(session_manager.SESSION_INDEX_DB)) as db:
+                await session_manager._refresh_genie_hierarchy(db)
+                await db.commit()
+
+        _run(refresh())
+        self.assertEqual(self._rows(), incremental)
+
+    def test_scheduled_upsert_takes_values_when_scheduled(self):
+        data = _session("F", "2026-01-01T00:00:00")
+
+        async def scenario():
+            session_manager._schedule_session_index_upsert("F", data)
+            data["name"] = "changed by a later transaction"
+            pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            await asyncio.gather(*pending)
+
+        _run(scenario())
+        conn = sqlite3.connect(str(session_manager.SESSION_INDEX_DB))
+        try:
+            name = conn.execute("SELECT name FROM session_index WHERE session_id='F'").fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(name, "F")
+
+
+# ---------------------------------------------------------------------------
+# Listing: index fast path vs file-scan fallback
+# ---------------------------------------------------------------------------
+
+class TestSessionListing(_SessionIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._write(_SESSIONS)
+        self._index(_SESSIONS)
+
+    def test_both_paths_return_sidebar_order(self):
+        for use_index in (True, False):
+            with self.subTest(use_index=use_index):
+                page = self._list(use_index)
+                self.assertEqual([s["id"] for s in page["sessions"]], _EXPECTED_ORDER)
+                self.assertEqual(page["total_count"], len(_EXPECTED_ORDER))
+
+    def test_last_child_markers_match(self):
+        markers = {}
+        for use_index in (True, False):
+            page = self._list(use_index)
+            markers[use_index] = sorted(
+                s["id"] for s in page["sessions"] if s["genie_metadata"].get("is_last_child"))
+        self.assertEqual(markers[True], markers[False])
+        self.assertEqual(markers[True], ["A1a", "A2x", "A3", "C1", "O"])
+
+    def test_cursor_pages_match(self):
+        for limit in (1, 3, 4):
+            with self.subTest(limit=limit):
+                index_pages = self._pages(True, limit)
+                scan_pages = self._pages(False, limit)
+                self.assertEqual(index_pages, scan_pages)
+                self.assertEqual(sum(index_pages, []), _EXPECTED_ORDER)
+
+    def test_cursor_is_portable_between_paths(self):
+        first = self._list(True, limit=4)
+        rest = self._list(False, cursor=first["next_cursor"])
+        self.assertEqual([s["id"] for s in first["sessions"] + rest["sessions"]], _EXPECTED_ORDER)
+
+    def test_cursor_continues_after_newer_session_is_added(self):
+        for use_index in (True, False):
+            with self.subTest(use_index=use_index):
+                before = [s["id"] for s in self._list(use_index)["sessions"]]
+                first = self._list(use_index, limit=3)
+                newest = _session(f"N{use_index}", "2026-02-01T00:00:00")
+                self._write([newest])
+                self._index([newest])
+                # Keyset pages neither repeat nor skip rows when a session moves to the top
+                rest = self._list(use_index, cursor=first["next_cursor"])
+                self.assertEqual([s["id"] for s in first["sessions"] + rest["sessions"]], before)
+
+    def test_offset_pages_match(self):
+        for use_index in (True, False):
+            with self.subTest(use_index=use_index):
+                page = self._list(use_index, limit=3, offset=3)
+                self.assertEqual([s["id"] for s in page["sessions"]], _EXPECTED_ORDER[3:6])
+                self.assertTrue(page["has_more"])
+
+    def test_malformed_cursor_raises_on_both_paths(self):
+        for use_index in (True, False):
+            with self.subTest(use_index=use_index):
+                with self.assertRaises(ValueError):
+                    self._list(use_index, limit=2, cursor="not-a-cursor")
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,250 @@
+"""
+Unit tests for journal-mode session storage (core/session_journal.py).
+
+Covers journal replay (including the read-only helpers used by code that
+scans session files directly), compaction, torn/corrupt journal lines and
+journals that do not match their snapshot.
+Everything runs against a temporary directory.
+
+Run with:
+  PYTHONPATH=src python test/test_session_journal.py -v
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.core import session_journal
+from trusted_data_agent.core.session_journal import (
+    journal_path_for,
+    load_journaled,
+    read_session,
+    read_session_sync,
+    save_journaled,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _session(turns: int = 0) -> dict:
+    return {
+        "id": "s1",
+        "name": "Journal test",
+        "archived": False,
+        "chat_object": [{"role": "user", "content": f"q{i}"} for i in range(turns)],
+        "last_turn_data": {"workflow_history": [{"turn": i + 1} for i in range(turns)]},
+    }
+
+
+class _JournalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "s1.json"
+        session_journal._states.clear()
+        session_journal._generations.clear()
+
+    def tearDown(self):
+        session_journal._states.clear()
+        session_journal._generations.clear()
+        self._tmp.cleanup()
+
+    def _save(self, data, compact_entries=1000, compact_bytes=10**9):
+        _run(save_journaled(self.path, data, compact_entries, compact_bytes))
+
+    def _journal_lines(self):
+        journal = journal_path_for(self.path)
+        if not journal.is_file():
+            return []
+        return journal.read_text(encoding="utf-8").splitlines()
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class TestJournalReplay(_JournalTestCase):
+
+    def test_deltas_replay_over_snapshot(self):
+        data = _session()
+        self._save(data)  # First save writes the baseline snapshot
+        for i in range(3):
+            data["chat_object"].append({"role": "user", "content": f"q{i}"})
+            data["last_turn_data"]["workflow_history"].append({"turn": i + 1})
+            self._save(data)
+        data["name"] = "Renamed"
+        del data["archived"]
+        self._save(data)
+
+        self.assertEqual(len(self._journal_lines()), 4)
+        # The snapshot alone is stale; replay brings it up to date
+        snapshot = json.loads(self.path.read_text(encoding="utf-8"))
+        self.assertEqual(snapshot["chat_object"], [])
+        self.assertEqual(_run(load_journaled(self.path)), data)
+
+    def test_read_helpers_replay_journal(self):
+        """The read-only helpers see journaled changes that are not in the snapshot."""
+        data = _session(turns=1)
+        self._save(data)
+        data["chat_object"].append({"role": "assistant", "content": "a"})
+        data["archived"] = True
+        self._save(data)
+
+        self.assertEqual(read_session_sync(self.path), data)
+        self.assertEqual(_run(read_session(self.path)), data)
+
+    def test_read_helpers_do_not_record_baseline(self):
+        data = _session()
+        self._save(data)
+        session_journal._states.clear()
+        read_session_sync(self.path)
+        _run(read_session(self.path))
+        self.assertNotIn(str(self.path), session_journal._states)
+
+    def test_plain_snapshot_without_journal(self):
+        data = _session(turns=2)
+        self.path.write_text(json.dumps(data), encoding="utf-8")
+        self.assertEqual(read_session_sync(self.path), data)
+        self.assertEqual(_run(load_journaled(self.path)), data)
+
+    def test_in_place_list_edit_replays(self):
+        data = _session(turns=3)
+        self._save(data)
+        data["last_turn_data"]["workflow_history"][1]["isValid"] = False
+        self._save(data)
+        self.assertEqual(read_session_sync(self.path), data)
+
+    def test_sections_limit_what_is_diffed(self):
+        data = _session(turns=2)
+        self._save(data)
+        data["chat_object"].append({"role": "assistant", "content": "a"})
+        data["provider"] = "Google"  # new keys are always picked up
+        del data["archived"]  # and so are removed ones
+        _run(save_journaled(self.path, data, 1000, 10**9, sections={"chat_object"}))
+        self.assertEqual(read_session_sync(self.path), data)
+
+        # Undeclared sections are not even looked at
+        data["name"] = "Renamed"
+        with patch.object(session_journal, "_leaf_fingerprint", wraps=session_journal._leaf_fingerprint) as fp:
+            _run(save_journaled(self.path, data, 1000, 10**9, sections=()))
+        fp.assert_not_called()
+        self.assertEqual(len(self._journal_lines()), 1)
+        _run(save_journaled(self.path, data, 1000, 10**9, sections={"name"}))
+        self.assertEqual(read_session_sync(self.path), data)
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+class TestJournalCompaction(_JournalTestCase):
+
+    def test_compacts_after_entry_threshold(self):
+        data = _session()
+        self._save(data, compact_entries=3)
+        for i in range(2):
+            data["chat_object"].append({"role": "user", "content": f"q{i}"})
+            self._save(data, compact_entries=3)
+        self.assertEqual(len(self._journal_lines()), 2)
+
+        data["chat_object"].append({"role": "user", "content": "q2"})
+        self._save(data, compact_entries=3)
+
+        self.assertFalse(journal_path_for(self.path).exists())
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8")), data)
+
+    def test_saves_after_compaction_append_again(self):
+        data = _session()
+        self._save(data, compact_entries=1)
+        data["name"] = "n1"
+        self._save(data, compact_entries=1)  # Compacts immediately
+        data["name"] = "n2"
+        self._save(data)
+        self.assertEqual(len(self._journal_lines()), 1)
+        self.assertEqual(read_session_sync(self.path)["name"], "n2")
+
+    def test_fold_journal(self):
+        data = _session()
+        self._save(data)
+        data["name"] = "folded"
+        self._save(data)
+        self.assertTrue(_run(session_journal.fold_journal(self.path)))
+        self.assertFalse(journal_path_for(self.path).exists())
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8"))["name"], "folded")
+        self.assertFalse(_run(session_journal.fold_journal(self.path)))
+
+
+# ---------------------------------------------------------------------------
+# Corrupt journals
+# ---------------------------------------------------------------------------
+
+class TestCorruptJournal(_JournalTestCase):
+
+    def test_torn_trailing_line_is_ignored(self):
+        data = _session()
+        self._save(data)
+        data["name"] = "kept"
+        self._save(data)
+        with open(journal_path_for(self.path), "a", encoding="utf-8") as f:
+            f.write('{"ops":[{"op":"set","path":["name"],"val')
+
+        self.assertEqual(read_session_sync(self.path)["name"], "kept")
+        self.assertEqual(_run(read_session(self.path))["name"], "kept")
+        self.assertEqual(_run(load_journaled(self.path))["name"], "kept")
+
+    def test_corrupt_middle_line_raises(self):
+        data = _session()
+        self._save(data)
+        journal = journal_path_for(self.path)
+        journal.write_text(
+            "not json\n" + json.dumps({"ops": [{"op": "set", "path": ["name"], "value": "x"}]}) + "\n",
+            encoding="utf-8",
+        )
+        with self.assertRaises(json.JSONDecodeError):
+            read_session_sync(self.path)
+        with self.assertRaises(json.JSONDecodeError):
+            _run(load_journaled(self.path))
+
+    def test_extend_past_short_list_falls_back_to_last_fitting_entry(self):
+        data = _session(turns=1)
+        self._save(data)
+        data["name"] = "kept"
+        self._save(data)
+        with open(journal_path_for(self.path), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ops": [
+                {"op": "set", "path": ["name"], "value": "dropped"},
+                {"op": "extend", "path": ["chat_object"], "at": 5, "items": [{"role": "user"}]},
+            ]}) + "\n")
+
+        self.assertEqual(read_session_sync(self.path), data)
+        self.assertEqual(_run(read_session(self.path)), data)
+        session_journal._states.clear()
+        self.assertEqual(_run(load_journaled(self.path)), data)
+        # No baseline: the next save rewrites the snapshot and drops the journal
+        self.assertNotIn(str(self.path), session_journal._states)
+        self._save(data)
+        self.assertEqual(self._journal_lines(), [])
+        self.assertEqual(json.loads(self.path.read_text(encoding="utf-8")), data)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,423 @@
+"""
+Unit tests for the REST background task registry (core/task_registry.py) and
+the task status endpoints built on it (GET /v1/tasks/<id>/wait and
+GET /v1/tasks/<id>/stream).
+
+Covers TTL and size-cap eviction, event spill to SQLite through the writer
+thread (and dropping when no spill file is configured), wait_for_change, and
+the long-poll / SSE routes driven through a Quart test client with
+authentication patched out.
+
+Run with:
+  PYTHONPATH=src python test/test_task_registry.py -v
+"""
+
+import asyncio
+import json
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.core.task_registry import TaskRegistry
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _registry(**kwargs) -> TaskRegistry:
+    kwargs.setdefault("spill_db_path", "")
+    return TaskRegistry(**kwargs)
+
+
+def _create(registry: TaskRegistry, task_id: str, user_uuid: str = "u1", status: str = "pending"):
+    return registry.create(task_id, {"task_id": task_id, "user_uuid": user_uuid, "status": status})
+
+
+# ---------------------------------------------------------------------------
+# Eviction
+# ---------------------------------------------------------------------------
+
+class TestEviction(unittest.TestCase):
+
+    def test_finished_tasks_expire_after_ttl(self):
+        registry = _registry(ttl_seconds=0.05)
+        _create(registry, "done")
+        _create(registry, "running")
+        registry.update("done", status="complete")
+        time.sleep(0.1)
+        _create(registry, "new")  # Eviction runs on writes
+
+        self.assertNotIn("done", registry)
+        self.assertIn("running", registry)
+        self.assertEqual(registry.get_stats()["evicted"], 1)
+
+    def test_oldest_finished_tasks_go_first_over_max(self):
+        registry = _registry(max_tasks=2)
+        for task_id in ("a", "b", "c"):
+            _create(registry, task_id)
+            registry.update(task_id, status="complete")
+
+        self.assertEqual(sorted(registry), ["b", "c"])
+
+    def test_running_tasks_are_never_evicted(self):
+        registry = _registry(max_tasks=1, ttl_seconds=0)
+        for task_id in ("a", "b", "c"):
+            _create(registry, task_id)
+        self.assertEqual(len(registry), 3)
+
+    def test_reopened_task_is_not_evictable(self):
+        registry = _registry(ttl_seconds=0.05)
+        _create(registry, "t")
+        registry.update("t", status="complete")
+        registry.update("t", status="cancelling")
+        time.sleep(0.1)
+        _create(registry, "other")
+        self.assertIn("t", registry)
+
+
+# ---------------------------------------------------------------------------
+# Events and spill
+# ---------------------------------------------------------------------------
+
+class TestEvents(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.spill_path = str(Path(self._tmp.name) / "task_events.db")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _spill_registry(self, **kwargs) -> TaskRegistry:
+        registry = _registry(spill_db_path=self.spill_path, **kwargs)
+        self.addCleanup(registry.close)
+        return registry
+
+    def _events(self, registry, task_id, since=0):
+        return [json.loads(e)["n"] for e in registry.event_strings(task_id, since)]
+
+    def _stored_rows(self) -> int:
+        conn = sqlite3.connect(self.spill_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM task_events").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_spilled_events_are_read_back_in_order(self):
+        registry = self._spill_registry(max_events_in_memory=10)
+        _create(registry, "t")
+        for n in range(35):
+            registry.append_event("t", {"n": n})
+
+        self.assertEqual(self._events(registry, "t"), list(range(35)))
+        self.assertEqual(self._events(registry, "t", since=7), list(range(7, 35)))
+        snapshot = registry.snapshot("t")
+        self.assertEqual(snapshot["event_count"], 35)
+        self.assertEqual(snapshot["events_dropped"], 0)
+        self.assertGreater(registry.get_stats()["events_spilled"], 0)
+
+    def test_without_spill_file_events_are_dropped_and_reported(self):
+        registry = _registry(max_events_in_memory=10)
+        _create(registry, "t")
+        for n in range(30):
+            registry.append_event("t", {"n": n})
+
+        snapshot = registry.snapshot("t")
+        self.assertEqual(snapshot["event_count"], 30)
+        self.assertGreater(snapshot["events_dropped"], 0)
+        self.assertEqual(len(snapshot["events"]) + snapshot["events_dropped"], 30)
+        self.assertEqual(self._events(registry, "t")[-1], 29)
+
+    def test_snapshot_reports_zero_dropped(self):
+        registry = _registry()
+        _create(registry, "t")
+        self.assertEqual(registry.snapshot("t")["events_dropped"], 0)
+
+    def test_spilled_events_are_stored_by_the_writer(self):
+        registry = self._spill_registry(max_events_in_memory=4)
+        _create(registry, "t")
+        for n in range(20):
+            registry.append_event("t", {"n": n})
+        registry.flush_spill()
+        self.assertEqual(self._stored_rows(), registry.snapshot("t")["event_count"] - len(registry._entries["t"].events))
+
+    def test_discard_removes_spilled_rows(self):
+        registry = self._spill_registry(max_events_in_memory=4)
+        _create(registry, "t")
+        for n in range(20):
+            registry.append_event("t", {"n": n})
+        registry.discard("t")
+        registry.flush_spill()
+        self.assertEqual(self._stored_rows(), 0)
+
+    def test_shared_spill_file_keeps_other_processes_rows(self):
+        first = self._spill_registry(max_events_in_memory=4)
+        _create(first, "t")
+        for n in range(20):
+            first.append_event("t", {"n": n})
+        first.flush_spill()
+
+        # A second worker opening the same file must not wipe live rows
+        second = self._spill_registry(max_events_in_memory=4)
+        second._spill_writer.read("t", 0, 1)
+        self.assertEqual(self._stored_rows(), 18)
+        self.assertEqual(self._events(first, "t"), list(range(20)))
+
+    def test_append_and_discard_never_touch_sqlite(self):
+        registry = self._spill_registry(max_events_in_memory=4)
+        writer = registry._spill_writer
+        calling_threads = []
+        write = writer._write
+
+        def record_write(batch):
+            calling_threads.append(threading.get_ident())
+            write(batch)
+
+        with patch.object(writer, "_write", record_write):
+            _create(registry, "t")
+            for n in range(20):
+                registry.append_event("t", {"n": n})
+            registry.discard("t")
+            registry.flush_spill()
+        self.assertTrue(calling_threads)
+        self.assertNotIn(threading.get_ident(), calling_threads)
+
+    def test_queued_events_are_readable_before_they_are_written(self):
+        registry = self._spill_registry(max_events_in_memory=4)
+        release = threading.Event()
+        write = registry._spill_writer._write
+        with patch.object(registry._spill_writer, "_write", lambda batch: release.wait(5) and write(batch)):
+            _create(registry, "t")
+            for n in range(20):
+                registry.append_event("t", {"n": n})
+            self.assertEqual(self._events(registry, "t"), list(range(20)))
+            release.set()
+            registry.flush_spill()
+        self.assertEqual(self._events(registry, "t"), list(range(20)))
+        self.assertEqual(registry._spill_writer._pending, {})
+
+    def test_failed_spill_is_reported_as_dropped(self):
+        registry = self._spill_registry(max_events_in_memory=4)
+
+        def fail(*args):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with patch.object(registry._spill_writer, "_get_conn", fail):
+            _create(registry, "t")
+            for n in range(10):
+                registry.append_event("t", {"n": n})
+            registry.flush_spill()
+            snapshot = registry.snapshot("t")
+        self.assertEqual(snapshot["events_dropped"], 6)
+        self.assertEqual([e["n"] for e in snapshot["events"]], [6, 7, 8, 9])
+        stats = registry.get_stats()
+        self.assertEqual((stats["events_spilled"], stats["events_dropped"]), (0, 6))
+
+    def test_full_spill_queue_drops_events(self):
+        registry = self._spill_registry(max_events_in_memory=4)
+        registry._spill_writer._queue = queue.Queue(maxsize=1)
+        release = threading.Event()
+        write = registry._spill_writer._write
+        with patch.object(registry._spill_writer, "_write", lambda batch: release.wait(5) and write(batch)):
+            _create(registry, "t")
+            for n in range(20):
+                registry.append_event("t", {"n": n})
+            release.set()
+        self.assertGreater(registry.snapshot("t")["events_dropped"], 0)
+        self.assertEqual(self._events(registry, "t")[-1], 19)
+
+    def test_async_reads_match_sync_reads(self):
+        registry = self._spill_registry(max_events_in_memory=10)
+        _create(registry, "t")
+        for n in range(35):
+            registry.append_event("t", {"n": n})
+        registry.flush_spill()
+
+        self.assertEqual(_run(registry.event_strings_async("t", 3)), registry.event_strings("t", 3))
+        self.assertEqual(_run(registry.snapshot_json_async("t")), registry.snapshot_json("t"))
+        self.assertEqual(_run(registry.snapshot_async("t"))["event_count"], 35)
+        self.assertIsNone(_run(registry.snapshot_json_async("missing")))
+
+    def test_relative_spill_path_resolves_against_project_root(self):
+        registry = _registry(spill_db_path="task_events_test.db")
+        with patch("trusted_data_agent.core.utils.get_project_root", return_value=Path(self._tmp.name)):
+            self.assertEqual(registry._resolve_spill_path(), self.spill_path.replace("task_events.db", "task_events_test.db"))
+
+
+# ---------------------------------------------------------------------------
+# wait_for_change
+# ---------------------------------------------------------------------------
+
+class TestWaitForChange(unittest.TestCase):
+
+    def test_returns_immediately_when_version_moved(self):
+        registry = _registry()
+        _create(registry, "t")
+        registry.update("t", status="running")
+        self.assertTrue(_run(registry.wait_for_change("t", 0, timeout=5)))
+
+    def test_wakes_on_event(self):
+        async def scenario():
+            registry = _registry()
+            _create(registry, "t")
+            version = registry.version("t")
+            waiter = asyncio.ensure_future(registry.wait_for_change("t", version, timeout=5))
+            await asyncio.sleep(0.01)
+            registry.append_event("t", {"n": 1})
+            return await waiter
+
+        self.assertTrue(_run(scenario()))
+
+    def test_times_out_without_change(self):
+        registry = _registry()
+        _create(registry, "t")
+        self.assertFalse(_run(registry.wait_for_change("t", registry.version("t"), timeout=0.02)))
+
+    def test_wakes_when_task_is_discarded(self):
+        async def scenario():
+            registry = _registry()
+            _create(registry, "t")
+            waiter = asyncio.ensure_future(registry.wait_for_change("t", registry.version("t"), timeout=5))
+            await asyncio.sleep(0.01)
+            registry.discard("t")
+            return await waiter
+
+        self.assertTrue(_run(scenario()))
+
+
+# ---------------------------------------------------------------------------
+# /wait and /stream endpoints
+# ---------------------------------------------------------------------------
+
+class TestTaskEndpoints(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from quart import Quart
+        from trusted_data_agent.api import rest_routes
+        cls.rest_routes = rest_routes
+        app = Quart(__name__)
+        app.register_blueprint(rest_routes.rest_api_bp, url_prefix="/api")
+        cls.app = app
+
+    def setUp(self):
+        from trusted_data_agent.core.config import APP_STATE
+        self.registry = _registry()
+        self._patches = [
+            patch.dict(APP_STATE, {"background_tasks": self.registry}),
+            patch.object(self.rest_routes, "_get_user_uuid_from_request", return_value="u1"),
+        ]
+        for p in self._patches:
+            p.start()
+        _create(self.registry, "t1", status="running")
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    def test_wait_returns_on_next_change(self):
+        async def scenario():
+            client = self.app.test_client()
+            request = asyncio.ensure_future(client.get("/api/v1/tasks/t1/wait?timeout=5"))
+            await asyncio.sleep(0.05)
+            self.registry.append_event("t1", {"n": 1})
+            response = await request
+            return response.status_code, await response.get_json()
+
+        status, body = _run(scenario())
+        self.assertEqual(status, 200)
+        self.assertEqual(body["events"], [{"n": 1}])
+        self.assertEqual(body["event_count"], 1)
+
+    def test_wait_times_out_with_current_state(self):
+        async def scenario():
+            response = await self.app.test_client().get("/api/v1/tasks/t1/wait?timeout=0.05")
+            return response.status_code, await response.get_json()
+
+        status, body = _run(scenario())
+        self.assertEqual(status, 200)
+        self.assertEqual(body["status"], "running")
+
+    def test_wait_since_event_returns_only_new_events(self):
+        for n in range(3):
+            self.registry.append_event("t1", {"n": n})
+
+        async def scenario():
+            version = self.registry.version("t1")
+            response = await self.app.test_client().get(
+                f"/api/v1/tasks/t1/wait?version={version - 1}&since_event=2")
+            return await response.get_json()
+
+        self.assertEqual(_run(scenario())["events"], [{"n": 2}])
+
+    def test_wait_rejects_other_users_and_unknown_tasks(self):
+        _create(self.registry, "foreign", user_uuid="u2")
+
+        async def scenario():
+            client = self.app.test_client()
+            foreign = await client.get("/api/v1/tasks/foreign/wait?timeout=0")
+            missing = await client.get("/api/v1/tasks/missing/wait?timeout=0")
+            return foreign.status_code, missing.status_code
+
+        self.assertEqual(_run(scenario()), (403, 404))
+
+    def test_stream_sends_events_then_completion(self):
+        self.registry.append_event("t1", {"n": 0})
+
+        async def scenario():
+            async def finish():
+                await asyncio.sleep(0.05)
+                self.registry.append_event("t1", {"n": 1})
+                self.registry.update("t1", status="complete", result={"ok": True})
+
+            finisher = asyncio.ensure_future(finish())
+            response = await self.app.test_client().get("/api/v1/tasks/t1/stream")
+            body = (await response.get_data()).decode()
+            await finisher
+            return response.status_code, body
+
+        status, body = _run(scenario())
+        self.assertEqual(status, 200)
+        frames = [f for f in body.split("\n\n") if f.strip()]
+        events = [json.loads(f.split("data: ", 1)[1]) for f in frames if f.startswith("event: task_event")]
+        self.assertEqual(events, [{"n": 0}, {"n": 1}])
+        self.assertTrue(frames[-1].startswith("event: task_complete"))
+        self.assertEqual(json.loads(frames[-1].split("data: ", 1)[1])["result"], {"ok": True})
+
+    def test_stream_reports_evicted_task(self):
+        async def scenario():
+            async def evict():
+                await asyncio.sleep(0.05)
+                self.registry.discard("t1")
+
+            evictor = asyncio.ensure_future(evict())
+            response = await self.app.test_client().get("/api/v1/tasks/t1/stream")
+            body = (await response.get_data()).decode()
+            await evictor
+            return body
+
+        self.assertIn("event: task_evicted", _run(scenario()))
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
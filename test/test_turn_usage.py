@@ -0,0 +1,285 @@
+"""
+Unit tests for per-turn usage batching in core/session_manager.py
+(turn_usage_scope, flush_turn_usage, update_token_count, update_models_used).
+
+Session storage is replaced by an in-memory store that counts saves and can be
+told to fail, and the auth-database writes (_record_quota_usage) are recorded
+instead of executed.
+
+Run with:
+  PYTHONPATH=src python test/test_turn_usage.py -v
+"""
+
+import asyncio
+import copy
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.core import session_manager
+from trusted_data_agent.core.session_manager import (
+    flush_turn_usage,
+    turn_usage_scope,
+    update_models_used,
+    update_token_count,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+class _Store:
+    """In-memory stand-in for _load_session / _save_session."""
+
+    def __init__(self):
+        self.sessions = {("u1", "s1"): {"id": "s1", "input_tokens": 0, "output_tokens": 0}}
+        self.saves = 0
+        self.fail_saves = 0
+        self.sections = []
+
+    async def load(self, user_uuid, session_id, checkout=False):
+        data = self.sessions.get((user_uuid, session_id))
+        return copy.deepcopy(data) if data is not None else None
+
+    async def save(self, user_uuid, session_id, session_data, handoff=False, sections=None):
+        if self.fail_saves:
+            self.fail_saves -= 1
+            return False
+        self.saves += 1
+        self.sections.append(sections)
+        self.sessions[(user_uuid, session_id)] = copy.deepcopy(session_data)
+        return True
+
+    def session(self):
+        return self.sessions[("u1", "s1")]
+
+
+class _TurnUsageTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = _Store()
+        self.quota = MagicMock()
+        self._patches = [
+            patch.object(session_manager, "_load_session", self.store.load),
+            patch.object(session_manager, "_save_session", self.store.save),
+            patch.object(session_manager, "_record_quota_usage", self.quota),
+            patch.object(session_manager.APP_CONFIG, "SESSION_USAGE_BATCHING_ENABLED", True),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+
+    async def _llm_call(self, input_tokens=10, output_tokens=5, model="m1"):
+        await update_token_count("u1", "s1", input_tokens, output_tokens)
+        await update_models_used("u1", "s1", "prov", model, profile_tag="TAG", planning_phase="tactical")
+
+
+# ---------------------------------------------------------------------------
+# Batching
+# ---------------------------------------------------------------------------
+
+class TestTurnUsageBatching(_TurnUsageTestCase):
+
+    def test_calls_in_scope_are_saved_once_at_exit(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                for model in ("m1", "m2", "m1"):
+                    await self._llm_call(model=model)
+                saves_inside = self.store.saves
+            return saves_inside
+
+        self.assertEqual(_run(scenario()), 0)
+        self.assertEqual(self.store.saves, 1)
+        session = self.store.session()
+        self.assertEqual((session["input_tokens"], session["output_tokens"]), (30, 15))
+        self.assertEqual(session["models_used"], ["prov/m1", "prov/m2"])
+        self.assertEqual(session["dual_model_usage"]["tactical"], ["prov/m1", "prov/m2"])
+        self.assertEqual(session["model"], "m1")
+        self.quota.assert_called_once_with("u1", 30, 15, 3)
+
+    def test_calls_outside_scope_write_immediately(self):
+        _run(self._llm_call())
+        self.assertEqual(self.store.saves, 2)
+        self.quota.assert_called_once_with("u1", 10, 5)
+
+    def test_batching_disabled_writes_per_call(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                await self._llm_call()
+
+        with patch.object(session_manager.APP_CONFIG, "SESSION_USAGE_BATCHING_ENABLED", False):
+            _run(scenario())
+        self.assertEqual(self.store.saves, 4)
+        self.assertEqual(self.quota.call_count, 2)
+
+    def test_nested_scope_joins_outer(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                async with turn_usage_scope("u1", "s1"):
+                    await self._llm_call()
+                saves_after_inner = self.store.saves
+                await self._llm_call()
+            return saves_after_inner
+
+        self.assertEqual(_run(scenario()), 0)
+        self.assertEqual(self.store.saves, 1)
+        self.quota.assert_called_once_with("u1", 20, 10, 2)
+
+    def test_other_session_is_not_batched(self):
+        self.store.sessions[("u1", "s2")] = {"id": "s2"}
+
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await update_token_count("u1", "s2", 1, 1)
+                return self.store.saves
+
+        self.assertEqual(_run(scenario()), 1)
+        self.assertEqual(self.store.sessions[("u1", "s2")]["input_tokens"], 1)
+
+    def test_usage_after_scope_closed_is_written_immediately(self):
+        async def scenario():
+            release = asyncio.Event()
+
+            async def late_call():
+                await release.wait()
+                await update_token_count("u1", "s1", 7, 3)
+
+            async with turn_usage_scope("u1", "s1"):
+                task = asyncio.ensure_future(late_call())  # Copies the scope's context
+            release.set()
+            await task
+
+        _run(scenario())
+        self.assertEqual(self.store.session()["input_tokens"], 7)
+        self.quota.assert_called_once_with("u1", 7, 3)
+
+
+# ---------------------------------------------------------------------------
+# Flushing, including error paths
+# ---------------------------------------------------------------------------
+
+class TestFlushTurnUsage(_TurnUsageTestCase):
+
+    def test_flush_applies_queue_in_one_save(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                await self._llm_call()
+                await flush_turn_usage("u1", "s1")
+                return self.store.saves, copy.deepcopy(self.store.session())
+
+        saves_after_flush, session = _run(scenario())
+        self.assertEqual(saves_after_flush, 1)
+        self.assertEqual(session["input_tokens"], 20)
+        # Nothing left to write at scope exit
+        self.assertEqual(self.store.saves, 1)
+        self.quota.assert_called_once_with("u1", 20, 10, 2)
+
+    def test_get_session_sees_queued_usage(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                history_only = await session_manager.get_session("u1", "s1", apply_turn_usage=False)
+                current = await session_manager.get_session("u1", "s1")
+            return history_only, current
+
+        history_only, current = _run(scenario())
+        self.assertEqual(history_only["input_tokens"], 0)
+        self.assertEqual(current["input_tokens"], 10)
+
+    def test_failed_flush_save_keeps_updates_queued(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                self.store.fail_saves = 1
+                await flush_turn_usage("u1", "s1")
+                tokens_after_failed_flush = self.store.session()["input_tokens"]
+                await self._llm_call()
+            return tokens_after_failed_flush
+
+        self.assertEqual(_run(scenario()), 0)
+        session = self.store.session()
+        self.assertEqual(session["input_tokens"], 20)
+        self.assertEqual(session["models_used"], ["prov/m1"])
+        self.assertEqual(self.store.saves, 1)
+
+    def test_failed_writer_transaction_keeps_updates_queued(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                with self.assertRaises(RuntimeError):
+                    async with session_manager._session_transaction("u1", "s1") as session_data:
+                        session_data["name"] = "renamed"
+                        raise RuntimeError("writer failed")
+                return self.store.saves
+
+        self.assertEqual(_run(scenario()), 0)
+        session = self.store.session()
+        self.assertEqual(session["input_tokens"], 10)
+        self.assertNotIn("name", session)
+
+    def test_save_declares_sections_touched_by_applied_usage(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                async with session_manager._session_transaction("u1", "s1", sections={"name"}) as session_data:
+                    session_data["name"] = "renamed"
+                await self._llm_call()
+                async with session_manager._session_transaction("u1", "s1") as session_data:
+                    session_data["name"] = "again"
+
+        _run(scenario())
+        self.assertEqual(self.store.sections[0], {
+            "name", "input_tokens", "output_tokens", "models_used", "dual_model_usage",
+            "profile_tags_used", "provider", "model", "profile_tag",
+        })
+        self.assertIsNone(self.store.sections[1])
+
+    def test_flush_on_missing_session_drops_queue(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "missing"):
+                await update_token_count("u1", "missing", 4, 2)
+                await flush_turn_usage("u1", "missing")
+
+        _run(scenario())
+        self.assertEqual(self.store.saves, 0)
+        # Quota usage is still recorded for the tokens spent
+        self.quota.assert_called_once_with("u1", 4, 2, 1)
+
+    def test_failed_turn_still_persists_usage(self):
+        async def scenario():
+            async with turn_usage_scope("u1", "s1"):
+                await self._llm_call()
+                raise ValueError("turn failed")
+
+        with self.assertRaises(ValueError):
+            _run(scenario())
+        self.assertEqual(self.store.session()["input_tokens"], 10)
+        self.quota.assert_called_once_with("u1", 10, 5, 1)
+
+    def test_flush_outside_scope_is_a_no_op(self):
+        _run(flush_turn_usage("u1", "s1"))
+        self.assertEqual(self.store.saves, 0)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,203 @@
+"""
+Unit tests for the in-memory usage ledger (auth/usage_ledger.py).
+
+The auth database is replaced by an in-memory SQLite engine holding only the
+tables the ledger needs. Several UsageLedger instances on the same engine
+stand in for several worker processes.
+
+Run with:
+  PYTHONPATH=src python test/test_usage_ledger.py -v
+"""
+
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# ---------------------------------------------------------------------------
+# Path setup
+# ---------------------------------------------------------------------------
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trusted_data_agent.auth import database
+from trusted_data_agent.auth.models import Base, ConsumptionProfile, User, UserTokenUsage
+from trusted_data_agent.auth.usage_ledger import UsageLedger, current_period
+from trusted_data_agent.core.config import APP_CONFIG
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class _LedgerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine, tables=[
+            ConsumptionProfile.__table__, User.__table__, UserTokenUsage.__table__,
+        ])
+        database.SessionLocal.configure(bind=engine)
+        self.addCleanup(database.SessionLocal.configure, bind=database.engine)
+        self.addCleanup(engine.dispose)
+
+        self._patches = [
+            patch.object(APP_CONFIG, "CONSUMPTION_LEDGER_CHECKPOINT_SECONDS", 3600),
+            patch.object(APP_CONFIG, "CONSUMPTION_PROFILE_CACHE_TTL_SECONDS", 60),
+        ]
+        for p in self._patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.period = current_period()
+
+    def _ledger(self) -> UsageLedger:
+        ledger = UsageLedger()
+        self.addCleanup(ledger.shutdown, timeout=1)
+        return ledger
+
+    def _stored(self, user_id="u1"):
+        with database.get_db_session() as session:
+            row = session.query(UserTokenUsage).filter_by(user_id=user_id, period=self.period).one_or_none()
+            if row is None:
+                return None
+            return row.input_tokens_used, row.output_tokens_used, row.total_tokens_used
+
+    def _insert(self, input_used, output_used, user_id="u1"):
+        now = datetime.now(timezone.utc)
+        with database.get_db_session() as session:
+            session.add(UserTokenUsage(
+                user_id=user_id, period=self.period, input_tokens_used=input_used,
+                output_tokens_used=output_used, total_tokens_used=input_used + output_used,
+                first_usage_at=now, last_usage_at=now,
+            ))
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+class TestCheckpoint(_LedgerTestCase):
+
+    def test_usage_is_held_until_checkpoint(self):
+        ledger = self._ledger()
+        ledger.record_usage("u1", 10, 5)
+        ledger.record_usage("u1", 10, 5)
+        self.assertIsNone(self._stored())
+        self.assertEqual(ledger.get_usage("u1")["total_tokens_used"], 30)
+
+        self.assertEqual(ledger.checkpoint(), 1)
+        self.assertEqual(self._stored(), (20, 10, 30))
+        self.assertEqual(ledger.checkpoint(), 0)
+
+    def test_checkpoints_add_to_stored_totals(self):
+        self._insert(100, 50)
+        ledger = self._ledger()
+        ledger.record_usage("u1", 10, 5)
+        ledger.checkpoint()
+        ledger.record_usage("u1", 1, 1)
+        ledger.checkpoint()
+        self.assertEqual(self._stored(), (111, 56, 167))
+        self.assertEqual(ledger.get_usage("u1")["input_tokens_used"], 111)
+
+    def test_workers_creating_the_same_period_both_count(self):
+        first, second = self._ledger(), self._ledger()
+        # Both load "no row yet" before either writes
+        first.record_usage("u1", 10, 0)
+        second.record_usage("u1", 7, 0)
+        first.checkpoint()
+        second.checkpoint()
+
+        self.assertEqual(self._stored(), (17, 0, 17))
+        # The refresh after each checkpoint folds in the other worker's usage
+        first.checkpoint()
+        self.assertEqual(first.get_usage("u1")["input_tokens_used"], 17)
+        self.assertEqual(second.get_usage("u1")["input_tokens_used"], 17)
+
+    def test_failed_checkpoint_restores_deltas(self):
+        ledger = self._ledger()
+        ledger.record_usage("u1", 10, 5)
+        with patch.object(UsageLedger, "_write", side_effect=RuntimeError("database is locked")):
+            self.assertEqual(ledger.checkpoint(), 0)
+        self.assertIsNone(self._stored())
+        self.assertEqual(ledger.get_usage("u1")["total_tokens_used"], 15)
+
+        ledger.record_usage("u1", 1, 0)
+        self.assertEqual(ledger.checkpoint(), 1)
+        self.assertEqual(self._stored(), (11, 5, 16))
+        self.assertEqual(ledger.get_usage("u1")["total_tokens_used"], 16)
+
+    def test_zero_interval_writes_every_record(self):
+        ledger = self._ledger()
+        with patch.object(APP_CONFIG, "CONSUMPTION_LEDGER_CHECKPOINT_SECONDS", 0):
+            ledger.record_usage("u1", 3, 2)
+        self.assertEqual(self._stored(), (3, 2, 5))
+        self.assertIsNone(ledger._thread)
+
+
+# ---------------------------------------------------------------------------
+# Restart
+# ---------------------------------------------------------------------------
+
+class TestRestart(_LedgerTestCase):
+
+    def test_shutdown_writes_pending_usage(self):
+        ledger = self._ledger()
+        ledger.record_usage("u1", 4, 6)
+        ledger.shutdown()
+        self.assertEqual(self._stored(), (4, 6, 10))
+
+    def test_restarted_ledger_starts_from_stored_totals(self):
+        before = self._ledger()
+        before.record_usage("u1", 40, 2)
+        before.shutdown()
+
+        after = self._ledger()
+        usage = after.get_usage("u1")
+        self.assertEqual((usage["input_tokens_used"], usage["output_tokens_used"]), (40, 2))
+        self.assertIsNotNone(usage["last_usage_at"])
+        self.assertEqual(after.periods_used_since("u1", datetime(2000, 1, 1, tzinfo=timezone.utc)), 1)
+
+        after.record_usage("u1", 1, 1)
+        after.shutdown()
+        self.assertEqual(self._stored(), (41, 3, 44))
+
+
+# ---------------------------------------------------------------------------
+# Profile cache
+# ---------------------------------------------------------------------------
+
+class TestProfileCache(_LedgerTestCase):
+
+    def test_profiles_are_cached_until_invalidated(self):
+        ledger = self._ledger()
+        loader = MagicMock(return_value={"limit": 1})
+        ledger.get_profile("quota", "u1", loader)
+        ledger.get_profile("quota", "u1", loader)
+        self.assertEqual(loader.call_count, 1)
+
+        ledger.invalidate_profiles("u2")
+        ledger.get_profile("quota", "u1", loader)
+        self.assertEqual(loader.call_count, 1)
+
+        ledger.invalidate_profiles("u1")
+        ledger.get_profile("quota", "u1", loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_zero_ttl_disables_profile_cache(self):
+        ledger = self._ledger()
+        loader = MagicMock(return_value=None)
+        with patch.object(APP_CONFIG, "CONSUMPTION_PROFILE_CACHE_TTL_SECONDS", 0):
+            ledger.get_profile("quota", "u1", loader)
+            ledger.get_profile("quota", "u1", loader)
+        self.assertEqual(loader.call_count, 2)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)